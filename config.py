@@ -63,6 +63,7 @@ SUPPRESSIONS_FILE = os.path.join(USER_DATA_DIR, "suppressions.json")
 PREFERENCES_FILE = os.path.join(USER_DATA_DIR, "preferences.json")
 EVENTS_FILE = os.path.join(USER_DATA_DIR, "events.jsonl")
 CALIBRATION_FILE = os.path.join(USER_DATA_DIR, "calibration.json")
+STATE_PREDICTOR_FILE = os.path.join(USER_DATA_DIR, "state_predictor.json")
 
 # --- Application Mode ---
 DEFAULT_MODE = _get_conf("DEFAULT_MODE", "active")
@@ -109,6 +110,11 @@ VIDEO_ACTIVE_DELAY = _get_conf("VIDEO_ACTIVE_DELAY", 0.05, float) # 20 FPS
 VIDEO_ECO_MODE_DELAY = _get_conf("VIDEO_ECO_MODE_DELAY", 0.2, float) # 5 FPS (Required for <200ms wake-up latency)
 VIDEO_ECO_HEARTBEAT_INTERVAL = _get_conf("VIDEO_ECO_HEARTBEAT_INTERVAL", 1.0, float) # Max time between face checks (seconds)
 
+# Session Recording / Playback (sensors/session_recording.py)
+SESSION_RECORDING_PATH = _get_conf("SESSION_RECORDING_PATH", None) # Directory to record raw video/audio/window streams into
+SESSION_PLAYBACK_PATH = _get_conf("SESSION_PLAYBACK_PATH", None) # Recorded session to replay instead of camera/microphone/window
+SESSION_PLAYBACK_SPEED = _get_conf("SESSION_PLAYBACK_SPEED", 1.0, float) # 1.0 = real time, N = N x faster, 0 = unthrottled
+
 # --- Meeting Mode ---
 MEETING_MODE_SPEECH_DURATION_THRESHOLD = _get_conf("MEETING_MODE_SPEECH_DURATION_THRESHOLD", 3.0, float)
 MEETING_MODE_IDLE_KEYBOARD_THRESHOLD = _get_conf("MEETING_MODE_IDLE_KEYBOARD_THRESHOLD", 10.0, float)
@@ -166,11 +172,82 @@ LOCAL_LLM_MODEL_ID = _get_conf("LOCAL_LLM_MODEL_ID", "deepseek/deepseek-r1-0528-
 LMM_FALLBACK_ENABLED = _get_conf("LMM_FALLBACK_ENABLED", True, bool)
 LMM_CIRCUIT_BREAKER_MAX_FAILURES = _get_conf("LMM_CIRCUIT_BREAKER_MAX_FAILURES", 5, int)
 LMM_CIRCUIT_BREAKER_COOLDOWN = _get_conf("LMM_CIRCUIT_BREAKER_COOLDOWN", 60, int)
+# Adaptive read timeout (core/lmm_health.py): multiplier x latency percentile of recent calls, at least LMM_TIMEOUT_MIN
+LMM_TIMEOUT_PERCENTILE = _get_conf("LMM_TIMEOUT_PERCENTILE", 95.0, float)
+LMM_TIMEOUT_MULTIPLIER = _get_conf("LMM_TIMEOUT_MULTIPLIER", 2.0, float) # 0 = always LMM_READ_TIMEOUT
+LMM_TIMEOUT_MIN = _get_conf("LMM_TIMEOUT_MIN", 5.0, float)
+# Startup warm-up (LMMInterface.warm_up): a representative request loads the model and measures its latency
+LMM_WARMUP_ENABLED = _get_conf("LMM_WARMUP_ENABLED", True, bool)
+LMM_WARMUP_RUNS = _get_conf("LMM_WARMUP_RUNS", 2, int) # Warm requests timed after the cold one
+LMM_WARMUP_TIMEOUT = _get_conf("LMM_WARMUP_TIMEOUT", 120.0, float) # Read timeout of the cold request (model load)
+LMM_WARMUP_INTERVAL_FACTOR = _get_conf("LMM_WARMUP_INTERVAL_FACTOR", 2.0, float) # Periodic interval >= factor x warm latency
+# Workload classes (core/lmm_workloads.py): state_estimation > pose_suggestion > history_summary > caption
+# Per-class overrides, e.g. {"caption": {"max_concurrent": 2}}; keys: priority, max_concurrent, yields
+LMM_WORKLOAD_CLASSES = _get_conf("LMM_WORKLOAD_CLASSES", {}, dict)
+LMM_WORKLOAD_MAX_DEFER = _get_conf("LMM_WORKLOAD_MAX_DEFER", 30.0, float) # Max seconds background work waits for analyses
+# Urgent triggers (high audio/video/arousal) may cancel an in-flight periodic check (core/lmm_scheduler.py)
+LMM_PREEMPTION_ENABLED = _get_conf("LMM_PREEMPTION_ENABLED", True, bool)
+# Pooled keep-alive HTTP client (core/lmm_http_client.py): separate connect/read budgets and pool sizes
+LMM_CONNECT_TIMEOUT = _get_conf("LMM_CONNECT_TIMEOUT", 3.0, float)
+LMM_READ_TIMEOUT = _get_conf("LMM_READ_TIMEOUT", 20.0, float)
+LMM_HTTP_POOL_SIZE = _get_conf("LMM_HTTP_POOL_SIZE", 4, int) # Idle connections kept per host
+LMM_HTTP_MAX_HOSTS = _get_conf("LMM_HTTP_MAX_HOSTS", 4, int) # Hosts whose pools are kept
+# Stream completions (SSE) and apply state_estimation as soon as it is parsed; generation is cut off once all fields are in
+LMM_STREAMING_ENABLED = _get_conf("LMM_STREAMING_ENABLED", False, bool)
+# Response cache keyed on quantized context + perceptual frame hash (core/lmm_cache.py); high-priority triggers bypass it
+LMM_CACHE_ENABLED = _get_conf("LMM_CACHE_ENABLED", False, bool)
+LMM_CACHE_TTL = _get_conf("LMM_CACHE_TTL", 15.0, float) # Max age (s) of a reused analysis
+LMM_CACHE_MAX_ENTRIES = _get_conf("LMM_CACHE_MAX_ENTRIES", 64, int)
+# llama.cpp server prompt (KV) cache hints sent with each request; leave off for servers that reject unknown fields
+LMM_CACHE_PROMPT = _get_conf("LMM_CACHE_PROMPT", False, bool)
+LMM_SLOT_ID = _get_conf("LMM_SLOT_ID", -1, int) # Pin requests to one server slot (-1 = let the server choose)
+# Token budget of the user message (core/prompt_builder.py); low-value sections are trimmed or summarized first
+LMM_PROMPT_TOKEN_BUDGET = _get_conf("LMM_PROMPT_TOKEN_BUDGET", 800, int) # 0 = unlimited
+LMM_TOKEN_ESTIMATOR = _get_conf("LMM_TOKEN_ESTIMATOR", "chars") # "chars" (~4 chars/token) or "words" (~1.3 tokens/word)
+# Retry budget and hedging (core/lmm_interface.py): all attempts of one request share the deadline
+LMM_REQUEST_DEADLINE = _get_conf("LMM_REQUEST_DEADLINE", 30.0, float)
+LMM_HEDGE_URL = _get_conf("LMM_HEDGE_URL", "") # Second inference server for hedged requests ("" = off)
+LMM_HEDGE_PERCENTILE = _get_conf("LMM_HEDGE_PERCENTILE", 95.0, float) # Primary latency percentile after which to hedge
+# Multiple inference servers (core/lmm_router.py). Each entry: {"url", "weight": 1.0, "capabilities": ["vision", "text"]}
+# Empty = LOCAL_LLM_URL only. Example: [{"url": "http://gpu1:1234", "weight": 2}, {"url": "http://cpu1:8080", "capabilities": ["text"]}]
+LMM_ENDPOINTS = _get_conf("LMM_ENDPOINTS", [], list)
+LMM_ROUTER_EWMA_ALPHA = _get_conf("LMM_ROUTER_EWMA_ALPHA", 0.3, float) # Weight of the newest sample in latency/error averages
+LMM_ROUTER_EJECT_AFTER = _get_conf("LMM_ROUTER_EJECT_AFTER", 3, int) # Consecutive failures before an endpoint is ejected
+LMM_ROUTER_PROBE_INTERVAL = _get_conf("LMM_ROUTER_PROBE_INTERVAL", 10.0, float) # Seconds between /v1/models probes of ejected endpoints
+# Two-tier cascade: a small text-only model screens each call; the vision model only runs on escalation
+LMM_CASCADE_ENABLED = _get_conf("LMM_CASCADE_ENABLED", False, bool)
+LMM_CASCADE_TEXT_MODEL_ID = _get_conf("LMM_CASCADE_TEXT_MODEL_ID", "") # "" = LOCAL_LLM_MODEL_ID
+LMM_CASCADE_CONFIDENCE_THRESHOLD = _get_conf("LMM_CASCADE_CONFIDENCE_THRESHOLD", 0.7, float) # Escalate below this self-reported confidence
+LMM_CASCADE_VISUAL_MAX_AGE = _get_conf("LMM_CASCADE_VISUAL_MAX_AGE", 120.0, float) # Seconds before the camera must be looked at again
+LMM_CASCADE_TEXT_DEADLINE = _get_conf("LMM_CASCADE_TEXT_DEADLINE", 8.0, float) # Retry budget of the text tier
+# Temporal montage: several recent frames tiled into the one image sent per call
+LMM_MONTAGE_FRAMES = _get_conf("LMM_MONTAGE_FRAMES", 0, int) # Frames per montage (0 or 1 = send the latest frame only)
+LMM_MONTAGE_WINDOW = _get_conf("LMM_MONTAGE_WINDOW", 20.0, float) # Seconds of capture history to pick frames from
+LMM_MONTAGE_TILE_WIDTH = _get_conf("LMM_MONTAGE_TILE_WIDTH", 320, int) # Pixel width of each tile
+LMM_MONTAGE_MAX_WIDTH = _get_conf("LMM_MONTAGE_MAX_WIDTH", 1024, int) # Montage width cap; tiles shrink to fit
+LMM_MONTAGE_SAMPLE_INTERVAL = _get_conf("LMM_MONTAGE_SAMPLE_INTERVAL", 0.5, float) # Seconds between kept frames (face changes are always kept)
+
+# Local state predictor (tools/train_state_predictor.py): sensor features -> state between LMM calls
+STATE_PREDICTOR_ENABLED = _get_conf("STATE_PREDICTOR_ENABLED", False, bool)
+STATE_PREDICTOR_INTERVAL = _get_conf("STATE_PREDICTOR_INTERVAL", 5.0, float) # Seconds between local predictions
+STATE_PREDICTOR_MIN_CONFIDENCE = _get_conf("STATE_PREDICTOR_MIN_CONFIDENCE", 0.8, float) # Below this, predictions are ignored
+STATE_PREDICTOR_MAX_DEVIATION = _get_conf("STATE_PREDICTOR_MAX_DEVIATION", 10, int) # Max points from the last LMM state to skip a periodic check
+STATE_PREDICTOR_MAX_SKIP = _get_conf("STATE_PREDICTOR_MAX_SKIP", 60.0, float) # Seconds after which the LMM is asked regardless
+
+# Novelty gating: periodic checks only go out when the snapshot changed since the last analysis
+LMM_NOVELTY_THRESHOLD = _get_conf("LMM_NOVELTY_THRESHOLD", 0.0, float) # Minimum feature distance to dispatch (0 = always dispatch)
+LMM_NOVELTY_MAX_STALENESS = _get_conf("LMM_NOVELTY_MAX_STALENESS", 60.0, float) # Seconds after which a periodic check goes out anyway
 
 # --- Context History ---
 HISTORY_SAMPLE_INTERVAL = _get_conf("HISTORY_SAMPLE_INTERVAL", 10, int) # Seconds between history snapshots
 HISTORY_WINDOW_SIZE = _get_conf("HISTORY_WINDOW_SIZE", 5, int) # Number of snapshots to keep
+HISTORY_MAX_SEGMENTS = _get_conf("HISTORY_MAX_SEGMENTS", 8, int) # Run-length segments kept for snapshots older than the window
+HISTORY_NARRATIVE_INTERVAL = _get_conf("HISTORY_NARRATIVE_INTERVAL", 0, float) # Seconds between background LMM history summaries (0 = off)
 RAPID_SWITCHING_THRESHOLD = _get_conf("RAPID_SWITCHING_THRESHOLD", 4, int) # Unique windows to trigger alert
+# Rolling sensor metric store (core/metric_store.py): raw ring size and buckets per rollup tier (1s/10s/60s)
+METRIC_STORE_CAPACITY = _get_conf("METRIC_STORE_CAPACITY", 4096, int)
+METRIC_STORE_ROLLUP_BUCKETS = _get_conf("METRIC_STORE_ROLLUP_BUCKETS", 720, int)
+METRIC_TREND_WINDOW = _get_conf("METRIC_TREND_WINDOW", 60, int) # Seconds summarised as "trends" in the LMM context
 
 # --- Reflexive Triggers ---
 # Simplified lists for common use cases
@@ -187,6 +264,13 @@ FOCUS_APPS = _get_conf("FOCUS_APPS", [
 REFLEXIVE_WINDOW_TRIGGERS = _get_conf("REFLEXIVE_WINDOW_TRIGGERS", {}, dict)
 REFLEXIVE_WINDOW_COOLDOWN = _get_conf("REFLEXIVE_WINDOW_COOLDOWN", 300, int) # 5 minutes
 
+# Declarative sensor trigger rules evaluated over rolling metric windows (core/trigger_rules.py).
+# Each rule: {"name", "when": ["agg(metric, Ns) op value", ...], "action": "lmm" | "intervention",
+#             "intervention": id, "tier", "priority": "low"|"normal"|"high", "cooldown": s, "modes": [...]}
+# Example: {"name": "sustained_noise", "when": ["min(audio_rms, 3s) > 0.4", "fraction_true(is_speech, 3s) < 0.2"],
+#           "action": "lmm", "priority": "high", "cooldown": 60}
+TRIGGER_RULES = _get_conf("TRIGGER_RULES", [], list)
+
 # --- Voice Commands ---
 # Mapping of keywords to intervention IDs
 VOICE_COMMANDS = _get_conf("VOICE_COMMANDS", {
@@ -213,6 +297,12 @@ ENABLE_MUSIC_CONTROL = _get_conf("ENABLE_MUSIC_CONTROL", False, bool)
 
 # --- Performance ---
 PERFORMANCE_MODE = _get_conf("PERFORMANCE_MODE", "high") # "high" or "low" (eco)
+# The main loop is event-driven; this is the only fixed-rate wake-up (sensor health polling)
+SENSOR_HEALTH_CHECK_INTERVAL = _get_conf("SENSOR_HEALTH_CHECK_INTERVAL", 0.5, float)
+# Run sensors, LMM calls and interventions as tasks on one asyncio loop (core/async_runtime.py)
+USE_ASYNC_RUNTIME = _get_conf("USE_ASYNC_RUNTIME", False, bool)
+ASYNC_MAX_WORKERS = _get_conf("ASYNC_MAX_WORKERS", 4, int) # Bounded executor for blocking TTS/HTTP work (sensors poll on dedicated threads)
+ASYNC_LMM_MAX_CONCURRENCY = _get_conf("ASYNC_LMM_MAX_CONCURRENCY", 1, int)
 
 # --- API Keys ---
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
@@ -0,0 +1,324 @@
+import asyncio
+import functools
+import threading
+import time
+import concurrent.futures
+from typing import Optional, Any, Callable, Dict, Set
+
+import config
+
+
+class TaskHandle:
+    """
+    Thread-like view of a coroutine scheduled on the runtime loop.
+
+    LogicEngine and InterventionEngine keep their `lmm_thread` / `intervention_thread`
+    checks (`is_alive()`, `join()`), so the handle mimics that part of threading.Thread
+    and adds cancel().
+    """
+
+    def __init__(self, future: concurrent.futures.Future, finished: threading.Event) -> None:
+        self._future = future
+        # Set once the coroutine's cleanup has run (a cancelled Future reports done() earlier)
+        self._finished = finished
+
+    def is_alive(self) -> bool:
+        return not self._finished.is_set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        # Errors are reported by the task itself; join() only waits.
+        self._finished.wait(timeout)
+
+    def cancel(self) -> bool:
+        return self._future.cancel()
+
+    def cancelled(self) -> bool:
+        return self._future.cancelled()
+
+
+class AsyncRuntime:
+    """
+    Single asyncio orchestration core (enabled with USE_ASYNC_RUNTIME).
+
+    Sensor polling, the decision loop, LMM calls and intervention sequences run as
+    tasks on one event loop. Blocking work (face detection, HTTP requests, TTS) is
+    pushed to one bounded executor, LMM calls are capped by a semaphore, and
+    intervention `wait` steps are plain awaits so stop_intervention() cancels them
+    immediately instead of waiting for a sleeping thread.
+
+    Camera and microphone reads block for most of their poll cycle, so each sensor
+    polls on its own dedicated thread instead of occupying an executor worker, and the
+    decision loop waits for EventScheduler signals on an asyncio.Event rather than in a
+    thread. The executor's workers are all left for LMM and intervention work.
+    """
+
+    def __init__(self, app: Any, max_workers: Optional[int] = None,
+                 max_lmm_concurrency: Optional[int] = None) -> None:
+        self.app = app
+        self.logger = getattr(app, 'data_logger', None)
+
+        self.max_workers: int = max_workers or getattr(config, 'ASYNC_MAX_WORKERS', 4)
+        self.max_lmm_concurrency: int = max_lmm_concurrency or getattr(config, 'ASYNC_LMM_MAX_CONCURRENCY', 1)
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="acr-worker"
+        )
+        # One thread per sensor: their reads must never wait behind (or block) LMM work
+        self._sensor_executors: Dict[str, concurrent.futures.ThreadPoolExecutor] = {
+            name: concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"acr-{name}")
+            for name in ("video", "audio")
+        }
+        self._lmm_semaphore: Optional[asyncio.Semaphore] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Only used by start_in_thread()/stop()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping: bool = False
+
+    # --- Lifecycle ---
+
+    def run(self) -> None:
+        """Runs the orchestration loop on the calling thread until the app stops."""
+        asyncio.run(self._main())
+
+    def start_in_thread(self) -> None:
+        """Runs the loop on a daemon thread (used by tests and embedders). Returns once the loop is up."""
+        ready = threading.Event()
+
+        def _runner():
+            async def _serve():
+                self._attach(asyncio.get_running_loop())
+                ready.set()
+                while not self._stopping:
+                    await asyncio.sleep(0.05)
+                await self._cancel_tasks()
+            asyncio.run(_serve())
+            self._detach()
+
+        self._stopping = False
+        self._thread = threading.Thread(target=_runner, daemon=True)
+        self._thread.start()
+        ready.wait(5.0)
+
+    def stop(self) -> None:
+        """Stops a loop started with start_in_thread()."""
+        self._stopping = True
+        if self._thread:
+            self._thread.join(timeout=5.0)
+        self._shutdown_executors()
+
+    def _shutdown_executors(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for executor in self._sensor_executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self._lmm_semaphore = asyncio.Semaphore(self.max_lmm_concurrency)
+        self._wake = asyncio.Event()
+        scheduler = getattr(self.app, 'scheduler', None)
+        if scheduler is not None:
+            scheduler.add_listener(self._on_scheduler_notify)
+        self.app.task_runner = self
+        if getattr(self.app, 'logic_engine', None):
+            self.app.logic_engine.task_runner = self
+        if getattr(self.app, 'intervention_engine', None):
+            self.app.intervention_engine.task_runner = self
+        if getattr(self.app, 'tray_icon', None):
+            self.app.tray_icon.task_runner = self
+
+    def _detach(self) -> None:
+        scheduler = getattr(self.app, 'scheduler', None)
+        if scheduler is not None:
+            scheduler.remove_listener(self._on_scheduler_notify)
+        self.app.task_runner = None
+        if getattr(self.app, 'logic_engine', None):
+            self.app.logic_engine.task_runner = None
+        if getattr(self.app, 'intervention_engine', None):
+            self.app.intervention_engine.task_runner = None
+        if getattr(self.app, 'tray_icon', None):
+            self.app.tray_icon.task_runner = None
+
+    async def _main(self) -> None:
+        self._attach(asyncio.get_running_loop())
+        self._log_info(f"Async runtime started (workers={self.max_workers}, lmm_concurrency={self.max_lmm_concurrency}).")
+
+        self._spawn(self._sensor_loop(self.app._poll_video_once, "video"))
+        self._spawn(self._sensor_loop(self.app._poll_audio_once, "audio"))
+        try:
+            await self._decision_loop()
+        finally:
+            await self._cancel_tasks()
+            self._detach()
+            self._shutdown_executors()
+            self._log_info("Async runtime stopped.")
+
+    async def _cancel_tasks(self) -> None:
+        tasks = [t for t in self._tasks if not t.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # --- Helpers ---
+
+    async def _blocking(self, fn: Callable, *args, **kwargs) -> Any:
+        """Runs a blocking callable on the bounded executor."""
+        return await self.loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def _on_scheduler_notify(self) -> None:
+        """EventScheduler listener; runs on the producer's thread."""
+        loop, wake = self.loop, self._wake
+        if loop is None or wake is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass  # Loop already closed during shutdown
+
+    async def _wait_until(self, deadline: Optional[float]) -> Set[str]:
+        """Async EventScheduler.wait_until(): sleeps on the loop until notified or `deadline` (wall clock)."""
+        scheduler = self.app.scheduler
+        if not scheduler.pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        # Clear before draining: a notify() after this point sets the event again
+        self._wake.clear()
+        return scheduler.drain()
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _submit(self, coro) -> TaskHandle:
+        """Schedules a coroutine from any thread and returns a thread-like handle."""
+        finished = threading.Event()
+        started = threading.Event()
+
+        async def _tracked():
+            started.set()
+            task = asyncio.current_task()
+            self._tasks.add(task)
+            try:
+                return await coro
+            finally:
+                self._tasks.discard(task)
+                finished.set()
+
+        def _on_done(fut):
+            # Cancelled before the loop picked it up: nothing left to clean up
+            if not started.is_set():
+                coro.close()
+                finished.set()
+
+        future = asyncio.run_coroutine_threadsafe(_tracked(), self.loop)
+        future.add_done_callback(_on_done)
+        return TaskHandle(future, finished)
+
+    def _log_info(self, msg: str) -> None:
+        if self.logger: self.logger.log_info(msg)
+
+    def _log_error(self, msg: str) -> None:
+        if self.logger: self.logger.log_error(msg)
+
+    # --- Loops ---
+
+    async def _sensor_loop(self, poll: Callable[[], Optional[float]], name: str) -> None:
+        self._log_info(f"{name.capitalize()} sensor task started.")
+        executor = self._sensor_executors[name]
+        while self.app.running:
+            delay = await self.loop.run_in_executor(executor, poll)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        self._log_info(f"{name.capitalize()} sensor task stopped.")
+
+    async def _decision_loop(self) -> None:
+        app = self.app
+        while app.running:
+            deadline = await self._blocking(app._run_iteration)
+            if not app.running:
+                break
+            await self._wait_until(deadline)
+
+    # --- Task entry points used by the engines ---
+
+    def submit_background(self, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Fire-and-forget job on the bounded executor (tray flashes, social drafts, ...)."""
+        def _job():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                self._log_error(f"Background task {getattr(fn, '__name__', fn)} failed: {e}")
+        return self._executor.submit(_job)
+
+    def start_lmm_analysis(self, engine: Any, payload: Dict[str, Any], allow_intervention: bool,
+                           request: Optional[Any] = None) -> TaskHandle:
+        return self._submit(self._lmm_task(engine, payload, allow_intervention, request))
+
+    async def _lmm_task(self, engine: Any, payload: Dict[str, Any], allow_intervention: bool,
+                        request: Optional[Any] = None) -> None:
+        try:
+            async with self._lmm_semaphore:
+                analysis = await self._blocking(engine._request_analysis, payload, request)
+            if request is not None and request.cancelled.is_set():
+                self._log_info(f"Discarding result of preempted LMM request ({request.reason}).")
+            else:
+                await self._blocking(engine._handle_lmm_analysis, analysis, allow_intervention)
+        except asyncio.CancelledError:
+            self._log_info("LMM analysis task cancelled.")
+            raise
+        except Exception as e:
+            engine._on_lmm_analysis_error(e)
+        finally:
+            await self._finish_lmm_request(engine, request)
+
+    async def _finish_lmm_request(self, engine: Any, request: Optional[Any]) -> None:
+        """
+        Completion may dispatch the next coalesced or preempting request, which builds its
+        payload (frame encoding, metric summaries), so it runs on the executor, not the loop.
+        """
+        try:
+            await self._blocking(engine._on_lmm_request_done, request)
+        except asyncio.CancelledError:
+            # Still free the scheduler slot (complete() ignores a request it already released)
+            engine._on_lmm_request_done(request)
+            raise
+        except RuntimeError:
+            engine._on_lmm_request_done(request)  # Executor already shut down
+
+    def start_intervention(self, engine: Any) -> TaskHandle:
+        return self._submit(self._intervention_task(engine))
+
+    async def _intervention_task(self, engine: Any) -> None:
+        run = None
+        try:
+            # Inside the try: a stop during the prologue must still clear the active flag
+            run = await self._blocking(engine._prepare_intervention_run)
+            if run["sequence"]:
+                for step in run["sequence"]:
+                    if not engine._intervention_active.is_set():
+                        break
+                    if step.get("action") == "wait":
+                        await asyncio.sleep(step.get("duration", 0))
+                    else:
+                        await self._blocking(engine._execute_step, step, run["logger"])
+            else:
+                await self._blocking(engine._run_legacy_intervention, run)
+        except asyncio.CancelledError:
+            engine._intervention_active.clear()
+            voice = getattr(engine, 'voice_interface', None)
+            if voice:
+                voice.stop()
+            raise
+        except Exception as e:
+            self._log_error(f"Intervention task failed: {e}")
+        finally:
+            engine._finish_intervention_run(run)
@@ -0,0 +1,84 @@
+import time
+import threading
+from typing import Optional
+
+
+class Clock:
+    """
+    Time source for the engines (cooldowns, snooze, probation, circuit breaker,
+    intervention waits, LMM backoff).
+
+    Components take a `clock` argument and call clock.time() / clock.sleep()
+    instead of the time module, so the same code can run on the wall clock or on
+    a VirtualClock that replays an hour of scenario in milliseconds.
+    """
+
+    def time(self) -> float:
+        raise NotImplementedError
+
+    def sleep(self, seconds: float) -> None:
+        raise NotImplementedError
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        """Waits for `event` up to `timeout` seconds; returns whether it is set."""
+        raise NotImplementedError
+
+
+class SystemClock(Clock):
+    """Wall-clock time. Looks up time.time / time.sleep on every call, so patches of the time module still apply."""
+
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        return event.wait(timeout)
+
+
+class VirtualClock(Clock):
+    """
+    Deterministic clock that only moves when told to.
+
+    sleep() and wait() advance the virtual time instantly instead of blocking, so
+    code that waits in small steps (e.g. InterventionEngine._wait) still observes
+    the same sequence of timestamps as it would on the wall clock.
+    """
+
+    def __init__(self, start: float = 0.0) -> None:
+        self._now: float = float(start)
+        self._lock: threading.Lock = threading.Lock()
+
+    def time(self) -> float:
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds: float) -> float:
+        """Moves time forward by `seconds` (negative values are ignored); returns the new time."""
+        with self._lock:
+            if seconds > 0:
+                self._now += seconds
+            return self._now
+
+    def set(self, timestamp: float) -> None:
+        """Jumps to `timestamp`. Time never runs backwards."""
+        with self._lock:
+            self._now = max(self._now, float(timestamp))
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        if event.is_set():
+            return True
+        if timeout is not None:
+            self.advance(timeout)
+        return event.is_set()
+
+    def __repr__(self) -> str:
+        return f"VirtualClock({self._now:.3f})"
+
+
+# Shared default for components constructed without an explicit clock
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,96 @@
+import time
+import threading
+from collections import Counter
+from typing import Optional, Set, Dict, List, Callable
+
+
+class EventScheduler:
+    """
+    Single wait primitive for the main loop.
+
+    Producers (sensor workers, hotkeys, LMM completions, mode changes) call
+    notify(); the main loop calls wait_until() with the earliest deadline it
+    cares about and sleeps until either something was signalled or that
+    deadline is reached. Nothing wakes the loop when nothing happened.
+    """
+
+    def __init__(self) -> None:
+        self._cond: threading.Condition = threading.Condition()
+        self._pending: Set[str] = set()
+        self._stopped: bool = False
+        # Called after every notify()/stop(), e.g. to wake an asyncio loop (see AsyncRuntime)
+        self._listeners: List[Callable[[], None]] = []
+
+        # Instrumentation: how often and why the loop woke up
+        self.wakeups: Counter = Counter()
+
+    def notify(self, source: str = "event") -> None:
+        """Signals that `source` has new work for the main loop. Thread-safe."""
+        with self._cond:
+            self._pending.add(source)
+            self._cond.notify_all()
+        self._notify_listeners()
+
+    def stop(self) -> None:
+        """Releases any waiter permanently (used on shutdown)."""
+        with self._cond:
+            self._stopped = True
+            self._pending.add("stop")
+            self._cond.notify_all()
+        self._notify_listeners()
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """`callback()` runs on the notifying thread after every notify() and stop(); it must not block."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]) -> None:
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify_listeners(self) -> None:
+        for callback in list(self._listeners):
+            callback()
+
+    @property
+    def pending(self) -> bool:
+        """True if an event was signalled since the last wait_until()/drain()."""
+        with self._cond:
+            return bool(self._pending)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    def wait_until(self, deadline: Optional[float]) -> Set[str]:
+        """
+        Blocks until an event is pending or the wall-clock `deadline` passes.
+        A deadline of None waits for the next event only.
+
+        Returns the set of event sources that fired since the previous call,
+        or {"timeout"} if the deadline was reached first.
+        """
+        with self._cond:
+            while not self._pending:
+                if deadline is None:
+                    self._cond.wait()
+                    continue
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            fired = self._pending
+            self._pending = set()
+
+        if not fired:
+            fired = {"timeout"}
+        self.wakeups.update(fired)
+        return fired
+
+    def drain(self) -> Set[str]:
+        """Non-blocking wait_until(): returns and clears the pending sources, or {"timeout"} if there are none."""
+        return self.wait_until(0.0)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Returns wake-up counts per source."""
+        return dict(self.wakeups)
@@ -0,0 +1,126 @@
+import math
+import threading
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+import cv2
+import numpy as np
+
+import config
+
+# Bonus added to a frame's motion score when face presence, face count or posture changed
+FACE_CHANGE_SALIENCY = 100.0
+
+
+class _Candidate:
+    __slots__ = ("timestamp", "thumb", "saliency")
+
+    def __init__(self, timestamp: float, thumb: np.ndarray, saliency: float) -> None:
+        self.timestamp = timestamp
+        self.thumb = thumb
+        self.saliency = saliency
+
+
+class FrameMontage:
+    """
+    Tiles several recent camera frames into one image so a single LMM call sees motion
+    (pacing, fidgeting, picking up a phone again and again) instead of one still.
+
+    `add` is called for every processed frame. At most one downscaled copy per
+    `sample_interval` is kept, plus any frame where face presence, face count or
+    posture changed, for the last `window` seconds. Each kept frame is scored by its
+    motion (video activity) plus FACE_CHANGE_SALIENCY when the face state changed.
+
+    `build` picks `frames` of them: always the newest frame, then the most salient
+    ones, spread at least window / (2 * frames) apart, and tiles them oldest first
+    (left to right, top to bottom) with a "T-<seconds>s" label each. The montage is
+    never wider than `max_width`, whatever the camera resolution.
+    """
+
+    def __init__(self, frames: Optional[int] = None, window: Optional[float] = None,
+                 tile_width: Optional[int] = None, max_width: Optional[int] = None,
+                 sample_interval: Optional[float] = None) -> None:
+        self.frames: int = frames if frames is not None else getattr(config, 'LMM_MONTAGE_FRAMES', 0)
+        self.window: float = window if window is not None else getattr(config, 'LMM_MONTAGE_WINDOW', 20.0)
+        self.tile_width: int = tile_width or getattr(config, 'LMM_MONTAGE_TILE_WIDTH', 320)
+        self.max_width: int = max_width or getattr(config, 'LMM_MONTAGE_MAX_WIDTH', 1024)
+        self.sample_interval: float = sample_interval if sample_interval is not None else getattr(config, 'LMM_MONTAGE_SAMPLE_INTERVAL', 0.5)
+        capacity = int(math.ceil(self.window / max(self.sample_interval, 0.05))) + self.frames + 1
+        self._candidates: deque = deque(maxlen=capacity)
+        self._latest: Optional[Tuple[float, np.ndarray]] = None
+        self._last_face_state: Optional[tuple] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.frames > 1
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        height, width = frame.shape[:2]
+        if width <= self.tile_width:
+            return frame.copy()
+        tile_height = max(1, int(round(height * self.tile_width / width)))
+        return cv2.resize(frame, (self.tile_width, tile_height), interpolation=cv2.INTER_AREA)
+
+    def add(self, frame: Optional[np.ndarray], timestamp: float, video_activity: float = 0.0,
+            face_detected: bool = False, face_count: int = 0, posture: Optional[str] = None) -> None:
+        if not self.enabled or frame is None:
+            return
+        face_state = (bool(face_detected), int(face_count or 0), posture)
+        with self._lock:
+            self._latest = (timestamp, frame)
+            changed = self._last_face_state is not None and face_state != self._last_face_state
+            self._last_face_state = face_state
+            last = self._candidates[-1] if self._candidates else None
+            if not changed and last is not None and timestamp - last.timestamp < self.sample_interval:
+                return
+            saliency = float(video_activity or 0.0) + (FACE_CHANGE_SALIENCY if changed else 0.0)
+        # Downscale outside the lock; the video thread is the only writer
+        candidate = _Candidate(timestamp, self._thumbnail(frame), saliency)
+        with self._lock:
+            self._candidates.append(candidate)
+
+    def _select(self, now: float) -> List[_Candidate]:
+        latest_ts, latest_frame = self._latest
+        newest = _Candidate(latest_ts, self._thumbnail(latest_frame), float("inf"))
+        older = [c for c in self._candidates if now - c.timestamp <= self.window and c.timestamp < latest_ts]
+        spacing = self.window / (2 * self.frames)
+        picked = [newest]
+        for candidate in sorted(older, key=lambda c: -c.saliency):
+            if len(picked) >= self.frames:
+                break
+            if all(abs(candidate.timestamp - p.timestamp) >= spacing for p in picked):
+                picked.append(candidate)
+        return sorted(picked, key=lambda c: c.timestamp)
+
+    def build(self, now: float) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+        """Returns (montage image, {"frames", "offsets"}), or None when there is nothing to tile."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._latest is None:
+                return None
+            picked = self._select(now)
+        if len(picked) < 2:
+            return None
+
+        cols = int(math.ceil(math.sqrt(len(picked))))
+        rows = int(math.ceil(len(picked) / cols))
+        tile_w = min(self.tile_width, self.max_width // cols)
+        src_h, src_w = picked[-1].thumb.shape[:2]
+        tile_h = max(1, int(round(src_h * tile_w / src_w)))
+        montage = np.zeros((rows * tile_h, cols * tile_w, 3), dtype=np.uint8)
+
+        offsets = []
+        for i, candidate in enumerate(picked):
+            tile = cv2.resize(candidate.thumb, (tile_w, tile_h), interpolation=cv2.INTER_AREA)
+            if tile.ndim == 2:
+                tile = cv2.cvtColor(tile, cv2.COLOR_GRAY2BGR)
+            offset = int(round(now - candidate.timestamp))
+            offsets.append(offset)
+            label = f"T-{offset}s"
+            cv2.rectangle(tile, (0, 0), (8 + 9 * len(label), 18), (0, 0, 0), -1)
+            cv2.putText(tile, label, (4, 14), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (255, 255, 255), 1, cv2.LINE_AA)
+            row, col = divmod(i, cols)
+            montage[row * tile_h:(row + 1) * tile_h, col * tile_w:(col + 1) * tile_w] = tile
+        return montage, {"frames": len(picked), "offsets": offsets}
@@ -0,0 +1,162 @@
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+import config
+from .prompt_builder import truncate_text
+
+
+def window_label(title: Optional[str]) -> str:
+    """
+    The application part of a window title ("main.py - project - Visual Studio Code"
+    -> "Visual Studio Code"), so switching files or tabs in one app does not break a run.
+    """
+    if not title:
+        return "Unknown"
+    return truncate_text(title.rsplit(" - ", 1)[-1].strip() or title, max_length=40)
+
+
+def _dominant(counts: Dict[str, float]) -> str:
+    # Ties go to the label seen first, which keeps merged segments stable
+    return max(counts, key=counts.get) if counts else "unknown"
+
+
+class HistorySegment:
+    """A run of consecutive history snapshots folded into duration-weighted counters."""
+
+    def __init__(self, start: float) -> None:
+        self.start: float = start
+        self.end: float = start
+        self.samples: int = 0
+        self.windows: Dict[str, float] = {}   # Seconds per window label
+        self.modes: Dict[str, float] = {}
+        self.postures: Dict[str, float] = {}
+        self.face_seconds: float = 0.0
+        self.audio_sum: float = 0.0
+        self.motion_sum: float = 0.0
+        self.speech_sum: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def face_presence(self) -> float:
+        return self.face_seconds / self.duration if self.duration > 0 else 0.0
+
+    def key(self) -> Tuple[str, str, bool, str]:
+        return (_dominant(self.windows), _dominant(self.modes), self.face_presence >= 0.5, _dominant(self.postures))
+
+    def add(self, snapshot: Dict[str, Any], seconds: float) -> None:
+        """Adds one snapshot standing for the `seconds` that followed it."""
+        timestamp = snapshot.get('timestamp', self.end)
+        self.end = max(self.end, timestamp + seconds)
+        self.samples += 1
+        for counts, value in ((self.windows, window_label(snapshot.get('active_window'))),
+                              (self.modes, snapshot.get('mode') or "unknown"),
+                              (self.postures, snapshot.get('posture') or "unknown")):
+            counts[value] = counts.get(value, 0.0) + seconds
+        if snapshot.get('face_detected'):
+            self.face_seconds += seconds
+        self.audio_sum += snapshot.get('audio_level') or 0.0
+        self.motion_sum += snapshot.get('video_activity') or 0.0
+        self.speech_sum += snapshot.get('speech_fraction') or 0.0
+
+    def absorb(self, other: "HistorySegment") -> None:
+        """Merges the adjacent segment `other` into this one."""
+        self.start = min(self.start, other.start)
+        self.end = max(self.end, other.end)
+        self.samples += other.samples
+        for mine, theirs in ((self.windows, other.windows), (self.modes, other.modes), (self.postures, other.postures)):
+            for label, seconds in theirs.items():
+                mine[label] = mine.get(label, 0.0) + seconds
+        self.face_seconds += other.face_seconds
+        self.audio_sum += other.audio_sum
+        self.motion_sum += other.motion_sum
+        self.speech_sum += other.speech_sum
+
+    def to_dict(self) -> Dict[str, Any]:
+        window, mode, _, posture = self.key()
+        samples = max(1, self.samples)
+        return {
+            "start": self.start,
+            "end": self.end,
+            "samples": self.samples,
+            "window": window,
+            "other_windows": len(self.windows) - 1,
+            "mode": mode,
+            "posture": posture,
+            "face_presence": self.face_presence,
+            "audio_mean": self.audio_sum / samples,
+            "motion_mean": self.motion_sum / samples,
+            "speech_fraction": self.speech_sum / samples,
+        }
+
+
+class HistorySegmenter:
+    """
+    Rolling summary of the history snapshots that have aged out of LogicEngine's
+    verbatim `context_history` window.
+
+    Each aged-out snapshot is folded into the newest segment when it continues the same
+    run (same app, mode, face presence and posture, no gap longer than `max_gap`),
+    otherwise it starts a new segment. Only `max_segments` are kept: past that, the
+    adjacent pair with the shortest combined duration is merged, so hours of history
+    cost a fixed number of prompt lines and the detail stays with the longer runs.
+    All work is incremental (O(max_segments) per snapshot).
+
+    An optional narrative (a sentence or two written by the LMM in the background, see
+    LogicEngine) can be attached with `set_narrative`; it covers segments ending at or
+    before its `covered_until` timestamp.
+    """
+
+    def __init__(self, max_segments: Optional[int] = None, sample_interval: Optional[float] = None,
+                 max_gap: Optional[float] = None) -> None:
+        self.max_segments: int = max(1, max_segments or getattr(config, 'HISTORY_MAX_SEGMENTS', 8))
+        self.sample_interval: float = sample_interval or getattr(config, 'HISTORY_SAMPLE_INTERVAL', 10)
+        self.max_gap: float = max_gap if max_gap is not None else 3 * self.sample_interval
+        self._segments: List[HistorySegment] = []
+        self._last_timestamp: Optional[float] = None
+        self._narrative: Optional[str] = None
+        self._narrative_until: Optional[float] = None
+        self._lock: threading.Lock = threading.Lock()
+        self.version: int = 0  # Bumped on every change; lets callers skip redundant work
+
+    def fold(self, snapshot: Dict[str, Any]) -> None:
+        """Folds one snapshot that just left the verbatim window."""
+        timestamp = snapshot.get('timestamp', 0.0)
+        with self._lock:
+            # Each snapshot stands for one sample interval
+            probe = HistorySegment(timestamp)
+            probe.add(snapshot, self.sample_interval)
+            last = self._segments[-1] if self._segments else None
+            if last is not None and self._last_timestamp is not None and timestamp - self._last_timestamp <= self.max_gap \
+                    and last.key() == probe.key():
+                last.add(snapshot, self.sample_interval)
+            else:
+                self._segments.append(probe)
+                if len(self._segments) > self.max_segments:
+                    self._merge_shortest_pair()
+            self._last_timestamp = timestamp
+            self.version += 1
+
+    def _merge_shortest_pair(self) -> None:
+        pairs = range(len(self._segments) - 1)
+        i = min(pairs, key=lambda j: self._segments[j].duration + self._segments[j + 1].duration)
+        self._segments[i].absorb(self._segments.pop(i + 1))
+
+    def segments(self) -> List[Dict[str, Any]]:
+        """The segments oldest first, as plain dicts (a copy; safe to hand to other threads)."""
+        with self._lock:
+            return [segment.to_dict() for segment in self._segments]
+
+    def set_narrative(self, text: Optional[str], covered_until: float) -> None:
+        with self._lock:
+            self._narrative = text.strip() if text else None
+            self._narrative_until = covered_until if self._narrative else None
+            self.version += 1
+
+    def narrative(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self._narrative:
+                return None
+            return {"text": self._narrative, "covered_until": self._narrative_until}
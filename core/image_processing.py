@@ -74,3 +74,17 @@ class ImageProcessor:
 
         cropped = frame[y1:y2, x1:x2]
         return cropped
+
+    @staticmethod
+    def difference_hash(frame: Optional[np.ndarray]) -> Optional[int]:
+        """
+        64-bit difference hash (dHash) of a frame: grayscale, 9x8 area resize, one bit per
+        horizontal gradient sign. Robust to noise, re-encoding and exposure drift; changes
+        when the scene does. Returns None for a missing or empty frame.
+        """
+        if frame is None or frame.size == 0:
+            return None
+        gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+        bits = (small[:, 1:] > small[:, :-1]).ravel()
+        return int(np.packbits(bits).view('>u8')[0])
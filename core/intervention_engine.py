@@ -10,6 +10,7 @@ import platform
 import base64
 from collections import deque
 from typing import Optional, Any, Dict, List
+from .clock import Clock, SYSTEM_CLOCK
 from .voice_interface import VoiceInterface
 from .image_processing import ImageProcessor
 from .social_media_manager import SocialMediaManager
@@ -43,14 +44,21 @@ except (ImportError, OSError):
 from .intervention_library import InterventionLibrary
 
 class InterventionEngine:
-    def __init__(self, logic_engine: Any, app_instance: Optional[Any] = None) -> None:
+    def __init__(self, logic_engine: Any, app_instance: Optional[Any] = None, clock: Optional[Clock] = None) -> None:
         self.logic_engine = logic_engine
         self.app = app_instance
+        # Cooldowns, escalation windows and _wait() run on the LogicEngine's clock unless one is given
+        if clock is None:
+            clock = getattr(logic_engine, 'clock', None)
+        self.clock: Clock = clock if isinstance(clock, Clock) else SYSTEM_CLOCK
         self.library = InterventionLibrary()
         self.last_intervention_time: float = 0
         self._intervention_active: threading.Event = threading.Event()
         self.intervention_thread: Optional[threading.Thread] = None
         self._current_intervention_details: Dict[str, Any] = {}
+        # Optional asyncio runtime (core/async_runtime.py). When set, interventions and
+        # background jobs run as cancellable tasks instead of dedicated threads.
+        self.task_runner: Optional[Any] = None
 
         # New Voice Interface
         logger = self.app.data_logger if self.app and hasattr(self.app, 'data_logger') else None
@@ -82,6 +90,7 @@ class InterventionEngine:
             "reflexive_window": getattr(config, 'REFLEXIVE_WINDOW_COOLDOWN', 300),
             "offline_fallback": 30,  # LogicEngine had this hardcoded
             "system": 0,             # No cooldown for system messages
+            "trigger_rule": 0,       # Rules carry their own cooldowns (core/trigger_rules.py)
             "lmm_suggestion": getattr(config, 'MIN_TIME_BETWEEN_INTERVENTIONS', 300),
             "default": getattr(config, 'MIN_TIME_BETWEEN_INTERVENTIONS', 300)
         }
@@ -110,7 +119,7 @@ class InterventionEngine:
                     self.suppressed_interventions = json.load(f)
 
                 # Clean up expired suppressions on load
-                current_time = time.time()
+                current_time = self.clock.time()
                 keys_to_remove = [k for k, v in self.suppressed_interventions.items() if v < current_time]
                 for k in keys_to_remove:
                     del self.suppressed_interventions[k]
@@ -172,7 +181,7 @@ class InterventionEngine:
         self.last_feedback_eligible_intervention = {
             "message": message,
             "type": intervention_type_for_logging,
-            "timestamp": time.time()
+            "timestamp": self.clock.time()
         }
         if self.app and self.app.data_logger:
              self.app.data_logger.log_debug(f"Stored intervention for feedback: Type='{intervention_type_for_logging}', Msg='{message}'")
@@ -338,11 +347,14 @@ class InterventionEngine:
             # Create Social Media Draft
             if is_erotic:
                 # Run in background to avoid blocking intervention
-                threading.Thread(
-                    target=self.social_media_manager.create_draft,
-                    args=(filename, "instagram", details),
-                    daemon=True
-                ).start()
+                if self.task_runner:
+                    self.task_runner.submit_background(self.social_media_manager.create_draft, filename, "instagram", details)
+                else:
+                    threading.Thread(
+                        target=self.social_media_manager.create_draft,
+                        args=(filename, "instagram", details),
+                        daemon=True
+                    ).start()
 
         except Exception as e:
             msg = f"Error saving captured image: {e}"
@@ -400,6 +412,7 @@ class InterventionEngine:
 
             out = cv2.VideoWriter(filename, cv2.VideoWriter_fourcc(*'MJPG'), fps, size)
 
+            # Captures real camera frames, so this stays on the wall clock
             start_time = time.time()
             frame_count = 0
             while time.time() - start_time < duration:
@@ -475,60 +488,67 @@ class InterventionEngine:
 
     def _wait(self, duration: float) -> None:
         """Waits for a specified duration, respecting the stop signal."""
-        start = time.time()
-        while time.time() - start < duration:
+        start = self.clock.time()
+        while self.clock.time() - start < duration:
             if not self._intervention_active.is_set():
                 break
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
 
     def _run_sequence(self, sequence: List[Dict[str, Any]], logger: Any) -> None:
         """Executes a sequence of actions."""
         for step in sequence:
             if not self._intervention_active.is_set():
                 break
+            self._execute_step(step, logger)
 
-            action = step.get("action")
+    def _execute_step(self, step: Dict[str, Any], logger: Any) -> None:
+        """Executes a single sequence step (blocking)."""
+        action = step.get("action")
 
-            if action == "speak":
-                content = step.get("content", "")
-                # Blocking speech in a sequence to maintain timing
-                self._speak(content, blocking=True)
+        if action == "speak":
+            content = step.get("content", "")
+            # Blocking speech in a sequence to maintain timing
+            self._speak(content, blocking=True)
 
-            elif action == "sound":
-                file_path = step.get("file", "")
-                self._play_sound(file_path)
+        elif action == "sound":
+            file_path = step.get("file", "")
+            self._play_sound(file_path)
 
-            elif action == "visual_prompt":
-                content = step.get("content", "")
-                self._show_visual_prompt(content)
+        elif action == "visual_prompt":
+            content = step.get("content", "")
+            self._show_visual_prompt(content)
 
-            elif action == "show_alert":
-                title = step.get("title", "Alert")
-                msg = step.get("message", "")
-                self._show_system_alert(title, msg)
+        elif action == "show_alert":
+            title = step.get("title", "Alert")
+            msg = step.get("message", "")
+            self._show_system_alert(title, msg)
 
-            elif action == "capture_image":
-                content = step.get("content", "")
-                self._capture_image(content)
+        elif action == "capture_image":
+            content = step.get("content", "")
+            self._capture_image(content)
 
-            elif action == "record_video":
-                content = step.get("content", "")
-                self._record_video(content)
+        elif action == "record_video":
+            content = step.get("content", "")
+            self._record_video(content)
 
-            elif action == "suggest_pose":
-                content = step.get("content", "")
-                self._suggest_pose(content)
+        elif action == "suggest_pose":
+            content = step.get("content", "")
+            self._suggest_pose(content)
 
-            elif action == "wait":
-                duration = step.get("duration", 0)
-                self._wait(duration)
+        elif action == "wait":
+            duration = step.get("duration", 0)
+            self._wait(duration)
 
-            else:
-                if logger:
-                    logger.log_warning(f"Unknown action in sequence: {action}")
+        else:
+            if logger:
+                logger.log_warning(f"Unknown action in sequence: {action}")
 
-    def _run_intervention_thread(self) -> None:
-        """The actual intervention logic run in a separate thread."""
+    def _prepare_intervention_run(self) -> Dict[str, Any]:
+        """
+        Shared prologue for the thread and async runners: logs the start, flashes the tray
+        and expands the card's sequence with tier-based escalation steps.
+        Returns a run context consumed by _run_legacy_intervention/_finish_intervention_run.
+        """
         intervention_type = self._current_intervention_details.get("type", "unknown_intervention")
         message = self._current_intervention_details.get("message", "No message provided.")
         # If a card was found, use its sequence. Otherwise, fallback to single message.
@@ -595,45 +615,80 @@ class InterventionEngine:
                      sequence.insert(0, {"action": "show_alert", "title": "Urgent Alert", "message": message or intervention_type})
                      log_debug(f"{log_prefix}: Added Visual Alert for Tier {tier} escalation.")
 
+        return {
+            "type": intervention_type,
+            "message": message,
+            "sequence": sequence,
+            "tier": tier,
+            "log_prefix": log_prefix,
+            "logger": logger,
+            "log_info": log_info,
+        }
 
-            # Execute the defined sequence from the library card
-            self._run_sequence(sequence, logger)
-        else:
-            # Fallback: Just speak the message (Legacy/Simple mode)
-            # Apply Tier logic to legacy mode too
-            if tier >= 2:
-                 self._play_sound("assets/sounds/test_tone.wav")
-            if tier >= 3:
-                 self._play_sound("assets/sounds/urgent_alert_tone.wav")
-                 self._show_system_alert("Urgent Alert", message)
-
-            # Default to blocking for backward compatibility in single-message mode,
-            # as this thread is dedicated to the intervention anyway.
-            self._speak(message, blocking=True)
-
-            # Store simple interventions for feedback
-            if intervention_type not in ["mode_change_notification", "error_notification_spoken"]:
-                self._store_last_intervention(message, intervention_type)
+    def _run_legacy_intervention(self, run: Dict[str, Any]) -> None:
+        """Single-message interventions (no library sequence)."""
+        tier = run["tier"]
+        message = run["message"]
+        intervention_type = run["type"]
+
+        # Fallback: Just speak the message (Legacy/Simple mode)
+        # Apply Tier logic to legacy mode too
+        if tier >= 2:
+             self._play_sound("assets/sounds/test_tone.wav")
+        if tier >= 3:
+             self._play_sound("assets/sounds/urgent_alert_tone.wav")
+             self._show_system_alert("Urgent Alert", message)
+
+        # Default to blocking for backward compatibility in single-message mode,
+        # as this thread is dedicated to the intervention anyway.
+        self._speak(message, blocking=True)
+
+        # Store simple interventions for feedback
+        if intervention_type not in ["mode_change_notification", "error_notification_spoken"]:
+            self._store_last_intervention(message, intervention_type)
+
+    def _finish_intervention_run(self, run: Optional[Dict[str, Any]]) -> None:
+        """
+        Shared epilogue: records feedback eligibility and clears the active flag. `run` is
+        None when the run was cancelled before _prepare_intervention_run returned.
+        """
+        if run is None:
+            self._intervention_active.clear()
+            self._current_intervention_details = {}
+            return
+        intervention_type = run["type"]
 
         # For library interventions, we store feedback *after* execution if needed.
         # But 'message' might not be a single string in a sequence.
         # So we use the 'description' or the primary message if available.
-        if sequence and intervention_type not in ["mode_change_notification"]:
+        if run["sequence"] and intervention_type not in ["mode_change_notification"]:
              description = self._current_intervention_details.get("description", intervention_type)
              self._store_last_intervention(description, intervention_type)
 
 
         if not self._intervention_active.is_set():
-            log_info(f"{log_prefix}: Stopped early by request.")
+            run["log_info"](f"{run['log_prefix']}: Stopped early by request.")
         else:
-            log_info(f"{log_prefix}: Completed.")
+            run["log_info"](f"{run['log_prefix']}: Completed.")
 
         self._intervention_active.clear()
         self._current_intervention_details = {}
 
+    def _run_intervention_thread(self) -> None:
+        """The actual intervention logic run in a separate thread."""
+        run = self._prepare_intervention_run()
+
+        if run["sequence"]:
+            # Execute the defined sequence from the library card
+            self._run_sequence(run["sequence"], run["logger"])
+        else:
+            self._run_legacy_intervention(run)
+
+        self._finish_intervention_run(run)
+
     def suppress_intervention(self, intervention_type: str, duration_minutes: int) -> None:
         """Suppress a specific intervention type for a duration."""
-        expiry_time = time.time() + (duration_minutes * 60)
+        expiry_time = self.clock.time() + (duration_minutes * 60)
         self.suppressed_interventions[intervention_type] = expiry_time
         self._save_suppressions()
 
@@ -645,7 +700,7 @@ class InterventionEngine:
 
     def get_suppressed_intervention_types(self) -> List[str]:
         """Returns a list of currently suppressed intervention types/IDs."""
-        current_time = time.time()
+        current_time = self.clock.time()
         # Clean up first (in memory, save will happen on next modification or load)
         active_suppressions = []
         keys_to_remove = []
@@ -722,8 +777,8 @@ class InterventionEngine:
 
         if check_type in self.suppressed_interventions:
             expiry = self.suppressed_interventions[check_type]
-            if time.time() < expiry:
-                remaining_mins = int((expiry - time.time()) / 60)
+            if self.clock.time() < expiry:
+                remaining_mins = int((expiry - self.clock.time()) / 60)
                 if logger:
                     logger.log_info(f"Intervention '{check_type}' skipped (suppressed for {remaining_mins} more mins).")
                 else:
@@ -734,7 +789,7 @@ class InterventionEngine:
                 del self.suppressed_interventions[check_type]
 
         # --- Centralized Cooldown & Priority Logic ---
-        current_time = time.time()
+        current_time = self.clock.time()
 
         # New Escalation Variables
         is_escalation = False
@@ -841,9 +896,12 @@ class InterventionEngine:
                 "tier": execution_details.get("tier", 1)
             })
 
-        self.intervention_thread = threading.Thread(target=self._run_intervention_thread)
-        self.intervention_thread.daemon = True
-        self.intervention_thread.start()
+        if self.task_runner:
+            self.intervention_thread = self.task_runner.start_intervention(self)
+        else:
+            self.intervention_thread = threading.Thread(target=self._run_intervention_thread)
+            self.intervention_thread.daemon = True
+            self.intervention_thread.start()
 
         msg_str = f"Intervention '{execution_details['type']}'"
         if "tier" in execution_details:
@@ -869,6 +927,10 @@ class InterventionEngine:
             # Kill any active subprocess (TTS)
             if self.voice_interface:
                 self.voice_interface.stop()
+
+            # Async runner: cancel the task so pending 'wait' steps end immediately
+            if self.task_runner and self.intervention_thread and hasattr(self.intervention_thread, 'cancel'):
+                self.intervention_thread.cancel()
         else:
             if logger:
                 logger.log_info("No active intervention to stop.")
@@ -928,7 +990,7 @@ class InterventionEngine:
                 print(log_msg)
             return
 
-        time_since_intervention = time.time() - self.last_feedback_eligible_intervention["timestamp"]
+        time_since_intervention = self.clock.time() - self.last_feedback_eligible_intervention["timestamp"]
 
         if time_since_intervention > self.feedback_window:
             log_msg = f"Feedback ('{feedback_value}') received for intervention '{self.last_feedback_eligible_intervention['message']}', but too late."
@@ -967,7 +1029,7 @@ class InterventionEngine:
                     self.preferred_interventions[itype] = {"count": 0, "last_helpful": 0}
 
                 self.preferred_interventions[itype]["count"] += 1
-                self.preferred_interventions[itype]["last_helpful"] = time.time()
+                self.preferred_interventions[itype]["last_helpful"] = self.clock.time()
                 self._save_preferences()
 
         self.last_feedback_eligible_intervention = {"message": None, "type": None, "timestamp": None}
@@ -0,0 +1,115 @@
+import base64
+import copy
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+import cv2
+import numpy as np
+
+import config
+from .clock import Clock, SYSTEM_CLOCK
+from .image_processing import ImageProcessor
+
+
+def perceptual_hash(video_data_b64: Optional[str]) -> Optional[int]:
+    """
+    Difference hash (ImageProcessor.difference_hash) of a base64 JPEG frame. Re-encoded or
+    slightly noisy copies of the same scene hash identically; returns None for missing or
+    undecodable frames.
+    """
+    if not video_data_b64:
+        return None
+    try:
+        buffer = np.frombuffer(base64.b64decode(video_data_b64), dtype=np.uint8)
+        gray = cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+    except Exception:
+        return None
+    if gray is None:
+        return None
+    return ImageProcessor.difference_hash(gray)
+
+
+class LMMResponseCache:
+    """
+    LRU + TTL cache of LMM analyses keyed on a quantized view of the request.
+
+    Consecutive periodic calls usually describe the same scene: same window, same
+    posture, metrics within noise. `make_key` buckets the continuous metrics and
+    reduces the frame to a perceptual hash, so such calls share a key and the
+    previous analysis is reused for up to `ttl` seconds instead of re-running inference.
+    """
+
+    # Bucket widths for the continuous metrics (differences inside a bucket are treated as noise)
+    AUDIO_LEVEL_BUCKET = 0.05
+    VIDEO_ACTIVITY_BUCKET = 5.0
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None, clock: Optional[Clock] = None) -> None:
+        self.max_entries: int = max_entries or getattr(config, 'LMM_CACHE_MAX_ENTRIES', 64)
+        self.ttl: float = ttl if ttl is not None else getattr(config, 'LMM_CACHE_TTL', 15.0)
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def make_key(self, video_data_b64: Optional[str], user_context: Optional[Dict[str, Any]]) -> Tuple:
+        """Canonical, hashable description of what the model would see (history and trigger reason excluded)."""
+        context = user_context or {}
+        metrics = context.get('sensor_metrics') or {}
+        video_analysis = metrics.get('video_analysis') or {}
+        audio_analysis = metrics.get('audio_analysis') or {}
+        return (
+            context.get('current_mode'),
+            context.get('active_window', 'Unknown'),
+            int(float(metrics.get('audio_level', 0.0) or 0.0) // self.AUDIO_LEVEL_BUCKET),
+            int(float(metrics.get('video_activity', 0.0) or 0.0) // self.VIDEO_ACTIVITY_BUCKET),
+            bool(audio_analysis.get('is_speech', False)),
+            bool(metrics.get('face_detected', video_analysis.get('face_detected', False))),
+            int(metrics.get('face_count', 0) or 0),
+            video_analysis.get('posture_state'),
+            tuple(sorted(context.get('system_alerts') or [])),
+            tuple(sorted(context.get('suppressed_interventions') or [])),
+            perceptual_hash(video_data_b64),
+        )
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Returns a copy of the cached analysis with `_meta.cache_hit` set, or None if absent or stale."""
+        now = self.clock.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            stored_at, analysis = entry
+
+        result = copy.deepcopy(analysis)
+        result["_meta"] = dict(result.get("_meta") or {}, cache_hit=True, cache_age_s=now - stored_at)
+        return result
+
+    def put(self, key: Tuple, analysis: Dict[str, Any]) -> None:
+        stored = copy.deepcopy(analysis)
+        stored["_meta"] = {}
+        with self._lock:
+            self._entries[key] = (self.clock.time(), stored)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
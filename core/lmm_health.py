@@ -0,0 +1,254 @@
+import threading
+from collections import deque
+from typing import Optional, Callable, Dict, Any, List
+
+import config
+from .clock import Clock, SYSTEM_CLOCK
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Latency class of callers that do not say which kind of request they timed
+DEFAULT_LATENCY_CLASS = "default"
+
+
+class LMMHealthManager:
+    """
+    One circuit breaker for the inference server, shared by LMMInterface and LogicEngine.
+
+    CLOSED: requests go through; `max_failures` consecutive failed requests open the circuit.
+    OPEN: requests are refused for `cooldown` seconds (LogicEngine runs its offline fallback).
+    HALF_OPEN: the cooldown is over. The next request first runs `probe` (a GET on
+    `/v1/models`, see LMMInterface.check_connection); if the server does not answer, the
+    circuit re-opens for another cooldown without a full multimodal request being sent.
+    Otherwise that request is let through as the single trial: success closes the
+    circuit, failure re-opens it.
+
+    Latencies of successful attempts are kept per latency class (`latencies`), e.g. per
+    model and payload kind, for hedging and for `adaptive_timeout`: a short caption or
+    text-tier call says nothing about how long a full vision analysis may take. Until a
+    class has enough samples, its startup warm-up latency (`set_baseline`) stands in. State changes are passed to listeners
+    (`add_listener`) as (state, stats) so the tray can show them.
+    """
+
+    LATENCY_WINDOW = 100
+    # Successful attempts needed before the adaptive timeout replaces the configured one
+    MIN_LATENCY_SAMPLES = 10
+
+    def __init__(self, clock: Optional[Clock] = None, max_failures: Optional[int] = None, cooldown: Optional[float] = None,
+                 probe: Optional[Callable[[], bool]] = None, timeout_percentile: Optional[float] = None,
+                 timeout_multiplier: Optional[float] = None, min_timeout: Optional[float] = None, data_logger=None) -> None:
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        self.max_failures: int = max_failures if max_failures is not None else getattr(config, 'LMM_CIRCUIT_BREAKER_MAX_FAILURES', 5)
+        self.cooldown: float = cooldown if cooldown is not None else getattr(config, 'LMM_CIRCUIT_BREAKER_COOLDOWN', 60)
+        self.probe: Optional[Callable[[], bool]] = probe
+        self.timeout_percentile: float = timeout_percentile if timeout_percentile is not None else getattr(config, 'LMM_TIMEOUT_PERCENTILE', 95.0)
+        self.timeout_multiplier: float = timeout_multiplier if timeout_multiplier is not None else getattr(config, 'LMM_TIMEOUT_MULTIPLIER', 2.0)
+        self.min_timeout: float = min_timeout if min_timeout is not None else getattr(config, 'LMM_TIMEOUT_MIN', 5.0)
+        self.logger = data_logger
+
+        self.consecutive_failures: int = 0
+        self.opened_at: float = 0.0
+        self.latencies: Dict[str, deque] = {}
+        self.baselines: Dict[str, float] = {}
+        self.stats: Dict[str, int] = {"trips": 0, "probes": 0, "failed_probes": 0}
+        self._trial_in_flight: bool = False
+        self._published_state: str = CLOSED
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        self._lock: threading.RLock = threading.RLock()
+
+    def _log_info(self, message):
+        if self.logger: self.logger.log_info(f"LMMHealth: {message}")
+        else: print(f"INFO: LMMHealth: {message}")
+
+    def _log_warning(self, message):
+        if self.logger: self.logger.log_warning(f"LMMHealth: {message}")
+        else: print(f"WARNING: LMMHealth: {message}")
+
+    # --- State ---
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.consecutive_failures < self.max_failures:
+                return CLOSED
+            if self.clock.time() - self.opened_at < self.cooldown:
+                return OPEN
+            return HALF_OPEN
+
+    def is_open(self) -> bool:
+        """True while requests are refused outright (OPEN and still cooling down)."""
+        return self.state == OPEN
+
+    @property
+    def open_until(self) -> float:
+        """End of the current cooldown, or 0 when the circuit is closed."""
+        with self._lock:
+            if self.consecutive_failures < self.max_failures:
+                return 0.0
+            return self.opened_at + self.cooldown
+
+    def force_open(self, until: float) -> None:
+        """Opens the circuit until `until` (clock time), e.g. when the server is known to be down."""
+        with self._lock:
+            self.consecutive_failures = max(self.consecutive_failures, self.max_failures)
+            self.opened_at = until - self.cooldown
+        self._publish()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = 0.0
+            self._trial_in_flight = False
+        self._publish()
+
+    # --- Request bookkeeping ---
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may be sent now. In HALF_OPEN this runs the probe on the calling
+        thread; callers that must not block (the main loop) use `is_open` instead.
+        """
+        with self._lock:
+            state = self.state
+            if state == CLOSED:
+                return True
+            if state == OPEN or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            if self.probe is not None:
+                self.stats["probes"] += 1
+        self._publish(HALF_OPEN)
+
+        if self.probe is not None:
+            try:
+                alive = bool(self.probe())
+            except Exception:
+                alive = False
+            if not alive:
+                with self._lock:
+                    self.stats["failed_probes"] += 1
+                    self.opened_at = self.clock.time()
+                    self._trial_in_flight = False
+                self._log_warning(f"Health probe failed; circuit stays open for another {self.cooldown}s.")
+                self._publish()
+                return False
+            self._log_info("Health probe answered; sending one trial request.")
+        return True
+
+    def record_success(self, latency: Optional[float] = None, latency_class: str = DEFAULT_LATENCY_CLASS) -> None:
+        """A request succeeded. `latency` (seconds of one attempt) feeds hedging and the adaptive timeout."""
+        with self._lock:
+            recovered = self.consecutive_failures >= self.max_failures
+            self.consecutive_failures = 0
+            self.opened_at = 0.0
+            self._trial_in_flight = False
+            if latency is not None:
+                self._window(latency_class).append(latency)
+        if recovered:
+            self._log_info("LMM recovered. Circuit closed.")
+        self._publish()
+
+    def _window(self, latency_class: str) -> deque:
+        # Caller holds the lock
+        window = self.latencies.get(latency_class)
+        if window is None:
+            window = self.latencies[latency_class] = deque(maxlen=self.LATENCY_WINDOW)
+        return window
+
+    def record_latency(self, latency: float, latency_class: str = DEFAULT_LATENCY_CLASS) -> None:
+        with self._lock:
+            self._window(latency_class).append(latency)
+
+    def latency_count(self, latency_class: str = DEFAULT_LATENCY_CLASS) -> int:
+        with self._lock:
+            return len(self.latencies.get(latency_class, ()))
+
+    def set_baseline(self, latency: float, latency_class: str = DEFAULT_LATENCY_CLASS) -> None:
+        """Latency of a warm representative request, measured at startup (LMMInterface.warm_up)."""
+        with self._lock:
+            self.baselines[latency_class] = latency
+
+    def record_failure(self) -> None:
+        """A request failed after its retries; a failed trial re-opens the circuit at once."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self._trial_in_flight:
+                self.consecutive_failures = max(self.consecutive_failures, self.max_failures)
+                self._trial_in_flight = False
+            tripped = self.consecutive_failures >= self.max_failures
+            if tripped:
+                self.opened_at = self.clock.time()
+                if self._published_state == CLOSED:
+                    self.stats["trips"] += 1
+        if tripped:
+            self._log_warning(f"LMM circuit breaker open after {self.consecutive_failures} failures. Pausing calls for {self.cooldown}s.")
+        self._publish()
+
+    def record_cancelled(self) -> None:
+        """A request ended without telling anything about the server (cancelled, cache hit, nothing to send)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    # --- Latency ---
+
+    def latency_percentile(self, percentile: float, latency_class: str = DEFAULT_LATENCY_CLASS) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self.latencies.get(latency_class, ()))
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(len(latencies) * percentile / 100.0))
+        return latencies[index]
+
+    def adaptive_timeout(self, default: float, latency_class: str = DEFAULT_LATENCY_CLASS) -> float:
+        """
+        Read timeout for the next attempt of `latency_class`: `timeout_multiplier` times the
+        `timeout_percentile` latency of that class (its warm-up baseline until enough attempts
+        have been timed), clamped to [min_timeout, default]. `default` without either, or when
+        the multiplier is 0.
+        """
+        if self.timeout_multiplier <= 0:
+            return default
+        with self._lock:
+            baseline = self.baselines.get(latency_class)
+        if self.latency_count(latency_class) >= self.MIN_LATENCY_SAMPLES:
+            reference = self.latency_percentile(self.timeout_percentile, latency_class)
+        elif baseline is not None:
+            reference = baseline
+        else:
+            return default
+        return min(default, max(self.min_timeout, reference * self.timeout_multiplier))
+
+    # --- Publishing ---
+
+    def add_listener(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """`callback(state, stats)` is called on every state change, on the thread that caused it."""
+        self._listeners.append(callback)
+
+    def _publish(self, state: Optional[str] = None) -> None:
+        state = state or self.state
+        with self._lock:
+            if state == self._published_state:
+                return
+            self._published_state = state
+        stats = self.get_stats()
+        for callback in list(self._listeners):
+            try:
+                callback(state, stats)
+            except Exception as e:
+                self._log_warning(f"Health listener failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._published_state,
+                "consecutive_failures": self.consecutive_failures,
+                "open_until": self.open_until,
+                "trips": self.stats["trips"],
+                "probes": self.stats["probes"],
+                "failed_probes": self.stats["failed_probes"],
+                # Per latency class
+                "p95_latency": {name: self.latency_percentile(95.0, name) for name in self.latencies},
+                "baseline_latency": dict(self.baselines),
+            }
@@ -0,0 +1,102 @@
+import socket
+import threading
+from typing import Optional, Dict, Any, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+import config
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets also enable TCP keep-alive, so a dead peer on an idle pooled connection is noticed."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("socket_options", HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)])
+        super().init_poolmanager(*args, **kwargs)
+
+
+class LMMHttpClient:
+    """
+    Pooled keep-alive HTTP client for the local inference server.
+
+    Module-level `requests.post` opens (and tears down) a TCP connection per call; this
+    keeps one `requests.Session` whose connection pools are reused across calls and
+    threads. Timeouts are (connect, read) tuples so an unreachable host fails fast
+    while a slow generation still gets the full read budget.
+
+    `get_stats()` reports how many requests were served and how many TCP connections
+    the pools had to open, i.e. how often keep-alive actually paid off.
+    """
+
+    def __init__(self, connect_timeout: Optional[float] = None, read_timeout: Optional[float] = None,
+                 pool_connections: Optional[int] = None, pool_maxsize: Optional[int] = None) -> None:
+        self.connect_timeout: float = connect_timeout if connect_timeout is not None else getattr(config, 'LMM_CONNECT_TIMEOUT', 3.0)
+        self.read_timeout: float = read_timeout if read_timeout is not None else getattr(config, 'LMM_READ_TIMEOUT', 20.0)
+        # pool_connections: hosts kept pooled; pool_maxsize: idle connections kept per host
+        self.pool_connections: int = pool_connections or getattr(config, 'LMM_HTTP_MAX_HOSTS', 4)
+        self.pool_maxsize: int = pool_maxsize or getattr(config, 'LMM_HTTP_POOL_SIZE', 4)
+
+        self.session: requests.Session = requests.Session()
+        self.session.headers.update({"Connection": "keep-alive"})
+        adapter = _KeepAliveAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._stats_lock: threading.Lock = threading.Lock()
+        self._requests: int = 0
+        self._errors: int = 0
+
+    def timeout(self, read_timeout: Optional[float] = None) -> Tuple[float, float]:
+        """(connect, read) timeout tuple; `read_timeout` overrides the configured read budget."""
+        return (self.connect_timeout, read_timeout if read_timeout is not None else self.read_timeout)
+
+    def post(self, url: str, json: Optional[Dict[str, Any]] = None, read_timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+        return self._request(self.session.post, url, read_timeout, json=json, **kwargs)
+
+    def get(self, url: str, read_timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+        return self._request(self.session.get, url, read_timeout, **kwargs)
+
+    def _request(self, method: Any, url: str, read_timeout: Optional[float], **kwargs: Any) -> requests.Response:
+        try:
+            return method(url, timeout=self.timeout(read_timeout), **kwargs)
+        except requests.exceptions.RequestException:
+            with self._stats_lock:
+                self._errors += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self._requests += 1
+
+    def _connections_opened(self) -> int:
+        """Sum of TCP connections opened by every live urllib3 pool behind the session."""
+        opened = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = getattr(getattr(adapter, 'poolmanager', None), 'pools', None)
+            if pools is None:
+                continue
+            for key in pools.keys():
+                try:
+                    opened += getattr(pools[key], 'num_connections', 0)
+                except KeyError:
+                    continue  # Evicted between keys() and lookup
+        return opened
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            requests_sent = self._requests
+            errors = self._errors
+        opened = self._connections_opened()
+        reused = max(0, requests_sent - errors - opened)
+        return {
+            "requests": requests_sent,
+            "errors": errors,
+            "connections_opened": opened,
+            "connections_reused": reused,
+            "reuse_ratio": reused / requests_sent if requests_sent else None,
+        }
+
+    def close(self) -> None:
+        """Closes pooled connections. The client stays usable; new connections are opened on demand."""
+        self.session.close()
@@ -1,12 +1,26 @@
 import requests
 import json
+import random
 import re
+import threading
 import time
-from typing import Optional, Dict, Any, List, TypedDict, Union
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as wait_futures
+from typing import Optional, Dict, Any, List, Tuple, TypedDict, Union, Callable
 import config
 from .intervention_library import InterventionLibrary
+from .clock import Clock, SYSTEM_CLOCK
+from .lmm_http_client import LMMHttpClient
+from .lmm_router import LMMRouter, LMMEndpoint, completions_url, CAPABILITY_VISION, CAPABILITY_TEXT
+from .lmm_stream import IncrementalJSONObjectParser, iter_sse_content
+from .lmm_cache import LMMResponseCache
+from .lmm_health import LMMHealthManager
+from .lmm_workloads import WorkloadGate, WORKLOAD_STATE, WORKLOAD_POSE, WORKLOAD_SUMMARY, WORKLOAD_CAPTION
+from .lmm_scheduler import REASON_PRIORITIES, PRIORITY_HIGH, PRIORITY_NORMAL
+from .prompt_builder import PromptBuilder, truncate_text
 from .prompts.v1 import SYSTEM_INSTRUCTION_V1
 from .prompts.pose_prompts import POSE_SUGGESTION_PROMPT
+from .prompts.cascade import TEXT_TIER_ADDENDUM
+from .prompts.history import HISTORY_NARRATIVE_PROMPT
 
 # Define response structures for type hinting
 class StateEstimation(TypedDict):
@@ -28,16 +42,65 @@ class LMMResponse(TypedDict):
     suggestion: Optional[Suggestion]
     _meta: Optional[Dict[str, Any]] # For internal flags like is_fallback, latency_ms
 
+class LMMCancelledError(Exception):
+    """Raised when a request is abandoned because it was preempted or the interface is closing."""
+
+
+class _AnyEvent:
+    """Read-only view that is set when any of the wrapped events (None entries ignored) is set."""
+
+    def __init__(self, *events: Optional[threading.Event]) -> None:
+        self._events = [event for event in events if event is not None]
+
+    def is_set(self) -> bool:
+        return any(event.is_set() for event in self._events)
+
+
 class LMMInterface:
     BASE_SYSTEM_INSTRUCTION = SYSTEM_INSTRUCTION_V1
-
-    def __init__(self, data_logger=None, intervention_library: Optional[InterventionLibrary] = None):
+    # Top-level fields of an analysis; a streamed analysis is cut off once all are parsed
+    RESPONSE_KEYS = ("state_estimation", "visual_context", "suggestion")
+    # process_data accepts cancel_event (LogicEngine passes the scheduler request's event)
+    SUPPORTS_CANCELLATION = True
+    # An attempt is not started with less than this much of the request deadline left
+    MIN_ATTEMPT_SECONDS = 1.0
+    # Primary latencies of the same latency class needed before hedging (kept by the health manager)
+    HEDGE_MIN_SAMPLES = 10
+    # 1x1 PNG sent by warm_up so the vision encoder runs without a real camera frame
+    WARM_UP_IMAGE = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNk+A8AAQUBAScY42YAAAAASUVORK5CYII="
+
+    def __init__(self, data_logger=None, intervention_library: Optional[InterventionLibrary] = None, clock: Optional[Clock] = None,
+                 http_client: Optional[LMMHttpClient] = None, router: Optional[LMMRouter] = None,
+                 health: Optional[LMMHealthManager] = None, workloads: Optional[WorkloadGate] = None):
         """
         Initializes the LMMInterface.
         - data_logger: An instance of DataLogger for logging.
         - intervention_library: Optional InterventionLibrary instance.
+        - clock: Optional core.clock.Clock for retry backoff and the circuit breaker (defaults to wall-clock time).
+        - http_client: Optional LMMHttpClient to share a connection pool (a private one is created otherwise).
+        - router: Optional LMMRouter over several inference servers (built from LMM_ENDPOINTS / LOCAL_LLM_URL otherwise).
+        - health: Optional LMMHealthManager (circuit breaker, latency percentiles); LogicEngine shares this one.
+        - workloads: Optional WorkloadGate ordering state estimation, pose suggestions, summaries and captions.
         """
         self.logger = data_logger
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        # Keep-alive connection pool for all calls to the inference server
+        self.http: LMMHttpClient = http_client if http_client is not None else LMMHttpClient()
+        # Consume completions as server-sent events and report fields as they close (see process_data's on_partial)
+        self.streaming: bool = getattr(config, 'LMM_STREAMING_ENABLED', False)
+        self.prompt_builder: PromptBuilder = PromptBuilder(clock=self.clock)
+        # Reuses analyses of near-identical requests (see core/lmm_cache.py); None when disabled
+        self.response_cache: Optional[LMMResponseCache] = LMMResponseCache(clock=self.clock) if getattr(config, 'LMM_CACHE_ENABLED', False) else None
+
+        # Two-tier cascade: a text-only model screens each call and the vision model is only used on escalation
+        self.cascade_enabled: bool = getattr(config, 'LMM_CASCADE_ENABLED', False)
+        self.cascade_text_model: str = getattr(config, 'LMM_CASCADE_TEXT_MODEL_ID', "") or config.LOCAL_LLM_MODEL_ID
+        self.cascade_confidence_threshold: float = getattr(config, 'LMM_CASCADE_CONFIDENCE_THRESHOLD', 0.7)
+        self.cascade_visual_max_age: float = getattr(config, 'LMM_CASCADE_VISUAL_MAX_AGE', 120.0)
+        self.cascade_text_deadline: float = getattr(config, 'LMM_CASCADE_TEXT_DEADLINE', 8.0)
+        # Last analysis that saw a camera frame; text-tier results carry its visual_context forward
+        self._last_vision_time: Optional[float] = None
+        self._last_visual_context: List[str] = []
 
         # Initialize Intervention Library
         self.intervention_library = intervention_library if intervention_library else InterventionLibrary()
@@ -46,30 +109,80 @@ class LMMInterface:
         interventions_info = self.intervention_library.get_all_interventions_info()
         self.SYSTEM_INSTRUCTION = self.BASE_SYSTEM_INSTRUCTION.replace("{interventions_list}", interventions_info)
 
+        # Endpoint selection, health tracking and ejection; a single LOCAL_LLM_URL endpoint unless LMM_ENDPOINTS is set
+        self.router: LMMRouter = router if router is not None else LMMRouter.from_config(http_client=self.http, clock=self.clock, data_logger=data_logger)
+        if len(self.router.endpoints) > 1:
+            self.router.start()
         # Ensure URL ends with v1/chat/completions for OpenAI compatibility
-        base_url = config.LOCAL_LLM_URL.rstrip('/')
-
-        if base_url.endswith("/v1/chat/completions"):
-            self.llm_url = base_url
-        elif base_url.endswith("/chat/completions"):
-             self.llm_url = base_url
-        elif base_url.endswith("/v1/chat"):
-             self.llm_url = f"{base_url}/completions"
-        elif base_url.endswith("/chat"):
-             self.llm_url = f"{base_url}/completions"
-        elif base_url.endswith("/v1"):
-             self.llm_url = f"{base_url}/chat/completions"
-        else:
-             self.llm_url = f"{base_url}/v1/chat/completions"
-
-        # Circuit Breaker State
-        self.circuit_failures = 0
-        self.circuit_open_time = 0
-        self.circuit_max_failures = getattr(config, 'LMM_CIRCUIT_BREAKER_MAX_FAILURES', 5)
-        self.circuit_cooldown = getattr(config, 'LMM_CIRCUIT_BREAKER_COOLDOWN', 60)
+        self.llm_url = self.router.primary.url
+
+        # Retry budget: every attempt and backoff of one request fits in this many seconds
+        self.request_deadline: float = getattr(config, 'LMM_REQUEST_DEADLINE', 30.0)
+        # Set by close(); interrupts backoff waits and streamed reads of in-flight requests
+        self._closing = threading.Event()
+        self._emit_lock = threading.Lock()
+
+        # Hedged requests: a duplicate goes to the second endpoint once the primary is slower
+        # than LMM_HEDGE_PERCENTILE of its recent latencies; the first valid answer wins
+        hedge_url = getattr(config, 'LMM_HEDGE_URL', "")
+        self.hedge_url: Optional[str] = self._completions_url(hedge_url) if hedge_url else None
+        # Not part of the router's pool, but accounted through it like any other endpoint
+        self.hedge_endpoint: Optional[LMMEndpoint] = LMMEndpoint(self.hedge_url) if self.hedge_url else None
+        self.hedge_percentile: float = getattr(config, 'LMM_HEDGE_PERCENTILE', 95.0)
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+
+        # Circuit breaker with a cheap /v1/models probe before the first request after a cooldown
+        self.health: LMMHealthManager = health if health is not None else LMMHealthManager(
+            clock=self.clock,
+            max_failures=getattr(config, 'LMM_CIRCUIT_BREAKER_MAX_FAILURES', 5),
+            cooldown=getattr(config, 'LMM_CIRCUIT_BREAKER_COOLDOWN', 60),
+            probe=self._health_probe,
+            data_logger=data_logger)
+        # Priority classes and concurrency limits per kind of call (see core/lmm_workloads.py)
+        self.workloads: WorkloadGate = workloads if workloads is not None else WorkloadGate()
 
         self._log_info(f"LMMInterface initializing with URL: {self.llm_url}")
 
+    # Circuit breaker state, kept by the health manager
+    @property
+    def circuit_failures(self) -> int:
+        return self.health.consecutive_failures
+
+    @circuit_failures.setter
+    def circuit_failures(self, value: int) -> None:
+        self.health.consecutive_failures = value
+
+    @property
+    def circuit_open_time(self) -> float:
+        return self.health.opened_at
+
+    @circuit_open_time.setter
+    def circuit_open_time(self, value: float) -> None:
+        self.health.opened_at = value
+
+    @property
+    def circuit_max_failures(self) -> int:
+        return self.health.max_failures
+
+    @circuit_max_failures.setter
+    def circuit_max_failures(self, value: int) -> None:
+        self.health.max_failures = value
+
+    @property
+    def circuit_cooldown(self) -> float:
+        return self.health.cooldown
+
+    @circuit_cooldown.setter
+    def circuit_cooldown(self, value: float) -> None:
+        self.health.cooldown = value
+
+    @staticmethod
+    def _completions_url(base_url: str) -> str:
+        """Normalizes a server base URL to its OpenAI-compatible chat completions endpoint."""
+        return completions_url(base_url)
+
     def _log_info(self, message):
         if self.logger: self.logger.log_info(f"LMMInterface: {message}")
         else: print(f"INFO: LMMInterface: {message}")
@@ -90,17 +203,38 @@ class LMMInterface:
              self.logger.log_info(f"LMMInterface-DEBUG: {message}")
 
     def check_connection(self) -> bool:
-        """Checks if the LMM server is reachable."""
-        try:
-            # Try a simple models list check if available, or just a dummy completion
-            # Usually /v1/models is standard
-            models_url = self.llm_url.replace("/chat/completions", "/models")
-            response = requests.get(models_url, timeout=2)
-            if response.status_code == 200:
-                return True
-        except:
-            pass
-        return False
+        """Checks if any configured LMM server is reachable (probing re-admits ejected ones)."""
+        # /v1/models is the standard cheap endpoint
+        return any(self.router.probe(endpoint) for endpoint in self.router.endpoints)
+
+    def _health_probe(self) -> bool:
+        # Looked up on each call so tests (and subclasses) can replace check_connection
+        return self.check_connection()
+
+    def close(self) -> None:
+        """Interrupts in-flight retries, logs connection reuse, cache and hedge stats, and releases pooled connections."""
+        self._closing.set()
+        self.router.stop()
+        stats = self.http.get_stats()
+        self._log_info(f"HTTP connections: {stats['connections_opened']} opened, {stats['connections_reused']} reused over {stats['requests']} requests.")
+        if self.response_cache is not None:
+            cache_stats = self.response_cache.get_stats()
+            self._log_info(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.")
+        if len(self.router.endpoints) > 1:
+            for endpoint in self.router.get_stats():
+                self._log_info(f"Endpoint {endpoint['url']}: {endpoint['requests']} requests, {endpoint['failures']} failures, healthy={endpoint['healthy']}.")
+        health = self.health.get_stats()
+        self._log_info(f"Circuit breaker: {health['trips']} trips, {health['probes']} health probes ({health['failed_probes']} failed).")
+        for workload, stats in self.workloads.get_stats().items():
+            if stats["requests"]:
+                self._log_info(f"Workload {workload}: {stats['requests']} requests ({stats['deferred']} deferred), "
+                               f"queue wait {stats['mean_wait_s']:.2f}s mean / {stats['max_wait_s']:.2f}s max, "
+                               f"service {stats['mean_service_s']:.2f}s mean.")
+        if self.hedge_url:
+            self._log_info(f"Hedged requests: {self.hedged_requests} sent, {self.hedge_wins} won.")
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+        self.http.close()
 
     def _validate_response_schema(self, data: Any) -> bool:
         """
@@ -193,17 +327,27 @@ class LMMInterface:
 
     def _truncate_text(self, text: str, max_length: int = 50) -> str:
         """Truncates text to max_length, adding '...' if truncated."""
-        if not text:
-            return ""
-        if len(text) <= max_length:
-            return text
-        return text[:max_length-3] + "..."
-
-    def _send_request_with_retry(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """Sends request to LMM with manual retry logic."""
+        return truncate_text(text, max_length)
+
+    def _send_request_with_retry(self, payload: Dict[str, Any], on_field: Optional[Callable[[str, Any], None]] = None,
+                                 required_keys: Optional[tuple] = None, deadline: Optional[float] = None,
+                                 cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Sends request to LMM with manual retry logic.
+        All attempts and backoff waits share one budget of `deadline` seconds (LMM_REQUEST_DEADLINE
+        by default): each attempt's read timeout is capped by what is left, and no attempt is
+        started once less than MIN_ATTEMPT_SECONDS remain. Backoff is jittered and returns early
+        (raising LMMCancelledError) when `cancel_event` is set or the interface is closing.
+        In streaming mode `on_field(key, value)` is called for each top-level field as soon as
+        it is parsed (at most once per field across retries), and generation is cancelled once
+        all `required_keys` are in.
+        """
         retries = 3
         backoff = 2
         last_exception = None
+        emitted: List[str] = []
+        budget = deadline if deadline is not None else self.request_deadline
+        deadline_at = self.clock.time() + budget
 
         # MiniCPM-o Optimization Check
         model_id = str(payload.get("model", "")).lower()
@@ -217,57 +361,250 @@ class LMMInterface:
         if "response_format" not in payload:
             payload["response_format"] = {"type": "json_object"}
 
+        # Image requests only go to vision-capable endpoints; a failed endpoint is avoided on the retries
+        capability = CAPABILITY_VISION if self._has_image(payload) else CAPABILITY_TEXT
+        failed_endpoints: List[LMMEndpoint] = []
+        latency_class = self._latency_class(payload)
+
         for attempt in range(retries):
+            if self._is_cancelled(cancel_event):
+                raise LMMCancelledError("LMM request cancelled")
+            remaining = deadline_at - self.clock.time()
+            if remaining < self.MIN_ATTEMPT_SECONDS:
+                self._log_warning(f"Request deadline ({budget:.1f}s) exhausted after {attempt} attempt(s).")
+                break
+            # A multiple of recent latency of this kind of call once enough are timed: a dead server fails fast
+            read_timeout = min(self.health.adaptive_timeout(self.http.read_timeout, latency_class), remaining)
+
+            endpoint = self.router.select(capability, exclude=failed_endpoints)
             try:
-                response = requests.post(self.llm_url, json=payload, timeout=20)
-                response.raise_for_status()
-
-                response_json = response.json()
-                content = response_json['choices'][0]['message']['content']
-                clean_content = self._clean_json_string(content)
-
-                try:
-                    parsed_result = json.loads(clean_content)
-                except json.JSONDecodeError as e:
-                     # This is a content error, might be fixed by regeneration, so we treat it as retryable
-                     raise ValueError(f"JSON decode error: {e}")
-
-                if not self._validate_response_schema(parsed_result):
-                    # If schema is invalid, we might want to retry if it's a transient generation error
-                    # However, if we are doing caption generation, schema validation is different (or skipped)
-                    # We assume specific prompt handlers handle their own validation if they bypass this generic flow.
-                    # For generic 'process_data', we need this schema.
-                    # If captioning reuses this, it will fail unless we update schema logic or bypass validation.
-                    # Better to let caption generation use a simpler flow or update validation.
-                    # Current fix: _validate_response_schema is loose enough? No, it checks "state_estimation".
-                    # So caption gen cannot reuse this if it returns {"caption": ...}
-                    # We will handle caption gen separately in its own method.
-                    pass
-
-                    # For standard state estimation:
-                    if "state_estimation" in parsed_result:
-                         if not self._validate_response_schema(parsed_result):
-                             raise ValueError(f"Schema validation failed: {parsed_result}")
-                    # If it's a caption response (simple dict with caption), we let it pass if caller handles it?
-                    # No, _send_request_with_retry is generic. Let's assume captioning calls it and gets a dict.
-                    # We only validate if it looks like a state response.
-
-                return parsed_result
+                return self._attempt_with_hedge(endpoint, payload, on_field, emitted, required_keys, read_timeout, cancel_event,
+                                                deadline_at=deadline_at)
 
             except (requests.exceptions.RequestException, ValueError, KeyError) as e:
                 last_exception = e
+                failed_endpoints.append(endpoint)
                 error_msg = str(e)
                 if isinstance(e, requests.exceptions.HTTPError) and "400" in error_msg:
                      self._log_warning(f"LMM returned 400 Bad Request. Hint: Check if LOCAL_LLM_MODEL_ID ('{getattr(config, 'LOCAL_LLM_MODEL_ID', 'unknown')}') matches the loaded model in LM Studio. Try using 'local-model' if uncertain.")
 
-                self._log_warning(f"Attempt {attempt + 1}/{retries} failed: {e}")
+                self._log_warning(f"Attempt {attempt + 1}/{retries} on {endpoint.url} failed: {e}")
                 if attempt < retries - 1:
-                    time.sleep(backoff)
+                    # Jittered so clients recovering from the same outage do not retry in lockstep
+                    delay = min(random.uniform(0.5, 1.5) * backoff, max(0.0, deadline_at - self.clock.time()))
+                    if self._backoff_wait(delay, cancel_event):
+                        raise LMMCancelledError("LMM request cancelled during retry backoff")
                     backoff *= 2 # Exponential backoff
 
         if last_exception:
             raise last_exception
-        raise Exception("Unknown error in _send_request_with_retry")
+        raise TimeoutError(f"LMM request deadline of {budget:.1f}s exhausted")
+
+    @staticmethod
+    def _has_image(payload: Dict[str, Any]) -> bool:
+        for message in payload.get("messages") or []:
+            content = message.get("content")
+            if isinstance(content, list) and any(isinstance(part, dict) and part.get("type") == "image_url" for part in content):
+                return True
+        return False
+
+    @classmethod
+    def _latency_class(cls, payload: Dict[str, Any]) -> str:
+        """
+        Key of the health manager's latency window for `payload`: calls with the same model,
+        modality and output budget take comparable time, a 100-token caption and a text-tier
+        screen do not tell how long a full vision analysis may take.
+        """
+        modality = CAPABILITY_VISION if cls._has_image(payload) else CAPABILITY_TEXT
+        return f"{payload.get('model', '')}/{modality}/{payload.get('max_tokens', '')}"
+
+    def _is_cancelled(self, cancel_event: Optional[threading.Event]) -> bool:
+        return self._closing.is_set() or (cancel_event is not None and cancel_event.is_set())
+
+    def _backoff_wait(self, delay: float, cancel_event: Optional[threading.Event]) -> bool:
+        """Sleeps `delay` seconds in short steps; returns True as soon as the request is cancelled."""
+        remaining = delay
+        while remaining > 0:
+            if self._is_cancelled(cancel_event):
+                return True
+            step = min(0.1, remaining)
+            self.clock.sleep(step)
+            remaining -= step
+        return self._is_cancelled(cancel_event)
+
+    def _attempt(self, url: str, payload: Dict[str, Any], on_field: Optional[Callable[[str, Any], None]],
+                 emitted: List[str], required_keys: Optional[tuple], read_timeout: float,
+                 cancel_event: Optional[threading.Event], deadline_at: Optional[float] = None) -> Dict[str, Any]:
+        """One request to `url`, returning the parsed and validated analysis."""
+        if self.streaming:
+            parsed_result = self._stream_completion(payload, on_field, emitted, required_keys, url=url, read_timeout=read_timeout,
+                                                    cancel_event=cancel_event, deadline_at=deadline_at)
+        else:
+            response = self.http.post(url, json=payload, read_timeout=read_timeout)
+            response.raise_for_status()
+
+            response_json = response.json()
+            content = response_json['choices'][0]['message']['content']
+            clean_content = self._clean_json_string(content)
+
+            try:
+                parsed_result = json.loads(clean_content)
+            except json.JSONDecodeError as e:
+                 # This is a content error, might be fixed by regeneration, so we treat it as retryable
+                 raise ValueError(f"JSON decode error: {e}")
+
+        # Caption and pose responses have no state_estimation; they are validated by their callers
+        if "state_estimation" in parsed_result:
+             if not self._validate_response_schema(parsed_result):
+                 raise ValueError(f"Schema validation failed: {parsed_result}")
+        return parsed_result
+
+    def _routed_attempt(self, endpoint: LMMEndpoint, payload: Dict[str, Any], on_field: Optional[Callable[[str, Any], None]],
+                        emitted: List[str], required_keys: Optional[tuple], read_timeout: float,
+                        cancel_event: Optional[threading.Event], deadline_at: Optional[float] = None) -> Dict[str, Any]:
+        """`_attempt` against a router endpoint, reporting its latency or failure back to the router."""
+        self.router.begin(endpoint)
+        start = time.monotonic()
+        try:
+            result = self._attempt(endpoint.url, payload, on_field, emitted, required_keys, read_timeout, cancel_event, deadline_at)
+        except LMMCancelledError:
+            self.router.record_cancelled(endpoint)
+            raise
+        except Exception:
+            self.router.record_failure(endpoint)
+            raise
+        self.router.record_success(endpoint, time.monotonic() - start)
+        return result
+
+    def _hedge_target(self, endpoint: LMMEndpoint, payload: Dict[str, Any]) -> LMMEndpoint:
+        """Where to send the duplicate: another capable LMM_ENDPOINTS server if there is one, else LMM_HEDGE_URL."""
+        if len(self.router.endpoints) > 1:
+            capability = CAPABILITY_VISION if self._has_image(payload) else CAPABILITY_TEXT
+            other = self.router.select(capability, exclude=[endpoint])
+            if other is not endpoint:
+                return other
+        return self.hedge_endpoint
+
+    def _hedge_delay(self, latency_class: str) -> Optional[float]:
+        """Seconds to wait for the primary before hedging, or None when hedging is off or `latency_class` is not yet calibrated."""
+        if not self.hedge_url or self.health.latency_count(latency_class) < self.HEDGE_MIN_SAMPLES:
+            return None
+        return self.health.latency_percentile(self.hedge_percentile, latency_class)
+
+    def _attempt_with_hedge(self, endpoint: LMMEndpoint, payload: Dict[str, Any], on_field: Optional[Callable[[str, Any], None]],
+                            emitted: List[str], required_keys: Optional[tuple], read_timeout: float,
+                            cancel_event: Optional[threading.Event], deadline_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Runs one attempt against the router's chosen endpoint. With hedging configured, a duplicate is
+        sent to a second server (`_hedge_target`) if the primary has not answered within the latency
+        percentile of its latency class; the first valid result wins and the other is abandoned
+        (streams are closed, a blocking call finishes in the background and is discarded). Both go
+        through the router's accounting.
+        """
+        latency_class = self._latency_class(payload)
+        hedge_delay = self._hedge_delay(latency_class)
+        if hedge_delay is None or hedge_delay >= read_timeout:
+            start = time.monotonic()
+            result = self._routed_attempt(endpoint, payload, on_field, emitted, required_keys, read_timeout, cancel_event, deadline_at)
+            self.health.record_latency(time.monotonic() - start, latency_class)
+            return result
+
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lmm-hedge")
+        # Lets the losing stream stop reading as soon as the winner is in
+        abandon = threading.Event()
+        attempt_cancel = _AnyEvent(abandon, cancel_event)
+
+        start = time.monotonic()
+        primary = self._hedge_executor.submit(self._routed_attempt, endpoint, payload, on_field, emitted,
+                                              required_keys, read_timeout, attempt_cancel, deadline_at)
+        pending = {primary}
+        if not self._wait_any(pending, hedge_delay, cancel_event) and not self._is_cancelled(cancel_event):
+            self.hedged_requests += 1
+            target = self._hedge_target(endpoint, payload)
+            self._log_info(f"Primary slower than p{self.hedge_percentile:g} ({hedge_delay:.2f}s); hedging to {target.url}.")
+            hedge = self._hedge_executor.submit(self._routed_attempt, target, payload, on_field, emitted,
+                                                required_keys, max(self.MIN_ATTEMPT_SECONDS, read_timeout - hedge_delay),
+                                                attempt_cancel, deadline_at)
+            pending.add(hedge)
+
+        first_error: Optional[BaseException] = None
+        try:
+            while pending:
+                if self._is_cancelled(cancel_event):
+                    raise LMMCancelledError("LMM request cancelled")
+                done, pending = wait_futures(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    if error is not None:
+                        first_error = first_error or error
+                        continue
+                    if future is primary:
+                        self.health.record_latency(time.monotonic() - start, latency_class)
+                    else:
+                        self.hedge_wins += 1
+                    return future.result()
+            raise first_error
+        finally:
+            abandon.set()
+
+    def _wait_any(self, futures: set, timeout: float, cancel_event: Optional[threading.Event]) -> bool:
+        """Waits up to `timeout` seconds for any of `futures`; returns True if one finished."""
+        waited = 0.0
+        while waited < timeout:
+            if self._is_cancelled(cancel_event):
+                return False
+            step = min(0.1, timeout - waited)
+            done, _ = wait_futures(futures, timeout=step, return_when=FIRST_COMPLETED)
+            if done:
+                return True
+            waited += step
+        return False
+
+    def _stream_completion(self, payload: Dict[str, Any], on_field: Optional[Callable[[str, Any], None]],
+                           emitted: List[str], required_keys: Optional[tuple], url: Optional[str] = None,
+                           read_timeout: Optional[float] = None,
+                           cancel_event: Optional[Union[threading.Event, "_AnyEvent"]] = None,
+                           deadline_at: Optional[float] = None) -> Dict[str, Any]:
+        """
+        One streamed attempt: parses the JSON object incrementally from the SSE token stream.
+        `read_timeout` only bounds the gap between chunks, so the stream is also abandoned once
+        the request deadline `deadline_at` (clock time) passes.
+        """
+        parser = IncrementalJSONObjectParser()
+        response = self.http.post(url or self.llm_url, json=dict(payload, stream=True), stream=True, read_timeout=read_timeout)
+        try:
+            response.raise_for_status()
+            for content in iter_sse_content(response.iter_lines(decode_unicode=True)):
+                if self._is_cancelled(cancel_event):
+                    raise LMMCancelledError("LMM stream abandoned")
+                if deadline_at is not None and self.clock.time() >= deadline_at:
+                    raise requests.exceptions.Timeout("LMM request deadline passed while streaming")
+                for key, value in parser.feed(content):
+                    if key == "state_estimation" and not self._validate_response_schema({key: value}):
+                        raise ValueError(f"Schema validation failed: {value}")
+                    if not on_field:
+                        continue
+                    with self._emit_lock:
+                        # A hedged duplicate may parse the same field; only the first one is reported
+                        if key in emitted:
+                            continue
+                        emitted.append(key)
+                    try:
+                        on_field(key, value)
+                    except Exception as e:
+                        self._log_warning(f"Partial result handler failed for '{key}': {e}")
+                if parser.complete or (required_keys and all(k in parser.fields for k in required_keys)):
+                    break
+        finally:
+            # Closing mid-stream drops the connection, which makes the server stop generating
+            response.close()
+
+        if not parser.complete and not (required_keys and all(k in parser.fields for k in required_keys)):
+            raise ValueError(f"Stream ended before the JSON object was complete (parsed: {list(parser.fields)})")
+        if not parser.complete:
+            self._log_debug(f"Cancelled generation after required fields {list(required_keys)}.")
+        return dict(parser.fields)
 
     def _get_fallback_response(self, user_context: Optional[Dict[str, Any]] = None) -> LMMResponse:
         """Returns a safe, neutral response when the LMM is unavailable, using simple heuristics."""
@@ -313,7 +650,9 @@ class LMMInterface:
             "_meta": {"is_fallback": True}
         }
 
-    def process_data(self, video_data=None, audio_data=None, user_context=None) -> Optional[LMMResponse]:
+    def process_data(self, video_data=None, audio_data=None, user_context=None,
+                     on_partial: Optional[Callable[[str, Any], None]] = None,
+                     cancel_event: Optional[threading.Event] = None) -> Optional[LMMResponse]:
         """
         Processes incoming sensor data and user context by sending it to the local LMM.
 
@@ -321,168 +660,119 @@ class LMMInterface:
             video_data: Base64 encoded image data from the video sensor.
             audio_data: Data from the audio sensor (list of floats).
             user_context: Additional context dictionary (includes metrics).
+            on_partial: Streaming mode only: called with (key, value) as each top-level field
+                (state_estimation, visual_context, suggestion) is parsed, before the full result
+                is returned. Fields delivered this way are listed in `_meta["streamed_fields"]`.
+            cancel_event: Optional threading.Event; setting it (e.g. on preemption) abandons the
+                request at the next retry backoff or streamed chunk. A cancelled request returns
+                None and does not count towards the circuit breaker.
+
+        With LMM_CASCADE_ENABLED, a text-only model answers first and the vision model is
+        only called on escalation; `_meta["cascade"]` records the tier that answered, the
+        escalation reason and per-tier latency.
 
         Returns:
             A dictionary with the LMM's response or None on failure.
         """
         self._log_info("Sending data to local LMM...")
 
-        # Circuit Breaker Check
-        if self.circuit_failures >= self.circuit_max_failures:
-            if time.time() - self.circuit_open_time < self.circuit_cooldown:
-                self._log_warning(f"Circuit breaker open. Skipping LMM call. (Cooldown: {self.circuit_cooldown}s)")
-                if getattr(config, 'LMM_FALLBACK_ENABLED', False):
-                    return self._get_fallback_response(user_context)
-                return None
-            else:
-                self._log_info("Circuit breaker cooldown expired. Retrying connection.")
-                self.circuit_failures = 0
-                self.circuit_open_time = 0
-
         if video_data is None and audio_data is None and not user_context:
             self._log_warning("No data provided to LMM process_data.")
             return None
 
-        # Construct User Message
-        content_parts = []
-
-        # 1. Text Context & Metrics
-        context_str = "Analyze the following user status:\n"
-        if user_context:
-            context_str += f"Current Mode: {user_context.get('current_mode', 'unknown')}\n"
-            context_str += f"Trigger Reason: {user_context.get('trigger_reason', 'unknown')}\n"
-
-            # Context Intelligence: Active Window
-            active_window = user_context.get('active_window', 'Unknown')
-            # Truncate current window title generously (80 chars) to allow context but prevent token bloat
-            active_window = self._truncate_text(active_window, max_length=80)
-            context_str += f"Active Window: {active_window}\n"
-
-            metrics = user_context.get('sensor_metrics', {})
-            context_str += f"Audio Level (RMS): {metrics.get('audio_level', 0.0):.4f}\n"
-
-            # Add detailed audio analysis if available
-            audio_analysis = metrics.get('audio_analysis', {})
-            if audio_analysis:
-                context_str += f"Audio Pitch (est): {audio_analysis.get('pitch_estimation', 0.0):.2f} Hz\n"
-                context_str += f"Audio Pitch Variance: {audio_analysis.get('pitch_variance', 0.0):.2f}\n"
-                context_str += f"Audio ZCR: {audio_analysis.get('zcr', 0.0):.4f}\n"
-
-                speech_rate = audio_analysis.get('speech_rate', 0.0)
-                context_str += f"Speech Rate: {speech_rate:.2f} syllables/sec\n"
-
-                is_speech = audio_analysis.get('is_speech', False)
-                speech_conf = audio_analysis.get('speech_confidence', 0.0)
-                context_str += f"Voice Activity: {'Yes' if is_speech else 'No'} (Conf: {speech_conf:.2f})\n"
-
-            context_str += f"Video Activity (Motion): {metrics.get('video_activity', 0.0):.2f}\n"
-
-            # Add detailed video/face analysis (Posture)
-            video_analysis = metrics.get('video_analysis', {})
-            if video_analysis and video_analysis.get("face_detected"):
-                context_str += f"Face Detected: Yes\n"
-                context_str += f"Face Size Ratio: {video_analysis.get('face_size_ratio', 0.0):.3f} (Lean/Focus)\n"
-                context_str += f"Face Vertical Pos: {video_analysis.get('vertical_position', 0.0):.2f} (0=Top, 1=Bottom)\n"
-
-                posture = video_analysis.get("posture_state")
-                if posture and posture != "neutral":
-                    context_str += f"Posture: {posture}\n"
-
-                roll = video_analysis.get("face_roll_angle")
-                if roll and abs(roll) > 15:
-                    context_str += f"Head Tilt: {roll:.1f} deg\n"
-            else:
-                context_str += f"Face Detected: No\n"
-
-            # Context History
-            context_history = user_context.get('context_history', [])
-            if context_history:
-                context_str += "\nRecent History (Last 5 snapshots):\n"
-                for snapshot in context_history:
-                    # Format simplified line
-                    ts = snapshot.get('timestamp', 0)
-                    win = snapshot.get('active_window', 'Unknown')
-                    # Truncate history window titles more aggressively (50 chars)
-                    win = self._truncate_text(win, max_length=50)
-
-                    # Relative time is better for LMM
-                    rel_time = int(time.time() - ts)
-
-                    # Extract richer metrics if available
-                    posture = snapshot.get('posture', 'unknown')
-                    audio_level = snapshot.get('audio_level', 0.0)
-                    video_activity = snapshot.get('video_activity', 0.0)
-
-                    context_str += (
-                        f"- T-{rel_time}s: Window='{win}', Mode={snapshot.get('mode')}, "
-                        f"Face={snapshot.get('face_detected')}, Posture={posture}, "
-                        f"Audio={audio_level:.2f}, Motion={video_activity:.1f}\n"
-                    )
-
-            est = user_context.get('current_state_estimation')
-            if est:
-                 context_str += f"Previous State: {est}\n"
-
-            # Add suppressed interventions
-            suppressed = user_context.get('suppressed_interventions')
-            if suppressed:
-                context_str += f"\nSuppressed Interventions (Do NOT suggest): {', '.join(suppressed)}\n"
-
-            # Add System Alerts (High Priority)
-            alerts = user_context.get('system_alerts', [])
-            if alerts:
-                context_str += f"\nSYSTEM ALERTS (High Priority): {', '.join(alerts)}\n"
-            # Add preferred interventions
-            preferred = user_context.get('preferred_interventions')
-            if preferred:
-                context_str += f"\nPreferred Interventions (User found these helpful recently): {', '.join(preferred)}\n"
-
-        content_parts.append({"type": "text", "text": context_str})
-
-        # 2. Image (Video Frame)
-        if video_data:
-            content_parts.append({
-                "type": "image_url",
-                "image_url": {
-                    "url": f"data:image/jpeg;base64,{video_data}"
-                }
-            })
+        # Circuit Breaker Check (after the cooldown, probes the server before the full request)
+        if not self.health.allow_request():
+            self._log_warning(f"Circuit breaker open. Skipping LMM call. (Cooldown: {self.circuit_cooldown}s)")
+            if getattr(config, 'LMM_FALLBACK_ENABLED', False):
+                return self._get_fallback_response(user_context)
+            return None
 
-        # Payload
+        # Response cache: high-priority triggers always get a fresh analysis
+        cache_key = None
+        if self.response_cache is not None and self._trigger_priority(user_context) < PRIORITY_HIGH:
+            cache_key = self.response_cache.make_key(video_data, user_context)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self._log_info(f"Cache hit ({cached['_meta']['cache_age_s']:.1f}s old). Skipping LMM call.")
+                self.health.record_cancelled()
+                return cached
+
+        # Stable-to-volatile message layout for server-side prefix (KV) cache reuse
         payload = {
             "model": config.LOCAL_LLM_MODEL_ID,
-            "messages": [
-                {"role": "system", "content": self.SYSTEM_INSTRUCTION},
-                {"role": "user", "content": content_parts}
-            ],
+            "messages": self.prompt_builder.build_messages(self.SYSTEM_INSTRUCTION, user_context, video_data),
             "temperature": 0.2, # Low temp for consistent JSON
             "max_tokens": 500
         }
+        payload.update(self.prompt_builder.cache_hints())
+        prompt_report = self.prompt_builder.last_report
 
+        # Holds a state-estimation slot for the whole call; background captions and summaries wait for it
+        if not self.workloads.acquire(WORKLOAD_STATE, cancel_event):
+            self.health.record_cancelled()
+            return None
+        workload_start = time.monotonic()
         try:
             start_time = time.time()
-            result = self._send_request_with_retry(payload)
+            streamed_fields = []
+            first_field_ms = []
+
+            def _on_field(key, value):
+                if not first_field_ms:
+                    first_field_ms.append((time.time() - start_time) * 1000)
+                if on_partial:
+                    on_partial(key, value)
+                streamed_fields.append(key)
+
+            result = None
+            cascade_meta = None
+            if self.cascade_enabled:
+                result, cascade_meta = self._run_text_tier(user_context, video_data, cancel_event)
+
+            if result is None:
+                self._log_prompt_report(prompt_report, "vision" if cascade_meta is not None else "default")
+                vision_start = time.time()
+                # The full model gets whatever is left of the request deadline after the text tier
+                deadline = max(self.MIN_ATTEMPT_SECONDS, self.request_deadline - (vision_start - start_time))
+                result = self._send_request_with_retry(payload, on_field=_on_field, required_keys=self.RESPONSE_KEYS,
+                                                       deadline=deadline, cancel_event=cancel_event)
+                if cascade_meta is not None:
+                    cascade_meta["vision_latency_ms"] = (time.time() - vision_start) * 1000
+                if video_data:
+                    self._last_vision_time = self.clock.time()
+                    self._last_visual_context = list(result.get("visual_context") or [])
             latency_ms = (time.time() - start_time) * 1000
 
             # Inject latency into _meta
             if "_meta" not in result or result["_meta"] is None:
                 result["_meta"] = {}
             result["_meta"]["latency_ms"] = latency_ms
+            if cascade_meta is not None:
+                result["_meta"]["cascade"] = cascade_meta
+            if streamed_fields:
+                result["_meta"]["first_field_latency_ms"] = first_field_ms[0]
+                if on_partial:
+                    result["_meta"]["streamed_fields"] = streamed_fields
+
+            if cache_key is not None:
+                self.response_cache.put(cache_key, result)
 
             self._log_info(f"Received valid JSON from LMM. Latency: {latency_ms:.2f}ms")
             self._log_debug(f"LMM Response: {result}")
             # Reset circuit breaker on success
-            self.circuit_failures = 0
+            self.health.record_success()
             return result
 
+        except LMMCancelledError as e:
+            self._log_info(f"LMM request abandoned: {e}")
+            self.health.record_cancelled()
+            return None
+
         except Exception as e:
             self._log_error(f"LMM Request Failed after retries: {e}")
 
             # Increment Circuit Breaker
-            self.circuit_failures += 1
-            if self.circuit_failures >= self.circuit_max_failures:
-                 self.circuit_open_time = time.time()
-                 self._log_warning(f"LMM Circuit Breaker TRIPPED. Pausing calls for {self.circuit_cooldown}s.")
+            self.health.record_failure()
 
             if getattr(config, 'LMM_FALLBACK_ENABLED', False):
                  self._log_info("LMM_FALLBACK_ENABLED is True. Returning neutral state.")
@@ -490,6 +780,77 @@ class LMMInterface:
 
             return None
 
+        finally:
+            self.workloads.release(WORKLOAD_STATE, time.monotonic() - workload_start)
+
+    def _run_text_tier(self, user_context: Optional[Dict[str, Any]], video_data: Optional[str],
+                       cancel_event: Optional[threading.Event]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        First cascade tier: scores the structured context with the small text-only model.
+        Returns (result, meta). result is None when the call must escalate to the vision
+        model; meta["escalation_reason"] then says why (high_priority_trigger,
+        stale_visual_context, text_tier_failed or low_confidence).
+        """
+        meta: Dict[str, Any] = {"tier": "vision", "escalation_reason": None}
+        if self._trigger_priority(user_context) >= PRIORITY_HIGH:
+            meta["escalation_reason"] = "high_priority_trigger"
+            return None, meta
+        visual_age = self.clock.time() - self._last_vision_time if self._last_vision_time is not None else None
+        if video_data and (visual_age is None or visual_age > self.cascade_visual_max_age):
+            meta["escalation_reason"] = "stale_visual_context"
+            return None, meta
+
+        payload = {
+            "model": self.cascade_text_model,
+            "messages": self.prompt_builder.build_messages(self.SYSTEM_INSTRUCTION + TEXT_TIER_ADDENDUM, user_context),
+            "temperature": 0.2,
+            "max_tokens": 500
+        }
+        payload.update(self.prompt_builder.cache_hints())
+        self._log_prompt_report(self.prompt_builder.last_report, "text")
+
+        start_time = time.time()
+        try:
+            result = self._send_request_with_retry(payload, deadline=self.cascade_text_deadline, cancel_event=cancel_event)
+        except LMMCancelledError:
+            raise
+        except Exception as e:
+            meta["text_latency_ms"] = (time.time() - start_time) * 1000
+            meta["escalation_reason"] = "text_tier_failed"
+            self._log_warning(f"Text tier failed, escalating to the vision model: {e}")
+            return None, meta
+        meta["text_latency_ms"] = (time.time() - start_time) * 1000
+
+        confidence = result.pop("confidence", None)
+        meta["text_confidence"] = confidence
+        if not isinstance(confidence, (int, float)) or confidence < self.cascade_confidence_threshold:
+            meta["escalation_reason"] = "low_confidence"
+            return None, meta
+
+        meta["tier"] = "text"
+        if video_data:
+            # The text model cannot see; reuse what the vision model saw at most cascade_visual_max_age ago
+            result["visual_context"] = list(self._last_visual_context)
+            meta["visual_context_age_s"] = visual_age
+        self._log_info(f"Text tier answered (confidence {confidence:.2f}); vision model skipped.")
+        return result, meta
+
+    def _log_prompt_report(self, report: Optional[Dict[str, Any]], tier: str) -> None:
+        """Writes the prompt's per-section token estimate to the events log."""
+        if not report:
+            return
+        if report["trimmed"]:
+            self._log_info(f"Prompt reduced to {report['total']}/{report['budget']} tokens: {', '.join(report['trimmed'])}")
+        if self.logger and hasattr(self.logger, 'log_event'):
+            self.logger.log_event("lmm_prompt_tokens", dict(report, tier=tier))
+
+    def _trigger_priority(self, user_context: Optional[Dict[str, Any]]) -> int:
+        """Scheduler priority of the trigger behind this request (LogicEngine passes it as 'trigger_priority')."""
+        context = user_context or {}
+        if context.get("trigger_priority") is not None:
+            return context["trigger_priority"]
+        return REASON_PRIORITIES.get(context.get("trigger_reason", "unknown"), PRIORITY_NORMAL)
+
     def get_intervention_suggestion(self, processed_analysis: LMMResponse) -> Optional[Dict[str, Any]]:
         """
         Extracts an intervention suggestion from the LMM's analysis.
@@ -523,13 +884,143 @@ class LMMInterface:
             payload["response_format"] = {"type": "json_object"}
             payload["messages"][0]["content"][0]["text"] += " Return valid JSON: {\"caption\": \"your caption here\"}"
 
-            result = self._send_request_with_retry(payload)
+            # Background work: deferred while a state estimation is in flight
+            with self.workloads.slot(WORKLOAD_CAPTION, self._closing) as admitted:
+                if not admitted:
+                    return "Captured moment."
+                result = self._send_request_with_retry(payload)
             return result.get("caption", "Cool shot.")
 
         except Exception as e:
             self._log_warning(f"Caption generation failed: {e}")
             return "Captured moment."
 
+    def warm_up(self, runs: int = 2, timeout: float = 120.0) -> Optional[Dict[str, float]]:
+        """
+        Loads and warms the model on every endpoint before the first real analysis. Sends a
+        representative request (system instruction, minimal context, tiny image, with the
+        prompt cache hints) once cold and `runs` more times warm; with the cascade enabled
+        the text model gets one request as well. The cold request may take up to `timeout`
+        seconds (model load). Responses are not parsed.
+
+        Like an analysis, warm-up is skipped while the circuit breaker is open, holds a
+        state-estimation workload slot, and its warm runs share one request deadline; latencies
+        are timed on `self.clock`. The health manager counts it as one request.
+
+        Warm latencies seed the router's per-endpoint estimates and the health manager's
+        baseline for the read timeout. Returns {"cold_latency", "warm_latency"} in seconds
+        for the fastest endpoint, or None if no endpoint answered.
+        """
+        if not self.health.allow_request():
+            self._log_warning(f"Circuit breaker open. Skipping LMM warm-up. (Cooldown: {self.circuit_cooldown}s)")
+            return None
+
+        user_context = {"current_mode": "active", "trigger_reason": "warm_up", "sensor_metrics": {}}
+        best: Optional[Dict[str, float]] = None
+        failed = False
+        for endpoint in self.router.endpoints:
+            image = self.WARM_UP_IMAGE if endpoint.supports(CAPABILITY_VISION) else None
+            payload = {
+                "model": config.LOCAL_LLM_MODEL_ID,
+                "messages": self.prompt_builder.build_messages(self.SYSTEM_INSTRUCTION, user_context, image),
+                "temperature": 0.2,
+                "max_tokens": 500,
+                "response_format": {"type": "json_object"}
+            }
+            payload.update(self.prompt_builder.cache_hints())
+            with self.workloads.slot(WORKLOAD_STATE, self._closing) as admitted:
+                if not admitted:
+                    break
+                try:
+                    cold = self._routed_post(endpoint, payload, timeout, cold=True)
+                    warm = []
+                    deadline_at = self.clock.time() + self.request_deadline
+                    for _ in range(runs):
+                        remaining = deadline_at - self.clock.time()
+                        if self._closing.is_set() or remaining < self.MIN_ATTEMPT_SECONDS:
+                            break
+                        warm.append(self._routed_post(endpoint, payload, min(self.http.read_timeout, remaining)))
+                    if self.cascade_enabled and endpoint.supports(CAPABILITY_TEXT) and not self._closing.is_set():
+                        text_payload = dict(payload, model=self.cascade_text_model,
+                                            messages=self.prompt_builder.build_messages(self.SYSTEM_INSTRUCTION + TEXT_TIER_ADDENDUM, user_context))
+                        self._routed_post(endpoint, text_payload, timeout, cold=True)
+                except Exception as e:
+                    self._log_warning(f"Warm-up of {endpoint.url} failed: {e}")
+                    failed = True
+                    continue
+            result = {"cold_latency": cold, "warm_latency": sorted(warm)[len(warm) // 2] if warm else cold}
+            self._log_info(f"Warmed up {endpoint.url}: cold {cold:.2f}s, warm {result['warm_latency']:.2f}s.")
+            if best is None or result["warm_latency"] < best["warm_latency"]:
+                best = result
+                baseline_class = self._latency_class(payload)
+        if best is not None:
+            # Only stands in for the timeout of calls like the warm-up request (full analyses)
+            self.health.set_baseline(best["warm_latency"], baseline_class)
+            self.health.record_success()
+        elif failed:
+            self.health.record_failure()
+        else:
+            self.health.record_cancelled()
+        return best
+
+    def _timed_post(self, url: str, payload: Dict[str, Any], read_timeout: float) -> float:
+        """Seconds the request took on `self.clock`."""
+        start = self.clock.time()
+        response = self.http.post(url, json=payload, read_timeout=read_timeout)
+        response.raise_for_status()
+        return self.clock.time() - start
+
+    def _routed_post(self, endpoint: LMMEndpoint, payload: Dict[str, Any], read_timeout: float, cold: bool = False) -> float:
+        """
+        `_timed_post` to a router endpoint with the same accounting as `_routed_attempt`. A `cold`
+        request's latency includes model load, so it does not feed the endpoint's latency estimate.
+        """
+        self.router.begin(endpoint)
+        try:
+            latency = self._timed_post(endpoint.url, payload, read_timeout)
+        except Exception:
+            self.router.record_failure(endpoint)
+            raise
+        if cold:
+            self.router.record_cancelled(endpoint)
+        else:
+            self.router.record_success(endpoint, latency)
+        return latency
+
+    def summarize_history(self, segment_lines: List[str], previous: Optional[str] = None,
+                          max_words: int = 60) -> Optional[str]:
+        """
+        Condenses history segments (and the previous summary) into a short narrative.
+        Text-only and sent to the cascade text model, so it is cheap; meant to run in the
+        background. Returns None on failure (the caller keeps the segments).
+        """
+        if not segment_lines:
+            return previous
+        text = ""
+        if previous:
+            text += f"Previous summary: {previous}\n"
+        text += "Segments:\n" + "\n".join(f"- {line}" for line in segment_lines)
+        payload = {
+            "model": self.cascade_text_model,
+            "messages": [
+                {"role": "system", "content": HISTORY_NARRATIVE_PROMPT.format(max_words=max_words)},
+                {"role": "user", "content": text}
+            ],
+            "temperature": 0.2,
+            "max_tokens": 2 * max_words + 40,
+            "response_format": {"type": "json_object"}
+        }
+        try:
+            with self.workloads.slot(WORKLOAD_SUMMARY, self._closing) as admitted:
+                if not admitted:
+                    return None
+                result = self._send_request_with_retry(payload, deadline=self.cascade_text_deadline)
+        except Exception as e:
+            self._log_warning(f"History summary failed: {e}")
+            return None
+        summary = result.get("summary")
+        return summary.strip() if isinstance(summary, str) and summary.strip() else None
+
     def generate_pose_suggestion(self, video_data_b64: str, context_text: str) -> str:
         """
         Generates a pose suggestion based on the image and context.
@@ -550,7 +1041,10 @@ class LMMInterface:
 
         try:
             payload["response_format"] = {"type": "json_object"}
-            result = self._send_request_with_retry(payload)
+            with self.workloads.slot(WORKLOAD_POSE, self._closing) as admitted:
+                if not admitted:
+                    return "The lighting is great. Just hold that pose."
+                result = self._send_request_with_retry(payload)
             return result.get("suggestion", "The lighting is great. Just hold that pose.")
 
         except Exception as e:
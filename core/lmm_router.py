@@ -0,0 +1,229 @@
+import threading
+from typing import Optional, Dict, Any, List, Iterable
+
+import config
+from .clock import Clock, SYSTEM_CLOCK
+from .lmm_http_client import LMMHttpClient
+
+CAPABILITY_VISION = "vision"
+CAPABILITY_TEXT = "text"
+
+
+def completions_url(base_url: str) -> str:
+    """Normalizes a server base URL to its OpenAI-compatible chat completions endpoint."""
+    base_url = base_url.rstrip('/')
+    if base_url.endswith("/v1/chat/completions"):
+        return base_url
+    elif base_url.endswith("/chat/completions"):
+         return base_url
+    elif base_url.endswith("/v1/chat"):
+         return f"{base_url}/completions"
+    elif base_url.endswith("/chat"):
+         return f"{base_url}/completions"
+    elif base_url.endswith("/v1"):
+         return f"{base_url}/chat/completions"
+    return f"{base_url}/v1/chat/completions"
+
+
+class LMMEndpoint:
+    """One inference server and what the router has learned about it."""
+
+    def __init__(self, url: str, weight: float = 1.0, capabilities: Optional[Iterable[str]] = None) -> None:
+        self.url: str = completions_url(url)
+        self.models_url: str = self.url.replace("/chat/completions", "/models")
+        self.weight: float = max(0.01, float(weight))
+        self.capabilities: frozenset = frozenset(capabilities or (CAPABILITY_VISION, CAPABILITY_TEXT))
+        self.ewma_latency: Optional[float] = None  # Seconds, successful requests only
+        self.error_rate: float = 0.0               # EWMA of failures (0 = never fails, 1 = always fails)
+        self.consecutive_failures: int = 0
+        self.healthy: bool = True
+        self.ejected_at: Optional[float] = None
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.failures: int = 0
+
+    def supports(self, capability: str) -> bool:
+        return capability in self.capabilities
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "capabilities": sorted(self.capabilities),
+            "healthy": self.healthy,
+            "ewma_latency_ms": self.ewma_latency * 1000 if self.ewma_latency is not None else None,
+            "error_rate": self.error_rate,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+    def __repr__(self) -> str:
+        return f"LMMEndpoint(url={self.url!r}, weight={self.weight}, healthy={self.healthy})"
+
+
+class LMMRouter:
+    """
+    Spreads LMM requests over several OpenAI-compatible inference servers.
+
+    Each endpoint has a weight and capabilities ("vision", "text"); requests carrying
+    an image only go to vision endpoints. `select` picks the healthy endpoint with the
+    lowest expected cost: EWMA latency, scaled up by requests already in flight and by
+    the recent error rate, divided by the weight. Endpoints nobody has timed yet are
+    tried first so every server gets measured.
+
+    An endpoint is ejected after `eject_after` consecutive failures. Ejected endpoints
+    are probed with a GET on `/v1/models` every `probe_interval` seconds (a background
+    thread, see `start`) and re-admitted on the first successful probe. If every
+    capable endpoint is ejected, `select` still returns the least bad one rather than
+    nothing; LMMInterface's circuit breaker handles a complete outage.
+    """
+
+    def __init__(self, endpoints: List[LMMEndpoint], http_client: Optional[LMMHttpClient] = None,
+                 clock: Optional[Clock] = None, ewma_alpha: Optional[float] = None, eject_after: Optional[int] = None,
+                 probe_interval: Optional[float] = None, probe_timeout: float = 2.0, data_logger=None) -> None:
+        if not endpoints:
+            raise ValueError("LMMRouter needs at least one endpoint")
+        self.endpoints: List[LMMEndpoint] = list(endpoints)
+        self.http: LMMHttpClient = http_client if http_client is not None else LMMHttpClient()
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        self.ewma_alpha: float = ewma_alpha if ewma_alpha is not None else getattr(config, 'LMM_ROUTER_EWMA_ALPHA', 0.3)
+        self.eject_after: int = eject_after or getattr(config, 'LMM_ROUTER_EJECT_AFTER', 3)
+        self.probe_interval: float = probe_interval if probe_interval is not None else getattr(config, 'LMM_ROUTER_PROBE_INTERVAL', 10.0)
+        self.probe_timeout: float = probe_timeout
+        self.logger = data_logger
+        self._lock: threading.Lock = threading.Lock()
+        self._stop_event: threading.Event = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    def _log_info(self, message):
+        if self.logger: self.logger.log_info(f"LMMRouter: {message}")
+        else: print(f"INFO: LMMRouter: {message}")
+
+    def _log_warning(self, message):
+        if self.logger: self.logger.log_warning(f"LMMRouter: {message}")
+        else: print(f"WARNING: LMMRouter: {message}")
+
+    @classmethod
+    def from_config(cls, http_client: Optional[LMMHttpClient] = None, clock: Optional[Clock] = None,
+                    data_logger=None) -> "LMMRouter":
+        """LMM_ENDPOINTS entries ({"url", "weight", "capabilities"}), or LOCAL_LLM_URL alone when none are configured."""
+        entries = getattr(config, 'LMM_ENDPOINTS', None) or [{"url": config.LOCAL_LLM_URL}]
+        endpoints = []
+        for entry in entries:
+            if isinstance(entry, str):
+                entry = {"url": entry}
+            endpoints.append(LMMEndpoint(entry["url"], entry.get("weight", 1.0), entry.get("capabilities")))
+        return cls(endpoints, http_client=http_client, clock=clock, data_logger=data_logger)
+
+    @property
+    def primary(self) -> LMMEndpoint:
+        return self.endpoints[0]
+
+    # --- Dispatch ---
+
+    def _cost(self, endpoint: LMMEndpoint) -> float:
+        latency = endpoint.ewma_latency if endpoint.ewma_latency is not None else 0.0
+        return latency * (1 + endpoint.in_flight) * (1 + 4 * endpoint.error_rate) / endpoint.weight
+
+    def select(self, capability: str = CAPABILITY_TEXT, exclude: Iterable[LMMEndpoint] = ()) -> LMMEndpoint:
+        """Best endpoint for a request needing `capability`, avoiding `exclude` (e.g. ones that already failed it)."""
+        excluded = set(id(e) for e in exclude)
+        with self._lock:
+            capable = [e for e in self.endpoints if e.supports(capability)] or list(self.endpoints)
+            candidates = [e for e in capable if e.healthy and id(e) not in excluded]
+            if not candidates:
+                candidates = [e for e in capable if e.healthy] or capable
+                if not any(e.healthy for e in candidates):
+                    # Everything is ejected: lowest error rate first, then the one ejected longest ago
+                    return min(candidates, key=lambda e: (e.error_rate, e.ejected_at or 0.0))
+            untimed = [e for e in candidates if e.ewma_latency is None]
+            if untimed:
+                return max(untimed, key=lambda e: e.weight)
+            return min(candidates, key=self._cost)
+
+    def begin(self, endpoint: LMMEndpoint) -> None:
+        with self._lock:
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+
+    def record_success(self, endpoint: LMMEndpoint, latency: float) -> None:
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            if endpoint.ewma_latency is None:
+                endpoint.ewma_latency = latency
+            else:
+                endpoint.ewma_latency += self.ewma_alpha * (latency - endpoint.ewma_latency)
+            endpoint.error_rate *= (1 - self.ewma_alpha)
+            endpoint.consecutive_failures = 0
+
+    def record_failure(self, endpoint: LMMEndpoint) -> None:
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+            endpoint.failures += 1
+            endpoint.error_rate += self.ewma_alpha * (1 - endpoint.error_rate)
+            endpoint.consecutive_failures += 1
+            if endpoint.healthy and endpoint.consecutive_failures >= self.eject_after:
+                endpoint.healthy = False
+                endpoint.ejected_at = self.clock.time()
+                ejected = True
+            else:
+                ejected = False
+        if ejected:
+            self._log_warning(f"Ejected {endpoint.url} after {self.eject_after} consecutive failures.")
+
+    def record_cancelled(self, endpoint: LMMEndpoint) -> None:
+        """An abandoned request says nothing about the endpoint's health."""
+        with self._lock:
+            endpoint.in_flight = max(0, endpoint.in_flight - 1)
+
+    # --- Health checks ---
+
+    def probe(self, endpoint: LMMEndpoint) -> bool:
+        """GET /v1/models on `endpoint`; re-admits it on success. Returns whether it answered."""
+        try:
+            ok = self.http.get(endpoint.models_url, read_timeout=self.probe_timeout).status_code == 200
+        except Exception:
+            ok = False
+        if ok and not endpoint.healthy:
+            with self._lock:
+                endpoint.healthy = True
+                endpoint.ejected_at = None
+                endpoint.consecutive_failures = 0
+                # Keep some suspicion so it is not flooded the moment it is back
+                endpoint.error_rate = max(endpoint.error_rate, 0.5)
+            self._log_info(f"Re-admitted {endpoint.url} after a successful health probe.")
+        return ok
+
+    def probe_ejected(self) -> None:
+        """Probes every ejected endpoint whose probe interval has elapsed."""
+        now = self.clock.time()
+        with self._lock:
+            due = [e for e in self.endpoints if not e.healthy and now - (e.ejected_at or 0.0) >= self.probe_interval]
+        for endpoint in due:
+            if not self.probe(endpoint):
+                with self._lock:
+                    endpoint.ejected_at = now  # Next probe one interval from now
+
+    def _probe_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self.probe_ejected()
+            self._stop_event.wait(min(1.0, self.probe_interval))
+
+    def start(self) -> None:
+        """Starts the background health-probe thread (only useful with more than one endpoint)."""
+        if self._probe_thread is not None and self._probe_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._probe_thread = threading.Thread(target=self._probe_loop, name="lmm-router-probe", daemon=True)
+        self._probe_thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._probe_thread is not None:
+            self._probe_thread.join(timeout=2.0)
+            self._probe_thread = None
+
+    def get_stats(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [e.to_dict() for e in self.endpoints]
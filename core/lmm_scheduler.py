@@ -0,0 +1,218 @@
+import threading
+from collections import Counter
+from typing import Optional, Callable, Dict, List, Any
+
+import config
+from .clock import Clock, SYSTEM_CLOCK
+
+# Request priorities (higher wins)
+PRIORITY_LOW = 0      # Routine heartbeats
+PRIORITY_NORMAL = 1
+PRIORITY_HIGH = 2     # Sensor-driven triggers that should not wait for a heartbeat
+
+REASON_PRIORITIES: Dict[str, int] = {
+    "periodic_check": PRIORITY_LOW,
+    "unknown": PRIORITY_LOW,
+    "high_audio_level": PRIORITY_HIGH,
+    "high_video_activity": PRIORITY_HIGH,
+    "high_sexual_arousal": PRIORITY_HIGH,
+}
+
+
+class LMMRequest:
+    """A (possibly merged) request for one LMM analysis."""
+
+    def __init__(self, reason: str, priority: int, allow_intervention: bool, created_at: Optional[float] = None) -> None:
+        self.reason: str = reason
+        self.priority: int = priority
+        self.allow_intervention: bool = allow_intervention
+        self.reasons: List[str] = [reason]
+        self.created_at: float = created_at if created_at is not None else SYSTEM_CLOCK.time()
+        self.dispatched_at: Optional[float] = None
+        # Set when a higher-priority request preempts this one; its result is discarded
+        self.cancelled: threading.Event = threading.Event()
+
+    def merge(self, other: "LMMRequest") -> None:
+        """Folds a newer trigger into this pending request (highest priority reason wins)."""
+        if other.priority > self.priority:
+            self.reason = other.reason
+            self.priority = other.priority
+        self.allow_intervention = self.allow_intervention or other.allow_intervention
+        self.reasons.extend(r for r in other.reasons if r not in self.reasons)
+
+    def __repr__(self) -> str:
+        return f"LMMRequest(reason={self.reason!r}, priority={self.priority}, reasons={self.reasons})"
+
+
+class LMMScheduler:
+    """
+    Sits between LogicEngine and LMMInterface and decides when a trigger becomes a request.
+
+    - One request in flight at a time (the local backend serves one at a time anyway).
+    - Triggers that arrive while a request is in flight are coalesced into a single
+      pending request instead of being dropped; it is dispatched as soon as the
+      in-flight one completes.
+    - The payload is built by `dispatch` at dispatch time, so a pending request always
+      carries the freshest sensor snapshot (latest wins), never the one from when it
+      was first queued.
+    - A high-priority trigger preempts an in-flight low-priority (periodic) request: the
+      old request is marked cancelled (its result is discarded) and the new one is sent
+      immediately. At most one abandoned request is allowed to drain, so the backend
+      never sees more than two concurrent calls.
+
+    `dispatch(request)` must start the analysis asynchronously and return True, or return
+    False if there was nothing to send. The worker must call complete(request) when done.
+    The slot is reserved under the scheduler lock, but `dispatch` (payload building: frame
+    encoding, montage, metric summaries) runs after it is released, so `is_busy` and other
+    triggers never wait for it. A request preempted or completed while it is still being
+    dispatched is handled like any other.
+    """
+
+    def __init__(self, dispatch: Callable[[LMMRequest], bool], logger: Optional[Any] = None, clock: Optional[Clock] = None) -> None:
+        self._dispatch = dispatch
+        self.logger = logger
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        self._lock: threading.RLock = threading.RLock()
+
+        self._inflight: Optional[LMMRequest] = None
+        self._draining: Optional[LMMRequest] = None  # preempted but still running
+        self._pending: Optional[LMMRequest] = None
+
+        self._closed: bool = False
+
+        # Per-instance copy so LogicEngine can register priorities for configured trigger rules
+        self.reason_priorities: Dict[str, int] = dict(REASON_PRIORITIES)
+        self.preemption_enabled: bool = getattr(config, 'LMM_PREEMPTION_ENABLED', True)
+        self.stats: Counter = Counter()
+
+    def priority_for(self, reason: str) -> int:
+        return self.reason_priorities.get(reason, PRIORITY_NORMAL)
+
+    def submit(self, reason: str, allow_intervention: bool = True, priority: Optional[int] = None) -> str:
+        """
+        Submits a trigger. Returns what happened to it:
+        "dispatched", "preempted" (dispatched after cancelling a periodic check),
+        "coalesced" (merged into the pending request), "queued", "empty" (nothing
+        was sent) or "closed" (after shutdown).
+        """
+        if priority is None:
+            priority = self.priority_for(reason)
+        request = LMMRequest(reason, priority, allow_intervention, created_at=self.clock.time())
+
+        with self._lock:
+            if self._closed:
+                return "closed"
+            self.stats["submitted"] += 1
+            if self._inflight is None:
+                self._reserve(request)
+                outcome = "dispatched"
+            elif self._can_preempt(request):
+                preempted = self._inflight
+                preempted.cancelled.set()
+                self._draining = preempted
+                if self._pending:
+                    # Whatever was waiting is folded into the urgent request
+                    request.merge(self._pending)
+                    self._pending = None
+                self._reserve(request)
+                self.stats["preempted"] += 1
+                outcome = "preempted"
+                if self.logger:
+                    self.logger.log_info(f"LMM request '{request.reason}' preempted in-flight '{preempted.reason}'.")
+            elif self._pending is not None:
+                self._pending.merge(request)
+                self.stats["coalesced"] += 1
+                return "coalesced"
+            else:
+                self._pending = request
+                self.stats["queued"] += 1
+                return "queued"
+
+        return outcome if self._start(request) else "empty"
+
+    def _can_preempt(self, request: LMMRequest) -> bool:
+        return (self.preemption_enabled
+                and request.priority >= PRIORITY_HIGH
+                and self._inflight.priority <= PRIORITY_LOW
+                and self._draining is None)
+
+    def _reserve(self, request: LMMRequest) -> None:
+        """Makes `request` the in-flight one. Caller holds the lock."""
+        self._inflight = request
+        request.dispatched_at = self.clock.time()
+        # Counted before the worker exists, so complete() never sees an uncounted request
+        self.stats["dispatched"] += 1
+
+    def _take_pending(self) -> Optional[LMMRequest]:
+        """Reserves the slot for the pending request, if any. Caller holds the lock and has freed the slot."""
+        next_request = None if self._closed else self._pending
+        self._pending = None
+        if next_request is not None:
+            self._reserve(next_request)
+            if self.logger:
+                self.logger.log_debug(f"Dispatching coalesced LMM request: {next_request}")
+        return next_request
+
+    def _start(self, request: LMMRequest) -> bool:
+        """Dispatches the reserved `request`. Called without the lock held."""
+        try:
+            started = self._dispatch(request)
+        except Exception as e:
+            if self.logger: self.logger.log_error(f"LMM dispatch failed: {e}")
+            started = False
+        if not started:
+            self._abandon(request)
+        return bool(started)
+
+    def _abandon(self, request: LMMRequest) -> None:
+        """Nothing was sent for `request`: frees its slot and starts whatever was queued meanwhile."""
+        with self._lock:
+            self.stats["dispatched"] -= 1
+            if self._draining is request:
+                self._draining = None
+                return
+            if self._inflight is not request:
+                return
+            self._inflight = None
+            next_request = self._take_pending()
+        if next_request is not None:
+            self._start(next_request)
+
+    def complete(self, request: LMMRequest) -> None:
+        """Called by the worker when `request` finished (successfully or not)."""
+        with self._lock:
+            if self._draining is request:
+                self._draining = None
+                return
+            if self._inflight is not request:
+                return
+            self._inflight = None
+            next_request = self._take_pending()
+        if next_request is not None:
+            self._start(next_request)
+
+    def drop_pending(self) -> None:
+        with self._lock:
+            self._pending = None
+
+    def shutdown(self) -> None:
+        """Stops dispatching; pending requests are dropped."""
+        with self._lock:
+            self._closed = True
+            self._pending = None
+
+    def has_reason(self, reason: str) -> bool:
+        """Whether the in-flight or pending request already carries `reason`."""
+        with self._lock:
+            return any(request is not None and reason in request.reasons for request in (self._inflight, self._pending))
+
+    def is_busy(self) -> bool:
+        with self._lock:
+            return self._inflight is not None
+
+    @property
+    def pending(self) -> Optional[LMMRequest]:
+        return self._pending
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
@@ -0,0 +1,123 @@
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class IncrementalJSONObjectParser:
+    """
+    Parses one top-level JSON object from text that arrives in arbitrary chunks.
+
+    Each top-level field is reported as soon as its value is closed, so
+    `state_estimation` is usable while the model is still generating the rest.
+    Leading prose, markdown fences and `<think>...</think>` blocks before the
+    opening brace are skipped. Values are decoded with `json.loads` once closed;
+    only the bracket/string structure is tracked while streaming.
+    """
+
+    def __init__(self) -> None:
+        self.buffer: str = ""
+        self.fields: Dict[str, Any] = {}
+        self.complete: bool = False
+        self._pos: int = 0            # Next buffer index to scan
+        self._started: bool = False   # Opening brace seen
+        self._depth: int = 0
+        self._in_string: bool = False
+        self._escape: bool = False
+        self._expect_key: bool = False
+        self._key_start: int = -1
+        self._key: Optional[str] = None
+        self._value_start: int = -1
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Adds a chunk; returns the (key, value) fields completed by it, in order."""
+        self.buffer += text
+        completed: List[Tuple[str, Any]] = []
+        if self.complete:
+            return completed
+        if not self._started and not self._find_start():
+            return completed
+
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start >= 0:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = -1
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._close_value(buf, i, completed)
+                    self.complete = True
+                    i += 1
+                    break
+            elif ch == ":" and self._depth == 1 and self._key is not None and self._value_start < 0:
+                self._value_start = i + 1
+            elif ch == "," and self._depth == 1:
+                self._close_value(buf, i, completed)
+                self._expect_key = True
+            i += 1
+        self._pos = i
+        return completed
+
+    def _find_start(self) -> bool:
+        buf = self.buffer
+        start = 0
+        think = buf.find("<think>")
+        brace = buf.find("{")
+        if think >= 0 and (brace < 0 or think < brace):
+            end = buf.find("</think>", think)
+            if end < 0:
+                return False  # Still reasoning
+            start = end + len("</think>")
+        brace = buf.find("{", start)
+        if brace < 0:
+            return False
+        self._started = True
+        self._depth = 1
+        self._expect_key = True
+        self._pos = brace + 1
+        return True
+
+    def _close_value(self, buf: str, end: int, completed: List[Tuple[str, Any]]) -> None:
+        if self._key is not None and self._value_start >= 0:
+            value = json.loads(buf[self._value_start:end])
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
+        self._value_start = -1
+
+
+def iter_sse_content(lines: Iterable[Any]) -> Iterator[str]:
+    """
+    Yields the content deltas of an OpenAI-compatible chat completion stream
+    (`data: {...}` server-sent events, terminated by `data: [DONE]`).
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        event = json.loads(data)
+        choices = event.get("choices") or []
+        if not choices:
+            continue
+        content = (choices[0].get("delta") or {}).get("content")
+        if content:
+            yield content
@@ -0,0 +1,137 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator
+
+import config
+
+# Workload classes of LMMInterface calls
+WORKLOAD_STATE = "state_estimation"   # process_data: analyses that drive state and interventions
+WORKLOAD_POSE = "pose_suggestion"     # generate_pose_suggestion: the user is waiting for it
+WORKLOAD_SUMMARY = "history_summary"  # summarize_history: background, text only
+WORKLOAD_CAPTION = "caption"          # generate_caption: background drafts
+
+# priority: higher is admitted first. max_concurrent: requests of the class on the server at once.
+# yields: wait while a higher-priority class has a request in flight (up to LMM_WORKLOAD_MAX_DEFER).
+WORKLOAD_CLASSES: Dict[str, Dict[str, Any]] = {
+    WORKLOAD_STATE: {"priority": 3, "max_concurrent": 2, "yields": False},  # 2: a preempted call may still drain
+    WORKLOAD_POSE: {"priority": 2, "max_concurrent": 1, "yields": False},
+    WORKLOAD_SUMMARY: {"priority": 1, "max_concurrent": 1, "yields": True},
+    WORKLOAD_CAPTION: {"priority": 0, "max_concurrent": 1, "yields": True},
+}
+
+
+class WorkloadGate:
+    """
+    Admission control for the different kinds of LMM calls sharing one inference server.
+
+    A call takes a slot of its class (`slot`) for as long as it talks to the server. It
+    is admitted when its class is below `max_concurrent` and no higher-priority call is
+    waiting. Classes that yield (background captions and summaries) also wait while a
+    higher-priority call is in flight, so a burst of capture drafts never queues on the
+    server ahead of a state estimation. Deferred calls then run one after another in the
+    gaps between analyses. A call that has been deferred for `max_defer` seconds is
+    admitted anyway, so background work cannot starve.
+
+    Per class, `get_stats` reports requests, deferrals, queue wait and service time.
+    """
+
+    def __init__(self, classes: Optional[Dict[str, Dict[str, Any]]] = None, max_defer: Optional[float] = None) -> None:
+        self.classes: Dict[str, Dict[str, Any]] = {name: dict(spec) for name, spec in WORKLOAD_CLASSES.items()}
+        for name, spec in (classes if classes is not None else getattr(config, 'LMM_WORKLOAD_CLASSES', {}) or {}).items():
+            self.classes.setdefault(name, {"priority": 0, "max_concurrent": 1, "yields": True}).update(spec)
+        self.max_defer: float = max_defer if max_defer is not None else getattr(config, 'LMM_WORKLOAD_MAX_DEFER', 30.0)
+        self._cond: threading.Condition = threading.Condition()
+        self._in_flight: Dict[str, int] = {name: 0 for name in self.classes}
+        self._waiting: Dict[str, int] = {name: 0 for name in self.classes}
+        self._stats: Dict[str, Dict[str, float]] = {
+            name: {"requests": 0, "deferred": 0, "forced": 0, "wait_total": 0.0, "wait_max": 0.0, "service_total": 0.0}
+            for name in self.classes
+        }
+
+    def _spec(self, workload: str) -> Dict[str, Any]:
+        if workload not in self.classes:
+            raise ValueError(f"Unknown LMM workload class: {workload}")
+        return self.classes[workload]
+
+    def _blocker(self, workload: str) -> Optional[str]:
+        """Why `workload` cannot be admitted now ("limit", "queued", "yield"), or None."""
+        spec = self.classes[workload]
+        if self._in_flight[workload] >= spec["max_concurrent"]:
+            return "limit"
+        higher = [name for name, other in self.classes.items() if other["priority"] > spec["priority"]]
+        if any(self._waiting[name] for name in higher):
+            return "queued"
+        if spec["yields"] and any(self._in_flight[name] for name in higher):
+            return "yield"
+        return None
+
+    def acquire(self, workload: str, cancel_event: Optional[threading.Event] = None) -> bool:
+        """Blocks until `workload` may send a request. Returns False if `cancel_event` was set first."""
+        self._spec(workload)
+        start = time.monotonic()
+        deferred = False
+        with self._cond:
+            self._waiting[workload] += 1
+            try:
+                while True:
+                    blocker = self._blocker(workload)
+                    waited = time.monotonic() - start
+                    if blocker is None:
+                        break
+                    if blocker != "limit" and waited >= self.max_defer:
+                        self._stats[workload]["forced"] += 1
+                        break
+                    if cancel_event is not None and cancel_event.is_set():
+                        return False
+                    deferred = deferred or blocker == "yield"
+                    # Releases notify; the timeout only bounds cancellation and max_defer checks
+                    self._cond.wait(timeout=0.5 if blocker == "limit" else min(0.5, max(0.01, self.max_defer - waited)))
+                self._in_flight[workload] += 1
+            finally:
+                self._waiting[workload] -= 1
+                self._cond.notify_all()
+            stats = self._stats[workload]
+            stats["requests"] += 1
+            stats["deferred"] += int(deferred)
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+        return True
+
+    def release(self, workload: str, service_time: float = 0.0) -> None:
+        with self._cond:
+            self._in_flight[workload] = max(0, self._in_flight[workload] - 1)
+            self._stats[workload]["service_total"] += service_time
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, workload: str, cancel_event: Optional[threading.Event] = None) -> Iterator[bool]:
+        """`with gate.slot(...) as admitted:` holds a slot for the body; admitted is False if cancelled while waiting."""
+        if not self.acquire(workload, cancel_event):
+            yield False
+            return
+        start = time.monotonic()
+        try:
+            yield True
+        finally:
+            self.release(workload, time.monotonic() - start)
+
+    def in_flight(self, workload: str) -> int:
+        with self._cond:
+            return self._in_flight[workload]
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per class: requests, deferred, forced (admitted after max_defer), mean/max queue wait and mean service time."""
+        with self._cond:
+            report = {}
+            for name, stats in self._stats.items():
+                n = stats["requests"]
+                report[name] = {
+                    "requests": int(n),
+                    "deferred": int(stats["deferred"]),
+                    "forced": int(stats["forced"]),
+                    "mean_wait_s": round(stats["wait_total"] / n, 3) if n else 0.0,
+                    "max_wait_s": round(stats["wait_max"], 3),
+                    "mean_service_s": round(stats["service_total"] / n, 3) if n else 0.0,
+                }
+            return report
@@ -1,27 +1,46 @@
-import time
 import config
+import math
 import threading
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, Dict
 from collections import deque
 import numpy as np
 import cv2
 import base64
 from .data_logger import DataLogger
 from .lmm_interface import LMMInterface
+from .lmm_health import LMMHealthManager
+from .clock import Clock, SYSTEM_CLOCK
+from .lmm_scheduler import LMMScheduler, LMMRequest
 from .intervention_engine import InterventionEngine
 from .state_engine import StateEngine
+from .sensor_snapshot import SensorSnapshot
+from .metric_store import MetricStore, posture_code
+from .trigger_rules import TriggerRuleEngine
+from .history_segments import HistorySegmenter
+from .frame_montage import FrameMontage
+from .state_predictor import StatePredictor
+from .novelty_gate import NoveltyGate, fingerprint
+from .prompt_builder import describe_segment
 from .stt_interface import STTInterface
 from .music_interface import MusicInterface
 
 
 class LogicEngine:
-    def __init__(self, audio_sensor: Optional[Any] = None, video_sensor: Optional[Any] = None, window_sensor: Optional[Any] = None, logger: Optional[DataLogger] = None, lmm_interface: Optional[LMMInterface] = None) -> None:
+    def __init__(self, audio_sensor: Optional[Any] = None, video_sensor: Optional[Any] = None, window_sensor: Optional[Any] = None, logger: Optional[DataLogger] = None, lmm_interface: Optional[LMMInterface] = None, clock: Optional[Clock] = None) -> None:
+        # All timing (cooldowns, snooze, probation, circuit breaker) goes through this clock;
+        # pass a core.clock.VirtualClock to replay scenarios deterministically.
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
         self.current_mode: str = config.DEFAULT_MODE
         self.snooze_end_time: float = 0
         self.previous_mode_before_pause: str = config.DEFAULT_MODE
         self.tray_callback: Optional[Callable[[str, Optional[str]], None]] = None
         self.state_update_callback: Optional[Callable[[dict], None]] = None
         self.notification_callback: Optional[Callable[[str, str], None]] = None
+        # Called with the LMM circuit state ("closed", "open", "half_open") when it changes
+        self.lmm_health_callback: Optional[Callable[[str], None]] = None
+        # Called with an event source name whenever the main loop should re-evaluate
+        # (LMM completion, user input, mode change). See core/event_scheduler.py.
+        self.wake_callback: Optional[Callable[[str], None]] = None
         self.audio_sensor: Optional[Any] = audio_sensor
         self.video_sensor: Optional[Any] = video_sensor
         self.window_sensor: Optional[Any] = window_sensor
@@ -29,28 +48,65 @@ class LogicEngine:
         self.lmm_interface: Optional[LMMInterface] = lmm_interface
         self.intervention_engine: Optional[InterventionEngine] = None
         self.state_engine: StateEngine = StateEngine(logger=self.logger)
+        # Guards mode state only (current_mode, snooze, pause). Sensor data is published
+        # as immutable snapshots and read without locking.
         self._lock: threading.Lock = threading.Lock()
 
         # Async LMM handling
         self.lmm_thread: Optional[threading.Thread] = None
+        # Optional asyncio runtime (core/async_runtime.py). When set, LMM analyses run as
+        # cancellable tasks; lmm_thread then holds a thread-like task handle.
+        self.task_runner: Optional[Any] = None
+        # Coalesces/prioritises triggers so urgent ones are not dropped while a call is in flight
+        self.lmm_scheduler: LMMScheduler = LMMScheduler(self._dispatch_lmm_request, logger=self.logger, clock=self.clock)
 
-        # Sensor data storage
-        self.last_video_frame: Optional[np.ndarray] = None
-        self.previous_video_frame: Optional[np.ndarray] = None
-        self.last_audio_chunk: Optional[np.ndarray] = None
+        # Sensor data and metrics: latest frame/chunk plus derived metrics, swapped by
+        # reference (see core/sensor_snapshot.py). Writers serialize on _snapshot_write_lock
+        # only for the swap itself; readers just take self._snapshot.
+        self._snapshot: SensorSnapshot = SensorSnapshot(timestamp=self.clock.time())
+        self._snapshot_write_lock: threading.Lock = threading.Lock()
+        # Per-tick metric time series with 1s/10s/60s rollups for windowed queries
+        self.metric_store: MetricStore = MetricStore()
 
-        # Sensor metrics
-        self.audio_level: float = 0.0
-        self.video_activity: float = 0.0
-        self.face_metrics: dict = {"face_detected": False, "face_count": 0}
-        self.video_analysis: dict = {}
-        self.audio_analysis: dict = {}
+        # Recent downscaled frames tiled into one image per LMM call (LMM_MONTAGE_FRAMES > 1)
+        self.frame_montage: FrameMontage = FrameMontage()
+
+        # Declarative trigger rules (config TRIGGER_RULES) evaluated over the metric store
+        self.trigger_rules: TriggerRuleEngine = TriggerRuleEngine(getattr(config, 'TRIGGER_RULES', []), self.metric_store, logger=self.logger)
+        for rule in self.trigger_rules.rules:
+            self.lmm_scheduler.reason_priorities[rule.name] = rule.priority
 
 
         # LMM trigger logic
+        # Set when a request actually starts (see _dispatch_lmm_request), not when it is submitted
         self.last_lmm_call_time: float = 0
         self.lmm_call_interval: int = 5  # Periodic check interval (seconds)
-        self.min_lmm_interval: int = 2   # Minimum time between calls even for triggers (seconds)
+        self.min_lmm_interval: int = 2   # Minimum time between submissions of the same trigger reason (seconds)
+        self.last_lmm_trigger_times: Dict[str, float] = {}
+        # Startup warm-up (start_lmm_warm_up); periodic checks wait for it, and its measured
+        # latency may lengthen lmm_call_interval
+        self._lmm_warm_up_thread: Optional[threading.Thread] = None
+        self.lmm_warm_up_result: Optional[dict] = None
+
+        # Local sensor-to-state model (tools/train_state_predictor.py). While it is confident
+        # and agrees with the last LMM state, it stands in for periodic LMM checks.
+        self.state_predictor: Optional[StatePredictor] = None
+        if getattr(config, 'STATE_PREDICTOR_ENABLED', False):
+            try:
+                self.state_predictor = StatePredictor.load(config.STATE_PREDICTOR_FILE)
+            except Exception as e:
+                self.logger.log_warning(f"Could not load state predictor: {e}")
+            if self.state_predictor is None:
+                self.logger.log_info("No usable state predictor found; run tools/train_state_predictor.py to train one.")
+        self.predicted_state: Optional[dict] = None
+        self.prediction_confidence: float = 0.0
+        self.last_prediction_time: float = 0
+        self.last_skipped_check_time: float = 0  # Last periodic check answered without the LMM (predictor or novelty gate)
+        self.last_lmm_state: Optional[dict] = None
+        self.local_check_stats: dict = {"predictions": 0, "state_updates": 0, "skipped_periodic_checks": 0}
+
+        # Periodic checks are only sent when the scene changed since the last analysis (LMM_NOVELTY_THRESHOLD > 0)
+        self.novelty_gate: NoveltyGate = NoveltyGate()
 
         # Thresholds
         # Thresholds (loaded from config)
@@ -66,16 +122,22 @@ class LogicEngine:
         self.recovery_probation_end_time: float = 0
         self.recovery_probation_duration: int = 10 # seconds
 
-        # LMM Circuit Breaker
-        self.lmm_consecutive_failures: int = 0
-        self.lmm_circuit_breaker_open_until: float = 0
+        # LMM Circuit Breaker: the interface's health manager, so both see the same state.
+        # Interfaces without one (fakes, replay mocks) get a breaker of our own.
+        health = getattr(lmm_interface, 'health', None)
+        if isinstance(health, LMMHealthManager):
+            self.lmm_health: LMMHealthManager = health
+        else:
+            self.lmm_health = LMMHealthManager(clock=self.clock, max_failures=config.LMM_CIRCUIT_BREAKER_MAX_FAILURES,
+                                               cooldown=config.LMM_CIRCUIT_BREAKER_COOLDOWN, data_logger=self.logger)
+        self.lmm_health.add_listener(self._on_lmm_health_change)
 
         # Offline Fallback
         self.last_offline_trigger_time: float = 0
         self.offline_trigger_interval: int = 30 # Seconds between offline interventions
 
         # Meeting Mode Heuristics
-        self.last_user_input_time: float = time.time()
+        self.last_user_input_time: float = self.clock.time()
         self.input_tracking_enabled: bool = False
         self.continuous_speech_start_time: float = 0
         self.auto_dnd_active: bool = False
@@ -88,9 +150,96 @@ class LogicEngine:
         # Context History (User Narrative)
         self.context_history: deque = deque(maxlen=getattr(config, 'HISTORY_WINDOW_SIZE', 5))
         self.last_history_sample_time: float = 0
+        # Snapshots leaving context_history are folded into run-length segments (bounded count)
+        self.history_segmenter: HistorySegmenter = HistorySegmenter()
+        # Optional background LMM narrative over those segments (0 = disabled)
+        self.history_narrative_interval: float = getattr(config, 'HISTORY_NARRATIVE_INTERVAL', 0)
+        self.last_history_narrative_time: float = 0
+        self._history_narrative_version: int = -1
+        self._history_narrative_thread: Optional[threading.Thread] = None
 
         self.logger.log_info(f"LogicEngine initialized. Mode: {self.current_mode}")
 
+    # --- Sensor snapshot ---
+
+    @property
+    def sensor_snapshot(self) -> SensorSnapshot:
+        """The latest published sensor snapshot (immutable, safe to read without locking)."""
+        return self._snapshot
+
+    def is_face_detected(self) -> bool:
+        """Lock-free check used by the video worker to pick its polling rate."""
+        return bool(self._snapshot.face_metrics.get("face_detected", False))
+
+    def _publish_snapshot(self, **changes: Any) -> SensorSnapshot:
+        with self._snapshot_write_lock:
+            self._snapshot = self._snapshot.replace(timestamp=self.clock.time(), **changes)
+            return self._snapshot
+
+    @property
+    def last_video_frame(self) -> Optional[np.ndarray]:
+        return self._snapshot.video_frame
+
+    @last_video_frame.setter
+    def last_video_frame(self, value: Optional[np.ndarray]) -> None:
+        self._publish_snapshot(video_frame=value)
+
+    @property
+    def previous_video_frame(self) -> Optional[np.ndarray]:
+        return self._snapshot.previous_video_frame
+
+    @previous_video_frame.setter
+    def previous_video_frame(self, value: Optional[np.ndarray]) -> None:
+        self._publish_snapshot(previous_video_frame=value)
+
+    @property
+    def last_audio_chunk(self) -> Optional[np.ndarray]:
+        return self._snapshot.audio_chunk
+
+    @last_audio_chunk.setter
+    def last_audio_chunk(self, value: Optional[np.ndarray]) -> None:
+        self._publish_snapshot(audio_chunk=value)
+
+    @property
+    def audio_level(self) -> float:
+        return self._snapshot.audio_level
+
+    @audio_level.setter
+    def audio_level(self, value: float) -> None:
+        self._publish_snapshot(audio_level=value)
+
+    @property
+    def video_activity(self) -> float:
+        return self._snapshot.video_activity
+
+    @video_activity.setter
+    def video_activity(self, value: float) -> None:
+        self._publish_snapshot(video_activity=value)
+
+    @property
+    def face_metrics(self) -> dict:
+        return self._snapshot.face_metrics
+
+    @face_metrics.setter
+    def face_metrics(self, value: dict) -> None:
+        self._publish_snapshot(face_metrics=value)
+
+    @property
+    def video_analysis(self) -> dict:
+        return self._snapshot.video_analysis
+
+    @video_analysis.setter
+    def video_analysis(self, value: dict) -> None:
+        self._publish_snapshot(video_analysis=value)
+
+    @property
+    def audio_analysis(self) -> dict:
+        return self._snapshot.audio_analysis
+
+    @audio_analysis.setter
+    def audio_analysis(self, value: dict) -> None:
+        self._publish_snapshot(audio_analysis=value)
+
     def get_mode(self) -> str:
         with self._lock:
             return self.current_mode
@@ -128,13 +277,13 @@ class LogicEngine:
 
         if mode == "active" and old_mode == "error":
              self.logger.log_info("Entered active mode from error. Starting probation period.")
-             self.recovery_probation_end_time = time.time() + self.recovery_probation_duration
+             self.recovery_probation_end_time = self.clock.time() + self.recovery_probation_duration
              # Do not reset attempts yet.
 
         self.current_mode = mode
 
         if self.current_mode == "snoozed":
-            self.snooze_end_time = time.time() + config.SNOOZE_DURATION
+            self.snooze_end_time = self.clock.time() + config.SNOOZE_DURATION
             self.logger.log_info(f"Snooze activated. Will return to active mode in {config.SNOOZE_DURATION / 60:.0f} minutes.")
         elif self.current_mode == "active":
             self.snooze_end_time = 0
@@ -156,7 +305,7 @@ class LogicEngine:
             current_actual_mode = self.current_mode
             if current_actual_mode == "paused":
                 if self.previous_mode_before_pause == "snoozed" and \
-                   self.snooze_end_time != 0 and time.time() >= self.snooze_end_time:
+                   self.snooze_end_time != 0 and self.clock.time() >= self.snooze_end_time:
                     self.snooze_end_time = 0
                     self._set_mode_unlocked("active")
                 else:
@@ -174,255 +323,453 @@ class LogicEngine:
         Updates the last input timestamp and enables tracking.
         """
         # Updates are atomic enough for our resolution
-        self.last_user_input_time = time.time()
+        self.last_user_input_time = self.clock.time()
         self.input_tracking_enabled = True
+        # Auto-DND exit reacts to input, so the main loop must re-evaluate now
+        if self.auto_dnd_active:
+            self._wake("user_input")
+
+    @property
+    def lmm_consecutive_failures(self) -> int:
+        return self.lmm_health.consecutive_failures
+
+    @lmm_consecutive_failures.setter
+    def lmm_consecutive_failures(self, value: int) -> None:
+        self.lmm_health.consecutive_failures = value
+
+    @property
+    def lmm_circuit_breaker_open_until(self) -> float:
+        return self.lmm_health.open_until
+
+    @lmm_circuit_breaker_open_until.setter
+    def lmm_circuit_breaker_open_until(self, value: float) -> None:
+        if value > 0:
+            self.lmm_health.force_open(value)
+        else:
+            self.lmm_health.reset()
+
+    def _interface_tracks_health(self) -> bool:
+        """True when the LMM interface records its own outcomes in our health manager."""
+        return getattr(self.lmm_interface, 'health', None) is self.lmm_health
+
+    def _record_lmm_failure(self) -> None:
+        if not self._interface_tracks_health():
+            self.lmm_health.record_failure()
+
+    def _on_lmm_health_change(self, state: str, stats: dict) -> None:
+        self.logger.log_event("lmm_health", stats)
+        if state != "closed":
+            self.logger.log_warning(f"LMM circuit {state} (consecutive failures: {stats['consecutive_failures']}).")
+        if self.lmm_health_callback:
+            try:
+                self.lmm_health_callback(state)
+            except Exception as e:
+                self.logger.log_debug(f"LMM health callback failed: {e}")
+        # The circuit's reopening time is one of the main loop's deadlines
+        self._wake("lmm_health")
+
+    def _wake(self, source: str) -> None:
+        """Signals the main loop (if event-driven) that update() should run."""
+        if self.wake_callback:
+            try:
+                self.wake_callback(source)
+            except Exception as e:
+                self.logger.log_debug(f"Wake callback failed: {e}")
 
     def _notify_mode_change(self, old_mode: str, new_mode: str, from_snooze_expiry: bool = False) -> None:
         self.logger.log_info(f"LogicEngine Notification: Mode changed from {old_mode} to {new_mode}{' (due to snooze expiry)' if from_snooze_expiry else ''}")
         if self.tray_callback:
             self.tray_callback(new_mode=new_mode, old_mode=old_mode)
+        self._wake("mode_change")
 
     def process_video_data(self, frame: np.ndarray) -> None:
-        with self._lock:
-            self.previous_video_frame = self.last_video_frame
-            self.last_video_frame = frame
+        # Analysis (face detection etc.) runs without any lock held; the result is
+        # published in one reference swap.
+        previous_frame = self._snapshot.video_frame
+        face_metrics = {"face_detected": False, "face_count": 0}
+        video_analysis = {}
+
+        # Use VideoSensor's unified processing if available
+        if self.video_sensor and hasattr(self.video_sensor, 'process_frame'):
+            metrics = self.video_sensor.process_frame(frame)
+            video_activity = metrics.get("video_activity", 0.0)
+
+            # Filter out non-face metrics for face_metrics dict
+            face_metrics = {k: v for k, v in metrics.items() if k.startswith("face_")}
+
+            # Prepare video analysis context for LMM
+            # We want face metrics plus other relevant high-level signals
+            video_analysis = face_metrics.copy()
+            additional_keys = ["posture_state", "vertical_position", "horizontal_position", "normalized_activity"]
+            for k in additional_keys:
+                if k in metrics:
+                    video_analysis[k] = metrics[k]
+
+        else:
+            # Fallback to legacy calculation (if sensor doesn't have process_frame or is missing)
+            video_activity = 0.0
+            if previous_frame is not None and frame is not None:
+                # Ensure shapes match before diffing
+                if previous_frame.shape == frame.shape:
+                    diff = cv2.absdiff(previous_frame, frame)
+                    gray_diff = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
+                    video_activity = np.mean(gray_diff)
+
+        self.metric_store.record(
+            timestamp=self.clock.time(),
+            video_activity=video_activity,
+            face_detected=face_metrics.get("face_detected", False),
+            face_count=face_metrics.get("face_count", 0),
+            face_size_ratio=video_analysis.get("face_size_ratio"),
+            vertical_position=video_analysis.get("vertical_position"),
+            posture=posture_code(video_analysis.get("posture_state")) if face_metrics.get("face_detected") else None,
+        )
 
-            # Use VideoSensor's unified processing if available
-            if self.video_sensor and hasattr(self.video_sensor, 'process_frame'):
-                metrics = self.video_sensor.process_frame(frame)
-                self.video_activity = metrics.get("video_activity", 0.0)
+        self.frame_montage.add(
+            frame, self.clock.time(), video_activity,
+            face_detected=face_metrics.get("face_detected", False),
+            face_count=face_metrics.get("face_count", 0),
+            posture=video_analysis.get("posture_state"),
+        )
 
-                # Filter out non-face metrics for face_metrics dict
-                self.face_metrics = {k: v for k, v in metrics.items() if k.startswith("face_")}
+        snapshot = self._publish_snapshot(
+            previous_video_frame=previous_frame,
+            video_frame=frame,
+            video_activity=video_activity,
+            face_metrics=face_metrics,
+            video_analysis=video_analysis,
+        )
 
-                # Prepare video analysis context for LMM
-                # We want face metrics plus other relevant high-level signals
-                self.video_analysis = self.face_metrics.copy()
-                additional_keys = ["posture_state", "vertical_position", "horizontal_position", "normalized_activity"]
-                for k in additional_keys:
-                    if k in metrics:
-                        self.video_analysis[k] = metrics[k]
+        self.logger.log_debug(f"Processed video frame. Activity: {snapshot.video_activity:.2f}, Face: {snapshot.face_metrics.get('face_detected')}")
 
+    def process_audio_data(self, audio_chunk: np.ndarray) -> None:
+        # Use AudioSensor analysis if available
+        if self.audio_sensor and hasattr(self.audio_sensor, 'analyze_chunk'):
+            audio_analysis = self.audio_sensor.analyze_chunk(audio_chunk)
+            audio_level = audio_analysis.get('rms', 0.0)
+        else:
+            # Fallback calculation
+            if len(audio_chunk) > 0:
+                audio_level = np.sqrt(np.mean(audio_chunk**2))
             else:
-                # Fallback to legacy calculation (if sensor doesn't have process_frame or is missing)
-                if self.previous_video_frame is not None and self.last_video_frame is not None:
-                    # Ensure shapes match before diffing
-                    if self.previous_video_frame.shape == self.last_video_frame.shape:
-                        diff = cv2.absdiff(self.previous_video_frame, self.last_video_frame)
-                        gray_diff = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
-                        self.video_activity = np.mean(gray_diff)
-                    else:
-                        self.video_activity = 0.0
-                else:
-                    self.video_activity = 0.0
-
-                self.face_metrics = {"face_detected": False, "face_count": 0}
-                self.video_analysis = {}
+                audio_level = 0.0
+            audio_analysis = {"rms": audio_level}
+
+        self.metric_store.record(
+            timestamp=self.clock.time(),
+            audio_rms=audio_level,
+            is_speech=audio_analysis.get("is_speech"),
+            speech_confidence=audio_analysis.get("speech_confidence"),
+        )
 
-        self.logger.log_debug(f"Processed video frame. Activity: {self.video_activity:.2f}, Face: {self.face_metrics.get('face_detected')}")
+        snapshot = self._publish_snapshot(audio_chunk=audio_chunk, audio_level=audio_level, audio_analysis=audio_analysis)
 
-    def process_audio_data(self, audio_chunk: np.ndarray) -> None:
-        with self._lock:
-            self.last_audio_chunk = audio_chunk
+        self.logger.log_debug(f"Processed audio chunk. Level: {snapshot.audio_level:.4f}")
 
-            # Use AudioSensor analysis if available
-            if self.audio_sensor and hasattr(self.audio_sensor, 'analyze_chunk'):
-                self.audio_analysis = self.audio_sensor.analyze_chunk(audio_chunk)
-                self.audio_level = self.audio_analysis.get('rms', 0.0)
-            else:
-                # Fallback calculation
-                if len(audio_chunk) > 0:
-                    self.audio_level = np.sqrt(np.mean(audio_chunk**2))
-                else:
-                    self.audio_level = 0.0
-                self.audio_analysis = {"rms": self.audio_level}
+    def _sensor_metrics(self, snapshot: SensorSnapshot) -> dict:
+        """Per-call sensor metrics sent to the LMM (and fed to the local state predictor)."""
+        return {
+            "audio_level": float(snapshot.audio_level),
+            "video_activity": float(snapshot.video_activity),
+            "face_detected": bool(snapshot.face_metrics.get("face_detected", False)),
+            "face_count": int(snapshot.face_metrics.get("face_count", 0)),
+            "video_analysis": snapshot.video_analysis,
+            "audio_analysis": snapshot.audio_analysis,
+            "trends": self.metric_store.summary(getattr(config, 'METRIC_TREND_WINDOW', 60), now=self.clock.time())
+        }
 
-        self.logger.log_debug(f"Processed audio chunk. Level: {self.audio_level:.4f}")
+    def _update_predicted_state(self, now: float) -> None:
+        """
+        Runs the local predictor every STATE_PREDICTOR_INTERVAL seconds. Confident
+        predictions are applied to the StateEngine (smoothed like LMM estimates) so the
+        state stays fresh between LMM calls.
+        """
+        if self.state_predictor is None or now - self.last_prediction_time < getattr(config, 'STATE_PREDICTOR_INTERVAL', 5.0):
+            return
+        self.last_prediction_time = now
+        try:
+            self.predicted_state, self.prediction_confidence = self.state_predictor.predict(self._sensor_metrics(self._snapshot))
+        except Exception as e:
+            self.logger.log_warning(f"State prediction failed: {e}")
+            self.predicted_state, self.prediction_confidence = None, 0.0
+            return
+        self.local_check_stats["predictions"] += 1
+        if self.prediction_confidence >= getattr(config, 'STATE_PREDICTOR_MIN_CONFIDENCE', 0.8):
+            self.state_engine.update({"state_estimation": self.predicted_state})
+            self.local_check_stats["state_updates"] += 1
+            if self.state_update_callback:
+                self.state_update_callback(self.state_engine.get_state())
+
+    def _prediction_covers_periodic_check(self, now: float) -> bool:
+        """
+        True when a periodic LMM check would most likely only confirm what the predictor
+        says: it is confident, agrees with the last LMM state within
+        STATE_PREDICTOR_MAX_DEVIATION points on every dimension, and the LMM was asked
+        less than STATE_PREDICTOR_MAX_SKIP seconds ago (so the camera is still looked at).
+        """
+        if self.state_predictor is None or self.predicted_state is None or self.last_lmm_state is None:
+            return False
+        if self.prediction_confidence < getattr(config, 'STATE_PREDICTOR_MIN_CONFIDENCE', 0.8):
+            return False
+        if now - self.last_lmm_call_time >= getattr(config, 'STATE_PREDICTOR_MAX_SKIP', 60.0):
+            return False
+        max_deviation = getattr(config, 'STATE_PREDICTOR_MAX_DEVIATION', 10)
+        return all(abs(value - self.last_lmm_state.get(dim, value)) <= max_deviation
+                   for dim, value in self.predicted_state.items())
+
+    def _periodic_check_is_novel(self, now: float) -> bool:
+        """Asks the novelty gate whether the current snapshot differs enough from the last analyzed one."""
+        if not self.novelty_gate.enabled:
+            return True
+        active_window = "Unknown"
+        if self.window_sensor:
+            try:
+                active_window = self.window_sensor.get_active_window()
+            except Exception as e:
+                self.logger.log_debug(f"Error fetching active window: {e}")
+        dispatch, reason = self.novelty_gate.check(fingerprint(self._snapshot, active_window), now)
+        if not dispatch:
+            self.logger.log_debug(f"Periodic check skipped: nothing changed (distance {self.novelty_gate.last_distance:.2f} "
+                                  f"< {self.novelty_gate.threshold}).")
+        return dispatch
 
     def _prepare_lmm_data(self, trigger_reason: str = "periodic") -> Optional[dict]:
-        with self._lock:
-            if self.last_video_frame is None and self.last_audio_chunk is None:
-                return None
+        # Lock-free: one consistent sensor snapshot, mode read under the mode lock only.
+        snapshot = self._snapshot
+        current_mode = self.get_mode()
+        history = list(self.context_history)
 
-            video_data_b64 = None
-            if self.last_video_frame is not None:
-                try:
-                    # Compress to reduce payload size
-                    _, buffer = cv2.imencode('.jpg', self.last_video_frame, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
-                    video_data_b64 = base64.b64encode(buffer).decode('utf-8')
-                except Exception as e:
-                     self.logger.log_warning(f"Error encoding video frame: {e}")
-
-            audio_data_list = None
-            if self.last_audio_chunk is not None:
-                # Downsample or limit audio data size if needed for LMM
-                # For now, sending raw list
-                audio_data_list = self.last_audio_chunk.tolist()
-
-            # Note: We are NOT clearing self.last_video_frame here to allow subsequent checks,
-            # but usually we want fresh data.
-            # If we clear it, we might lose context if the LMM call fails and we retry.
-            # However, standard practice here is to send snapshot.
-
-            # Fetch suppressed interventions if available
-            suppressed_list = []
-            preferred_list = []
-            if self.intervention_engine:
-                if hasattr(self.intervention_engine, 'get_suppressed_intervention_types'):
-                    suppressed_list = self.intervention_engine.get_suppressed_intervention_types()
-                if hasattr(self.intervention_engine, 'get_preferred_intervention_types'):
-                    preferred_list = self.intervention_engine.get_preferred_intervention_types()
-
-            # Generate System Alerts based on persistence
-            system_alerts = []
-            if self.context_persistence.get("phone_usage", 0) >= self.doom_scroll_trigger_threshold:
-                 system_alerts.append("Persistent Phone Usage Detected (Potential Doom Scrolling)")
-
-            # Rapid Task Switching logic
-            if len(self.context_history) > 0:
-                unique_windows = len(set(s.get("active_window") for s in self.context_history if s.get("active_window")))
-                threshold = getattr(config, 'RAPID_SWITCHING_THRESHOLD', 4)
-                if unique_windows >= threshold:
-                    system_alerts.append("Rapid Task Switching Detected")
-
-            # Fetch active window
-            active_window = "Unknown"
-            if self.window_sensor:
-                try:
-                    active_window = self.window_sensor.get_active_window()
-                except Exception as e:
-                    self.logger.log_debug(f"Error fetching active window: {e}")
-
-            context = {
-                "current_mode": self.current_mode,
-                "trigger_reason": trigger_reason,
-                "active_window": active_window,
-                "history": list(self.context_history),
-                "sensor_metrics": {
-                    "audio_level": float(self.audio_level),
-                    "video_activity": float(self.video_activity),
-                    "face_detected": bool(self.face_metrics.get("face_detected", False)),
-                    "face_count": int(self.face_metrics.get("face_count", 0)),
-                    "video_analysis": self.video_analysis,
-                    "audio_analysis": self.audio_analysis
-                },
-                "current_state_estimation": self.state_engine.get_state(),
-                "suppressed_interventions": suppressed_list,
-                "system_alerts": system_alerts,
-                "preferred_interventions": preferred_list
-            }
+        if snapshot.video_frame is None and snapshot.audio_chunk is None:
+            return None
 
-            return {
-                "video_data": video_data_b64,
-                "audio_data": audio_data_list,
-                "user_context": context
-            }
+        video_data_b64 = None
+        montage_meta = None
+        if snapshot.video_frame is not None:
+            image = snapshot.video_frame
+            try:
+                # Several recent frames in one image, in place of the single latest frame
+                montage = self.frame_montage.build(self.clock.time())
+                if montage is not None:
+                    image, montage_meta = montage
+            except Exception as e:
+                self.logger.log_warning(f"Error building frame montage: {e}")
+            try:
+                # Compress to reduce payload size
+                _, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
+                video_data_b64 = base64.b64encode(buffer).decode('utf-8')
+            except Exception as e:
+                 self.logger.log_warning(f"Error encoding video frame: {e}")
+
+        audio_data_list = None
+        if snapshot.audio_chunk is not None:
+            # Downsample or limit audio data size if needed for LMM
+            # For now, sending raw list
+            audio_data_list = snapshot.audio_chunk.tolist()
+
+        # Note: We are NOT clearing the last video frame here to allow subsequent checks,
+        # but usually we want fresh data.
+        # If we clear it, we might lose context if the LMM call fails and we retry.
+        # However, standard practice here is to send snapshot.
+
+        # Fetch suppressed interventions if available
+        suppressed_list = []
+        preferred_list = []
+        if self.intervention_engine:
+            if hasattr(self.intervention_engine, 'get_suppressed_intervention_types'):
+                suppressed_list = self.intervention_engine.get_suppressed_intervention_types()
+            if hasattr(self.intervention_engine, 'get_preferred_intervention_types'):
+                preferred_list = self.intervention_engine.get_preferred_intervention_types()
+
+        # Generate System Alerts based on persistence
+        system_alerts = []
+        if self.context_persistence.get("phone_usage", 0) >= self.doom_scroll_trigger_threshold:
+             system_alerts.append("Persistent Phone Usage Detected (Potential Doom Scrolling)")
+
+        # Rapid Task Switching logic
+        if len(history) > 0:
+            unique_windows = len(set(s.get("active_window") for s in history if s.get("active_window")))
+            threshold = getattr(config, 'RAPID_SWITCHING_THRESHOLD', 4)
+            if unique_windows >= threshold:
+                system_alerts.append("Rapid Task Switching Detected")
+
+        # Fetch active window
+        active_window = "Unknown"
+        if self.window_sensor:
+            try:
+                active_window = self.window_sensor.get_active_window()
+            except Exception as e:
+                self.logger.log_debug(f"Error fetching active window: {e}")
+
+        context = {
+            "current_mode": current_mode,
+            "trigger_reason": trigger_reason,
+            "trigger_priority": self.lmm_scheduler.priority_for(trigger_reason),
+            "active_window": active_window,
+            "history": history,
+            "history_segments": self.history_segmenter.segments(),
+            "history_narrative": self.history_segmenter.narrative(),
+            "sensor_metrics": self._sensor_metrics(snapshot),
+            "current_state_estimation": self.state_engine.get_state(),
+            "suppressed_interventions": suppressed_list,
+            "system_alerts": system_alerts,
+            "preferred_interventions": preferred_list
+        }
+        if montage_meta:
+            context["video_montage"] = montage_meta
+
+        return {
+            "video_data": video_data_b64,
+            "audio_data": audio_data_list,
+            "user_context": context
+        }
 
-    def _run_lmm_analysis_async(self, lmm_payload: dict, allow_intervention: bool) -> None:
+    def _run_lmm_analysis_async(self, lmm_payload: dict, allow_intervention: bool,
+                                request: Optional[LMMRequest] = None) -> None:
         """Background worker for LMM analysis."""
         try:
-            analysis = self.lmm_interface.process_data(
-                video_data=lmm_payload["video_data"],
-                audio_data=lmm_payload["audio_data"],
-                user_context=lmm_payload["user_context"]
-            )
-
-            if analysis:
-                # Reset circuit breaker on success (even if it's a fallback, though ideally fallback shouldn't count as 'network success'
-                # but LMMInterface handles that. LMMInterface returns fallback if network failed.
-                # If we get a response, the interface handled it.
-                # If analysis has _meta.is_fallback, it means LMM failed.
-
-                is_fallback = analysis.get("_meta", {}).get("is_fallback", False)
-
-                with self._lock:
-                    if is_fallback:
-                        self.lmm_consecutive_failures += 1
-                        self.logger.log_warning(f"LMM returned fallback response. Consecutive failures: {self.lmm_consecutive_failures}")
-
-                        if self.lmm_consecutive_failures >= config.LMM_CIRCUIT_BREAKER_MAX_FAILURES:
-                             self.lmm_circuit_breaker_open_until = time.time() + config.LMM_CIRCUIT_BREAKER_COOLDOWN
-                             self.logger.log_error(f"LMM Circuit Breaker OPENED. Pausing LMM calls for {config.LMM_CIRCUIT_BREAKER_COOLDOWN}s.")
-                    else:
-                        if self.lmm_consecutive_failures > 0:
-                            self.logger.log_info("LMM recovered. Resetting failure count.")
-                        self.lmm_consecutive_failures = 0
+            analysis = self._request_analysis(lmm_payload, request)
+            if request is not None and request.cancelled.is_set():
+                self.logger.log_info(f"Discarding result of preempted LMM request ({request.reason}).")
+            else:
+                self._handle_lmm_analysis(analysis, allow_intervention)
+        except Exception as e:
+            self._on_lmm_analysis_error(e)
+        finally:
+            self._on_lmm_request_done(request)
 
-                # Check if it was a fallback response
-                if analysis.get("fallback"):
-                     self.logger.log_warning("LMM analysis used fallback mechanism.")
+    def _request_analysis(self, lmm_payload: dict, request: Optional[LMMRequest] = None) -> Optional[dict]:
+        """
+        Blocking LMM call shared by the thread and asyncio paths; streams partial fields when
+        enabled and lets preemption interrupt the request's retries.
+        """
+        kwargs = {}
+        if request is not None and getattr(self.lmm_interface, 'SUPPORTS_CANCELLATION', False) is True:
+            kwargs["cancel_event"] = request.cancelled
+        if getattr(self.lmm_interface, 'streaming', False) is True:
+            kwargs["on_partial"] = lambda key, value: self._handle_partial_analysis(key, value, request)
+        return self.lmm_interface.process_data(
+            video_data=lmm_payload["video_data"],
+            audio_data=lmm_payload["audio_data"],
+            user_context=lmm_payload["user_context"],
+            **kwargs
+        )
 
-                # Update state estimation (StateEngine should be thread-safe or we assume simple updates)
+    def _handle_partial_analysis(self, key: str, value: Any, request: Optional[LMMRequest] = None) -> None:
+        """
+        Applies a field of a streamed LMM result before the rest has been generated.
+        Only state_estimation is acted on early; visual context and the suggestion are
+        handled with the full result (the stream is cut off right after them anyway).
+        """
+        if request is not None and request.cancelled.is_set():
+            return
+        if key != "state_estimation":
+            return
+        self.state_engine.update({"state_estimation": value})
+        self.logger.log_info("Streamed state estimation applied ahead of full LMM result.")
+        if self.state_update_callback:
+            self.state_update_callback(self.state_engine.get_state())
+
+    def _on_lmm_request_done(self, request: Optional[LMMRequest]) -> None:
+        """Releases the scheduler slot (dispatching any coalesced request) and wakes the main loop."""
+        if request is not None:
+            self.lmm_scheduler.complete(request)
+        self._wake("lmm_complete")
+
+    def _on_lmm_analysis_error(self, error: Exception) -> None:
+        self.logger.log_error(f"Error in async LMM analysis: {error}")
+        # The interface raised instead of returning, so it has not recorded this failure
+        self.lmm_health.record_failure()
+
+    def _handle_lmm_analysis(self, analysis: Optional[dict], allow_intervention: bool) -> None:
+        """Applies an LMM result: circuit breaker bookkeeping, state update, interventions."""
+        if analysis:
+            # If analysis has _meta.is_fallback, it means LMM failed. An interface sharing our
+            # health manager has already recorded the outcome; otherwise we record it here.
+            is_fallback = analysis.get("_meta", {}).get("is_fallback", False)
+
+            if is_fallback:
+                self.logger.log_warning(f"LMM returned fallback response. Consecutive failures: {self.lmm_consecutive_failures}")
+                self._record_lmm_failure()
+            elif not self._interface_tracks_health():
+                self.lmm_health.record_success()
+
+            # Check if it was a fallback response
+            if analysis.get("fallback"):
+                 self.logger.log_warning("LMM analysis used fallback mechanism.")
+
+            # Update state estimation (StateEngine should be thread-safe or we assume simple updates)
+            # A streamed state_estimation was already applied by _handle_partial_analysis
+            if "state_estimation" not in (analysis.get("_meta") or {}).get("streamed_fields", []):
                 self.state_engine.update(analysis)
-                self.logger.log_info("LMM analysis complete and state updated.")
-
-                # Process Visual Context
-                reflexive_intervention_id = None
-                visual_context = analysis.get("visual_context", [])
-                triggered_intervention_id = None
-                if visual_context:
-                    self.logger.log_info(f"LMM Detected Visual Context: {visual_context}")
-                    reflexive_intervention_id = self._process_visual_context_triggers(visual_context)
-                    triggered_intervention_id = reflexive_intervention_id
-
-                # Log state update event
-                self.logger.log_event("state_update", self.state_engine.get_state())
-
-                # Update tray tooltip with new state
-                if hasattr(self, 'state_update_callback') and self.state_update_callback:
-                    self.state_update_callback(self.state_engine.get_state())
-
-                # Update music playlist if enabled
-                if getattr(config, 'ENABLE_MUSIC_CONTROL', False) and not is_fallback:
-                    if hasattr(self, 'music_interface') and self.music_interface:
-                        current_state = self.state_engine.get_state()
-                        self.music_interface.play_mood_playlist(
-                            mood=current_state.get('mood', 50),
-                            arousal=current_state.get('arousal', 50),
-                            sexual_arousal=current_state.get('sexual_arousal', 0)
-                        )
-
-            else:
-                 # LogicEngine received None (hard failure in interface even after retries and no fallback?)
-                 # This usually means no fallback was enabled or interface crashed.
-                 with self._lock:
-                     self.lmm_consecutive_failures += 1
-                     if self.lmm_consecutive_failures >= config.LMM_CIRCUIT_BREAKER_MAX_FAILURES:
-                         self.lmm_circuit_breaker_open_until = time.time() + config.LMM_CIRCUIT_BREAKER_COOLDOWN
-                         self.logger.log_error(f"LMM Circuit Breaker OPENED (No Response). Pausing LMM calls for {config.LMM_CIRCUIT_BREAKER_COOLDOWN}s.")
-                 triggered_intervention_id = None # Ensure defined in this scope
-
-
-            if analysis and self.intervention_engine:
-                suggestion = self.lmm_interface.get_intervention_suggestion(analysis)
-
-                # Reflexive triggers take priority over lack of suggestion,
-                # OR can override if needed (policy decision).
-                # For now: if LMM suggests nothing (or None), but we have a reflexive trigger, use it.
-                if not suggestion and reflexive_intervention_id:
-                     self.logger.log_info(f"Reflexive Trigger activated: {reflexive_intervention_id}")
-                     suggestion = {"id": reflexive_intervention_id}
-
-                # Priority: System Triggers > LMM Suggestion
-                final_intervention = None
-
-                if triggered_intervention_id:
-                    final_intervention = {"id": triggered_intervention_id}
-                    self.logger.log_info(f"System Trigger overrides LMM suggestion. Triggered: {triggered_intervention_id}")
-                elif suggestion:
-                    final_intervention = suggestion
-
-                if final_intervention:
-                    if allow_intervention:
-                        self.logger.log_info(f"Starting intervention: {final_intervention}")
-                        # start_intervention is generally thread-safe as it just sets an event/launches another thread
-                        self.intervention_engine.start_intervention(final_intervention)
-                    else:
-                        self.logger.log_info(f"Intervention suggested but suppressed due to mode: {final_intervention}")
-        except Exception as e:
-            self.logger.log_error(f"Error in async LMM analysis: {e}")
-            with self._lock:
-                self.lmm_consecutive_failures += 1
+            self.logger.log_info("LMM analysis complete and state updated.")
+            if not is_fallback:
+                # The raw estimate, not the smoothed StateEngine state, which local predictions also feed
+                raw_state = {dim: value for dim, value in (analysis.get("state_estimation") or {}).items()
+                             if isinstance(value, (int, float)) and not isinstance(value, bool)}
+                self.last_lmm_state = raw_state
+                # A cache hit repeats an earlier answer; logging it again would duplicate a training target
+                if not (analysis.get("_meta") or {}).get("cache_hit"):
+                    self.logger.log_event("lmm_state_estimation", raw_state)
+
+            # Process Visual Context
+            reflexive_intervention_id = None
+            visual_context = analysis.get("visual_context", [])
+            triggered_intervention_id = None
+            if visual_context:
+                self.logger.log_info(f"LMM Detected Visual Context: {visual_context}")
+                reflexive_intervention_id = self._process_visual_context_triggers(visual_context)
+                triggered_intervention_id = reflexive_intervention_id
+
+            # Log state update event
+            self.logger.log_event("state_update", self.state_engine.get_state())
+
+            # Update tray tooltip with new state
+            if hasattr(self, 'state_update_callback') and self.state_update_callback:
+                self.state_update_callback(self.state_engine.get_state())
+
+            # Update music playlist if enabled
+            if getattr(config, 'ENABLE_MUSIC_CONTROL', False) and not is_fallback:
+                if hasattr(self, 'music_interface') and self.music_interface:
+                    current_state = self.state_engine.get_state()
+                    self.music_interface.play_mood_playlist(
+                        mood=current_state.get('mood', 50),
+                        arousal=current_state.get('arousal', 50),
+                        sexual_arousal=current_state.get('sexual_arousal', 0)
+                    )
+
+        else:
+             # LogicEngine received None (hard failure in interface even after retries and no fallback,
+             # or a cancelled request, which a shared health manager does not count).
+             self._record_lmm_failure()
+             triggered_intervention_id = None # Ensure defined in this scope
+
+
+        if analysis and self.intervention_engine:
+            suggestion = self.lmm_interface.get_intervention_suggestion(analysis)
+
+            # Reflexive triggers take priority over lack of suggestion,
+            # OR can override if needed (policy decision).
+            # For now: if LMM suggests nothing (or None), but we have a reflexive trigger, use it.
+            if not suggestion and reflexive_intervention_id:
+                 self.logger.log_info(f"Reflexive Trigger activated: {reflexive_intervention_id}")
+                 suggestion = {"id": reflexive_intervention_id}
+
+            # Priority: System Triggers > LMM Suggestion
+            final_intervention = None
+
+            if triggered_intervention_id:
+                final_intervention = {"id": triggered_intervention_id}
+                self.logger.log_info(f"System Trigger overrides LMM suggestion. Triggered: {triggered_intervention_id}")
+            elif suggestion:
+                final_intervention = suggestion
+
+            if final_intervention:
+                if allow_intervention:
+                    self.logger.log_info(f"Starting intervention: {final_intervention}")
+                    # start_intervention is generally thread-safe as it just sets an event/launches another thread
+                    self.intervention_engine.start_intervention(final_intervention)
+                else:
+                    self.logger.log_info(f"Intervention suggested but suppressed due to mode: {final_intervention}")
 
     def _process_visual_context_triggers(self, visual_context: list) -> Optional[str]:
         """
@@ -502,7 +849,7 @@ class LogicEngine:
         """
         Executes simple heuristic-based interventions when LMM is offline.
         """
-        current_time = time.time()
+        current_time = self.clock.time()
         if current_time - self.last_offline_trigger_time < self.offline_trigger_interval:
             self.logger.log_debug(f"Offline fallback skipped: Cooldown active ({int(self.offline_trigger_interval - (current_time - self.last_offline_trigger_time))}s left).")
             return
@@ -527,42 +874,164 @@ class LogicEngine:
             self.intervention_engine.start_intervention(intervention_payload, category='offline_fallback')
             self.last_offline_trigger_time = current_time
 
+    def _lmm_trigger_ready(self, reason: str, now: float) -> bool:
+        """
+        Whether a trigger for `reason` may be submitted: not while a request carrying it is
+        still pending or in flight, and at most once per min_lmm_interval.
+        """
+        if self.lmm_scheduler.has_reason(reason):
+            return False
+        return now - self.last_lmm_trigger_times.get(reason, float("-inf")) >= self.min_lmm_interval
+
     def _trigger_lmm_analysis(self, reason: str = "unknown", allow_intervention: bool = True) -> None:
         if not self.lmm_interface:
             self.logger.log_warning("LMM interface not available.")
             return
 
         # Check Circuit Breaker
-        with self._lock:
-            if time.time() < self.lmm_circuit_breaker_open_until:
-                 self.logger.log_debug(f"Skipping LMM trigger ({reason}): Circuit breaker is OPEN.")
-                 return
-
-        # Check if previous analysis is still running
-        if self.lmm_thread and self.lmm_thread.is_alive():
-            self.logger.log_info(f"Skipping LMM trigger ({reason}): Previous analysis still running.")
+        if self.lmm_health.is_open():
+            self.logger.log_debug(f"Skipping LMM trigger ({reason}): Circuit breaker is OPEN.")
             return
 
-        lmm_payload = self._prepare_lmm_data(trigger_reason=reason)
+        # The scheduler dispatches now, or coalesces the trigger into the request that
+        # follows the one in flight (preempting it if this trigger is urgent).
+        outcome = self.lmm_scheduler.submit(reason, allow_intervention)
+        if outcome in ("coalesced", "queued"):
+            self.logger.log_info(f"LMM trigger ({reason}) {outcome}: previous analysis still running.")
+
+    def _dispatch_lmm_request(self, request: LMMRequest) -> bool:
+        """
+        Scheduler callback: builds the payload from the *current* sensor snapshot and
+        starts the analysis in the background. Returns False if nothing was sent.
+        """
+        if self.lmm_health.is_open():
+            self.logger.log_debug(f"Dropping LMM request ({request.reason}): Circuit breaker is OPEN.")
+            return False
+
+        lmm_payload = self._prepare_lmm_data(trigger_reason=request.reason)
         if not lmm_payload:
             self.logger.log_debug("No new sensor data to send to LMM.")
-            return
+            return False
+
+        if request.cancelled.is_set():
+            # Preempted while the payload was being built (the scheduler lock is not held here)
+            return False
 
-        self.logger.log_info(f"Triggering LMM analysis (Reason: {reason})...")
+        if self.novelty_gate.enabled:
+            self.novelty_gate.record(fingerprint(self._snapshot, lmm_payload["user_context"].get("active_window")), self.clock.time())
+
+        self.logger.log_info(f"Triggering LMM analysis (Reason: {request.reason})...")
+        # The periodic interval counts from requests that were actually sent
+        self.last_lmm_call_time = self.clock.time()
 
         trigger_payload = {
-            "reason": reason,
+            "reason": request.reason,
+            "priority": request.priority,
+            "coalesced_reasons": request.reasons,
+            "queue_wait": round(request.dispatched_at - request.created_at, 3) if request.dispatched_at else 0.0,
             "metrics": lmm_payload["user_context"].get("sensor_metrics", {})
         }
         self.logger.log_event("lmm_trigger", trigger_payload)
 
-        # Run in background thread to avoid blocking main loop
+        # Run in background to avoid blocking main loop
+        if self.task_runner:
+            self.lmm_thread = self.task_runner.start_lmm_analysis(self, lmm_payload, request.allow_intervention, request)
+            return True
+
         self.lmm_thread = threading.Thread(
             target=self._run_lmm_analysis_async,
-            args=(lmm_payload, allow_intervention),
+            args=(lmm_payload, request.allow_intervention, request),
             daemon=True
         )
         self.lmm_thread.start()
+        return True
+
+    def _maybe_refresh_history_narrative(self, now: float) -> None:
+        """
+        Starts a background LMM summary of the history segments that the current narrative
+        does not cover yet, at most every HISTORY_NARRATIVE_INTERVAL seconds and only while
+        no analysis is in flight, so it never delays an analysis request.
+        """
+        if self.history_narrative_interval <= 0 or not self.lmm_interface:
+            return
+        if now - self.last_history_narrative_time < self.history_narrative_interval:
+            return
+        if self.lmm_scheduler.is_busy() or self.lmm_health.state != "closed":
+            return
+        if self._history_narrative_thread is not None and self._history_narrative_thread.is_alive():
+            return
+        version = self.history_segmenter.version
+        if version == self._history_narrative_version:
+            return
+        narrative = self.history_segmenter.narrative()
+        covered_until = narrative["covered_until"] if narrative else None
+        segments = [segment for segment in self.history_segmenter.segments()
+                    if covered_until is None or segment["end"] > covered_until]
+        if not segments:
+            return
+        self.last_history_narrative_time = now
+        self._history_narrative_version = version
+        self._history_narrative_thread = threading.Thread(
+            target=self._refresh_history_narrative,
+            args=(segments, narrative["text"] if narrative else None),
+            daemon=True
+        )
+        self._history_narrative_thread.start()
+
+    def _refresh_history_narrative(self, segments: list, previous: Optional[str]) -> None:
+        try:
+            text = self.lmm_interface.summarize_history([describe_segment(segment) for segment in segments], previous)
+        except Exception as e:
+            self.logger.log_warning(f"History narrative refresh failed: {e}")
+            return
+        if isinstance(text, str) and text:
+            self.history_segmenter.set_narrative(text, covered_until=segments[-1]["end"])
+            self.logger.log_debug(f"History narrative updated: {text}")
+
+    def start_lmm_warm_up(self) -> None:
+        """
+        Loads and warms the model in the background (LMMInterface.warm_up) so the first
+        real analysis does not pay for it. Periodic checks wait until it is done; event
+        triggers do not.
+        """
+        if not self.lmm_interface or not getattr(self.lmm_interface, 'warm_up', None):
+            return
+        if self._lmm_warm_up_thread is not None and self._lmm_warm_up_thread.is_alive():
+            return
+        self._lmm_warm_up_thread = threading.Thread(target=self._run_lmm_warm_up, name="lmm-warm-up", daemon=True)
+        self._lmm_warm_up_thread.start()
+
+    def _lmm_warming_up(self) -> bool:
+        return self._lmm_warm_up_thread is not None and self._lmm_warm_up_thread.is_alive()
+
+    def _run_lmm_warm_up(self) -> None:
+        self.logger.log_info("Warming up the LMM in the background...")
+        try:
+            result = self.lmm_interface.warm_up(runs=getattr(config, 'LMM_WARMUP_RUNS', 2),
+                                                timeout=getattr(config, 'LMM_WARMUP_TIMEOUT', 120.0))
+        except Exception as e:
+            self.logger.log_warning(f"LMM warm-up failed: {e}")
+            result = None
+        if result:
+            self._apply_lmm_calibration(result)
+        else:
+            self.logger.log_warning("LMM warm-up got no answer; keeping the configured intervals.")
+        self._wake("lmm_warm_up")
+
+    def _apply_lmm_calibration(self, result: dict) -> None:
+        """
+        Sets the periodic check interval from the warm latency measured at startup: at
+        least LMM_WARMUP_INTERVAL_FACTOR times it, so periodic checks never queue up
+        behind each other on a slow server.
+        """
+        factor = getattr(config, 'LMM_WARMUP_INTERVAL_FACTOR', 2.0)
+        interval = max(self.lmm_call_interval, int(math.ceil(result["warm_latency"] * factor)))
+        if interval != self.lmm_call_interval:
+            self.logger.log_info(f"Periodic LMM interval raised from {self.lmm_call_interval}s to {interval}s "
+                                 f"(warm latency {result['warm_latency']:.2f}s).")
+            self.lmm_call_interval = interval
+        self.lmm_warm_up_result = dict(result, periodic_interval=self.lmm_call_interval)
+        self.logger.log_event("lmm_warm_up", self.lmm_warm_up_result)
 
     def update(self) -> None:
         """
@@ -571,7 +1040,7 @@ class LogicEngine:
         """
         with self._lock:
             # 0. Check snooze expiry
-            if self.current_mode == "snoozed" and self.snooze_end_time != 0 and time.time() >= self.snooze_end_time:
+            if self.current_mode == "snoozed" and self.snooze_end_time != 0 and self.clock.time() >= self.snooze_end_time:
                 self.logger.log_info("Snooze expired.")
                 self.snooze_end_time = 0
                 self._set_mode_unlocked("active", from_snooze_expiry=True)
@@ -580,7 +1049,7 @@ class LogicEngine:
         # self.logger.log_debug(f"LogicEngine update. Current mode: {current_mode}")
 
         if current_mode in ["active", "dnd"]:
-            current_time = time.time()
+            current_time = self.clock.time()
 
             # Check probation (only relevant if recovering to active, but harmless to check)
             if self.recovery_probation_end_time > 0 and current_time > self.recovery_probation_end_time:
@@ -592,16 +1061,15 @@ class LogicEngine:
             trigger_reason = ""
 
             # 1. Process sensor data & Evaluate conditions (Metrics updated in process_* methods)
-            # We access metrics (atomic reads roughly safe, but better with lock if precise)
-            # Using local copies for decision making
-            with self._lock:
-                current_audio_level = self.audio_level
-                current_video_activity = self.video_activity
-                # Get more detailed analysis for filtering triggers
-                is_speech = self.audio_analysis.get("is_speech", False)
-                # Face detection is key for "user activity" vs "shadows"
-                face_detected = self.face_metrics.get("face_detected", False)
-                face_count = self.face_metrics.get("face_count", 0)
+            # One immutable snapshot gives a consistent set of values without locking
+            snapshot = self._snapshot
+            current_audio_level = snapshot.audio_level
+            current_video_activity = snapshot.video_activity
+            # Get more detailed analysis for filtering triggers
+            is_speech = snapshot.audio_analysis.get("is_speech", False)
+            # Face detection is key for "user activity" vs "shadows"
+            face_detected = snapshot.face_metrics.get("face_detected", False)
+            face_count = snapshot.face_metrics.get("face_count", 0)
 
             # Reflexive Window Triggers (run BEFORE LMM to allow instant reaction)
             # Only run if active, not in DND
@@ -625,23 +1093,31 @@ class LogicEngine:
             history_interval = getattr(config, 'HISTORY_SAMPLE_INTERVAL', 10)
             if current_time - self.last_history_sample_time >= history_interval:
                 self.last_history_sample_time = current_time
-                with self._lock:
-                    hist_active_window = "Unknown"
-                    if self.window_sensor:
-                        try:
-                            hist_active_window = self.window_sensor.get_active_window()
-                        except: pass
-
-                    snapshot = {
-                        "timestamp": current_time,
-                        "mode": self.current_mode,
-                        "active_window": hist_active_window,
-                        "audio_level": current_audio_level,
-                        "video_activity": current_video_activity,
-                        "face_detected": face_detected,
-                        "posture": self.video_analysis.get("posture_state", "unknown")
-                    }
-                    self.context_history.append(snapshot)
+                hist_active_window = "Unknown"
+                if self.window_sensor:
+                    try:
+                        hist_active_window = self.window_sensor.get_active_window()
+                    except: pass
+
+                history_entry = {
+                    "timestamp": current_time,
+                    "mode": current_mode,
+                    "active_window": hist_active_window,
+                    "audio_level": current_audio_level,
+                    "video_activity": current_video_activity,
+                    "face_detected": face_detected,
+                    "posture": snapshot.video_analysis.get("posture_state", "unknown")
+                }
+                # Aggregates over the interval since the previous history sample
+                history_entry.update(self.metric_store.summary(history_interval, now=current_time))
+                if self.context_history.maxlen and len(self.context_history) == self.context_history.maxlen:
+                    # The oldest snapshot is about to drop out of the verbatim window
+                    self.history_segmenter.fold(self.context_history[0])
+                # Copy-on-write so lock-free readers (_prepare_lmm_data) never see a deque mid-mutation
+                history = deque(self.context_history, maxlen=self.context_history.maxlen)
+                history.append(history_entry)
+                self.context_history = history
+                self._maybe_refresh_history_narrative(current_time)
 
             # 2. Check Meeting Mode Conditions (Active -> DND)
             # Heuristic: Continuous Speech + Face Detected + No User Input for X seconds
@@ -723,22 +1199,23 @@ class LogicEngine:
                      # auto_dnd_active is reset in set_mode
 
             # 3. Check for Event-based Triggers
+            # Paced per reason (_lmm_trigger_ready), so a trigger right after a periodic check
+            # still preempts it, but a sustained condition does not resubmit on every tick.
             # Check for sudden loud noise AND it is speech-like
             # If it's just a loud bang (high RMS, no speech confidence), we ignore it to prevent false positives.
             if current_audio_level > self.audio_threshold_high:
-                if is_speech:
-                    if current_time - self.last_lmm_call_time >= self.min_lmm_interval:
-                        trigger_lmm = True
-                        trigger_reason = "high_audio_level"
-                else:
+                if not is_speech:
                     self.logger.log_debug(f"High audio level ({current_audio_level:.2f}) ignored: Not speech.")
+                elif self._lmm_trigger_ready("high_audio_level", current_time):
+                    trigger_lmm = True
+                    trigger_reason = "high_audio_level"
 
             # Check for high activity (or sudden movement) AND user is present
             elif current_video_activity > self.video_activity_threshold_high:
                 # Only trigger if we see a face (user is present)
                 # This prevents triggering on cats, shadows, or empty chairs.
                 if face_detected or face_count > 0:
-                    if current_time - self.last_lmm_call_time >= self.min_lmm_interval:
+                    if self._lmm_trigger_ready("high_video_activity", current_time):
                         trigger_lmm = True
                         trigger_reason = "high_video_activity"
                 else:
@@ -750,35 +1227,63 @@ class LogicEngine:
                 arousal = self.state_engine.get_state().get("sexual_arousal", 0)
                 threshold = getattr(config, 'SEXUAL_AROUSAL_THRESHOLD', 50)
                 if arousal > threshold:
-                    if current_time - self.last_lmm_call_time >= self.lmm_call_interval / 2.0:
+                    if (current_time - self.last_lmm_call_time >= self.lmm_call_interval / 2.0
+                            and self._lmm_trigger_ready("high_sexual_arousal", current_time)):
                         trigger_lmm = True
                         trigger_reason = "high_sexual_arousal"
 
+            # Declarative rules (all evaluated in one vectorized pass). A rule's cooldown
+            # only starts once it has been acted on; a rule that loses to another trigger
+            # this tick stays due.
+            lmm_rule = None
+            for rule in self.trigger_rules.evaluate(current_mode, current_time):
+                if rule.action == "intervention":
+                    if current_mode == "active" and self.intervention_engine:
+                        self.logger.log_info(f"Trigger rule fired: {rule.name} -> {rule.intervention}")
+                        self.intervention_engine.start_intervention({"id": rule.intervention, "tier": rule.tier}, category='trigger_rule')
+                        self.trigger_rules.mark_fired(rule, current_time)
+                elif not trigger_lmm and self._lmm_trigger_ready(rule.name, current_time):
+                    self.logger.log_info(f"Trigger rule fired: {rule.name} -> LMM analysis")
+                    trigger_lmm = True
+                    trigger_reason = rule.name
+                    lmm_rule = rule
+
             # 3. Periodic Check (Heartbeat)
             # If no event triggered, check if it's time for a routine check
-            if not trigger_lmm:
-                if current_time - self.last_lmm_call_time >= self.lmm_call_interval:
-                    trigger_lmm = True
-                    trigger_reason = "periodic_check"
+            self._update_predicted_state(current_time)
+            if not trigger_lmm and not self._lmm_warming_up() and not self.lmm_scheduler.has_reason("periodic_check"):
+                if current_time - max(self.last_lmm_call_time, self.last_skipped_check_time) >= self.lmm_call_interval:
+                    if self._prediction_covers_periodic_check(current_time):
+                        # The local predictor answered this check; no LMM call
+                        self.last_skipped_check_time = current_time
+                        self.local_check_stats["skipped_periodic_checks"] += 1
+                        self.logger.log_debug(f"Periodic check answered locally (confidence {self.prediction_confidence:.2f}).")
+                    elif not self._periodic_check_is_novel(current_time):
+                        self.last_skipped_check_time = current_time
+                    else:
+                        trigger_lmm = True
+                        trigger_reason = "periodic_check"
 
             # 4. Trigger LMM if warranted
             if trigger_lmm:
-                self.last_lmm_call_time = current_time
                 # Intervention only allowed in 'active' mode
                 should_intervene = (current_mode == "active")
 
                 # Check Circuit Breaker before calling LMM to see if we should fallback
-                circuit_open = False
-                with self._lock:
-                    if time.time() < self.lmm_circuit_breaker_open_until:
-                        circuit_open = True
-
-                if circuit_open:
-                     self.logger.log_info(f"LMM Circuit Open. Attempting Offline Fallback (Reason: {trigger_reason})")
-                     if should_intervene:
-                        self._run_offline_fallback_logic(reason=trigger_reason)
+                if self.lmm_health.is_open():
+                     # The fallback bypasses the scheduler, so it keeps the min-interval pacing
+                     if current_time - self.last_lmm_call_time >= self.min_lmm_interval:
+                        self.last_lmm_call_time = current_time
+                        self.logger.log_info(f"LMM Circuit Open. Attempting Offline Fallback (Reason: {trigger_reason})")
+                        if should_intervene:
+                            self._run_offline_fallback_logic(reason=trigger_reason)
+                        if lmm_rule is not None:
+                            self.trigger_rules.mark_fired(lmm_rule, current_time)
                 else:
+                    self.last_lmm_trigger_times[trigger_reason] = current_time
                     self._trigger_lmm_analysis(reason=trigger_reason, allow_intervention=should_intervene)
+                    if lmm_rule is not None:
+                        self.trigger_rules.mark_fired(lmm_rule, current_time)
 
             # 5. Potentially change mode (e.g. error)
             # (Note: Main application handles sensor hardware errors.
@@ -786,7 +1291,7 @@ class LogicEngine:
             # but no hardware error is reported. For now, we leave that to future expansion.)
 
         elif current_mode == "error":
-            current_time = time.time()
+            current_time = self.clock.time()
             if current_time - self.last_error_log_time > 10:
                 self.logger.log_debug("LogicEngine: Mode is ERROR. Attempting to handle or log.")
                 self.last_error_log_time = current_time
@@ -816,16 +1321,78 @@ class LogicEngine:
 
         elif current_mode == "snoozed":
             self.logger.log_debug("LogicEngine: Mode is SNOOZED. Performing light monitoring without intervention.")
-            current_time = time.time()
-            if current_time - self.last_lmm_call_time >= self.lmm_call_interval:
-                self.last_lmm_call_time = current_time
+            current_time = self.clock.time()
+            if current_time - self.last_lmm_call_time >= self.lmm_call_interval and self._lmm_trigger_ready("unknown", current_time):
+                self.last_lmm_trigger_times["unknown"] = current_time
                 self._trigger_lmm_analysis(allow_intervention=False)
 
+    def get_next_deadline(self) -> Optional[float]:
+        """
+        Returns the earliest wall-clock time at which update() has timed work to do
+        even if no new sensor data arrives (snooze expiry, periodic LMM interval,
+        history sampling, probation end, meeting-mode timers, error recovery).
+        Returns None if nothing is scheduled (e.g. paused).
+        """
+        deadlines = []
+        with self._lock:
+            mode = self.current_mode
+            snooze_end = self.snooze_end_time
+
+        if mode == "snoozed":
+            if snooze_end:
+                deadlines.append(snooze_end)
+            deadlines.append(self.last_lmm_call_time + self.lmm_call_interval)
+
+        elif mode in ["active", "dnd"]:
+            interval = self.lmm_call_interval
+            arousal = self.state_engine.get_state().get("sexual_arousal", 0)
+            if arousal > getattr(config, 'SEXUAL_AROUSAL_THRESHOLD', 50):
+                interval = self.lmm_call_interval / 2.0
+            deadlines.append(max(self.last_lmm_call_time, self.last_skipped_check_time) + interval)
+            if self.state_predictor is not None:
+                deadlines.append(self.last_prediction_time + getattr(config, 'STATE_PREDICTOR_INTERVAL', 5.0))
+
+            deadlines.append(self.last_history_sample_time + getattr(config, 'HISTORY_SAMPLE_INTERVAL', 10))
+
+            if self.recovery_probation_end_time > 0:
+                deadlines.append(self.recovery_probation_end_time)
+
+            if self.input_tracking_enabled:
+                # Meeting mode is evaluated on timers as well as on sensor data
+                if self.continuous_speech_start_time > 0:
+                    deadlines.append(self.continuous_speech_start_time + getattr(config, 'MEETING_MODE_SPEECH_DURATION_THRESHOLD', 3.0))
+                    deadlines.append(self.last_speech_time + getattr(config, 'MEETING_MODE_SPEECH_GRACE_PERIOD', 2.0))
+                deadlines.append(self.last_user_input_time + getattr(config, 'MEETING_MODE_IDLE_KEYBOARD_THRESHOLD', 10.0))
+
+            if self.lmm_health.is_open():
+                deadlines.append(self.lmm_health.open_until)
+
+        elif mode == "error":
+            if self.error_recovery_attempts <= self.max_error_recovery_attempts:
+                # update() uses a strict '>' comparison, so nudge past the boundary
+                deadlines.append(self.last_error_recovery_attempt_time + self.error_recovery_interval + 0.01)
+
+        now = self.clock.time()
+        # Deadlines already in the past would spin the loop; only future ones matter
+        # once update() has just run (past-due work is re-armed by update itself).
+        future = [d for d in deadlines if d > now]
+        if not future:
+            return now + self.min_lmm_interval if deadlines else None
+        return min(future)
+
     def shutdown(self) -> None:
         """
         Gracefully shuts down the LogicEngine, ensuring background threads complete.
         """
         self.logger.log_info("LogicEngine shutting down...")
+        self.lmm_scheduler.shutdown()
+        self.logger.log_info(f"LMM scheduler stats: {self.lmm_scheduler.get_stats()}")
+        if self.state_predictor is not None:
+            self.logger.log_info(f"State predictor stats: {self.local_check_stats}")
+        if self.novelty_gate.enabled:
+            self.logger.log_info(f"Novelty gate stats: {self.novelty_gate.get_stats()}")
+        if not self._interface_tracks_health():
+            self.logger.log_info(f"LMM health stats: {self.lmm_health.get_stats()}")
         # Since lmm_thread is daemon and uses network calls, we can't easily interrupt it
         # unless we add a flag to LMMInterface, but we can wait briefly.
         if self.lmm_thread and self.lmm_thread.is_alive():
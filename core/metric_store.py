@@ -0,0 +1,267 @@
+import time
+import threading
+from typing import Optional, Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+
+import config
+
+# Per-tick columns. Boolean signals are stored as 0/1, categorical ones as codes.
+COLUMNS: Tuple[str, ...] = (
+    "audio_rms",
+    "is_speech",
+    "speech_confidence",
+    "video_activity",
+    "face_detected",
+    "face_count",
+    "face_size_ratio",
+    "vertical_position",
+    "posture",
+)
+
+# Codes for the categorical "posture" column (index = code)
+POSTURES: Tuple[str, ...] = (
+    "unknown", "neutral", "slouching", "leaning_forward", "leaning_back", "tilted_left", "tilted_right",
+)
+_POSTURE_CODES: Dict[str, int] = {name: i for i, name in enumerate(POSTURES)}
+
+DEFAULT_RESOLUTIONS: Tuple[int, ...] = (1, 10, 60)
+
+
+def posture_code(posture: Optional[str]) -> int:
+    return _POSTURE_CODES.get(posture or "unknown", 0)
+
+
+class _Rollup:
+    """Fixed-size ring of time buckets holding per-column sum / count / max."""
+
+    def __init__(self, resolution: float, buckets: int, n_columns: int) -> None:
+        self.resolution = resolution
+        self.size = buckets
+        self.bucket_ids = np.full(buckets, -1, dtype=np.int64)
+        self.sums = np.zeros((buckets, n_columns), dtype=np.float64)
+        self.counts = np.zeros((buckets, n_columns), dtype=np.int32)
+        self.maxes = np.full((buckets, n_columns), np.nan, dtype=np.float64)
+
+    def add(self, timestamp: float, row: np.ndarray, present: np.ndarray) -> None:
+        bucket_id = int(timestamp // self.resolution)
+        slot = bucket_id % self.size
+        if self.bucket_ids[slot] != bucket_id:
+            # Reusing the slot of a bucket that aged out of the ring
+            self.bucket_ids[slot] = bucket_id
+            self.sums[slot] = 0.0
+            self.counts[slot] = 0
+            self.maxes[slot] = np.nan
+        self.sums[slot, present] += row[present]
+        self.counts[slot, present] += 1
+        self.maxes[slot, present] = np.fmax(self.maxes[slot, present], row[present])
+
+    def select(self, start: float, end: float) -> np.ndarray:
+        """Boolean mask of buckets whose start lies in [start, end]."""
+        lo = int(start // self.resolution)
+        hi = int(end // self.resolution)
+        return (self.bucket_ids >= lo) & (self.bucket_ids <= hi)
+
+
+class MetricStore:
+    """
+    Columnar, fixed-memory time series of per-tick sensor metrics.
+
+    Raw samples go into a numpy ring buffer (one row per recorded tick, NaN for
+    columns a tick did not report, e.g. video columns on an audio tick). Every
+    sample is also folded into rollups at 1 s, 10 s and 60 s resolution, so long
+    windows stay cheap once the raw ring has wrapped. Window queries (mean, max,
+    fraction_true) are vectorized over whichever tier covers the window.
+
+    Memory is bounded by capacity + len(resolutions) * rollup_buckets rows.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, resolutions: Sequence[int] = DEFAULT_RESOLUTIONS,
+                 rollup_buckets: Optional[int] = None, columns: Sequence[str] = COLUMNS) -> None:
+        self.capacity: int = capacity or getattr(config, 'METRIC_STORE_CAPACITY', 4096)
+        buckets = rollup_buckets or getattr(config, 'METRIC_STORE_ROLLUP_BUCKETS', 720)
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.columns)}
+
+        self._timestamps = np.full(self.capacity, np.nan, dtype=np.float64)
+        self._values = np.full((self.capacity, len(self.columns)), np.nan, dtype=np.float64)
+        self._head: int = 0     # next write position
+        self._size: int = 0
+        # Timestamp of the first sample of each column (survives the ring wrapping)
+        self._first_seen = np.full(len(self.columns), np.nan, dtype=np.float64)
+
+        self._rollups: Dict[int, _Rollup] = {
+            res: _Rollup(res, buckets, len(self.columns)) for res in sorted(resolutions)
+        }
+        # Single writer at a time; readers copy the slices they need under the same lock
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    # --- Writing ---
+
+    def record(self, timestamp: Optional[float] = None, **values: float) -> None:
+        """
+        Appends one tick. Unknown column names raise KeyError; omitted (or None /
+        non-numeric) values stay NaN.
+        """
+        ts = time.time() if timestamp is None else timestamp
+        row = np.full(len(self.columns), np.nan, dtype=np.float64)
+        for name, value in values.items():
+            col = self._index[name]
+            if value is None:
+                continue
+            try:
+                row[col] = float(value)
+            except (TypeError, ValueError):
+                pass
+        present = ~np.isnan(row)
+
+        with self._lock:
+            self._timestamps[self._head] = ts
+            self._values[self._head] = row
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self._first_seen[present & np.isnan(self._first_seen)] = ts
+            for rollup in self._rollups.values():
+                rollup.add(ts, row, present)
+
+    # --- Reading ---
+
+    def _raw_window(self, column: str, seconds: float, now: float) -> Optional[np.ndarray]:
+        """Raw samples of `column` within the window, or None if the ring no longer covers it."""
+        col = self._index[column]
+        start = now - seconds
+        with self._lock:
+            if self._size == 0:
+                return np.empty(0)
+            # Once the ring has wrapped, the oldest surviving sample sits at the write head
+            if self._size == self.capacity and self._timestamps[self._head] > start:
+                return None
+            mask = (self._timestamps >= start) & (self._timestamps <= now)
+            values = self._values[mask, col]
+        return values[~np.isnan(values)]
+
+    def window_matrix(self, seconds: float, now: Optional[float] = None) -> np.ndarray:
+        """
+        All columns over the last `seconds` as a (rows x columns) array, NaN where a
+        tick did not report a column. Uses raw ticks while the ring covers the window,
+        otherwise per-bucket means of the finest covering rollup.
+        """
+        now = time.time() if now is None else now
+        start = now - seconds
+        with self._lock:
+            if self._size == 0:
+                return np.empty((0, len(self.columns)))
+            if not (self._size == self.capacity and self._timestamps[self._head] > start):
+                mask = (self._timestamps >= start) & (self._timestamps <= now)
+                return self._values[mask]
+
+            rollup = self._rollup_for(seconds)
+            mask = rollup.select(start, now)
+            counts = rollup.counts[mask]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = rollup.sums[mask] / counts
+        means[counts == 0] = np.nan
+        return means
+
+    def first_seen(self) -> np.ndarray:
+        """Per column, the timestamp of its first recorded sample (NaN if none yet)."""
+        with self._lock:
+            return self._first_seen.copy()
+
+    def column_index(self, column: str) -> int:
+        return self._index[column]
+
+    def _rollup_for(self, seconds: float) -> _Rollup:
+        for res, rollup in self._rollups.items():
+            if res * rollup.size >= seconds:
+                return rollup
+        return self._rollups[max(self._rollups)]
+
+    def _aggregate(self, column: str, seconds: float, now: Optional[float]) -> Tuple[Optional[np.ndarray], Optional[Tuple[float, float, float]]]:
+        """Returns (raw values, None) when the raw ring covers the window, else (None, (sum, count, max))."""
+        now = time.time() if now is None else now
+        raw = self._raw_window(column, seconds, now)
+        if raw is not None:
+            return raw, None
+
+        col = self._index[column]
+        rollup = self._rollup_for(seconds)
+        with self._lock:
+            mask = rollup.select(now - seconds, now)
+            total = float(rollup.sums[mask, col].sum())
+            count = float(rollup.counts[mask, col].sum())
+            peak = float(np.nanmax(rollup.maxes[mask, col])) if count else np.nan
+        return None, (total, count, peak)
+
+    def mean(self, column: str, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        """Mean of `column` over the last `seconds`, or None without samples."""
+        raw, agg = self._aggregate(column, seconds, now)
+        if raw is not None:
+            return float(raw.mean()) if raw.size else None
+        total, count, _ = agg
+        return total / count if count else None
+
+    def max(self, column: str, seconds: float, now: Optional[float] = None) -> Optional[float]:
+        raw, agg = self._aggregate(column, seconds, now)
+        if raw is not None:
+            return float(raw.max()) if raw.size else None
+        _, count, peak = agg
+        return peak if count else None
+
+    def fraction_true(self, column: str, seconds: float, now: Optional[float] = None, threshold: float = 0.5) -> Optional[float]:
+        """
+        Fraction of samples where `column` is true (>= threshold) over the last `seconds`.
+        On rollup tiers boolean columns are averaged, which is the same quantity.
+        """
+        raw, agg = self._aggregate(column, seconds, now)
+        if raw is not None:
+            return float((raw >= threshold).mean()) if raw.size else None
+        total, count, _ = agg
+        return total / count if count else None
+
+    def count(self, column: str, seconds: float, now: Optional[float] = None) -> int:
+        raw, agg = self._aggregate(column, seconds, now)
+        return int(raw.size) if raw is not None else int(agg[1])
+
+    def dominant(self, column: str, seconds: float, now: Optional[float] = None) -> Optional[int]:
+        """Most frequent code of a categorical column in the raw window (None without samples)."""
+        now = time.time() if now is None else now
+        raw = self._raw_window(column, seconds, now)
+        if raw is None or raw.size == 0:
+            return None
+        return int(np.bincount(raw.astype(np.int64)).argmax())
+
+    def series(self, column: str, seconds: float, resolution: int, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-bucket means of `column` at a rollup resolution over the last `seconds`.
+        Returns (bucket_start_times, means) in chronological order; empty buckets are omitted.
+        """
+        now = time.time() if now is None else now
+        rollup = self._rollups[resolution]
+        col = self._index[column]
+        with self._lock:
+            mask = rollup.select(now - seconds, now) & (rollup.counts[:, col] > 0)
+            ids = rollup.bucket_ids[mask]
+            means = rollup.sums[mask, col] / rollup.counts[mask, col]
+        order = np.argsort(ids)
+        return ids[order] * float(resolution), means[order]
+
+    def summary(self, seconds: float, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """Compact window summary used for history snapshots and LMM context."""
+        now = time.time() if now is None else now
+        posture = self.dominant("posture", seconds, now)
+        return {
+            "audio_level_mean": self.mean("audio_rms", seconds, now),
+            "audio_level_max": self.max("audio_rms", seconds, now),
+            "speech_fraction": self.fraction_true("is_speech", seconds, now),
+            "video_activity_mean": self.mean("video_activity", seconds, now),
+            "video_activity_max": self.max("video_activity", seconds, now),
+            "face_presence": self.fraction_true("face_detected", seconds, now),
+            "dominant_posture": POSTURES[posture] if posture is not None and posture < len(POSTURES) else None,
+        }
+
+    def resolutions(self) -> Iterable[int]:
+        return tuple(self._rollups)
@@ -0,0 +1,97 @@
+import threading
+import zlib
+from typing import Optional, Dict, Any, Tuple
+
+import config
+from .image_processing import ImageProcessor
+
+# Distance contributed by each kind of change (see NoveltyGate.distance)
+WEIGHTS: Dict[str, float] = {
+    "audio_level": 1.0,     # Per AUDIO_THRESHOLD_HIGH of difference
+    "video_activity": 1.0,  # Per VIDEO_ACTIVITY_THRESHOLD_HIGH of difference
+    "face_count": 1.0,      # Someone arrived or left
+    "posture": 0.5,
+    "window": 1.0,
+    "speech": 0.5,
+    "image": 2.0,           # Times the fraction of differing image-hash bits
+}
+
+
+def fingerprint(snapshot, active_window: Optional[str]) -> Dict[str, Any]:
+    """Normalized features of one sensor snapshot, compared by NoveltyGate.distance."""
+    audio_scale = getattr(config, 'AUDIO_THRESHOLD_HIGH', 0.5) or 1.0
+    video_scale = getattr(config, 'VIDEO_ACTIVITY_THRESHOLD_HIGH', 20.0) or 1.0
+    return {
+        "audio_level": float(snapshot.audio_level) / audio_scale,
+        "video_activity": float(snapshot.video_activity) / video_scale,
+        "face_count": int(snapshot.face_metrics.get("face_count", 0) or int(bool(snapshot.face_metrics.get("face_detected")))),
+        "posture": snapshot.video_analysis.get("posture_state"),
+        "window": zlib.crc32((active_window or "").encode("utf-8", "replace")),
+        "speech": bool(snapshot.audio_analysis.get("is_speech", False)),
+        "image": ImageProcessor.difference_hash(snapshot.video_frame),
+    }
+
+
+class NoveltyGate:
+    """
+    Decides whether a periodic LMM check is worth making.
+
+    The fingerprint of the snapshot behind the last analysis is kept (`record`). A
+    periodic check is dispatched when the current fingerprint is at least `threshold`
+    away from it, or when the last analysis is older than `max_staleness` seconds;
+    otherwise it is skipped. Event-driven triggers bypass the gate. Decisions are
+    counted in `stats` (dispatched_first, dispatched_novel, dispatched_stale,
+    skipped_unchanged).
+    """
+
+    def __init__(self, threshold: Optional[float] = None, max_staleness: Optional[float] = None) -> None:
+        self.threshold: float = threshold if threshold is not None else getattr(config, 'LMM_NOVELTY_THRESHOLD', 0.0)
+        self.max_staleness: float = max_staleness if max_staleness is not None else getattr(config, 'LMM_NOVELTY_MAX_STALENESS', 60.0)
+        self._baseline: Optional[Dict[str, Any]] = None
+        self._baseline_time: float = 0.0
+        self._lock: threading.Lock = threading.Lock()
+        self.stats: Dict[str, int] = {"dispatched_first": 0, "dispatched_novel": 0, "dispatched_stale": 0, "skipped_unchanged": 0}
+        self.last_distance: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    @staticmethod
+    def distance(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+        d = WEIGHTS["audio_level"] * abs(a["audio_level"] - b["audio_level"])
+        d += WEIGHTS["video_activity"] * abs(a["video_activity"] - b["video_activity"])
+        d += WEIGHTS["face_count"] * min(1, abs(a["face_count"] - b["face_count"]))
+        d += WEIGHTS["posture"] * (a["posture"] != b["posture"])
+        d += WEIGHTS["window"] * (a["window"] != b["window"])
+        d += WEIGHTS["speech"] * (a["speech"] != b["speech"])
+        if a["image"] is not None and b["image"] is not None:
+            d += WEIGHTS["image"] * bin(a["image"] ^ b["image"]).count("1") / 64
+        elif (a["image"] is None) != (b["image"] is None):
+            d += WEIGHTS["image"]  # Camera appeared or went away
+        return d
+
+    def record(self, features: Dict[str, Any], now: float) -> None:
+        """Sets the baseline: the snapshot that was just sent for analysis."""
+        with self._lock:
+            self._baseline = features
+            self._baseline_time = now
+
+    def check(self, features: Dict[str, Any], now: float) -> Tuple[bool, str]:
+        """(dispatch?, reason) for a periodic check at `now` with the current `features`."""
+        with self._lock:
+            baseline, baseline_time = self._baseline, self._baseline_time
+        if baseline is None:
+            decision = (True, "dispatched_first")
+        elif now - baseline_time >= self.max_staleness:
+            decision = (True, "dispatched_stale")
+        else:
+            self.last_distance = self.distance(features, baseline)
+            decision = (True, "dispatched_novel") if self.last_distance >= self.threshold else (False, "skipped_unchanged")
+        with self._lock:
+            self.stats[decision[1]] += 1
+        return decision
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
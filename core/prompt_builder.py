@@ -0,0 +1,386 @@
+import math
+import re
+from typing import Optional, Dict, Any, List, Tuple, Callable
+
+import config
+from .clock import Clock, SYSTEM_CLOCK
+
+
+def truncate_text(text: str, max_length: int = 50) -> str:
+    """Truncates text to max_length, adding '...' if truncated."""
+    if not text:
+        return ""
+    if len(text) <= max_length:
+        return text
+    return text[:max_length-3] + "..."
+
+
+def describe_segment(segment: Dict[str, Any]) -> str:
+    """A history segment (see core/history_segments.py) as a short phrase, e.g. "VS Code, active, face present, neutral, quiet, still, 12 min"."""
+    window = segment.get('window', "Unknown")
+    others = segment.get('other_windows', 0)
+    if others:
+        window += f" +{others} other{'s' if others > 1 else ''}"
+    presence = segment.get('face_presence', 0.0)
+    face = "face present" if presence >= 0.8 else "away" if presence <= 0.2 else "face intermittent"
+    sound = "talking" if segment.get('speech_fraction', 0.0) >= 0.3 else "quiet"
+    motion = segment.get('motion_mean', 0.0)
+    movement = "moving a lot" if motion >= 20 else "moving" if motion >= 5 else "still"
+    minutes = max(1, int(round((segment.get('end', 0) - segment.get('start', 0)) / 60)))
+    return f"{window}, {segment.get('mode', 'unknown')}, {face}, {segment.get('posture', 'unknown')}, {sound}, {movement}, {minutes} min"
+
+
+def approx_tokens_by_chars(text: str) -> int:
+    """~4 characters per token, the usual ratio for English text with BPE vocabularies."""
+    return math.ceil(len(text) / 4)
+
+
+def approx_tokens_by_words(text: str) -> int:
+    """Words and punctuation runs, ~1.3 tokens per word; closer than chars for number-heavy text."""
+    return math.ceil(len(re.findall(r"\w+|[^\w\s]+", text)) * 1.3)
+
+
+# Token count approximations selectable with LMM_TOKEN_ESTIMATOR
+TOKEN_ESTIMATORS: Dict[str, Callable[[str], int]] = {
+    "chars": approx_tokens_by_chars,
+    "words": approx_tokens_by_words,
+}
+
+
+class PromptSection:
+    """One block of the user message plus cheaper stand-ins for it, most complete first ("" drops it)."""
+
+    def __init__(self, name: str, text: str, fallbacks: Optional[List[str]] = None, priority: int = 100) -> None:
+        self.name: str = name
+        self.text: str = text
+        # Sections without text have nothing to give up
+        self.fallbacks: List[str] = list(fallbacks or []) if text else []
+        self.priority: int = priority  # Lower is reduced first
+
+
+class PromptBuilder:
+    """
+    Builds the chat messages for an analysis request, ordered from most stable to
+    most volatile so llama.cpp/LM Studio-style servers can reuse the KV cache of
+    the longest unchanged prefix:
+
+    1. System instruction (fixed for the process lifetime).
+    2. Intervention preferences: suppressed/preferred lists (change rarely).
+    3. Earlier history (run-length segments of aged-out snapshots, optionally led by
+       a background narrative) and recent history: times are relative to the newest
+       snapshot, so both blocks are byte-identical until the next history sample.
+    4. Previous state estimate (changes once per analysis).
+    5. Current status: mode, trigger, window, per-call metrics, trends, alerts.
+    6. The camera frame (or a montage of recent frames, see core/frame_montage.py).
+
+    Blocks are rendered deterministically (fixed key order and number formats) so
+    equal inputs always produce equal bytes.
+
+    The user message is also held to a token budget (LMM_PROMPT_TOKEN_BUDGET, counted
+    with `tokenizer`, an approximation unless a real one is passed). Over budget, the
+    lowest-value sections are reduced first: trends and preferred interventions are
+    dropped, earlier history loses its oldest segments, recent history loses its oldest snapshots and is then summarized in one line,
+    detailed audio/face metrics shrink to voice activity and posture, and the previous
+    state goes last. Suppressions, the current status and alerts are always kept.
+    `last_report` holds the per-section token counts of the last message built.
+    """
+
+    HEADER = "Analyze the following user status:\n"
+
+    def __init__(self, clock: Optional[Clock] = None, tokenizer: Optional[Callable[[str], int]] = None,
+                 token_budget: Optional[int] = None) -> None:
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        estimator = getattr(config, 'LMM_TOKEN_ESTIMATOR', "chars")
+        self.tokenizer: Callable[[str], int] = tokenizer if tokenizer is not None else TOKEN_ESTIMATORS.get(estimator, approx_tokens_by_chars)
+        self.token_budget: int = token_budget if token_budget is not None else getattr(config, 'LMM_PROMPT_TOKEN_BUDGET', 800)
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    def build_messages(self, system_instruction: str, user_context: Optional[Dict[str, Any]],
+                       video_data: Optional[str] = None) -> List[Dict[str, Any]]:
+        content_parts: List[Dict[str, Any]] = [{"type": "text", "text": self.build_user_text(user_context)}]
+        # The system instruction is fixed (and prefix-cached), so it is reported but not budgeted
+        self.last_report["system"] = self.count_tokens(system_instruction)
+        if video_data:
+            content_parts.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{video_data}"
+                }
+            })
+        return [
+            {"role": "system", "content": system_instruction},
+            {"role": "user", "content": content_parts}
+        ]
+
+    def build_user_text(self, user_context: Optional[Dict[str, Any]]) -> str:
+        if not user_context:
+            self.last_report = self._report([PromptSection("header", self.HEADER)], [])
+            return self.HEADER
+        sections = self._sections(user_context)
+        trimmed = self._fit_budget(sections)
+        self.last_report = self._report(sections, trimmed)
+        return "".join(section.text for section in sections)
+
+    def _sections(self, user_context: Dict[str, Any]) -> List["PromptSection"]:
+        """The user message as sections in prompt order, each with its cheaper fallbacks."""
+        suppressed, preferred = self._preferences_block(user_context)
+        audio_detail, voice_only = self._audio_detail_block(user_context)
+        face, face_minimal = self._face_block(user_context)
+        return [
+            PromptSection("header", self.HEADER),
+            PromptSection("suppressed", suppressed),
+            PromptSection("preferred", preferred, [""], priority=1),
+            PromptSection("earlier", self._earlier_block(user_context), self._earlier_fallbacks(user_context), priority=1),
+            PromptSection("history", self._history_block(user_context), self._history_fallbacks(user_context), priority=2),
+            PromptSection("previous_state", self._previous_state_block(user_context), [""], priority=4),
+            PromptSection("status", self._status_block(user_context)),
+            PromptSection("audio_detail", audio_detail, [voice_only, ""], priority=3),
+            PromptSection("video", self._video_block(user_context)),
+            PromptSection("face", face, [face_minimal], priority=3),
+            PromptSection("trends", self._trends_block(user_context), [""], priority=1),
+            PromptSection("alerts", self._alerts_block(user_context)),
+        ]
+
+    def count_tokens(self, text: str) -> int:
+        return self.tokenizer(text) if text else 0
+
+    def _fit_budget(self, sections: List["PromptSection"]) -> List[str]:
+        """
+        Steps the lowest-priority sections down to their next fallback (trim, summary, drop)
+        until the estimated total fits the budget. Sections without fallbacks (header,
+        suppressions, current status, alerts) are never reduced. Returns what was reduced.
+        """
+        trimmed: List[str] = []
+        if not self.token_budget or self.token_budget <= 0:
+            return trimmed
+        total = sum(self.count_tokens(section.text) for section in sections)
+        while total > self.token_budget:
+            reducible = [section for section in sections if section.fallbacks]
+            if not reducible:
+                break
+            # Lowest priority first; among equals the one that saves the most
+            section = min(reducible, key=lambda sec: (sec.priority, -self.count_tokens(sec.text)))
+            before = self.count_tokens(section.text)
+            section.text = section.fallbacks.pop(0)
+            total += self.count_tokens(section.text) - before
+            trimmed.append(section.name if section.text else f"{section.name}:dropped")
+        return trimmed
+
+    def _report(self, sections: List["PromptSection"], trimmed: List[str]) -> Dict[str, Any]:
+        tokens = {section.name: self.count_tokens(section.text) for section in sections}
+        return {
+            "sections": tokens,
+            "total": sum(tokens.values()),
+            "budget": self.token_budget,
+            "trimmed": trimmed,
+        }
+
+    def _preferences_block(self, user_context: Dict[str, Any]) -> Tuple[str, str]:
+        suppressed_text = ""
+        suppressed = user_context.get('suppressed_interventions')
+        if suppressed:
+            suppressed_text = f"Suppressed Interventions (Do NOT suggest): {', '.join(suppressed)}\n"
+        preferred_text = ""
+        preferred = user_context.get('preferred_interventions')
+        if preferred:
+            preferred_text = f"Preferred Interventions (User found these helpful recently): {', '.join(preferred)}\n"
+        return suppressed_text, preferred_text
+
+    @staticmethod
+    def _history(user_context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # LogicEngine sends it as 'history'; 'context_history' is the older key
+        return list(user_context.get('context_history') or user_context.get('history') or [])
+
+    def _history_block(self, user_context: Dict[str, Any], keep: Optional[int] = None) -> str:
+        history = self._history(user_context)
+        if not history:
+            return ""
+        latest = max(snapshot.get('timestamp', 0) for snapshot in history)
+        if keep is None:
+            text = "\nRecent History (Last 5 snapshots):\n"
+        else:
+            # Budget fallback: the newest `keep` snapshots verbatim, the older ones folded into one line
+            text = f"\nRecent History (Last {keep} of {len(history)} snapshots):\n"
+            text += f"- Earlier: {self._history_summary(history[:-keep])}\n"
+            history = history[-keep:]
+        for snapshot in history:
+            # Truncate history window titles more aggressively (50 chars)
+            win = truncate_text(snapshot.get('active_window', 'Unknown'), max_length=50)
+            # Relative to the newest snapshot (not to now) so the block does not change between samples
+            rel_time = int(latest - snapshot.get('timestamp', 0))
+            text += (
+                f"- T-{rel_time}s: Window='{win}', Mode={snapshot.get('mode')}, "
+                f"Face={snapshot.get('face_detected')}, Posture={snapshot.get('posture', 'unknown')}, "
+                f"Audio={snapshot.get('audio_level', 0.0):.2f}, Motion={snapshot.get('video_activity', 0.0):.1f}\n"
+            )
+        return text
+
+    def _history_fallbacks(self, user_context: Dict[str, Any]) -> List[str]:
+        """Fewer verbatim snapshots with the rest summarized, then a summary alone, then nothing (each shorter than the last)."""
+        history = self._history(user_context)
+        if not history:
+            return []
+        candidates = [self._history_block(user_context, keep=k) for k in range(len(history) - 1, 0, -1)]
+        candidates.append(f"\nRecent History Summary: {self._history_summary(history)}\n")
+        fallbacks: List[str] = []
+        shortest = len(self._history_block(user_context))
+        for candidate in candidates:
+            if len(candidate) < shortest:
+                fallbacks.append(candidate)
+                shortest = len(candidate)
+        fallbacks.append("")
+        return fallbacks
+
+    @staticmethod
+    def _history_summary(history: List[Dict[str, Any]]) -> str:
+        timestamps = [snapshot.get('timestamp', 0) for snapshot in history]
+        windows: List[str] = []
+        for snapshot in reversed(history):
+            win = truncate_text(snapshot.get('active_window', 'Unknown'), max_length=30)
+            if win not in windows:
+                windows.append(win)
+        faces = sum(1 for snapshot in history if snapshot.get('face_detected'))
+        audio = sum(snapshot.get('audio_level', 0.0) for snapshot in history) / len(history)
+        motion = sum(snapshot.get('video_activity', 0.0) for snapshot in history) / len(history)
+        return (
+            f"{len(history)} snapshots over {int(max(timestamps) - min(timestamps))}s, "
+            f"Windows (newest first)={', '.join(windows[:3])}, Face={faces}/{len(history)}, "
+            f"Audio mean={audio:.2f}, Motion mean={motion:.1f}"
+        )
+
+    def _earlier_block(self, user_context: Dict[str, Any], keep: Optional[int] = None) -> str:
+        """Compressed history older than the verbatim snapshots; `keep` limits it to the newest segments."""
+        segments = list(user_context.get('history_segments') or [])
+        narrative = user_context.get('history_narrative')
+        if narrative:
+            # The narrative already tells the story of the segments it covers
+            segments = [segment for segment in segments if segment.get('end', 0) > narrative.get('covered_until', 0)]
+        if not segments and not narrative:
+            return ""
+        history = self._history(user_context)
+        ends = [snapshot.get('timestamp', 0) for snapshot in history] or [segment.get('end', 0) for segment in segments]
+        latest = max(ends) if ends else narrative.get('covered_until', 0)
+        if keep is not None:
+            segments = segments[-keep:] if keep > 0 else []
+        text = "\nEarlier History (oldest first):\n"
+        if narrative:
+            text += f"- Until T-{int((latest - narrative.get('covered_until', latest)) // 60)}m: {narrative.get('text')}\n"
+        for segment in segments:
+            text += (
+                f"- T-{int((latest - segment.get('start', 0)) // 60)}m to T-{int((latest - segment.get('end', 0)) // 60)}m: "
+                f"{describe_segment(segment)}\n"
+            )
+        return text
+
+    def _earlier_fallbacks(self, user_context: Dict[str, Any]) -> List[str]:
+        """Fewer segments (oldest dropped first), then nothing."""
+        segments = user_context.get('history_segments') or []
+        fallbacks: List[str] = []
+        shortest = len(self._earlier_block(user_context))
+        for keep in range(len(segments) - 1, 0, -1):
+            candidate = self._earlier_block(user_context, keep=keep)
+            if candidate and len(candidate) < shortest:
+                fallbacks.append(candidate)
+                shortest = len(candidate)
+        fallbacks.append("")
+        return fallbacks
+
+    def _previous_state_block(self, user_context: Dict[str, Any]) -> str:
+        est = user_context.get('current_state_estimation')
+        return f"\nPrevious State: {est}\n" if est else ""
+
+    def _status_block(self, user_context: Dict[str, Any]) -> str:
+        text = "\nCurrent Status:\n"
+        text += f"Current Mode: {user_context.get('current_mode', 'unknown')}\n"
+        text += f"Trigger Reason: {user_context.get('trigger_reason', 'unknown')}\n"
+
+        # Truncate current window title generously (80 chars) to allow context but prevent token bloat
+        active_window = truncate_text(user_context.get('active_window', 'Unknown'), max_length=80)
+        text += f"Active Window: {active_window}\n"
+
+        history = self._history(user_context)
+        if history:
+            latest = max(snapshot.get('timestamp', 0) for snapshot in history)
+            text += f"Latest History Snapshot: {int(self.clock.time() - latest)}s ago\n"
+
+        metrics = user_context.get('sensor_metrics', {})
+        text += f"Audio Level (RMS): {metrics.get('audio_level', 0.0):.4f}\n"
+        return text
+
+    def _audio_detail_block(self, user_context: Dict[str, Any]) -> Tuple[str, str]:
+        """Detailed audio analysis, and the voice activity line alone as its fallback."""
+        audio_analysis = user_context.get('sensor_metrics', {}).get('audio_analysis', {})
+        if not audio_analysis:
+            return "", ""
+        is_speech = audio_analysis.get('is_speech', False)
+        speech_conf = audio_analysis.get('speech_confidence', 0.0)
+        voice = f"Voice Activity: {'Yes' if is_speech else 'No'} (Conf: {speech_conf:.2f})\n"
+        text = f"Audio Pitch (est): {audio_analysis.get('pitch_estimation', 0.0):.2f} Hz\n"
+        text += f"Audio Pitch Variance: {audio_analysis.get('pitch_variance', 0.0):.2f}\n"
+        text += f"Audio ZCR: {audio_analysis.get('zcr', 0.0):.4f}\n"
+        text += f"Speech Rate: {audio_analysis.get('speech_rate', 0.0):.2f} syllables/sec\n"
+        return text + voice, voice
+
+    def _video_block(self, user_context: Dict[str, Any]) -> str:
+        metrics = user_context.get('sensor_metrics', {})
+        text = f"Video Activity (Motion): {metrics.get('video_activity', 0.0):.2f}\n"
+        montage = user_context.get('video_montage')
+        if montage:
+            taken = ", ".join(f"T-{offset}s" for offset in montage.get('offsets', []))
+            text += (
+                f"Camera Image: montage of {montage.get('frames')} frames in time order (left to right, top to bottom), "
+                f"taken {taken}. Use it to judge movement and repeated behaviour; the last frame is the current view.\n"
+            )
+        return text
+
+    def _face_block(self, user_context: Dict[str, Any]) -> Tuple[str, str]:
+        """Detailed video/face analysis (posture), and presence plus posture alone as its fallback."""
+        video_analysis = user_context.get('sensor_metrics', {}).get('video_analysis', {})
+        if not (video_analysis and video_analysis.get("face_detected")):
+            return "Face Detected: No\n", "Face Detected: No\n"
+        text = "Face Detected: Yes\n"
+        minimal = text
+        text += f"Face Size Ratio: {video_analysis.get('face_size_ratio', 0.0):.3f} (Lean/Focus)\n"
+        text += f"Face Vertical Pos: {video_analysis.get('vertical_position', 0.0):.2f} (0=Top, 1=Bottom)\n"
+
+        posture = video_analysis.get("posture_state")
+        if posture and posture != "neutral":
+            text += f"Posture: {posture}\n"
+            minimal += f"Posture: {posture}\n"
+
+        roll = video_analysis.get("face_roll_angle")
+        if roll and abs(roll) > 15:
+            text += f"Head Tilt: {roll:.1f} deg\n"
+        return text, minimal
+
+    def _trends_block(self, user_context: Dict[str, Any]) -> str:
+        # Windowed aggregates from the metric store (LogicEngine.metric_store)
+        trends = user_context.get('sensor_metrics', {}).get('trends') or {}
+        if not any(v is not None for v in trends.values()):
+            return ""
+
+        def _fmt(value, spec):
+            return format(value, spec) if value is not None else "n/a"
+        return (
+            f"Recent Trend (last {getattr(config, 'METRIC_TREND_WINDOW', 60)}s): "
+            f"Audio mean={_fmt(trends.get('audio_level_mean'), '.3f')} max={_fmt(trends.get('audio_level_max'), '.3f')}, "
+            f"Speech={_fmt(trends.get('speech_fraction'), '.0%')}, "
+            f"Motion mean={_fmt(trends.get('video_activity_mean'), '.1f')} max={_fmt(trends.get('video_activity_max'), '.1f')}, "
+            f"Face present={_fmt(trends.get('face_presence'), '.0%')}\n"
+        )
+
+    def _alerts_block(self, user_context: Dict[str, Any]) -> str:
+        # System Alerts (High Priority) depend on the latest history, so they stay in the volatile tail
+        alerts = user_context.get('system_alerts', [])
+        return f"\nSYSTEM ALERTS (High Priority): {', '.join(alerts)}\n" if alerts else ""
+
+    @staticmethod
+    def cache_hints() -> Dict[str, Any]:
+        """Server-side prompt cache hints (llama.cpp server) from config; empty unless configured."""
+        hints: Dict[str, Any] = {}
+        if getattr(config, 'LMM_CACHE_PROMPT', False):
+            hints["cache_prompt"] = True
+        slot_id = getattr(config, 'LMM_SLOT_ID', None)
+        if slot_id is not None and slot_id >= 0:
+            hints["id_slot"] = slot_id
+        return hints
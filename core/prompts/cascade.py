@@ -0,0 +1,6 @@
+TEXT_TIER_ADDENDUM = """
+Text-only screening:
+No camera image is attached to this request. Estimate the state from the sensor metrics, window and history alone, and return "visual_context": [].
+Add a top-level field "confidence": <float 0.0-1.0> saying how sure you are that the estimate and suggestion would not change if the camera image were available.
+Use a confidence below 0.5 when posture, phone usage, other people or anything else only visible in the image could matter.
+"""
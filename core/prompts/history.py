@@ -0,0 +1,6 @@
+HISTORY_NARRATIVE_PROMPT = """You keep a running diary of a user's computer session for a wellbeing assistant.
+Below are the previous summary (if any) and newer activity segments, oldest first. Each segment gives the
+application, mode, whether the user was at the desk, posture, sound, movement and duration.
+Write an updated summary of the whole session in at most {max_words} words: what the user worked on, for how long,
+breaks and notable changes. Do not invent details that are not in the segments.
+Return valid JSON: {{"summary": "..."}}"""
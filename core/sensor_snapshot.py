@@ -0,0 +1,65 @@
+import time
+from typing import Optional, Any, Dict
+
+import numpy as np
+
+
+class SensorSnapshot:
+    """
+    Immutable view of the latest processed sensor data.
+
+    LogicEngine never mutates a published snapshot; writers build a new one with
+    replace() and swap the reference (read-copy-update). Readers grab the reference
+    once and get a consistent set of values without taking a lock, even while the
+    next frame is being analysed. The contained dicts and arrays are treated as
+    owned by the snapshot and must not be modified in place.
+    """
+
+    __slots__ = (
+        "video_frame",
+        "previous_video_frame",
+        "audio_chunk",
+        "audio_level",
+        "video_activity",
+        "face_metrics",
+        "video_analysis",
+        "audio_analysis",
+        "timestamp",
+    )
+
+    def __init__(self,
+                 video_frame: Optional[np.ndarray] = None,
+                 previous_video_frame: Optional[np.ndarray] = None,
+                 audio_chunk: Optional[np.ndarray] = None,
+                 audio_level: float = 0.0,
+                 video_activity: float = 0.0,
+                 face_metrics: Optional[Dict[str, Any]] = None,
+                 video_analysis: Optional[Dict[str, Any]] = None,
+                 audio_analysis: Optional[Dict[str, Any]] = None,
+                 timestamp: Optional[float] = None) -> None:
+        _set = object.__setattr__
+        _set(self, "video_frame", video_frame)
+        _set(self, "previous_video_frame", previous_video_frame)
+        _set(self, "audio_chunk", audio_chunk)
+        _set(self, "audio_level", audio_level)
+        _set(self, "video_activity", video_activity)
+        _set(self, "face_metrics", face_metrics if face_metrics is not None else {"face_detected": False, "face_count": 0})
+        _set(self, "video_analysis", video_analysis if video_analysis is not None else {})
+        _set(self, "audio_analysis", audio_analysis if audio_analysis is not None else {})
+        _set(self, "timestamp", timestamp if timestamp is not None else time.time())
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"SensorSnapshot is immutable; use replace() to change '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("SensorSnapshot is immutable")
+
+    def replace(self, **changes: Any) -> "SensorSnapshot":
+        """Returns a new snapshot with `changes` applied and a fresh timestamp."""
+        values = {name: getattr(self, name) for name in self.__slots__ if name != "timestamp"}
+        values.update(changes)
+        return SensorSnapshot(**values)
+
+    def __repr__(self) -> str:
+        return (f"SensorSnapshot(audio_level={self.audio_level:.4f}, video_activity={self.video_activity:.2f}, "
+                f"face_detected={self.face_metrics.get('face_detected', False)})")
@@ -0,0 +1,214 @@
+import json
+import math
+import os
+import time
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+
+import numpy as np
+
+from .metric_store import POSTURES
+
+STATE_DIMENSIONS: Tuple[str, ...] = ("arousal", "overload", "focus", "energy", "mood", "sexual_arousal")
+
+# Sensor features, read from the `sensor_metrics` dict LogicEngine sends to the LMM (and logs with lmm_trigger)
+FEATURES: Tuple[str, ...] = (
+    "audio_level", "video_activity", "face_detected", "face_count",
+    "face_size_ratio", "vertical_position", "horizontal_position",
+    "is_speech", "speech_confidence", "pitch_variance", "speech_rate",
+    "trend_audio_mean", "trend_speech_fraction", "trend_video_mean", "trend_face_presence",
+) + tuple(f"posture_{name}" for name in POSTURES[1:])
+
+
+def _number(value: Any) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if math.isfinite(value) else 0.0
+
+
+def extract_features(sensor_metrics: Dict[str, Any]) -> np.ndarray:
+    """Fixed-order feature vector (see FEATURES); missing values count as 0."""
+    video = sensor_metrics.get("video_analysis") or {}
+    audio = sensor_metrics.get("audio_analysis") or {}
+    trends = sensor_metrics.get("trends") or {}
+    values = {
+        "audio_level": sensor_metrics.get("audio_level"),
+        "video_activity": sensor_metrics.get("video_activity"),
+        "face_detected": sensor_metrics.get("face_detected"),
+        "face_count": sensor_metrics.get("face_count"),
+        "face_size_ratio": video.get("face_size_ratio"),
+        "vertical_position": video.get("vertical_position"),
+        "horizontal_position": video.get("horizontal_position"),
+        "is_speech": audio.get("is_speech"),
+        "speech_confidence": audio.get("speech_confidence"),
+        "pitch_variance": audio.get("pitch_variance"),
+        "speech_rate": audio.get("speech_rate"),
+        "trend_audio_mean": trends.get("audio_level_mean"),
+        "trend_speech_fraction": trends.get("speech_fraction"),
+        "trend_video_mean": trends.get("video_activity_mean"),
+        "trend_face_presence": trends.get("face_presence"),
+    }
+    posture = video.get("posture_state")
+    for name in POSTURES[1:]:
+        values[f"posture_{name}"] = posture == name
+    return np.array([_number(values[name]) for name in FEATURES], dtype=np.float64)
+
+
+class StatePredictor:
+    """
+    Ridge regression from sensor features to the state dimensions, fitted offline from
+    events.jsonl by tools/train_state_predictor.py and evaluated at sensor rate by
+    LogicEngine to keep the state fresh between LMM calls.
+
+    `predict` returns the state and a confidence in [0, 1]: one minus the model's
+    cross-validated RMSE (averaged over dimensions) relative to `error_scale` points,
+    reduced further when the input is far outside the training data (any standardized
+    feature beyond `max_z`). Models trained on fewer than `min_samples` pairs always
+    report 0.
+    """
+
+    VERSION = 1
+
+    def __init__(self, mean: Sequence[float], scale: Sequence[float], weights: Sequence[Sequence[float]],
+                 intercept: Sequence[float], rmse: Sequence[float], samples: int, alpha: float = 1.0,
+                 features: Sequence[str] = FEATURES, dimensions: Sequence[str] = STATE_DIMENSIONS,
+                 error_scale: float = 25.0, max_z: float = 4.0, min_samples: int = 50) -> None:
+        self.features: Tuple[str, ...] = tuple(features)
+        self.dimensions: Tuple[str, ...] = tuple(dimensions)
+        self.mean: np.ndarray = np.asarray(mean, dtype=np.float64)
+        self.scale: np.ndarray = np.asarray(scale, dtype=np.float64)
+        self.weights: np.ndarray = np.asarray(weights, dtype=np.float64)   # (features, dimensions)
+        self.intercept: np.ndarray = np.asarray(intercept, dtype=np.float64)
+        self.rmse: np.ndarray = np.asarray(rmse, dtype=np.float64)
+        self.samples: int = int(samples)
+        self.alpha: float = float(alpha)
+        self.error_scale: float = error_scale
+        self.max_z: float = max_z
+        self.min_samples: int = min_samples
+
+    # --- Training ---
+
+    @staticmethod
+    def _solve(X: np.ndarray, Y: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale < 1e-9] = 1.0  # Constant features get zero weight anyway
+        Z = (X - mean) / scale
+        intercept = Y.mean(axis=0)
+        weights = np.linalg.solve(Z.T @ Z + alpha * np.eye(Z.shape[1]), Z.T @ (Y - intercept))
+        return mean, scale, weights, intercept
+
+    @classmethod
+    def fit(cls, X: np.ndarray, Y: np.ndarray, alpha: float = 1.0, folds: int = 5, **kwargs) -> "StatePredictor":
+        """Fits on all rows; the reported RMSE per dimension comes from `folds`-fold cross-validation."""
+        X = np.asarray(X, dtype=np.float64)
+        Y = np.asarray(Y, dtype=np.float64)
+        n = len(X)
+        if n == 0:
+            raise ValueError("No training samples")
+        residuals = np.zeros_like(Y)
+        folds = max(2, min(folds, n)) if n > 1 else 0
+        if folds:
+            # Contiguous folds: neighbouring samples are correlated, so shuffling would flatter the model
+            for idx in np.array_split(np.arange(n), folds):
+                train = np.setdiff1d(np.arange(n), idx)
+                mean, scale, weights, intercept = cls._solve(X[train], Y[train], alpha)
+                residuals[idx] = Y[idx] - (((X[idx] - mean) / scale) @ weights + intercept)
+            rmse = np.sqrt((residuals ** 2).mean(axis=0))
+        else:
+            rmse = np.full(Y.shape[1], float("inf"))
+        mean, scale, weights, intercept = cls._solve(X, Y, alpha)
+        return cls(mean, scale, weights, intercept, rmse, n, alpha=alpha, **kwargs)
+
+    # --- Inference ---
+
+    def predict(self, sensor_metrics: Dict[str, Any]) -> Tuple[Dict[str, int], float]:
+        z = (extract_features(sensor_metrics) - self.mean) / self.scale
+        values = z @ self.weights + self.intercept
+        state = {dim: int(round(min(100.0, max(0.0, v)))) for dim, v in zip(self.dimensions, values)}
+        if self.samples < self.min_samples:
+            return state, 0.0
+        confidence = max(0.0, 1.0 - float(np.mean(self.rmse)) / self.error_scale)
+        excess = float(np.max(np.abs(z))) - self.max_z if len(z) else 0.0
+        if excess > 0:
+            confidence *= math.exp(-excess)
+        return state, confidence
+
+    # --- Persistence ---
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.VERSION,
+            "trained_at": time.time(),
+            "features": list(self.features),
+            "dimensions": list(self.dimensions),
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "weights": self.weights.tolist(),
+            "intercept": self.intercept.tolist(),
+            "rmse": self.rmse.tolist(),
+            "samples": self.samples,
+            "alpha": self.alpha,
+        }
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["StatePredictor"]:
+        """The saved model, or None if there is none or it was trained on a different feature set."""
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get("version") != cls.VERSION or tuple(data.get("features", ())) != FEATURES:
+            return None
+        return cls(data["mean"], data["scale"], data["weights"], data["intercept"], data["rmse"], data["samples"],
+                   alpha=data.get("alpha", 1.0), dimensions=data.get("dimensions", STATE_DIMENSIONS))
+
+
+def training_pairs(events: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairs each `lmm_trigger` event's sensor metrics with the `lmm_state_estimation`
+    that followed it (before the next trigger) and returns (X, Y) for `StatePredictor.fit`.
+    The target is the LMM's raw estimate: `state_update` is the smoothed state, which
+    local predictions also feed once the predictor is enabled. Logs written before
+    raw estimates were logged fall back to the trigger's first `state_update`, until
+    the first `lmm_state_estimation` in `events` shows that the format changed.
+    """
+    rows: List[np.ndarray] = []
+    targets: List[List[float]] = []
+
+    def add(metrics: Dict[str, Any], state: Dict[str, Any]) -> None:
+        # sexual_arousal is optional in LMM responses and defaults to 0, as in StateEngine
+        if all(dim in state for dim in STATE_DIMENSIONS if dim != "sexual_arousal"):
+            rows.append(extract_features(metrics))
+            targets.append([_number(state.get(dim, 0)) for dim in STATE_DIMENSIONS])
+
+    pending: Optional[Dict[str, Any]] = None
+    legacy: Optional[Dict[str, Any]] = None  # state_update seen for the pending trigger
+    raw_logged = False
+    for event in events:
+        event_type = event.get("event_type")
+        payload = event.get("payload") or {}
+        if event_type == "lmm_trigger":
+            if pending is not None and legacy is not None and not raw_logged:
+                add(pending, legacy)
+            pending, legacy = payload.get("metrics"), None
+        elif event_type == "lmm_state_estimation":
+            raw_logged = True
+            if pending is not None:
+                add(pending, payload)
+            pending, legacy = None, None
+        elif event_type == "state_update" and pending is not None and legacy is None:
+            legacy = payload
+    if pending is not None and legacy is not None and not raw_logged:
+        add(pending, legacy)
+    X = np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURES))
+    Y = np.array(targets, dtype=np.float64).reshape(len(targets), len(STATE_DIMENSIONS))
+    return X, Y
@@ -38,6 +38,7 @@ def load_image(path):
 class ACRTrayIcon:
     def __init__(self, application_instance):
         self.app = application_instance # Reference to the main Application instance
+        self.task_runner = None # Set by AsyncRuntime; flashes then run on its bounded executor
         self.icon_paths = {
             "active": "assets/icons/active_icon.png",
             "paused": "assets/icons/paused_icon.png",
@@ -53,6 +54,9 @@ class ACRTrayIcon:
         self.icons["feedback_unhelpful"] = self.create_colored_icon("red", "NO")
 
         self.current_icon_state = "default" # e.g., "active", "paused"
+        # LMM circuit state ("closed", "open", "half_open") shown in the tooltip, and the last state shown
+        self.lmm_health = "closed"
+        self.last_state_info = None
 
         # Calculate snooze label
         snooze_minutes = config.SNOOZE_DURATION // 60
@@ -179,6 +183,7 @@ class ACRTrayIcon:
         """
         if not self.tray_icon:
             return
+        self.last_state_info = state_info
 
         tooltip_text = config.APP_NAME # Default
 
@@ -215,8 +220,18 @@ class ACRTrayIcon:
         elif isinstance(state_info, str):
             tooltip_text = f"{config.APP_NAME}\n{state_info}"
 
+        if self.lmm_health == "open":
+            tooltip_text += "\nLMM offline (local fallback)"
+        elif self.lmm_health == "half_open":
+            tooltip_text += "\nLMM reconnecting..."
+
         self.tray_icon.title = tooltip_text
 
+    def update_lmm_health(self, state):
+        """Shows the LMM circuit state ("closed", "open", "half_open") in the tooltip."""
+        self.lmm_health = state
+        self.update_tooltip(self.last_state_info)
+
     def flash_icon(self, flash_status="active", original_status=None, duration=0.5, flashes=2):
         """Briefly changes the icon to indicate an event (e.g., intervention)."""
         if not self.tray_icon: return
@@ -233,7 +248,10 @@ class ACRTrayIcon:
             # Ensure it returns to the correct state
             self.update_icon_status(original_status)
 
-        # Run flash in a separate thread to not block
+        # Run flash off the caller's thread to not block
+        if self.task_runner:
+            self.task_runner.submit_background(_flash)
+            return
         flash_thread = threading.Thread(target=_flash, daemon=True)
         flash_thread.start()
 
@@ -0,0 +1,234 @@
+import re
+import time
+import warnings
+from typing import Optional, Any, Dict, List, Union
+
+import numpy as np
+
+from .lmm_scheduler import PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_HIGH
+
+AGGREGATES = ("mean", "max", "min", "fraction_true", "last", "count")
+_AGG_CODES = {name: i for i, name in enumerate(AGGREGATES)}
+# Aggregates that describe the whole window ("for N seconds"): only valid once the metric has history that long
+DURATION_AGGREGATES = ("mean", "max", "min", "fraction_true")
+
+OPERATORS = (">", ">=", "<", "<=", "==", "!=")
+_OP_CODES = {op: i for i, op in enumerate(OPERATORS)}
+
+PRIORITIES = {"low": PRIORITY_LOW, "normal": PRIORITY_NORMAL, "high": PRIORITY_HIGH}
+
+# "mean(audio_rms, 3s) > 0.4", "fraction_true(is_speech, 3) < 0.2", ...
+_CONDITION_RE = re.compile(
+    r"^\s*(?P<agg>\w+)\(\s*(?P<metric>\w+)\s*,\s*(?P<window>[\d.]+)\s*s?\s*\)\s*(?P<op>>=|<=|==|!=|>|<)\s*(?P<value>-?[\d.]+)\s*$"
+)
+
+
+class TriggerRuleError(ValueError):
+    """Raised when a declared trigger rule cannot be compiled."""
+
+
+class TriggerRule:
+    """A compiled trigger rule (conditions are held by TriggerRuleEngine as arrays)."""
+
+    def __init__(self, name: str, action: str, priority: int, cooldown: float,
+                 modes: List[str], intervention: Optional[str], tier: int, n_conditions: int) -> None:
+        self.name = name
+        self.action = action              # "lmm" or "intervention"
+        self.priority = priority
+        self.cooldown = cooldown
+        self.modes = modes
+        self.intervention = intervention
+        self.tier = tier
+        self.n_conditions = n_conditions
+
+    def __repr__(self) -> str:
+        return f"TriggerRule({self.name!r}, action={self.action!r})"
+
+
+def parse_condition(condition: Union[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Normalises a condition given as a dict or as "agg(metric, Ns) op value"."""
+    if isinstance(condition, str):
+        match = _CONDITION_RE.match(condition)
+        if not match:
+            raise TriggerRuleError(f"Cannot parse condition '{condition}'")
+        condition = match.groupdict()
+
+    try:
+        parsed = {
+            "metric": condition["metric"],
+            "agg": condition.get("agg", "mean"),
+            "window": float(condition.get("window", 1.0)),
+            "op": condition.get("op", ">"),
+            "value": float(condition["value"]),
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise TriggerRuleError(f"Invalid condition {condition!r}: {e}")
+
+    if parsed["agg"] not in _AGG_CODES:
+        raise TriggerRuleError(f"Unknown aggregate '{parsed['agg']}' (expected one of {AGGREGATES})")
+    if parsed["op"] not in _OP_CODES:
+        raise TriggerRuleError(f"Unknown operator '{parsed['op']}'")
+    if parsed["window"] <= 0:
+        raise TriggerRuleError("Condition window must be positive")
+    return parsed
+
+
+class TriggerRuleEngine:
+    """
+    Evaluates declarative trigger rules over the MetricStore.
+
+    Rules are declared in config (TRIGGER_RULES), e.g.:
+
+        {"name": "sustained_noise",
+         "when": ["min(audio_rms, 3s) > 0.4", "fraction_true(is_speech, 3s) < 0.2"],
+         "action": "lmm", "priority": "high", "cooldown": 60, "modes": ["active"]}
+
+    "min(x, Ns) > X" reads as "x > X for N seconds", so duration aggregates (mean, max,
+    min, fraction_true) only hold once the metric's first sample is at least N seconds
+    old; a single fresh sample never satisfies them. At construction all conditions
+    are compiled into flat numpy arrays (column, aggregate, operator, threshold, rule).
+    evaluate() fetches each distinct window from the store once, computes every
+    aggregate for every condition with column-wise numpy ops, and reduces conditions
+    to rules with a bincount, so per-tick cost grows with the number of distinct
+    windows, not with the number of rules.
+
+    evaluate() only reports rules that are due; the caller starts a rule's cooldown
+    with mark_fired() once it has actually acted on it.
+    """
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]], store: Any, logger: Optional[Any] = None) -> None:
+        self.logger = logger
+        self.store = store
+        self.rules: List[TriggerRule] = []
+
+        cond_rule, cond_col, cond_agg, cond_op, cond_value, cond_window = [], [], [], [], [], []
+        for spec in rules or []:
+            try:
+                rule, conditions = self._compile_rule(spec)
+            except TriggerRuleError as e:
+                if self.logger: self.logger.log_warning(f"Ignoring trigger rule {spec.get('name', '?') if isinstance(spec, dict) else spec!r}: {e}")
+                continue
+            rule_idx = len(self.rules)
+            self.rules.append(rule)
+            for cond in conditions:
+                cond_rule.append(rule_idx)
+                cond_col.append(store.column_index(cond["metric"]))
+                cond_agg.append(_AGG_CODES[cond["agg"]])
+                cond_op.append(_OP_CODES[cond["op"]])
+                cond_value.append(cond["value"])
+                cond_window.append(cond["window"])
+
+        self._cond_rule = np.array(cond_rule, dtype=np.int64)
+        self._cond_col = np.array(cond_col, dtype=np.int64)
+        self._cond_agg = np.array(cond_agg, dtype=np.int64)
+        self._cond_op = np.array(cond_op, dtype=np.int64)
+        self._cond_value = np.array(cond_value, dtype=np.float64)
+        self._cond_duration = np.isin(self._cond_agg, [_AGG_CODES[a] for a in DURATION_AGGREGATES])
+        cond_window = np.array(cond_window, dtype=np.float64)
+        self._cond_window = cond_window
+        # Conditions grouped by window length: one store read per distinct window
+        self._window_groups = [(float(w), np.flatnonzero(cond_window == w)) for w in np.unique(cond_window)]
+
+        n = len(self.rules)
+        self._n_conditions = np.array([r.n_conditions for r in self.rules], dtype=np.int64)
+        self._cooldowns = np.array([r.cooldown for r in self.rules], dtype=np.float64)
+        self._last_fired = np.full(n, -np.inf)
+        self._mode_masks: Dict[str, np.ndarray] = {}
+        for mode in ("active", "dnd", "snoozed", "paused", "error"):
+            self._mode_masks[mode] = np.array([mode in r.modes for r in self.rules], dtype=bool)
+
+        if self.rules and self.logger:
+            self.logger.log_info(f"Compiled {n} trigger rules ({len(cond_rule)} conditions, {len(self._window_groups)} windows).")
+
+    def _compile_rule(self, spec: Dict[str, Any]):
+        if not isinstance(spec, dict) or not spec.get("name"):
+            raise TriggerRuleError("rule must be an object with a 'name'")
+        when = spec.get("when")
+        if isinstance(when, (str, dict)):
+            when = [when]
+        if not when:
+            raise TriggerRuleError("rule has no 'when' conditions")
+        conditions = [parse_condition(c) for c in when]
+        for cond in conditions:
+            if cond["metric"] not in self.store.columns:
+                raise TriggerRuleError(f"unknown metric '{cond['metric']}'")
+
+        action = spec.get("action", "lmm")
+        intervention = spec.get("intervention")
+        if intervention:
+            action = "intervention"
+        if action not in ("lmm", "intervention"):
+            raise TriggerRuleError(f"unknown action '{action}'")
+        if action == "intervention" and not intervention:
+            raise TriggerRuleError("intervention rules need an 'intervention' id")
+
+        priority = spec.get("priority", "normal")
+        priority = PRIORITIES.get(priority, priority) if isinstance(priority, str) else int(priority)
+        if not isinstance(priority, int):
+            raise TriggerRuleError(f"unknown priority '{spec.get('priority')}'")
+
+        rule = TriggerRule(
+            name=spec["name"],
+            action=action,
+            priority=priority,
+            cooldown=float(spec.get("cooldown", 30)),
+            modes=list(spec.get("modes", ["active"])),
+            intervention=intervention,
+            tier=int(spec.get("tier", 1)),
+            n_conditions=len(conditions),
+        )
+        return rule, conditions
+
+    def evaluate(self, mode: str, now: Optional[float] = None) -> List[TriggerRule]:
+        """Evaluates all rules in one pass; returns those whose conditions hold and whose cooldown has passed."""
+        if not self.rules:
+            return []
+        now = time.time() if now is None else now
+
+        values = np.full(len(self._cond_rule), np.nan)
+        with warnings.catch_warnings():
+            # All-NaN columns (no samples yet) are expected and simply evaluate to False
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            for window, idx in self._window_groups:
+                matrix = self.store.window_matrix(window, now)
+                if matrix.shape[0] == 0:
+                    continue
+                sub = matrix[:, self._cond_col[idx]]
+                valid = ~np.isnan(sub)
+
+                rows = sub.shape[0]
+                last_row = rows - 1 - np.argmax(valid[::-1], axis=0)
+                last = sub[last_row, np.arange(sub.shape[1])]
+
+                aggregates = np.vstack([
+                    np.nanmean(sub, axis=0),
+                    np.nanmax(sub, axis=0),
+                    np.nanmin(sub, axis=0),
+                    np.nanmean(np.where(valid, sub >= 0.5, np.nan), axis=0),
+                    last,
+                    valid.sum(axis=0).astype(np.float64),
+                ])
+                values[idx] = aggregates[self._cond_agg[idx], np.arange(len(idx))]
+
+        # Duration aggregates need the window covered: first sample at or before its start
+        covered = self.store.first_seen()[self._cond_col] <= now - self._cond_window
+        values[self._cond_duration & ~covered] = np.nan
+
+        t = self._cond_value
+        op = self._cond_op
+        with np.errstate(invalid='ignore'):
+            ok = np.select(
+                [op == 0, op == 1, op == 2, op == 3, op == 4, op == 5],
+                [values > t, values >= t, values < t, values <= t, values == t, values != t],
+                default=False,
+            ) & ~np.isnan(values)
+
+        satisfied = np.bincount(self._cond_rule, weights=ok, minlength=len(self.rules)) >= self._n_conditions
+        ready = (now - self._last_fired) >= self._cooldowns
+        mode_mask = self._mode_masks.get(mode, np.zeros(len(self.rules), dtype=bool))
+        fired = satisfied & ready & mode_mask
+        return [self.rules[i] for i in np.flatnonzero(fired)]
+
+    def mark_fired(self, rule: TriggerRule, now: Optional[float] = None) -> None:
+        """Starts `rule`'s cooldown; called when the engine has acted on it."""
+        self._last_fired[self.rules.index(rule)] = time.time() if now is None else now
@@ -10,6 +10,7 @@ from core.intervention_engine import InterventionEngine
 from core.system_tray import ACRTrayIcon
 from core.data_logger import DataLogger
 from core.lmm_interface import LMMInterface
+from core.event_scheduler import EventScheduler
 from sensors.video_sensor import VideoSensor
 from sensors.audio_sensor import AudioSensor
 from sensors.window_sensor import WindowSensor
@@ -26,23 +27,50 @@ class Application:
         self.logic_engine = None
         self.intervention_engine = None
         self.tray_icon = None
+        self.session_playback = None
+        self.session_recorder = None
+        # Session time while replaying a recording; None runs the engines on the wall clock
+        self.session_clock = None
 
         try:
             # Initialize sensors first, as they might be needed by LogicEngine
-            self.video_sensor = VideoSensor(config.CAMERA_INDEX, self.data_logger)
-            self.audio_sensor = AudioSensor(self.data_logger)
-            self.window_sensor = WindowSensor(self.data_logger)
+            if getattr(config, 'SESSION_PLAYBACK_PATH', None):
+                # Drive the pipeline from a recorded session instead of hardware
+                from sensors.session_recording import SessionPlayback, PlaybackClock, PlaybackVideoSensor, PlaybackAudioSensor, PlaybackWindowSensor
+                self.session_playback = SessionPlayback(config.SESSION_PLAYBACK_PATH, speed=getattr(config, 'SESSION_PLAYBACK_SPEED', 1.0))
+                self.session_clock = PlaybackClock(self.session_playback)
+                self.data_logger.log_info(f"Replaying sensor session {config.SESSION_PLAYBACK_PATH} ({self.session_playback.duration:.0f}s) at speed {self.session_playback.speed or 'unthrottled'}.")
+                self.video_sensor = PlaybackVideoSensor(self.session_playback, self.data_logger)
+                self.audio_sensor = PlaybackAudioSensor(self.session_playback, self.data_logger)
+                self.window_sensor = PlaybackWindowSensor(self.session_playback, self.data_logger)
+            else:
+                self.video_sensor = VideoSensor(config.CAMERA_INDEX, self.data_logger)
+                self.audio_sensor = AudioSensor(self.data_logger)
+                self.window_sensor = WindowSensor(self.data_logger)
+
+            if getattr(config, 'SESSION_RECORDING_PATH', None):
+                from sensors.session_recording import SessionRecorder, RecordingWindowSensor
+                self.session_recorder = SessionRecorder(
+                    config.SESSION_RECORDING_PATH,
+                    sample_rate=self.audio_sensor.sample_rate,
+                    channels=self.audio_sensor.channels,
+                    data_logger=self.data_logger
+                )
+                self.window_sensor = RecordingWindowSensor(self.window_sensor, self.session_recorder)
 
             # Initialize LMM Interface
             self.lmm_interface = LMMInterface(self.data_logger)
 
-            # Pass sensors and logger to LogicEngine
+            # Pass sensors and logger to LogicEngine. During playback it runs on session
+            # time, so its intervals and cooldowns scale with SESSION_PLAYBACK_SPEED
+            # (LMM requests still talk to a real server and keep wall-clock timeouts).
             self.logic_engine = LogicEngine(
                 audio_sensor=self.audio_sensor,
                 video_sensor=self.video_sensor,
                 window_sensor=self.window_sensor,
                 logger=self.data_logger,
-                lmm_interface=self.lmm_interface
+                lmm_interface=self.lmm_interface,
+                clock=self.session_clock
             )
             self.intervention_engine: InterventionEngine = InterventionEngine(self.logic_engine, self)
             self.logic_engine.set_intervention_engine(self.intervention_engine)
@@ -66,10 +94,20 @@ class Application:
         self.video_thread: Optional[threading.Thread] = None
         self.audio_thread: Optional[threading.Thread] = None
 
+        # Single wait primitive for the main loop (sensor data, hotkeys, LMM completions, timers)
+        self.scheduler: EventScheduler = EventScheduler()
+        self._last_known_mode: str = self.logic_engine.get_mode()
+        self._next_sensor_check: float = 0.0
+
+        # Set by AsyncRuntime when USE_ASYNC_RUNTIME is enabled
+        self.task_runner: Optional[Any] = None
+
         self.tray_icon: ACRTrayIcon = ACRTrayIcon(self)
         self.logic_engine.tray_callback = self.update_tray_status_and_notify
         self.logic_engine.state_update_callback = self.update_tray_tooltip
         self.logic_engine.notification_callback = self.send_notification
+        self.logic_engine.lmm_health_callback = self.update_tray_lmm_health
+        self.logic_engine.wake_callback = self.scheduler.notify
 
         self._setup_hotkeys()
 
@@ -115,6 +153,7 @@ class Application:
     def on_feedback_helpful_pressed(self) -> None:
         self.data_logger.log_info(f"Hotkey '{config.HOTKEY_FEEDBACK_HELPFUL}' pressed.")
         self.intervention_engine.register_feedback("helpful")
+        self.scheduler.notify("hotkey")
         # Optionally, provide some subtle confirmation feedback (e.g., short tray flash or sound)
         if self.tray_icon: # Example: quick flash of current icon
              self.tray_icon.flash_icon(flash_status="feedback_helpful", duration=0.3, flashes=1)
@@ -123,6 +162,7 @@ class Application:
     def on_feedback_unhelpful_pressed(self) -> None:
         self.data_logger.log_info(f"Hotkey '{config.HOTKEY_FEEDBACK_UNHELPFUL}' pressed.")
         self.intervention_engine.register_feedback("unhelpful")
+        self.scheduler.notify("hotkey")
         if self.tray_icon: # Example: quick flash
              self.tray_icon.flash_icon(flash_status="feedback_unhelpful", duration=0.3, flashes=1)
 
@@ -150,6 +190,10 @@ class Application:
         if self.tray_icon:
             self.tray_icon.update_tooltip(state_info)
 
+    def update_tray_lmm_health(self, state: str) -> None:
+        if self.tray_icon:
+            self.tray_icon.update_lmm_health(state)
+
     def on_cycle_mode_pressed(self, from_tray: bool = False) -> None:
         with self._sensor_lock:
             if self.sensor_error_active:
@@ -229,158 +273,218 @@ class Application:
         # Otherwise, Eco Mode (low FPS)
         return config.VIDEO_ECO_MODE_DELAY
 
+    def _poll_video_once(self) -> Optional[float]:
+        """
+        One iteration of the video worker: reads a frame (if active) and queues it.
+        Returns the delay before the next poll, or None if the worker should stop.
+        """
+        with self._sensor_lock:
+            sensor_error = self.sensor_error_active
+        if self.logic_engine.get_mode() != "active" or sensor_error:
+            # If not active or sensor error, sleep longer to reduce CPU usage
+            return 0.2
+
+        try:
+            frame, error = self.video_sensor.get_frame()
+            if not self.running: return None # Double check after potentially blocking call
+
+            if error:
+                self.data_logger.log_warning(f"Video sensor error in worker: {error}")
+                # We might still put an error marker or None frame in queue if needed
+                # For now, only put valid frames or rely on _check_sensors
+            # Determine dynamic poll delay
+            # Use locally calculated activity for instant response (no lag from main loop)
+            # We use update_history=False so we don't mess up the LogicEngine's state tracking
+            # Calculate BEFORE queueing to avoid race condition with LogicEngine updating last_frame
+            instant_activity = 0.0
+            if frame is not None:
+                 if self.session_recorder:
+                     self.session_recorder.record_frame(frame)
+                 instant_activity = self.video_sensor.calculate_activity(frame, update_history=False)
+
+            next_sleep_time = self._get_video_poll_delay(instant_activity)
+
+            if frame is not None:
+                try:
+                    self.video_queue.put((frame, error), timeout=0.1) # Short timeout
+                    self.scheduler.notify("video")
+                except queue.Full:
+                    self.data_logger.log_debug("Video queue full, frame discarded.")
+                    pass # Frame discarded
+            elif error: # If frame is None due to error
+                 # Potentially put an error marker in the queue if main loop needs to react instantly
+                 # For now, _check_sensors will handle persistent errors.
+                 pass
+
+            return next_sleep_time
+
+        except Exception as e:
+            # Ignore errors if we are shutting down
+            if not self.running: return None
+            self.data_logger.log_error(f"Exception in video worker: {e}")
+            return 1.0 # Wait a bit longer after an unexpected error
+
+    def _poll_audio_once(self) -> Optional[float]:
+        """
+        One iteration of the audio worker: reads a chunk (if active) and queues it.
+        Returns the delay before the next poll, or None if the worker should stop.
+        """
+        with self._sensor_lock:
+            sensor_error = self.sensor_error_active
+        if self.logic_engine.get_mode() != "active" or sensor_error:
+            return 0.2
+
+        try:
+            chunk, error = self.audio_sensor.get_chunk()
+            if not self.running: return None # Double check after potentially blocking call
+
+            if error:
+                # Log warning unless it's just a shutdown symptom
+                if self.running:
+                    self.data_logger.log_warning(f"Audio sensor error in worker: {error}")
+
+            if chunk is not None:
+                if self.session_recorder:
+                    self.session_recorder.record_audio(chunk)
+                try:
+                    self.audio_queue.put((chunk, error), timeout=0.1)
+                    self.scheduler.notify("audio")
+                except queue.Full:
+                    self.data_logger.log_debug("Audio queue full, chunk discarded.")
+                    pass # Chunk discarded
+            elif error: # If chunk is None due to error
+                pass
+
+            # Audio sensor's get_chunk might return None if not enough data is ready,
+            # so a short sleep helps avoid busy-looping.
+            # sounddevice's InputStream usually has its own internal buffering thread.
+            return 0.05 # Poll frequently but allow other things to run
+
+        except Exception as e:
+            if not self.running: return None
+            self.data_logger.log_error(f"Exception in audio worker: {e}")
+            return 1.0
+
     def _video_worker(self) -> None:
         self.data_logger.log_info("Video worker thread started.")
         while self.running:
-            with self._sensor_lock:
-                sensor_error = self.sensor_error_active
-            if self.logic_engine.get_mode() == "active" and not sensor_error:
-                try:
-                    frame, error = self.video_sensor.get_frame()
-                    if not self.running: break # Double check after potentially blocking call
-
-                    if error:
-                        self.data_logger.log_warning(f"Video sensor error in worker: {error}")
-                        # We might still put an error marker or None frame in queue if needed
-                        # For now, only put valid frames or rely on _check_sensors
-                    # Determine dynamic poll delay
-                    # Use locally calculated activity for instant response (no lag from main loop)
-                    # We use update_history=False so we don't mess up the LogicEngine's state tracking
-                    # Calculate BEFORE queueing to avoid race condition with LogicEngine updating last_frame
-                    instant_activity = 0.0
-                    if frame is not None:
-                         instant_activity = self.video_sensor.calculate_activity(frame, update_history=False)
-
-                    next_sleep_time = self._get_video_poll_delay(instant_activity)
-
-                    if frame is not None:
-                        try:
-                            self.video_queue.put((frame, error), timeout=0.1) # Short timeout
-                        except queue.Full:
-                            self.data_logger.log_debug("Video queue full, frame discarded.")
-                            pass # Frame discarded
-                    elif error: # If frame is None due to error
-                         # Potentially put an error marker in the queue if main loop needs to react instantly
-                         # For now, _check_sensors will handle persistent errors.
-                         pass
-
-                    time.sleep(next_sleep_time)
-
-                except Exception as e:
-                    # Ignore errors if we are shutting down
-                    if not self.running: break
-                    self.data_logger.log_error(f"Exception in video worker: {e}")
-                    time.sleep(1) # Wait a bit longer after an unexpected error
-            else:
-                # If not active or sensor error, sleep longer to reduce CPU usage
-                time.sleep(0.2)
+            delay = self._poll_video_once()
+            if delay is None: break
+            time.sleep(delay)
         self.data_logger.log_info("Video worker thread stopped.")
 
     def _audio_worker(self) -> None:
         self.data_logger.log_info("Audio worker thread started.")
         while self.running:
-            with self._sensor_lock:
-                sensor_error = self.sensor_error_active
-            if self.logic_engine.get_mode() == "active" and not sensor_error:
-                try:
-                    chunk, error = self.audio_sensor.get_chunk()
-                    if not self.running: break # Double check after potentially blocking call
-
-                    if error:
-                        # Log warning unless it's just a shutdown symptom
-                        if self.running:
-                            self.data_logger.log_warning(f"Audio sensor error in worker: {error}")
-
-                    if chunk is not None:
-                        try:
-                            self.audio_queue.put((chunk, error), timeout=0.1)
-                        except queue.Full:
-                            self.data_logger.log_debug("Audio queue full, chunk discarded.")
-                            pass # Chunk discarded
-                    elif error: # If chunk is None due to error
-                        pass
-
-                    # Audio sensor's get_chunk might return None if not enough data is ready,
-                    # so a short sleep helps avoid busy-looping.
-                    # sounddevice's InputStream usually has its own internal buffering thread.
-                    time.sleep(0.05) # Poll frequently but allow other things to run
-
-                except Exception as e:
-                    if not self.running: break
-                    self.data_logger.log_error(f"Exception in audio worker: {e}")
-                    time.sleep(1)
-            else:
-                time.sleep(0.2)
+            delay = self._poll_audio_once()
+            if delay is None: break
+            time.sleep(delay)
         self.data_logger.log_info("Audio worker thread stopped.")
 
+    def _drain_sensor_queues(self) -> None:
+        """Hands every queued video frame and audio chunk to the LogicEngine."""
+        while True:
+            try:
+                frame, video_err = self.video_queue.get_nowait()
+            except queue.Empty:
+                break
+            if video_err:
+                self.data_logger.log_warning(f"Video frame read error from queue: {video_err}")
+            # Process frame if not None (e.g., pass to logic engine)
+            if frame is not None:
+                self.logic_engine.process_video_data(frame)
+                self.data_logger.log_debug(f"Dequeued video frame. Shape: {frame.shape}")
+            self.video_queue.task_done() # Signal that item processing is complete
+
+        while True:
+            try:
+                audio_chunk, audio_err = self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+            if audio_err:
+                self.data_logger.log_warning(f"Audio chunk read error from queue: {audio_err}")
+            if audio_chunk is not None:
+                self.logic_engine.process_audio_data(audio_chunk)
+                self.data_logger.log_debug(f"Dequeued audio chunk. Shape: {audio_chunk.shape}")
+            self.audio_queue.task_done()
+
+    def _run_iteration(self) -> Optional[float]:
+        """
+        One pass of the decision loop: sensor health, tray status, queued sensor
+        data and the LogicEngine update. Returns the wall-clock deadline the loop
+        may sleep until if nothing else happens.
+        """
+        now = time.time()
+        if now >= self._next_sensor_check:
+            self._check_sensors()
+            self._next_sensor_check = now + getattr(config, 'SENSOR_HEALTH_CHECK_INTERVAL', 0.5)
+
+        current_mode = self.logic_engine.get_mode()
+
+        if current_mode != self._last_known_mode:
+            if self.sensor_error_active:
+                if self.tray_icon: self.tray_icon.update_icon_status("error")
+            else:
+                if self.tray_icon: self.tray_icon.update_icon_status(current_mode)
+            self._last_known_mode = current_mode
+
+        if current_mode == "active" and not self.sensor_error_active:
+            self._drain_sensor_queues()
+
+        # Let the logic engine handle its own periodic updates, including LMM calls
+        self.logic_engine.update()
+
+        if self.session_playback and self.session_playback.finished:
+            self.data_logger.log_info("Sensor session playback finished.")
+            self.quit_application()
+            return None
+
+        # Next timed deadline (snooze expiry, periodic LMM, history sample, sensor check, ...)
+        deadline = self._next_sensor_check
+        engine_deadline = self.logic_engine.get_next_deadline()
+        if isinstance(engine_deadline, (int, float)):
+            if self.session_clock is not None:
+                # Engine deadlines are in session time
+                engine_deadline = self.session_clock.to_wall_time(engine_deadline, now)
+            deadline = min(deadline, engine_deadline)
+        return deadline
+
     def run(self) -> None:
         if self.tray_icon:
             self.tray_icon.run_threaded()
 
+        self._last_known_mode = self.logic_engine.get_mode()
+        self._next_sensor_check = 0.0
+
+        if getattr(config, 'LMM_WARMUP_ENABLED', True):
+            # Model load and prompt caching happen off the main loop, before the first analysis
+            self.logic_engine.start_lmm_warm_up()
+
+        if getattr(config, 'USE_ASYNC_RUNTIME', False):
+            # Sensors, LMM calls and interventions run as tasks on one event loop
+            from core.async_runtime import AsyncRuntime
+            try:
+                AsyncRuntime(self).run()
+            finally:
+                self._shutdown()
+            return
+
         # Start sensor worker threads
         self.video_thread = threading.Thread(target=self._video_worker, daemon=True)
         self.video_thread.start()
         self.audio_thread = threading.Thread(target=self._audio_worker, daemon=True)
         self.audio_thread.start()
 
-        last_known_mode = self.logic_engine.get_mode()
-        loop_counter = 0
-
         try:
             while self.running:
-                # print(f"Main loop iteration: {loop_counter}")
-                loop_counter += 1
-                if loop_counter % 10 == 0: # Check sensors slightly less often than main loop spins
-                     self._check_sensors()
-
-                current_mode = self.logic_engine.get_mode()
-
-                if current_mode != last_known_mode:
-                    if self.sensor_error_active:
-                        if self.tray_icon: self.tray_icon.update_icon_status("error")
-                    else:
-                        if self.tray_icon: self.tray_icon.update_icon_status(current_mode)
-                    last_known_mode = current_mode
-
-                video_data_processed = False
-                audio_data_processed = False
-
-                if current_mode == "active" and not self.sensor_error_active:
-                    # Process video queue
-                    try:
-                        frame, video_err = self.video_queue.get_nowait()
-                        if video_err:
-                            self.data_logger.log_warning(f"Video frame read error from queue: {video_err}")
-                        # Process frame if not None (e.g., pass to logic engine)
-                        if frame is not None:
-                            self.logic_engine.process_video_data(frame)
-                            self.data_logger.log_debug(f"Dequeued video frame. Shape: {frame.shape}")
-                        video_data_processed = True
-                        self.video_queue.task_done() # Signal that item processing is complete
-                    except queue.Empty:
-                        pass # No new video frame
-
-                    # Process audio queue
-                    try:
-                        audio_chunk, audio_err = self.audio_queue.get_nowait()
-                        if audio_err:
-                            self.data_logger.log_warning(f"Audio chunk read error from queue: {audio_err}")
-                        if audio_chunk is not None:
-                            self.logic_engine.process_audio_data(audio_chunk)
-                            self.data_logger.log_debug(f"Dequeued audio chunk. Shape: {audio_chunk.shape}")
-                        audio_data_processed = True
-                        self.audio_queue.task_done()
-                    except queue.Empty:
-                        pass # No new audio chunk
-
-                # Let the logic engine handle its own periodic updates, including LMM calls
-                self.logic_engine.update()
-
-                # Adjust sleep time based on whether we processed sensor data
-                if not video_data_processed and not audio_data_processed:
-                    time.sleep(0.05)
-                else:
-                    time.sleep(0.01)
+                deadline = self._run_iteration()
+
+                if not self.running:
+                    break
+
+                # Block until new sensor data, a hotkey, an LMM completion, a mode change,
+                # or the next timed deadline
+                self.scheduler.wait_until(deadline)
 
         finally:
             self._shutdown()
@@ -390,6 +494,8 @@ class Application:
 
         # Ensure running is False so threads know to stop
         self.running = False
+        self.scheduler.stop()
+        self.data_logger.log_info(f"Main loop wake-ups by source: {self.scheduler.get_stats()}")
 
         # 1. Join worker threads first (let them finish current read naturally)
         if self.video_thread and self.video_thread.is_alive():
@@ -419,9 +525,15 @@ class Application:
             except Exception as e:
                 self.data_logger.log_warning(f"Error releasing audio sensor: {e}")
 
+        if self.session_recorder:
+            self.session_recorder.close()
+        if self.session_playback:
+            self.session_playback.close()
+
         # 3. Shutdown engines
         if hasattr(self, 'logic_engine') and self.logic_engine: self.logic_engine.shutdown()
         if hasattr(self, 'intervention_engine') and self.intervention_engine: self.intervention_engine.shutdown()
+        if hasattr(self, 'lmm_interface') and self.lmm_interface: self.lmm_interface.close()
 
         if hasattr(self, 'tray_icon') and self.tray_icon: self.tray_icon.stop()
 
@@ -445,6 +557,7 @@ class Application:
             return
         self.data_logger.log_info("Quit signal received.")
         self.running = False
+        self.scheduler.stop()
 
 if __name__ == "__main__":
     if not hasattr(config, 'CAMERA_INDEX'): config.CAMERA_INDEX = 0
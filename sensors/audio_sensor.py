@@ -1,4 +1,8 @@
-import sounddevice as sd
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    # No PortAudio (e.g. headless boxes replaying recorded sessions)
+    sd = None
 import numpy as np
 import time
 import collections
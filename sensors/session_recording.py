@@ -0,0 +1,394 @@
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Optional, Any, Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from core.clock import Clock, SYSTEM_CLOCK, VirtualClock
+from sensors.audio_sensor import AudioSensor
+from sensors.video_sensor import VideoSensor
+from sensors.window_sensor import WindowSensor
+
+# A session is a directory:
+#   session.json  - format version and audio parameters
+#   video.mjpg    - JPEG frames appended back to back
+#   audio.pcm     - interleaved little-endian float32 samples
+#   index.jsonl   - one line per frame / audio chunk / window change, in recording order:
+#                   {"t": ts, "type": "video", "offset": byte_offset, "size": n_bytes}
+#                   {"t": ts, "type": "audio", "offset": sample_offset, "samples": n_samples}
+#                   {"t": ts, "type": "window", "title": "..."}
+# The index is appended as data arrives; a truncated last line (interrupted recording) is ignored on load.
+SESSION_FORMAT_VERSION = 1
+MANIFEST_FILE = "session.json"
+VIDEO_FILE = "video.mjpg"
+AUDIO_FILE = "audio.pcm"
+INDEX_FILE = "index.jsonl"
+
+
+class SessionRecorder:
+    """
+    Records raw sensor streams (video frames, audio chunks, window-title changes)
+    with their capture timestamps. Safe to call from the sensor worker threads.
+    """
+
+    def __init__(self, path: str, sample_rate: int = 44100, channels: int = 1, jpeg_quality: int = 90, data_logger: Optional[Any] = None) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.jpeg_quality = jpeg_quality
+        self.logger = data_logger
+        self._lock = threading.Lock()
+        self._closed = False
+        self._last_title: Optional[str] = None
+        self._audio_samples = 0
+
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, MANIFEST_FILE), 'w') as f:
+            json.dump({
+                "version": SESSION_FORMAT_VERSION,
+                "created": time.time(),
+                "sample_rate": sample_rate,
+                "channels": channels,
+                "audio_format": "float32le",
+                "video_format": "jpeg",
+            }, f, indent=2)
+
+        self._video_file = open(os.path.join(path, VIDEO_FILE), 'wb')
+        self._audio_file = open(os.path.join(path, AUDIO_FILE), 'wb')
+        self._index_file = open(os.path.join(path, INDEX_FILE), 'w')
+        self.counts: Dict[str, int] = {"video": 0, "audio": 0, "window": 0}
+
+        if self.logger:
+            self.logger.log_info(f"SessionRecorder: Recording sensor session to {path}")
+
+    def _write_index(self, entry: Dict[str, Any]) -> None:
+        self._index_file.write(json.dumps(entry) + "\n")
+        self.counts[entry["type"]] += 1
+
+    def record_frame(self, frame: np.ndarray, timestamp: Optional[float] = None) -> None:
+        ts = timestamp if timestamp is not None else time.time()
+        ok, encoded = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality])
+        if not ok:
+            if self.logger:
+                self.logger.log_warning("SessionRecorder: Failed to encode video frame.")
+            return
+        data = encoded.tobytes()
+        with self._lock:
+            if self._closed:
+                return
+            offset = self._video_file.tell()
+            self._video_file.write(data)
+            self._write_index({"t": ts, "type": "video", "offset": offset, "size": len(data)})
+
+    def record_audio(self, chunk: np.ndarray, timestamp: Optional[float] = None) -> None:
+        ts = timestamp if timestamp is not None else time.time()
+        samples = np.ascontiguousarray(chunk, dtype='<f4').reshape(-1, self.channels)
+        with self._lock:
+            if self._closed:
+                return
+            self._audio_file.write(samples.tobytes())
+            self._write_index({"t": ts, "type": "audio", "offset": self._audio_samples, "samples": len(samples)})
+            self._audio_samples += len(samples)
+
+    def record_window(self, title: str, timestamp: Optional[float] = None) -> None:
+        """Records the active window title; unchanged titles are skipped."""
+        ts = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            if self._closed or title == self._last_title:
+                return
+            self._last_title = title
+            self._write_index({"t": ts, "type": "window", "title": title})
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            for f in (self._video_file, self._audio_file, self._index_file):
+                f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for f in (self._video_file, self._audio_file, self._index_file):
+                f.close()
+        if self.logger:
+            self.logger.log_info(f"SessionRecorder: Closed {self.path} ({self.counts['video']} frames, {self.counts['audio']} audio chunks, {self.counts['window']} window changes).")
+
+
+class RecordingWindowSensor:
+    """Wraps a WindowSensor and records every title it returns (changes only)."""
+
+    def __init__(self, window_sensor: Any, recorder: SessionRecorder) -> None:
+        self.window_sensor = window_sensor
+        self.recorder = recorder
+
+    def get_active_window(self, sanitize: bool = True) -> str:
+        title = self.window_sensor.get_active_window(sanitize=sanitize)
+        # Only sanitized titles are persisted
+        recorded = title if sanitize else self.window_sensor._sanitize_title(title)
+        self.recorder.record_window(recorded)
+        return title
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.window_sensor, name)
+
+
+class SessionPlayback:
+    """
+    Seekable reader for a recorded session, shared by the playback sensors.
+
+    speed=1.0 replays in real time, speed=N at N times real time, and speed=0 (or None)
+    is unthrottled: every read returns the next item immediately. In throttled mode
+    video behaves like a camera (stale frames are dropped if the reader falls behind)
+    while audio chunks are all delivered in order, like the sounddevice queue.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, clock: Optional[Clock] = None) -> None:
+        self.path = path
+        self.speed: float = float(speed) if speed else 0.0
+        self.clock: Clock = clock if clock is not None else SYSTEM_CLOCK
+        self._lock = threading.Lock()
+
+        with open(os.path.join(path, MANIFEST_FILE), 'r') as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        self.sample_rate: int = int(self.manifest.get("sample_rate", 44100))
+        self.channels: int = int(self.manifest.get("channels", 1))
+
+        self.video: List[Tuple[float, int, int]] = []
+        self.audio: List[Tuple[float, int, int]] = []
+        self.windows: List[Tuple[float, str]] = []
+        with open(os.path.join(path, INDEX_FILE), 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # Truncated last line of an interrupted recording
+                if entry["type"] == "video":
+                    self.video.append((entry["t"], entry["offset"], entry["size"]))
+                elif entry["type"] == "audio":
+                    self.audio.append((entry["t"], entry["offset"], entry["samples"]))
+                elif entry["type"] == "window":
+                    self.windows.append((entry["t"], entry["title"]))
+        self._video_ts = [v[0] for v in self.video]
+        self._audio_ts = [a[0] for a in self.audio]
+        self._window_ts = [w[0] for w in self.windows]
+
+        all_ts = self._video_ts[:1] + self._audio_ts[:1] + self._window_ts[:1]
+        self.start_time: float = min(all_ts) if all_ts else 0.0
+        end_ts = self._video_ts[-1:] + self._audio_ts[-1:] + self._window_ts[-1:]
+        self.end_time: float = max(end_ts) if end_ts else self.start_time
+
+        self._video_file = open(os.path.join(path, VIDEO_FILE), 'rb')
+        self._audio_file = open(os.path.join(path, AUDIO_FILE), 'rb')
+
+        self._video_cursor = 0
+        self._audio_cursor = 0
+        # Session time reached by the readers (unthrottled) / anchor for throttled playback
+        self._position: float = self.start_time
+        self._wall_anchor: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+    @property
+    def finished(self) -> bool:
+        with self._lock:
+            return self._video_cursor >= len(self.video) and self._audio_cursor >= len(self.audio)
+
+    def position(self) -> float:
+        """Current session timestamp."""
+        with self._lock:
+            return self._position_unlocked()
+
+    def _position_unlocked(self) -> float:
+        if not self.speed or self._wall_anchor is None:
+            return self._position
+        return self._position + (self.clock.time() - self._wall_anchor) * self.speed
+
+    def seek(self, offset: float) -> None:
+        """Moves playback to `offset` seconds after the start of the session."""
+        target = self.start_time + max(0.0, offset)
+        with self._lock:
+            self._video_cursor = bisect.bisect_left(self._video_ts, target)
+            self._audio_cursor = bisect.bisect_left(self._audio_ts, target)
+            self._position = target
+            self._wall_anchor = self.clock.time() if self._wall_anchor is not None else None
+
+    def _wait_for(self, ts: float) -> None:
+        """Throttled mode: blocks until session time reaches `ts`."""
+        with self._lock:
+            if self._wall_anchor is None:
+                self._wall_anchor = self.clock.time()
+            remaining = ts - self._position_unlocked()
+        if remaining > 0:
+            self.clock.sleep(remaining / self.speed)
+
+    def _advance_unthrottled(self, ts: float) -> None:
+        with self._lock:
+            self._position = max(self._position, ts)
+
+    def read_frame(self) -> Optional[np.ndarray]:
+        """Returns the next due video frame, or None at the end of the session."""
+        with self._lock:
+            if self._video_cursor >= len(self.video):
+                return None
+            ts = self.video[self._video_cursor][0]
+        if self.speed:
+            self._wait_for(ts)
+            with self._lock:
+                # Skip to the newest frame that is already due
+                now = self._position_unlocked()
+                self._video_cursor = max(self._video_cursor, bisect.bisect_right(self._video_ts, now) - 1)
+                if self._video_cursor >= len(self.video):
+                    return None
+                entry = self.video[self._video_cursor]
+                self._video_cursor += 1
+        else:
+            with self._lock:
+                entry = self.video[self._video_cursor]
+                self._video_cursor += 1
+            self._advance_unthrottled(entry[0])
+        return self.frame_at(entry)
+
+    def frame_at(self, entry: Tuple[float, int, int]) -> Optional[np.ndarray]:
+        _, offset, size = entry
+        with self._lock:
+            self._video_file.seek(offset)
+            data = self._video_file.read(size)
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def read_chunk(self) -> Optional[np.ndarray]:
+        """Returns the next audio chunk as a (samples, channels) float32 array, or None at the end."""
+        with self._lock:
+            if self._audio_cursor >= len(self.audio):
+                return None
+            entry = self.audio[self._audio_cursor]
+            self._audio_cursor += 1
+        if self.speed:
+            self._wait_for(entry[0])
+        else:
+            self._advance_unthrottled(entry[0])
+        return self.chunk_at(entry)
+
+    def chunk_at(self, entry: Tuple[float, int, int]) -> np.ndarray:
+        _, offset, samples = entry
+        bytes_per_sample = 4 * self.channels
+        with self._lock:
+            self._audio_file.seek(offset * bytes_per_sample)
+            data = self._audio_file.read(samples * bytes_per_sample)
+        return np.frombuffer(data, dtype='<f4').reshape(-1, self.channels).copy()
+
+    def window_title(self) -> str:
+        """Window title active at the current session position."""
+        with self._lock:
+            index = bisect.bisect_right(self._window_ts, self._position_unlocked()) - 1
+        if index < 0:
+            return "Unknown"
+        return self.windows[index][1]
+
+    def close(self) -> None:
+        with self._lock:
+            self._video_file.close()
+            self._audio_file.close()
+
+
+class PlaybackClock(VirtualClock):
+    """
+    Session time of a SessionPlayback as a VirtualClock, for the engines that consume it.
+
+    Every reading catches up with the playback position, so LogicEngine intervals,
+    cooldowns and min-interval checks run at playback speed instead of wall speed.
+    sleep()/wait() last the equivalent wall time (seconds / speed) while playback is
+    throttled, and advance instantly when it is unthrottled.
+    """
+
+    def __init__(self, playback: SessionPlayback) -> None:
+        super().__init__(playback.start_time)
+        self.playback = playback
+
+    def time(self) -> float:
+        self.set(self.playback.position())
+        return super().time()
+
+    def sleep(self, seconds: float) -> None:
+        if self.playback.speed:
+            self.playback.clock.sleep(max(0.0, seconds) / self.playback.speed)
+        else:
+            self.advance(seconds)
+
+    def wait(self, event: threading.Event, timeout: Optional[float] = None) -> bool:
+        if self.playback.speed:
+            return self.playback.clock.wait(event, None if timeout is None else timeout / self.playback.speed)
+        return super().wait(event, timeout)
+
+    def to_wall_time(self, timestamp: float, now: Optional[float] = None) -> float:
+        """Wall-clock time at which session time reaches `timestamp` (immediately when unthrottled)."""
+        now = self.playback.clock.time() if now is None else now
+        if not self.playback.speed:
+            return now
+        return now + max(0.0, timestamp - self.time()) / self.playback.speed
+
+
+class PlaybackVideoSensor(VideoSensor):
+    """VideoSensor that reads frames from a SessionPlayback instead of a camera."""
+
+    def __init__(self, playback: SessionPlayback, data_logger: Optional[Any] = None, history_size: int = 5) -> None:
+        self.playback = playback
+        # camera_index=None skips opening hardware; analysis (cascades, activity) is the real one
+        super().__init__(camera_index=None, data_logger=data_logger, history_size=history_size)
+
+    def get_frame(self):
+        frame = self.playback.read_frame()
+        if frame is None:
+            return None, "Session playback finished."
+        return frame, None
+
+    def release(self):
+        pass
+
+
+class PlaybackAudioSensor(AudioSensor):
+    """AudioSensor that reads chunks from a SessionPlayback instead of a microphone."""
+
+    def __init__(self, playback: SessionPlayback, data_logger: Optional[Any] = None, chunk_duration: float = 1.0, history_seconds: int = 5) -> None:
+        self.playback = playback
+        super().__init__(data_logger=data_logger, sample_rate=playback.sample_rate, chunk_duration=chunk_duration,
+                         channels=playback.channels, history_seconds=history_seconds)
+
+    def _check_devices(self):
+        pass
+
+    def _initialize_stream(self):
+        self.error_state = False
+        self.last_error_message = ""
+
+    def get_chunk(self):
+        chunk = self.playback.read_chunk()
+        if chunk is None:
+            return None, "Session playback finished."
+        return chunk, None
+
+    def release(self):
+        pass
+
+
+class PlaybackWindowSensor(WindowSensor):
+    """WindowSensor that reports the recorded window title at the current playback position."""
+
+    def __init__(self, playback: SessionPlayback, logger: Optional[Any] = None) -> None:
+        self.playback = playback
+        super().__init__(logger)
+
+    def _setup_platform(self):
+        pass
+
+    def get_active_window(self, sanitize: bool = True) -> str:
+        title = self.playback.window_title()
+        return self._sanitize_title(title) if sanitize else title
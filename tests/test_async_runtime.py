@@ -0,0 +1,160 @@
+import asyncio
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from core.async_runtime import AsyncRuntime
+from core.event_scheduler import EventScheduler
+from core.intervention_engine import InterventionEngine
+from core.logic_engine import LogicEngine
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    def setUp(self):
+        self.app = MagicMock()
+        self.app.scheduler = EventScheduler()
+        self.app.logic_engine = LogicEngine(logger=MagicMock())
+        self.app.logic_engine.lmm_interface = MagicMock()
+
+        with patch('core.intervention_engine.sd', MagicMock()):
+            self.app.intervention_engine = InterventionEngine(self.app.logic_engine, self.app)
+        self.app.intervention_engine.voice_interface = MagicMock()
+
+        self.runtime = AsyncRuntime(self.app, max_workers=2)
+        self.runtime.start_in_thread()
+
+    def tearDown(self):
+        self.runtime.stop()
+
+    def test_hooks_installed(self):
+        self.assertIs(self.app.logic_engine.task_runner, self.runtime)
+        self.assertIs(self.app.intervention_engine.task_runner, self.runtime)
+        self.assertIs(self.app.task_runner, self.runtime)
+
+    def test_lmm_analysis_task_updates_state(self):
+        engine = self.app.logic_engine
+        engine.lmm_interface.process_data.return_value = {
+            "state_estimation": {"arousal": 80, "overload": 10, "focus": 60, "energy": 70, "mood": 55},
+            "suggestion": None,
+        }
+        wake = MagicMock()
+        engine.wake_callback = wake
+
+        handle = self.runtime.start_lmm_analysis(engine, {"video_data": None, "audio_data": None, "user_context": {}}, False)
+        handle.join(timeout=5.0)
+
+        self.assertFalse(handle.is_alive())
+        engine.lmm_interface.process_data.assert_called_once()
+        wake.assert_called_with("lmm_complete")
+        self.assertEqual(engine.lmm_consecutive_failures, 0)
+
+    def test_lmm_completion_runs_off_the_event_loop(self):
+        # Completion may dispatch the next request, whose payload building must not block the loop
+        engine = self.app.logic_engine
+        engine.lmm_interface.process_data.return_value = None
+        on_loop = []
+
+        def done(request):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+
+        engine._on_lmm_request_done = done
+        handle = self.runtime.start_lmm_analysis(engine, {"video_data": None, "audio_data": None, "user_context": {}}, False)
+        handle.join(timeout=5.0)
+        self.assertEqual(on_loop, [False])
+
+    def test_lmm_analysis_error_counts_failure(self):
+        engine = self.app.logic_engine
+        engine.lmm_interface.process_data.side_effect = RuntimeError("boom")
+
+        handle = self.runtime.start_lmm_analysis(engine, {"video_data": None, "audio_data": None, "user_context": {}}, False)
+        handle.join(timeout=5.0)
+
+        self.assertEqual(engine.lmm_consecutive_failures, 1)
+
+    def test_stop_cancels_pending_wait_step(self):
+        engine = self.app.intervention_engine
+        engine._current_intervention_details = {
+            "type": "long_wait",
+            "message": "m",
+            "sequence": [{"action": "wait", "duration": 30}, {"action": "speak", "content": "never"}],
+        }
+        engine._intervention_active.set()
+        engine.intervention_thread = self.runtime.start_intervention(engine)
+        time.sleep(0.1)
+        self.assertTrue(engine.intervention_thread.is_alive())
+
+        start = time.time()
+        engine.stop_intervention()
+        engine.intervention_thread.join(timeout=5.0)
+
+        self.assertLess(time.time() - start, 1.0)
+        self.assertFalse(engine.intervention_thread.is_alive())
+        self.assertFalse(engine._intervention_active.is_set())
+        self.assertEqual(engine._current_intervention_details, {})
+        engine.voice_interface.speak.assert_not_called()
+
+    def test_stop_during_prepare_clears_the_active_flag(self):
+        engine = self.app.intervention_engine
+        entered, release = threading.Event(), threading.Event()
+        self.addCleanup(release.set)
+
+        def slow_prepare():
+            entered.set()
+            release.wait(5.0)
+            return {"type": "t", "sequence": [], "logger": None}
+
+        engine._prepare_intervention_run = slow_prepare
+        engine._current_intervention_details = {"type": "t", "message": "m"}
+        engine._intervention_active.set()
+        engine.intervention_thread = self.runtime.start_intervention(engine)
+        self.assertTrue(entered.wait(5.0))
+
+        engine.stop_intervention()
+        engine.intervention_thread.join(timeout=5.0)
+        self.assertFalse(engine.intervention_thread.is_alive())
+        self.assertFalse(engine._intervention_active.is_set())
+        self.assertEqual(engine._current_intervention_details, {})
+
+    def test_decision_wait_does_not_hold_a_worker(self):
+        # Both workers busy (e.g. a slow LMM call): the wait must still wake on notify
+        release = threading.Event()
+        busy = [self.runtime.submit_background(release.wait, 5.0) for _ in range(2)]
+        threading.Timer(0.05, self.app.scheduler.notify, args=("video",)).start()
+
+        start = time.time()
+        wait = asyncio.run_coroutine_threadsafe(self.runtime._wait_until(time.time() + 5.0), self.runtime.loop)
+        self.assertEqual(wait.result(timeout=5.0), {"video"})
+        self.assertLess(time.time() - start, 1.0)
+
+        wait = asyncio.run_coroutine_threadsafe(self.runtime._wait_until(time.time() + 0.05), self.runtime.loop)
+        self.assertEqual(wait.result(timeout=5.0), {"timeout"})
+        release.set()
+        for future in busy:
+            future.result(timeout=5.0)
+
+    def test_sensor_polls_run_on_dedicated_threads(self):
+        threads = []
+        self.app.running = True
+
+        def poll():
+            threads.append(threading.current_thread().name)
+            return None
+
+        task = asyncio.run_coroutine_threadsafe(self.runtime._sensor_loop(poll, "audio"), self.runtime.loop)
+        task.result(timeout=5.0)
+        self.assertTrue(threads[0].startswith("acr-audio"))
+
+    def test_submit_background(self):
+        done = threading.Event()
+        future = self.runtime.submit_background(done.set)
+        future.result(timeout=5.0)
+        self.assertTrue(done.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import config
+from core.clock import SystemClock, VirtualClock, SYSTEM_CLOCK
+from core.intervention_engine import InterventionEngine
+from core.logic_engine import LogicEngine
+
+
+class TestVirtualClock(unittest.TestCase):
+    def test_advance_sleep_and_set(self):
+        clock = VirtualClock(100.0)
+        clock.sleep(5)
+        self.assertEqual(clock.time(), 105.0)
+        self.assertEqual(clock.advance(-10), 105.0)  # Never runs backwards
+        clock.set(50.0)
+        self.assertEqual(clock.time(), 105.0)
+        clock.set(200.0)
+        self.assertEqual(clock.time(), 200.0)
+
+    def test_wait_advances_by_timeout_unless_set(self):
+        clock = VirtualClock(0.0)
+        event = threading.Event()
+        self.assertFalse(clock.wait(event, 2.5))
+        self.assertEqual(clock.time(), 2.5)
+        event.set()
+        self.assertTrue(clock.wait(event, 10))
+        self.assertEqual(clock.time(), 2.5)
+
+    def test_system_clock_follows_time_module(self):
+        self.assertIsInstance(SYSTEM_CLOCK, SystemClock)
+        self.assertAlmostEqual(SYSTEM_CLOCK.time(), time.time(), delta=1.0)
+
+
+class TestEnginesOnVirtualTime(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1_000_000.0)
+        self.engine = LogicEngine(logger=MagicMock(), clock=self.clock)
+
+    def test_snooze_expires_in_virtual_time(self):
+        self.engine.set_mode("snoozed")
+        self.clock.advance(config.SNOOZE_DURATION - 1)
+        self.engine.update()
+        self.assertEqual(self.engine.current_mode, "snoozed")
+
+        self.clock.advance(2)
+        self.engine.update()
+        self.assertEqual(self.engine.current_mode, "active")
+
+    def test_intervention_engine_inherits_clock_and_waits_instantly(self):
+        intervention_engine = InterventionEngine(self.engine, MagicMock())
+        self.assertIs(intervention_engine.clock, self.clock)
+
+        intervention_engine._intervention_active.set()
+        start = time.monotonic()
+        intervention_engine._wait(3600)
+        self.assertLess(time.monotonic() - start, 5.0)
+        self.assertGreaterEqual(self.clock.time(), 1_000_000.0 + 3600)
+
+    def test_mock_logic_engine_falls_back_to_system_clock(self):
+        intervention_engine = InterventionEngine(MagicMock(), MagicMock())
+        self.assertIs(intervention_engine.clock, SYSTEM_CLOCK)
+
+
+if __name__ == '__main__':
+    unittest.main()
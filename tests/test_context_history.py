@@ -74,7 +74,7 @@ class TestContextHistory(unittest.TestCase):
         }
 
         # Mock requests to avoid network calls
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_post.return_value.status_code = 200
             mock_post.return_value.json.return_value = {
                 'choices': [{'message': {'content': '{"state_estimation": {"arousal": 50, "overload": 0, "focus": 50, "energy": 50, "mood": 50}}'}}]
@@ -100,13 +100,15 @@ class TestContextHistory(unittest.TestCase):
             # print(text_part)
 
             self.assertIn("Recent History (Last 5 snapshots):", text_part)
-            self.assertIn("- T-40s: Window='Old App'", text_part)
+            # Times are relative to the newest snapshot so the block stays byte-identical between samples
+            self.assertIn("- T-30s: Window='Old App'", text_part)
             # Verify new fields are present
             self.assertIn("Posture=neutral", text_part)
             self.assertIn("Audio=0.05", text_part)
             self.assertIn("Motion=2.5", text_part)
 
-            self.assertIn("- T-10s: Window='New App'", text_part)
+            self.assertIn("- T-0s: Window='New App'", text_part)
+            self.assertIn("Latest History Snapshot: 10s ago", text_part)
             self.assertIn("Posture=slouching", text_part)
             self.assertIn("Audio=0.55", text_part)
             self.assertIn("Motion=15.2", text_part)
@@ -0,0 +1,115 @@
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import config
+from core.event_scheduler import EventScheduler
+from core.logic_engine import LogicEngine
+
+
+class TestEventScheduler(unittest.TestCase):
+    def test_wait_returns_on_notify(self):
+        scheduler = EventScheduler()
+
+        threading.Timer(0.05, scheduler.notify, args=("video",)).start()
+        start = time.time()
+        fired = scheduler.wait_until(time.time() + 5.0)
+
+        self.assertEqual(fired, {"video"})
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_pending_event_does_not_block(self):
+        scheduler = EventScheduler()
+        scheduler.notify("audio")
+        scheduler.notify("hotkey")
+
+        fired = scheduler.wait_until(time.time() + 5.0)
+        self.assertEqual(fired, {"audio", "hotkey"})
+
+    def test_deadline_timeout(self):
+        scheduler = EventScheduler()
+        fired = scheduler.wait_until(time.time() + 0.05)
+
+        self.assertEqual(fired, {"timeout"})
+        self.assertEqual(scheduler.get_stats(), {"timeout": 1})
+
+    def test_stop_releases_waiter(self):
+        scheduler = EventScheduler()
+        threading.Timer(0.05, scheduler.stop).start()
+
+        fired = scheduler.wait_until(None)
+        self.assertIn("stop", fired)
+        self.assertTrue(scheduler.stopped)
+
+    def test_listener_and_drain(self):
+        scheduler = EventScheduler()
+        listener = MagicMock()
+        scheduler.add_listener(listener)
+        self.assertEqual(scheduler.drain(), {"timeout"})
+
+        scheduler.notify("video")
+        listener.assert_called_once_with()
+        self.assertTrue(scheduler.pending)
+        self.assertEqual(scheduler.drain(), {"video"})
+        self.assertFalse(scheduler.pending)
+
+        scheduler.remove_listener(listener)
+        scheduler.notify("audio")
+        listener.assert_called_once_with()
+
+
+class TestLogicEngineDeadlines(unittest.TestCase):
+    def setUp(self):
+        self.engine = LogicEngine(logger=MagicMock())
+        self.engine.lmm_call_interval = 5
+        self.engine.min_lmm_interval = 2
+
+    def test_paused_has_no_deadline(self):
+        self.engine.current_mode = "paused"
+        self.assertIsNone(self.engine.get_next_deadline())
+
+    def test_snooze_expiry_deadline(self):
+        now = time.time()
+        self.engine.current_mode = "snoozed"
+        self.engine.snooze_end_time = now + 1.0
+        self.engine.last_lmm_call_time = now
+
+        self.assertAlmostEqual(self.engine.get_next_deadline(), now + 1.0, places=3)
+
+    def test_active_periodic_deadline(self):
+        now = time.time()
+        self.engine.current_mode = "active"
+        self.engine.last_lmm_call_time = now
+        self.engine.last_history_sample_time = now + 100
+
+        self.assertAlmostEqual(self.engine.get_next_deadline(), now + 5, places=3)
+
+    def test_history_sample_deadline(self):
+        now = time.time()
+        self.engine.current_mode = "active"
+        self.engine.last_lmm_call_time = now + 100
+        self.engine.last_history_sample_time = now
+
+        expected = now + config.HISTORY_SAMPLE_INTERVAL
+        self.assertAlmostEqual(self.engine.get_next_deadline(), expected, places=3)
+
+    def test_wake_callback_on_mode_change(self):
+        wake = MagicMock()
+        self.engine.wake_callback = wake
+
+        self.engine.set_mode("paused")
+        wake.assert_called_with("mode_change")
+
+    def test_wake_callback_after_lmm_analysis(self):
+        wake = MagicMock()
+        self.engine.wake_callback = wake
+        self.engine.lmm_interface = MagicMock()
+        self.engine.lmm_interface.process_data.return_value = None
+
+        self.engine._run_lmm_analysis_async({"video_data": None, "audio_data": None, "user_context": {}}, False)
+        wake.assert_called_with("lmm_complete")
+
+
+if __name__ == '__main__':
+    unittest.main()
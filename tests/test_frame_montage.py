@@ -0,0 +1,76 @@
+import base64
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.frame_montage import FrameMontage
+from core.logic_engine import LogicEngine
+from core.prompt_builder import PromptBuilder
+
+
+def _frame(value, width=640, height=480):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+class TestFrameMontage(unittest.TestCase):
+    def test_disabled_by_default(self):
+        montage = FrameMontage(frames=0)
+        montage.add(_frame(10), 0.0)
+        self.assertFalse(montage.enabled)
+        self.assertIsNone(montage.build(0.0))
+
+    def test_needs_two_frames(self):
+        montage = FrameMontage(frames=4, window=20, sample_interval=0.5)
+        montage.add(_frame(10), 100.0)
+        self.assertIsNone(montage.build(100.0))
+
+    def test_picks_salient_frames_and_keeps_the_latest(self):
+        montage = FrameMontage(frames=4, window=20, tile_width=160, max_width=320, sample_interval=0.5)
+        for i in range(40):  # 20 s at 2 fps, quiet except for a few bursts
+            t = 100.0 + i * 0.5
+            activity = 50.0 if i in (4, 20) else 1.0
+            montage.add(_frame(i), t, video_activity=activity, face_detected=i < 30)
+        image, meta = montage.build(119.5)
+
+        self.assertEqual(meta["frames"], 4)
+        # Newest last; the motion bursts (T-17.5s, T-9.5s) and the face leaving (T-4.5s) were picked
+        self.assertEqual(meta["offsets"], [18, 10, 4, 0])
+        # 2x2 grid, bounded by max_width
+        self.assertEqual(image.shape, (240, 320, 3))
+        self.assertEqual(int(image[200, 300, 0]), 39)  # Bottom-right tile is the latest frame
+
+    def test_sample_interval_bounds_kept_frames(self):
+        montage = FrameMontage(frames=3, window=10, sample_interval=1.0)
+        for i in range(100):
+            montage.add(_frame(0), 100.0 + i * 0.05)
+        self.assertEqual(len(montage._candidates), 5)
+
+
+class TestMontageInLMMPayload(unittest.TestCase):
+    def test_montage_replaces_single_frame(self):
+        clock = VirtualClock(1000.0)
+        engine = LogicEngine(clock=clock)
+        engine.frame_montage = FrameMontage(frames=3, window=10, tile_width=160, sample_interval=1.0)
+        for i in range(10):
+            clock.advance(1.0)
+            engine.process_video_data(_frame(i * 20))
+
+        payload = engine._prepare_lmm_data("periodic")
+        montage_meta = payload["user_context"]["video_montage"]
+        self.assertEqual(montage_meta["frames"], 3)
+        image = cv2.imdecode(np.frombuffer(base64.b64decode(payload["video_data"]), np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(image.shape[:2], (240, 320))
+
+        text = PromptBuilder(clock=clock, token_budget=0).build_user_text(payload["user_context"])
+        self.assertIn("Camera Image: montage of 3 frames", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.history_segments import HistorySegmenter, window_label
+from core.lmm_interface import LMMInterface
+from core.logic_engine import LogicEngine
+from core.prompt_builder import PromptBuilder, describe_segment
+
+
+def _snapshot(t, window="main.py - Visual Studio Code", face=True, posture="neutral", mode="active", motion=1.0):
+    return {"timestamp": t, "active_window": window, "mode": mode, "face_detected": face, "posture": posture,
+            "audio_level": 0.01, "video_activity": motion, "speech_fraction": 0.0}
+
+
+class TestHistorySegmenter(unittest.TestCase):
+    def test_runs_are_merged_by_app_not_title(self):
+        self.assertEqual(window_label("notes.md - project - Visual Studio Code"), "Visual Studio Code")
+        segmenter = HistorySegmenter(max_segments=8, sample_interval=10)
+        for i in range(72):  # 12 minutes in one app, switching files
+            segmenter.fold(_snapshot(i * 10, window=f"file{i % 3}.py - Visual Studio Code"))
+        for i in range(72, 90):
+            segmenter.fold(_snapshot(i * 10, window="Inbox - Mozilla Firefox", posture="slouching"))
+
+        first, second = segmenter.segments()
+        self.assertEqual((first["window"], first["samples"], first["end"] - first["start"]), ("Visual Studio Code", 72, 720))
+        self.assertEqual(describe_segment(first), "Visual Studio Code, active, face present, neutral, quiet, still, 12 min")
+        self.assertEqual((second["window"], second["posture"]), ("Mozilla Firefox", "slouching"))
+
+    def test_gap_starts_a_new_segment(self):
+        segmenter = HistorySegmenter(sample_interval=10)
+        segmenter.fold(_snapshot(0))
+        segmenter.fold(_snapshot(10))
+        segmenter.fold(_snapshot(600))  # Machine was asleep
+        self.assertEqual([s["samples"] for s in segmenter.segments()], [2, 1])
+
+    def test_segment_count_is_bounded(self):
+        segmenter = HistorySegmenter(max_segments=4, sample_interval=10)
+        apps = ["A - Editor", "B - Browser", "C - Terminal"]
+        for i in range(1000):  # ~2.8 hours, switching app every minute
+            segmenter.fold(_snapshot(i * 10, window=apps[(i // 6) % 3], face=(i // 60) % 2 == 0))
+        segments = segmenter.segments()
+        self.assertEqual(len(segments), 4)
+        self.assertEqual(segments[0]["start"], 0)
+        self.assertEqual(segments[-1]["end"], 10000)
+        self.assertEqual(sum(s["samples"] for s in segments), 1000)
+        self.assertTrue(any(s["other_windows"] for s in segments))
+
+
+class TestEarlierHistoryPrompt(unittest.TestCase):
+    def setUp(self):
+        segmenter = HistorySegmenter(sample_interval=10)
+        for i in range(6):
+            segmenter.fold(_snapshot(i * 600, window=f"App{i}"))
+        self.segmenter = segmenter
+        self.context = {
+            "current_mode": "active",
+            "history": [_snapshot(3700, window="Now - Terminal")],
+            "history_segments": segmenter.segments(),
+        }
+
+    def test_segments_render_relative_to_newest_snapshot(self):
+        text = PromptBuilder(clock=VirtualClock(3700), token_budget=0).build_user_text(self.context)
+        self.assertIn("Earlier History (oldest first):\n- T-61m to T-61m: App0, active", text)
+        self.assertLess(text.index("Earlier History"), text.index("Recent History"))
+
+    def test_narrative_replaces_the_segments_it_covers(self):
+        self.segmenter.set_narrative("Coded in App0 to App3 for an hour.", covered_until=1810)
+        self.context["history_narrative"] = self.segmenter.narrative()
+        text = PromptBuilder(clock=VirtualClock(3700), token_budget=0).build_user_text(self.context)
+        self.assertIn("- Until T-31m: Coded in App0 to App3 for an hour.", text)
+        self.assertNotIn("App2", text)
+        self.assertIn("App4", text)
+
+    def test_budget_drops_oldest_segments_first(self):
+        builder = PromptBuilder(clock=VirtualClock(3700), token_budget=0)
+        full = builder.count_tokens(builder.build_user_text(self.context))
+        builder.token_budget = full - 20
+        text = builder.build_user_text(self.context)
+        self.assertNotIn("App0", text)
+        self.assertIn("App5", text)
+        self.assertIn("earlier", builder.last_report["trimmed"])
+
+
+class TestLogicEngineHistoryFolding(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.lmm = MagicMock(spec=LMMInterface)
+        self.lmm.summarize_history.return_value = "Worked in the editor."
+        self.engine = LogicEngine(lmm_interface=self.lmm, clock=self.clock)
+        self.engine.window_sensor = MagicMock()
+        self.engine.window_sensor.get_active_window.return_value = "main.py - Visual Studio Code"
+
+    def _sample(self, count):
+        for _ in range(count):
+            self.clock.advance(10)
+            self.engine.update()
+
+    def test_aged_out_snapshots_become_segments(self):
+        size = self.engine.context_history.maxlen
+        self._sample(size)
+        self.assertEqual(self.engine.history_segmenter.segments(), [])
+        self._sample(30)
+        segments = self.engine.history_segmenter.segments()
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(segments[0]["samples"], 30)
+        self.assertEqual(len(self.engine.context_history), size)
+        self.lmm.summarize_history.assert_not_called()  # HISTORY_NARRATIVE_INTERVAL defaults to off
+
+    def test_background_narrative(self):
+        self.engine.history_narrative_interval = 60
+        self._sample(self.engine.context_history.maxlen + 3)
+        self.engine._history_narrative_thread.join(timeout=2.0)
+        lines, previous = self.lmm.summarize_history.call_args[0]
+        self.assertEqual(lines, ["Visual Studio Code, active, away, unknown, quiet, still, 1 min"])
+        self.assertIsNone(previous)
+        self.assertEqual(self.engine.history_segmenter.narrative()["text"], "Worked in the editor.")
+
+        self._sample(3)  # Within the interval: no new summary
+        self.assertEqual(self.lmm.summarize_history.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import base64
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+import cv2
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.image_processing import ImageProcessor
+from core.lmm_cache import LMMResponseCache, perceptual_hash
+from core.lmm_interface import LMMInterface
+
+ANALYSIS = {
+    "state_estimation": {"arousal": 50, "overload": 10, "focus": 70, "energy": 60, "mood": 55},
+    "visual_context": ["working"],
+    "suggestion": None,
+}
+
+
+def _jpeg_b64(frame, quality=90):
+    _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    return base64.b64encode(buffer).decode('utf-8')
+
+
+def _scene(seed):
+    """8x9 blocks of 20px whose neighbours differ by at least 28 grey levels (stable under JPEG noise)."""
+    rng = np.random.default_rng(seed)
+    blocks = np.stack([rng.permutation(9) * 28 for _ in range(8)]).astype(np.uint8)
+    gray = cv2.resize(blocks, (180, 160), interpolation=cv2.INTER_NEAREST)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def _context(audio=0.11, motion=3.0, reason="periodic_check", window="Editor"):
+    return {
+        "current_mode": "active",
+        "trigger_reason": reason,
+        "active_window": window,
+        "sensor_metrics": {"audio_level": audio, "video_activity": motion, "face_detected": True, "face_count": 1,
+                           "audio_analysis": {"is_speech": False}, "video_analysis": {"posture_state": "neutral"}},
+        "system_alerts": [],
+    }
+
+
+class TestLMMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.cache = LMMResponseCache(max_entries=2, ttl=10.0, clock=self.clock)
+
+    def test_perceptual_hash_ignores_encoding_noise(self):
+        frame = _scene(1)
+        self.assertEqual(perceptual_hash(_jpeg_b64(frame, 90)), perceptual_hash(_jpeg_b64(frame, 60)))
+        self.assertNotEqual(perceptual_hash(_jpeg_b64(frame)), perceptual_hash(_jpeg_b64(_scene(2))))
+        self.assertIsNone(perceptual_hash(None))
+        self.assertIsNone(perceptual_hash(base64.b64encode(b"not a jpeg").decode()))
+        # Same hash as the raw frame the novelty gate sees
+        self.assertEqual(perceptual_hash(_jpeg_b64(frame, 90)), ImageProcessor.difference_hash(frame))
+
+    def test_key_buckets_metrics(self):
+        frame = _jpeg_b64(_scene(1))
+        self.assertEqual(self.cache.make_key(frame, _context(audio=0.11, motion=3.0)),
+                         self.cache.make_key(frame, _context(audio=0.14, motion=4.5, reason="unknown")))
+        self.assertNotEqual(self.cache.make_key(frame, _context(audio=0.11)), self.cache.make_key(frame, _context(audio=0.31)))
+        self.assertNotEqual(self.cache.make_key(frame, _context()), self.cache.make_key(frame, _context(window="Mail")))
+
+    def test_ttl_and_lru(self):
+        self.cache.put("a", dict(ANALYSIS, _meta={"latency_ms": 900}))
+        hit = self.cache.get("a")
+        self.assertTrue(hit["_meta"]["cache_hit"])
+        self.assertNotIn("latency_ms", hit["_meta"])
+        hit["visual_context"].append("mutated")
+        self.assertEqual(self.cache.get("a")["visual_context"], ["working"])
+
+        self.cache.put("b", ANALYSIS)
+        self.cache.get("a")  # 'b' is now least recently used
+        self.cache.put("c", ANALYSIS)
+        self.assertIsNone(self.cache.get("b"))
+
+        self.clock.advance(10.5)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get_stats()["entries"], 1)
+
+
+class TestLMMInterfaceCache(unittest.TestCase):
+    def setUp(self):
+        with patch('config.LMM_CACHE_ENABLED', True):
+            self.lmm = LMMInterface(data_logger=MagicMock(), clock=VirtualClock(1000.0))
+        self.lmm._send_request_with_retry = MagicMock(side_effect=lambda *a, **k: dict(ANALYSIS))
+        self.frame = _jpeg_b64(_scene(3))
+
+    def test_repeated_periodic_context_hits_cache(self):
+        first = self.lmm.process_data(video_data=self.frame, user_context=_context())
+        second = self.lmm.process_data(video_data=self.frame, user_context=_context(audio=0.12))
+
+        self.assertEqual(self.lmm._send_request_with_retry.call_count, 1)
+        self.assertNotIn("cache_hit", first["_meta"])
+        self.assertTrue(second["_meta"]["cache_hit"])
+        self.assertEqual(second["state_estimation"], ANALYSIS["state_estimation"])
+
+    def test_high_priority_trigger_bypasses_cache(self):
+        self.lmm.process_data(video_data=self.frame, user_context=_context())
+        result = self.lmm.process_data(video_data=self.frame, user_context=_context(reason="high_audio_level"))
+        self.assertEqual(self.lmm._send_request_with_retry.call_count, 2)
+        self.assertNotIn("cache_hit", result["_meta"])
+
+        context = dict(_context(reason="sustained_noise"), trigger_priority=2)
+        self.lmm.process_data(video_data=self.frame, user_context=context)
+        self.assertEqual(self.lmm._send_request_with_retry.call_count, 3)
+
+    def test_fallback_is_not_cached(self):
+        self.lmm._send_request_with_retry.side_effect = ValueError("bad json")
+        with patch('config.LMM_FALLBACK_ENABLED', True):
+            self.lmm.process_data(video_data=self.frame, user_context=_context())
+        self.lmm._send_request_with_retry.side_effect = lambda *a, **k: dict(ANALYSIS)
+        result = self.lmm.process_data(video_data=self.frame, user_context=_context())
+        self.assertNotIn("cache_hit", result["_meta"])
+
+
+if __name__ == '__main__':
+    unittest.main()
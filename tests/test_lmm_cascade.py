@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from core.clock import VirtualClock
+from core.lmm_interface import LMMInterface
+
+STATE = {"arousal": 50, "overload": 10, "focus": 70, "energy": 60, "mood": 55}
+FRAME = "aGVsbG8="
+
+
+def _context(reason="periodic_check"):
+    return {"current_mode": "active", "trigger_reason": reason, "sensor_metrics": {"audio_level": 0.1}}
+
+
+class TestLMMCascade(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        with patch('config.LMM_CASCADE_ENABLED', True), patch('config.LMM_CASCADE_TEXT_MODEL_ID', "small-text"):
+            self.lmm = LMMInterface(data_logger=MagicMock(), clock=self.clock)
+        self.text_confidence = 0.9
+        self.calls = []
+        self.lmm._send_request_with_retry = MagicMock(side_effect=self._send)
+
+    def _send(self, payload, **kwargs):
+        has_image = self.lmm._has_image(payload)
+        self.calls.append((payload["model"], has_image))
+        if payload["model"] == "small-text":
+            return {"state_estimation": dict(STATE), "visual_context": [], "suggestion": None, "confidence": self.text_confidence}
+        return {"state_estimation": dict(STATE, focus=40), "visual_context": ["phone_usage"], "suggestion": None}
+
+    def test_first_call_with_frame_escalates_then_text_tier_serves(self):
+        first = self.lmm.process_data(video_data=FRAME, user_context=_context())
+        self.assertEqual(first["_meta"]["cascade"]["escalation_reason"], "stale_visual_context")
+        self.assertEqual(first["_meta"]["cascade"]["tier"], "vision")
+        self.assertEqual(self.calls, [(config.LOCAL_LLM_MODEL_ID, True)])
+
+        self.clock.advance(30)
+        second = self.lmm.process_data(video_data=FRAME, user_context=_context())
+        cascade = second["_meta"]["cascade"]
+        self.assertEqual(cascade["tier"], "text")
+        self.assertIsNone(cascade["escalation_reason"])
+        self.assertIn("text_latency_ms", cascade)
+        self.assertNotIn("confidence", second)
+        self.assertEqual(second["visual_context"], ["phone_usage"])  # Carried over from the vision call
+        self.assertEqual(cascade["visual_context_age_s"], 30)
+        self.assertEqual(self.calls[1], ("small-text", False))
+
+        self.clock.advance(121)
+        self.lmm.process_data(video_data=FRAME, user_context=_context())
+        self.assertTrue(self.calls[-1][1])
+
+    def test_low_confidence_escalates_to_vision(self):
+        self.lmm._last_vision_time = self.clock.time()
+        self.text_confidence = 0.3
+        result = self.lmm.process_data(video_data=FRAME, user_context=_context())
+
+        cascade = result["_meta"]["cascade"]
+        self.assertEqual((cascade["tier"], cascade["escalation_reason"]), ("vision", "low_confidence"))
+        self.assertEqual(cascade["text_confidence"], 0.3)
+        self.assertIn("vision_latency_ms", cascade)
+        self.assertEqual([has_image for _, has_image in self.calls], [False, True])
+        self.assertEqual(result["state_estimation"]["focus"], 40)
+
+    def test_high_priority_trigger_skips_text_tier(self):
+        result = self.lmm.process_data(user_context=_context("high_audio_level"))
+        self.assertEqual(result["_meta"]["cascade"]["escalation_reason"], "high_priority_trigger")
+        self.assertEqual(len(self.calls), 1)
+        self.assertNotEqual(self.calls[0][0], "small-text")
+
+    def test_text_tier_failure_escalates(self):
+        def fail_text(payload, **kwargs):
+            if payload["model"] == "small-text":
+                raise ValueError("bad json")
+            return self._send(payload, **kwargs)
+        self.lmm._send_request_with_retry.side_effect = fail_text
+
+        result = self.lmm.process_data(user_context=_context())
+        self.assertEqual(result["_meta"]["cascade"]["escalation_reason"], "text_tier_failed")
+        self.assertEqual(self.lmm.circuit_failures, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -89,7 +89,7 @@ class TestLMMContextIntegration(unittest.TestCase):
         with patch.object(core.lmm_interface.config, 'LMM_FALLBACK_ENABLED', False):
              self.lmm_interface = LMMInterface(data_logger=self.mock_logger)
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_active_window_injection(self, mock_post):
         # Setup mock response
         mock_response = MagicMock()
@@ -127,7 +127,7 @@ class TestLMMContextIntegration(unittest.TestCase):
 
         self.assertIn("Active Window: Visual Studio Code - MyProject", text_content)
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_active_window_injection_includes_unknown(self, mock_post):
          # Setup mock response
         mock_response = MagicMock()
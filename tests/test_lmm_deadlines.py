@@ -0,0 +1,169 @@
+import json
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.lmm_interface import LMMInterface, LMMCancelledError
+
+STATE = {"arousal": 50, "overload": 10, "focus": 70, "energy": 60, "mood": 55}
+
+
+def _response(state=STATE):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = {"choices": [{"message": {"content": json.dumps({"state_estimation": state, "suggestion": None})}}]}
+    return response
+
+
+class TestDeadlineBudget(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(0.0)
+        self.lmm = LMMInterface(data_logger=MagicMock(), clock=self.clock)
+        self.payload = {"model": "test", "messages": []}
+
+    @patch('core.lmm_interface.random.uniform', return_value=1.0)
+    @patch('requests.Session.post')
+    def test_retries_consume_remaining_budget(self, mock_post, _uniform):
+        def slow_failure(*args, **kwargs):
+            self.clock.advance(6)
+            raise requests.exceptions.Timeout("read timed out")
+        mock_post.side_effect = slow_failure
+
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.lmm._send_request_with_retry(self.payload, deadline=10.0)
+
+        # t=0: 10s left; t=6 + 2s backoff: 2s left; t=14: budget gone, no third attempt
+        self.assertEqual(mock_post.call_count, 2)
+        read_timeouts = [c[1]["timeout"][1] for c in mock_post.call_args_list]
+        self.assertEqual(read_timeouts[0], 10.0)
+        self.assertAlmostEqual(read_timeouts[1], 2.0)
+        self.assertAlmostEqual(self.clock.time(), 14.0)
+
+    @patch('requests.Session.post')
+    def test_cancel_interrupts_backoff(self, mock_post):
+        cancel = threading.Event()
+
+        def fail_and_preempt(*args, **kwargs):
+            cancel.set()
+            raise requests.exceptions.ConnectionError("refused")
+        mock_post.side_effect = fail_and_preempt
+
+        with self.assertRaises(LMMCancelledError):
+            self.lmm._send_request_with_retry(self.payload, cancel_event=cancel)
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertLess(self.clock.time(), 0.5)
+
+    @patch('requests.Session.post')
+    def test_cancelled_request_is_not_a_circuit_failure(self, mock_post):
+        cancel = threading.Event()
+        cancel.set()
+
+        result = self.lmm.process_data(user_context={"current_mode": "active"}, cancel_event=cancel)
+
+        self.assertIsNone(result)
+        mock_post.assert_not_called()
+        self.assertEqual(self.lmm.circuit_failures, 0)
+
+    @patch('requests.Session.post')
+    def test_close_interrupts_retries(self, mock_post):
+        def fail_and_close(*args, **kwargs):
+            self.lmm.close()
+            raise requests.exceptions.ConnectionError("refused")
+        mock_post.side_effect = fail_and_close
+
+        self.assertIsNone(self.lmm.process_data(user_context={"current_mode": "active"}))
+        self.assertEqual(mock_post.call_count, 1)
+
+    @patch('core.lmm_interface.random.uniform', return_value=1.0)
+    @patch('requests.Session.post')
+    def test_trickling_stream_stops_at_the_deadline(self, mock_post, _uniform):
+        self.lmm.streaming = True
+
+        def trickle(*args, **kwargs):
+            def lines():
+                yield 'data: {"choices": [{"delta": {"content": "{\\"state_estimation\\": "}}]}'
+                while True:
+                    # Every chunk arrives well within the read timeout, but it never finishes
+                    self.clock.advance(1.0)
+                    yield 'data: {"choices": [{"delta": {"content": " "}}]}'
+            response = MagicMock()
+            response.iter_lines.return_value = lines()
+            return response
+        mock_post.side_effect = trickle
+
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.lmm._send_request_with_retry(self.payload, deadline=10.0)
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertAlmostEqual(self.clock.time(), 10.0)
+
+
+class TestHedgedRequests(unittest.TestCase):
+    def setUp(self):
+        with patch('config.LMM_HEDGE_URL', "http://backup:8080"):
+            self.lmm = LMMInterface(data_logger=MagicMock())
+        self.release_primary = threading.Event()
+        self.addCleanup(self.release_primary.set)
+
+    def _post(self, url, **kwargs):
+        if url.startswith("http://backup"):
+            return _response(dict(STATE, focus=20))
+        self.release_primary.wait(5)
+        return _response()
+
+    def test_hedge_url_is_normalized(self):
+        self.assertEqual(self.lmm.hedge_url, "http://backup:8080/v1/chat/completions")
+
+    def test_no_hedge_until_latencies_are_known(self):
+        self.release_primary.set()
+        with patch('requests.Session.post', side_effect=self._post) as mock_post:
+            result = self.lmm._send_request_with_retry({"messages": []})
+        self.assertEqual(result["state_estimation"], STATE)
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(self.lmm.health.latency_count(LMMInterface._latency_class({"messages": []})), 1)
+
+    def test_slow_primary_is_hedged(self):
+        for _ in range(10):
+            self.lmm.health.record_latency(0.05, LMMInterface._latency_class({"messages": []}))
+        with patch('requests.Session.post', side_effect=self._post) as mock_post:
+            result = self.lmm._send_request_with_retry({"messages": []})
+
+        self.assertEqual(result["state_estimation"]["focus"], 20)
+        self.assertEqual([c[0][0] for c in mock_post.call_args_list],
+                         [self.lmm.llm_url, "http://backup:8080/v1/chat/completions"])
+        self.assertEqual((self.lmm.hedged_requests, self.lmm.hedge_wins), (1, 1))
+        # The hedge is accounted like any routed attempt
+        self.assertEqual(self.lmm.hedge_endpoint.requests, 1)
+        self.assertEqual(self.lmm.hedge_endpoint.in_flight, 0)
+        self.assertIsNotNone(self.lmm.hedge_endpoint.ewma_latency)
+
+    def test_hedge_goes_to_another_configured_endpoint(self):
+        with patch('config.LMM_HEDGE_URL', "http://backup:8080"), \
+                patch('config.LMM_ENDPOINTS', [{"url": "http://gpu-a:1234"}, {"url": "http://gpu-b:1234"}], create=True):
+            lmm = LMMInterface(data_logger=MagicMock())
+        for _ in range(10):
+            lmm.health.record_latency(0.05, LMMInterface._latency_class({"messages": []}))
+
+        def post(url, **kwargs):
+            if url.startswith("http://gpu-b"):
+                return _response(dict(STATE, focus=20))
+            self.release_primary.wait(5)
+            return _response()
+
+        with patch('requests.Session.post', side_effect=post) as mock_post:
+            result = lmm._send_request_with_retry({"messages": []})
+        self.assertEqual(result["state_estimation"]["focus"], 20)
+        self.assertEqual([c[0][0] for c in mock_post.call_args_list],
+                         ["http://gpu-a:1234/v1/chat/completions", "http://gpu-b:1234/v1/chat/completions"])
+        self.assertEqual(lmm.router.endpoints[1].requests, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.lmm_health import LMMHealthManager, CLOSED, OPEN, HALF_OPEN
+from core.lmm_interface import LMMInterface
+from core.logic_engine import LogicEngine
+
+
+class TestLMMHealthManager(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.probe = MagicMock(return_value=True)
+        self.health = LMMHealthManager(clock=self.clock, max_failures=2, cooldown=30, probe=self.probe,
+                                       data_logger=MagicMock())
+        self.published = []
+        self.health.add_listener(lambda state, stats: self.published.append(state))
+
+    def _trip(self):
+        self.health.record_failure()
+        self.health.record_failure()
+
+    def test_opens_after_max_failures(self):
+        self.health.record_failure()
+        self.assertEqual(self.health.state, CLOSED)
+        self.health.record_failure()
+        self.assertEqual(self.health.state, OPEN)
+        self.assertFalse(self.health.allow_request())
+        self.assertEqual(self.health.open_until, 1030.0)
+        self.probe.assert_not_called()
+        self.assertEqual(self.published, [OPEN])
+
+    def test_failed_probe_keeps_circuit_open(self):
+        self._trip()
+        self.clock.advance(31)
+        self.assertEqual(self.health.state, HALF_OPEN)
+        self.probe.return_value = False
+        self.assertFalse(self.health.allow_request())
+        self.assertEqual(self.health.state, OPEN)
+        self.assertEqual(self.health.open_until, 1061.0)
+        self.assertEqual(self.published, [OPEN, HALF_OPEN, OPEN])
+
+    def test_one_trial_after_probe_then_close_or_reopen(self):
+        self._trip()
+        self.clock.advance(31)
+        self.assertTrue(self.health.allow_request())
+        self.assertFalse(self.health.allow_request())  # Only one trial in flight
+        self.health.record_failure()
+        self.assertEqual(self.health.state, OPEN)
+
+        self.clock.advance(31)
+        self.assertTrue(self.health.allow_request())
+        self.health.record_success(latency=1.0)
+        self.assertEqual(self.health.state, CLOSED)
+        self.assertEqual(self.health.consecutive_failures, 0)
+        self.assertEqual(self.published[-1], CLOSED)
+        self.assertEqual(self.health.get_stats()["probes"], 2)
+
+    def test_cancelled_trial_frees_the_slot(self):
+        self._trip()
+        self.clock.advance(31)
+        self.assertTrue(self.health.allow_request())
+        self.health.record_cancelled()
+        self.assertTrue(self.health.allow_request())
+
+    def test_force_open(self):
+        self.health.force_open(1100.0)
+        self.assertTrue(self.health.is_open())
+        self.assertEqual(self.health.open_until, 1100.0)
+        self.health.reset()
+        self.assertEqual(self.health.state, CLOSED)
+
+    def test_adaptive_timeout(self):
+        health = LMMHealthManager(clock=self.clock, timeout_percentile=95.0, timeout_multiplier=2.0, min_timeout=5.0)
+        self.assertEqual(health.adaptive_timeout(20.0), 20.0)  # Not calibrated yet
+        for latency in [1.5] * 18 + [4.0] * 2:
+            health.record_latency(latency)
+        self.assertEqual(health.adaptive_timeout(20.0), 8.0)
+        for _ in range(100):
+            health.record_latency(0.5)
+        self.assertEqual(health.adaptive_timeout(20.0), 5.0)  # Floor
+        health.timeout_multiplier = 0
+        self.assertEqual(health.adaptive_timeout(20.0), 20.0)
+
+    def test_latency_classes_are_kept_apart(self):
+        health = LMMHealthManager(clock=self.clock, timeout_percentile=95.0, timeout_multiplier=2.0, min_timeout=5.0)
+        health.set_baseline(8.0, "vision")
+        for _ in range(10):
+            health.record_latency(0.4, "text")  # Short text-tier calls
+        self.assertEqual(health.adaptive_timeout(20.0, "text"), 5.0)
+        self.assertEqual(health.adaptive_timeout(20.0, "vision"), 16.0)
+        self.assertIsNone(health.latency_percentile(95.0, "vision"))
+        self.assertEqual(health.get_stats()["p95_latency"], {"text": 0.4})
+
+
+class TestSharedHealth(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.lmm = LMMInterface(data_logger=MagicMock(), clock=self.clock)
+        self.lmm.health.max_failures = 2
+        self.engine = LogicEngine(logger=MagicMock(), lmm_interface=self.lmm, clock=self.clock)
+
+    def test_engine_uses_the_interface_breaker(self):
+        self.assertIs(self.engine.lmm_health, self.lmm.health)
+        # The interface records its own failures; the engine must not count them again
+        self.lmm.health.record_failure()
+        self.engine._handle_lmm_analysis({"state_estimation": {}, "_meta": {"is_fallback": True}}, allow_intervention=False)
+        self.engine._handle_lmm_analysis(None, allow_intervention=False)
+        self.assertEqual(self.engine.lmm_consecutive_failures, 1)
+
+        self.lmm.health.record_failure()
+        self.assertEqual(self.engine.lmm_circuit_breaker_open_until, 1000.0 + self.lmm.circuit_cooldown)
+
+    def test_state_changes_reach_the_tray(self):
+        callback = MagicMock()
+        self.engine.lmm_health_callback = callback
+        self.lmm.health.record_failure()
+        self.lmm.health.record_failure()
+        callback.assert_called_once_with(OPEN)
+        self.lmm.health.record_success()
+        callback.assert_called_with(CLOSED)
+
+    def test_text_calls_do_not_shorten_the_vision_timeout(self):
+        self.lmm.http.read_timeout = 20.0
+        text = {"model": "small", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 100}
+        vision = {"model": "big", "max_tokens": 500, "messages": [{"role": "user", "content": [
+            {"type": "image_url", "image_url": {"url": "data:image/jpeg;base64,AAAA"}}]}]}
+        for _ in range(10):
+            self.lmm.health.record_latency(0.4, LMMInterface._latency_class(text))
+        timeouts = []
+        with patch.object(self.lmm, '_attempt_with_hedge', side_effect=lambda *args, **kwargs: timeouts.append(args[5]) or {}):
+            self.lmm._send_request_with_retry(vision)
+            self.lmm._send_request_with_retry(text)
+        self.assertEqual(timeouts, [20.0, 5.0])
+
+    def test_engine_owns_breaker_for_fake_interfaces(self):
+        engine = LogicEngine(logger=MagicMock(), lmm_interface=MagicMock(), clock=self.clock)
+        self.assertIsNot(engine.lmm_health, self.lmm.health)
+        engine._handle_lmm_analysis(None, allow_intervention=False)
+        self.assertEqual(engine.lmm_consecutive_failures, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
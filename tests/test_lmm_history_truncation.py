@@ -32,7 +32,7 @@ class TestLMMHistoryTruncation(unittest.TestCase):
         }
 
         # Mock requests to avoid network calls
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_post.return_value.status_code = 200
             mock_post.return_value.json.return_value = {
                 'choices': [{'message': {'content': '{}'}}]
@@ -71,7 +71,7 @@ class TestLMMHistoryTruncation(unittest.TestCase):
             'sensor_metrics': {}
         }
 
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_post.return_value.status_code = 200
             mock_post.return_value.json.return_value = {
                 'choices': [{'message': {'content': '{}'}}]
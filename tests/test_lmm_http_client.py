@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.lmm_http_client import LMMHttpClient
+from core.lmm_interface import LMMInterface
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Persistent connections
+    connections = set()
+
+    def _reply(self, body):
+        _KeepAliveHandler.connections.add(self.client_address)
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        content = json.dumps({"state_estimation": {"arousal": 50, "overload": 0, "focus": 50, "energy": 50, "mood": 50},
+                              "visual_context": [], "suggestion": None})
+        self._reply({"choices": [{"message": {"content": content}}]})
+
+    def do_GET(self):
+        self._reply({"data": [{"id": "local-model"}]})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestLMMHttpClient(unittest.TestCase):
+    def setUp(self):
+        _KeepAliveHandler.connections = set()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.client = LMMHttpClient(connect_timeout=1.0, read_timeout=5.0)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_sequential_requests_reuse_one_connection(self):
+        for _ in range(5):
+            response = self.client.post(f"{self.url}/v1/chat/completions", json={"model": "m"})
+            self.assertEqual(response.status_code, 200)
+
+        stats = self.client.get_stats()
+        self.assertEqual(len(_KeepAliveHandler.connections), 1)
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["connections_reused"], 4)
+
+    def test_timeouts_are_connect_read_tuples(self):
+        self.assertEqual(self.client.timeout(), (1.0, 5.0))
+        self.assertEqual(self.client.timeout(2), (1.0, 2))
+
+        with patch.object(self.client.session, 'get') as mock_get:
+            self.client.get(self.url, read_timeout=2)
+            self.assertEqual(mock_get.call_args[1]["timeout"], (1.0, 2))
+
+    def test_lmm_interface_calls_share_the_pool(self):
+        with patch('config.LOCAL_LLM_URL', self.url):
+            lmm = LMMInterface(data_logger=MagicMock(), http_client=self.client)
+
+        self.assertTrue(lmm.check_connection())
+        for _ in range(2):
+            result = lmm.process_data(user_context={"current_mode": "active"})
+            self.assertFalse((result.get("_meta") or {}).get("is_fallback", False))
+
+        stats = self.client.get_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["connections_opened"], 1)
+
+    def test_failed_request_counts_as_error(self):
+        client = LMMHttpClient(connect_timeout=0.5, read_timeout=0.5)
+        # Port of a closed server socket: connection refused
+        self.server.shutdown()
+        self.server.server_close()
+        with self.assertRaises(Exception):
+            client.get(self.url)
+        self.assertEqual(client.get_stats()["errors"], 1)
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
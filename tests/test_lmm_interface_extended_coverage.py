@@ -20,13 +20,13 @@ def lmm_interface(mock_logger):
         yield LMMInterface(data_logger=mock_logger)
 
 def test_check_connection_success(lmm_interface):
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         mock_get.return_value.status_code = 200
         assert lmm_interface.check_connection() is True
         mock_get.assert_called_once()
 
 def test_check_connection_failure(lmm_interface):
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Case 1: Exception
         mock_get.side_effect = requests.exceptions.ConnectionError("Fail")
         assert lmm_interface.check_connection() is False
@@ -111,7 +111,7 @@ def test_prompt_construction_full_context(lmm_interface):
         "preferred_interventions": ["box_breathing"]
     }
 
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         # Mock successful response
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -195,7 +195,7 @@ def test_retry_on_schema_validation_failure(lmm_interface):
 
     good_schema = {"state_estimation": base_state, "suggestion": None}
 
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         # First call returns bad schema, second call returns good schema
         bad_response = MagicMock()
         bad_response.status_code = 200
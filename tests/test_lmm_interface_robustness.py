@@ -16,7 +16,7 @@ class TestLMMInterface(unittest.TestCase):
     def tearDown(self):
         self.config_patcher.stop()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_process_data_success(self, mock_post):
         # Mock successful response
         response_data = {
@@ -42,7 +42,7 @@ class TestLMMInterface(unittest.TestCase):
         self.assertIn('response_format', kwargs['json'])
         self.assertEqual(kwargs['json']['response_format'], {"type": "json_object"})
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_process_data_retry_logic(self, mock_post):
         # Mock first two calls failing, third succeeding
         response_data = {
@@ -70,7 +70,7 @@ class TestLMMInterface(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(mock_post.call_count, 3)
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_process_data_schema_validation(self, mock_post):
         # Mock response with missing keys
         invalid_data = {
@@ -17,7 +17,7 @@ class TestLMMLatency(unittest.TestCase):
         self.mock_logger = MagicMock()
         self.lmm_interface = LMMInterface(data_logger=self.mock_logger)
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_latency_monitoring(self, mock_post):
         """
         Test that LMM latency is calculated, logged, and returned in _meta.
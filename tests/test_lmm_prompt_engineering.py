@@ -19,13 +19,15 @@ class TestLMMPromptEngineering(unittest.TestCase):
         self.mock_config.LMM_CIRCUIT_BREAKER_MAX_FAILURES = 5
         self.mock_config.LMM_CIRCUIT_BREAKER_COOLDOWN = 60
         self.mock_config.LMM_FALLBACK_ENABLED = False
+        self.mock_config.LMM_REQUEST_DEADLINE = 30.0
+        self.mock_config.LMM_HEDGE_URL = ""
 
         self.lmm_interface = LMMInterface(data_logger=self.mock_logger, intervention_library=self.mock_library)
 
     def tearDown(self):
         self.config_patcher.stop()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_prompt_includes_new_audio_metrics(self, mock_post):
         # Setup mock response
         mock_response = MagicMock()
@@ -86,7 +88,7 @@ class TestLMMPromptEngineering(unittest.TestCase):
         self.assertIn("Audio ZCR: 0.1500", user_text)
         self.assertIn("Speech Rate: 6.00 syllables/sec", user_text)
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_prompt_handles_missing_metrics(self, mock_post):
          # Setup mock response
         mock_response = MagicMock()
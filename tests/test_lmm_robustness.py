@@ -23,7 +23,7 @@ class TestLMMRobustness(unittest.TestCase):
 
     def test_fallback_response(self):
         """Test that fallback response is returned when LMM fails."""
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_post.side_effect = requests.exceptions.RequestException("Connection Refused")
 
             # Should fail 3 times (retries) then return fallback
@@ -36,7 +36,7 @@ class TestLMMRobustness(unittest.TestCase):
 
     def test_circuit_breaker_activates(self):
         """Test that circuit breaker trips after max failures."""
-        with patch('requests.post') as mock_post:
+        with patch('requests.Session.post') as mock_post:
             mock_post.side_effect = requests.exceptions.RequestException("Connection Refused")
 
             # 1st call (fails 3 times due to retries inside process_data)
@@ -69,8 +69,15 @@ class TestLMMRobustness(unittest.TestCase):
             # Wait for cooldown
             time.sleep(1.1)
 
-            # 5th call - Should retry
-            self.lmm.process_data(user_context={"sensor_metrics": {}})
+            # 5th call - Health probe fails: still no full request
+            with patch.object(self.lmm, 'check_connection', return_value=False):
+                self.lmm.process_data(user_context={"sensor_metrics": {}})
+            mock_post.assert_not_called()
+
+            # 6th call - Probe answers after another cooldown: should retry
+            time.sleep(1.1)
+            with patch.object(self.lmm, 'check_connection', return_value=True):
+                self.lmm.process_data(user_context={"sensor_metrics": {}})
             mock_post.assert_called()
 
 if __name__ == '__main__':
@@ -0,0 +1,123 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.lmm_http_client import LMMHttpClient
+from core.lmm_interface import LMMInterface
+from core.lmm_router import LMMRouter, LMMEndpoint, CAPABILITY_VISION, CAPABILITY_TEXT
+from tools.lmm_standin_server import StandinServer
+
+FRAME = "aGVsbG8="  # Any base64 string; stand-ins only look at the message structure
+
+
+class TestLMMRouterSelection(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.a = LMMEndpoint("http://a:1234")
+        self.b = LMMEndpoint("http://b:1234/v1", weight=2.0)
+        self.text = LMMEndpoint("http://c:8080", capabilities=["text"])
+        self.router = LMMRouter([self.a, self.b, self.text], http_client=MagicMock(), clock=self.clock, eject_after=2)
+
+    def _complete(self, endpoint, latency=None):
+        self.router.begin(endpoint)
+        if latency is None:
+            self.router.record_failure(endpoint)
+        else:
+            self.router.record_success(endpoint, latency)
+
+    def test_urls_are_normalized(self):
+        self.assertEqual(self.a.url, "http://a:1234/v1/chat/completions")
+        self.assertEqual(self.b.models_url, "http://b:1234/v1/models")
+
+    def test_untimed_first_then_lowest_weighted_latency(self):
+        self.assertIs(self.router.select(CAPABILITY_TEXT), self.b)  # Untimed, highest weight
+        self._complete(self.b, 1.0)
+        self._complete(self.a, 0.8)
+        self._complete(self.text, 3.0)
+        # b: 1.0 / 2 beats a: 0.8 / 1
+        self.assertIs(self.router.select(CAPABILITY_TEXT), self.b)
+        self.router.begin(self.b)  # One in flight doubles its cost
+        self.assertIs(self.router.select(CAPABILITY_TEXT), self.a)
+
+    def test_vision_requests_skip_text_only_endpoints(self):
+        self._complete(self.a, 5.0)
+        self._complete(self.b, 5.0)
+        self._complete(self.text, 0.1)
+        self.assertIs(self.router.select(CAPABILITY_TEXT), self.text)
+        self.assertIn(self.router.select(CAPABILITY_VISION), (self.a, self.b))
+
+    def test_ejection_and_readmission(self):
+        self._complete(self.a, 0.5)
+        self._complete(self.b, 0.5)
+        self._complete(self.b)
+        self._complete(self.b)
+        self.assertFalse(self.b.healthy)
+        self.assertIs(self.router.select(CAPABILITY_VISION), self.a)
+        self.assertIs(self.router.select(CAPABILITY_VISION, exclude=[self.a]), self.a)  # Nothing healthy left to try
+
+        self.router.http.get.return_value.status_code = 200
+        self.clock.advance(5)
+        self.router.probe_ejected()
+        self.router.http.get.assert_not_called()  # Probe interval not reached
+
+        self.clock.advance(10)
+        self.router.probe_ejected()
+        self.router.http.get.assert_called_once_with(self.b.models_url, read_timeout=2.0)
+        self.assertTrue(self.b.healthy)
+
+    def test_all_ejected_still_returns_an_endpoint(self):
+        for endpoint in (self.a, self.b):
+            self._complete(endpoint)
+            self._complete(endpoint)
+        self.a.error_rate = 0.1
+        self.assertIs(self.router.select(CAPABILITY_VISION), self.a)
+
+
+class TestLMMRouterWithStandins(unittest.TestCase):
+    def setUp(self):
+        self.fast = StandinServer("fast", latency=0.01).start()
+        self.slow = StandinServer("slow", latency=0.15).start()
+        self.text = StandinServer("text", latency=0.0, vision=False).start()
+        for server in (self.fast, self.slow, self.text):
+            self.addCleanup(server.stop)
+
+        self.clock = VirtualClock(1000.0)
+        http = LMMHttpClient(connect_timeout=1.0, read_timeout=5.0)
+        self.router = LMMRouter([LMMEndpoint(self.fast.url), LMMEndpoint(self.slow.url),
+                                 LMMEndpoint(self.text.url, capabilities=["text"])],
+                                http_client=http, clock=self.clock, eject_after=2, probe_interval=5.0)
+        self.lmm = LMMInterface(data_logger=MagicMock(), clock=self.clock, http_client=http, router=self.router)
+        self.addCleanup(self.lmm.close)
+
+    def _analyze(self):
+        result = self.lmm.process_data(video_data=FRAME, user_context={"current_mode": "active"})
+        return result["visual_context"][0]
+
+    def test_load_goes_to_the_faster_vision_server(self):
+        answered = [self._analyze() for _ in range(8)]
+        self.assertEqual(len(self.text.requests), 0)
+        self.assertEqual(answered.count("slow"), 1)  # Measured once, then avoided
+        self.assertEqual(answered.count("fast"), 7)
+
+    def test_down_server_is_ejected_and_readmitted(self):
+        self._analyze()
+        self._analyze()
+        self.fast.down = True
+        answered = [self._analyze() for _ in range(3)]
+        self.assertEqual(answered, ["slow"] * 3)  # Failed attempts were retried on the other server
+        self.assertFalse(self.router.endpoints[0].healthy)
+
+        self.fast.down = False
+        self.clock.advance(5)
+        self.router.probe_ejected()
+        self.assertTrue(self.router.endpoints[0].healthy)
+        self.assertTrue(self.lmm.check_connection())
+
+
+if __name__ == '__main__':
+    unittest.main()
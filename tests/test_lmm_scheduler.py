@@ -0,0 +1,235 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from core.clock import VirtualClock
+from core.lmm_scheduler import LMMScheduler, PRIORITY_HIGH, PRIORITY_LOW
+from core.logic_engine import LogicEngine
+
+
+class TestLMMScheduler(unittest.TestCase):
+    def setUp(self):
+        self.dispatched = []
+        self.scheduler = LMMScheduler(self._dispatch)
+
+    def _dispatch(self, request):
+        self.dispatched.append(request)
+        return True
+
+    def test_dispatches_when_idle(self):
+        self.assertEqual(self.scheduler.submit("periodic_check"), "dispatched")
+        self.assertEqual(len(self.dispatched), 1)
+        self.assertTrue(self.scheduler.is_busy())
+
+    def test_triggers_coalesce_while_busy(self):
+        self.scheduler.submit("high_audio_level")
+        self.assertEqual(self.scheduler.submit("periodic_check", allow_intervention=False), "queued")
+        self.assertEqual(self.scheduler.submit("high_video_activity"), "coalesced")
+
+        pending = self.scheduler.pending
+        self.assertEqual(pending.reasons, ["periodic_check", "high_video_activity"])
+        self.assertEqual(pending.reason, "high_video_activity")
+        self.assertEqual(pending.priority, PRIORITY_HIGH)
+        self.assertTrue(pending.allow_intervention)
+
+        # Completion dispatches exactly one merged follow-up
+        self.scheduler.complete(self.dispatched[0])
+        self.assertEqual(len(self.dispatched), 2)
+        self.assertIs(self.dispatched[1], pending)
+        self.assertIsNone(self.scheduler.pending)
+
+    def test_high_priority_preempts_periodic(self):
+        self.scheduler.submit("periodic_check")
+        periodic = self.dispatched[0]
+
+        self.assertEqual(self.scheduler.submit("high_audio_level"), "preempted")
+        self.assertTrue(periodic.cancelled.is_set())
+        self.assertEqual(self.dispatched[1].reason, "high_audio_level")
+
+        # A second urgent trigger must not stack another concurrent call
+        self.assertEqual(self.scheduler.submit("high_video_activity"), "queued")
+
+        # Draining the preempted request does not release the active slot
+        self.scheduler.complete(periodic)
+        self.assertTrue(self.scheduler.is_busy())
+        self.assertEqual(len(self.dispatched), 2)
+
+    def test_high_priority_does_not_preempt_high_priority(self):
+        self.scheduler.submit("high_audio_level")
+        self.assertEqual(self.scheduler.submit("high_video_activity"), "queued")
+        self.assertFalse(self.dispatched[0].cancelled.is_set())
+
+    def test_empty_dispatch_releases_slot(self):
+        scheduler = LMMScheduler(lambda request: False)
+        self.assertEqual(scheduler.submit("periodic_check"), "empty")
+        self.assertFalse(scheduler.is_busy())
+
+    def test_worker_completing_during_dispatch(self):
+        # A worker that finishes before dispatch() returns still sees a counted request
+        def dispatch(request):
+            self.dispatched.append(request)
+            if len(self.dispatched) == 1:
+                scheduler.submit("high_video_activity")
+                scheduler.complete(request)
+            return True
+
+        scheduler = LMMScheduler(dispatch)
+        self.assertEqual(scheduler.submit("high_audio_level"), "dispatched")
+        self.assertEqual([r.reason for r in self.dispatched], ["high_audio_level", "high_video_activity"])
+        self.assertEqual(scheduler.get_stats()["dispatched"], 2)
+        self.assertTrue(scheduler.is_busy())
+
+    def test_dispatch_runs_outside_the_lock(self):
+        entered, release = threading.Event(), threading.Event()
+
+        def dispatch(request):
+            entered.set()
+            release.wait(5.0)  # Payload building
+            return True
+
+        scheduler = LMMScheduler(dispatch)
+        worker = threading.Thread(target=scheduler.submit, args=("periodic_check",), daemon=True)
+        worker.start()
+        self.assertTrue(entered.wait(5.0))
+        busy = []
+        probe = threading.Thread(target=lambda: busy.append(scheduler.is_busy()), daemon=True)
+        probe.start()
+        probe.join(timeout=1.0)
+        release.set()
+        worker.join(timeout=5.0)
+        self.assertEqual(busy, [True])  # Answered while dispatch was still running
+
+    def test_empty_dispatch_starts_what_queued_meanwhile(self):
+        def dispatch(request):
+            self.dispatched.append(request)
+            if len(self.dispatched) == 1:
+                self.assertEqual(scheduler.submit("high_video_activity"), "queued")
+                return False
+            return True
+
+        scheduler = LMMScheduler(dispatch)
+        self.assertEqual(scheduler.submit("high_audio_level"), "empty")
+        self.assertEqual([r.reason for r in self.dispatched], ["high_audio_level", "high_video_activity"])
+        self.assertEqual(scheduler.get_stats()["dispatched"], 1)
+        self.assertTrue(scheduler.is_busy())
+
+    def test_shutdown_drops_pending(self):
+        self.scheduler.submit("periodic_check", priority=PRIORITY_LOW)
+        self.scheduler.submit("unknown")
+        self.scheduler.shutdown()
+
+        self.scheduler.complete(self.dispatched[0])
+        self.assertEqual(len(self.dispatched), 1)
+        self.assertEqual(self.scheduler.submit("high_audio_level"), "closed")
+
+
+class TestLogicEngineScheduling(unittest.TestCase):
+    def setUp(self):
+        self.engine = LogicEngine(logger=MagicMock())
+        self.engine.last_video_frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        self.release = threading.Event()
+        self.calls = []
+
+        def slow_process(video_data, audio_data, user_context):
+            self.calls.append(dict(user_context))
+            if len(self.calls) == 1:
+                self.release.wait(5.0)
+            return {"state_estimation": {"arousal": 50, "overload": 0, "focus": 50, "energy": 50, "mood": 50}}
+
+        self.engine.lmm_interface = MagicMock()
+        self.engine.lmm_interface.process_data.side_effect = slow_process
+
+    def tearDown(self):
+        self.release.set()
+        self.engine.shutdown()
+
+    def _wait_for_calls(self, n):
+        deadline = time.time() + 5.0
+        while len(self.calls) < n and time.time() < deadline:
+            time.sleep(0.01)
+
+    def test_urgent_trigger_not_dropped(self):
+        self.engine._trigger_lmm_analysis(reason="high_audio_level")
+        self._wait_for_calls(1)
+
+        # Arrives while the first call is in flight; previously this was dropped
+        self.engine.audio_level = 0.9
+        self.engine._trigger_lmm_analysis(reason="high_video_activity")
+        self.assertEqual(len(self.calls), 1)
+
+        self.release.set()
+        self._wait_for_calls(2)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.calls[1]["trigger_reason"], "high_video_activity")
+        # Payload is built at dispatch time from the latest snapshot
+        self.assertAlmostEqual(self.calls[1]["sensor_metrics"]["audio_level"], 0.9)
+
+    def test_periodic_result_discarded_when_preempted(self):
+        self.engine.state_engine.update = MagicMock()
+        self.engine._trigger_lmm_analysis(reason="periodic_check")
+        self._wait_for_calls(1)
+        periodic_thread = self.engine.lmm_thread
+
+        self.engine._trigger_lmm_analysis(reason="high_audio_level")
+        self._wait_for_calls(2)
+        self.engine.lmm_thread.join(timeout=5.0)
+        self.assertEqual(self.engine.state_engine.update.call_count, 1)
+
+        self.release.set()
+        periodic_thread.join(timeout=5.0)
+        # The preempted periodic result is not applied on top of the newer one
+        self.assertEqual(self.engine.state_engine.update.call_count, 1)
+
+    def test_speech_right_after_periodic_check_preempts_it(self):
+        clock = VirtualClock(1000.0)
+        engine = LogicEngine(logger=MagicMock(), clock=clock)
+        engine.last_video_frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        engine.lmm_interface = self.engine.lmm_interface
+        engine.audio_threshold_high = 0.5
+        try:
+            engine.update()
+            self._wait_for_calls(1)
+            self.assertEqual(self.calls[0]["trigger_reason"], "periodic_check")
+            periodic = engine.lmm_scheduler._inflight
+
+            # Well inside min_lmm_interval of the periodic check
+            clock.advance(0.1)
+            engine.audio_level = 0.9
+            engine.audio_analysis = {"is_speech": True}
+            engine.update()
+            self._wait_for_calls(2)
+
+            self.assertTrue(periodic.cancelled.is_set())
+            self.assertEqual(self.calls[1]["trigger_reason"], "high_audio_level")
+            self.assertEqual(engine.lmm_scheduler.get_stats()["preempted"], 1)
+        finally:
+            self.release.set()
+            engine.shutdown()
+
+    def test_sustained_speech_does_not_resubmit_every_tick(self):
+        clock = VirtualClock(1000.0)
+        engine = LogicEngine(logger=MagicMock(), clock=clock)
+        engine.last_video_frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        engine.lmm_interface = self.engine.lmm_interface
+        engine.audio_threshold_high = 0.5
+        engine.audio_level = 0.9
+        engine.audio_analysis = {"is_speech": True}
+        try:
+            engine.update()
+            self._wait_for_calls(1)
+            self.assertEqual(engine.last_lmm_call_time, 1000.0)
+            for _ in range(8):  # The first call is still running, and no heartbeat is due yet
+                clock.advance(0.5)
+                engine.update()
+            self.assertEqual(engine.lmm_scheduler.get_stats()["submitted"], 1)
+            self.assertEqual(engine.last_lmm_call_time, 1000.0)  # Nothing new started
+        finally:
+            self.release.set()
+            engine.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.lmm_interface import LMMInterface
+from core.lmm_stream import IncrementalJSONObjectParser, iter_sse_content
+from core.logic_engine import LogicEngine
+
+STATE = {"arousal": 70, "overload": 10, "focus": 40, "energy": 60, "mood": 55}
+RESPONSE = {
+    "state_estimation": STATE,
+    "visual_context": ["phone_usage", "a, b {c}"],
+    "suggestion": {"id": "box_breathing", "type": "physiology", "message": "Say \"hi\"\\n"},
+}
+
+
+def _sse_lines(text, size=7, trailer=""):
+    """Splits text into small SSE content deltas, like a token stream."""
+    lines = [f"data: {json.dumps({'choices': [{'delta': {'role': 'assistant'}}]})}"]
+    for i in range(0, len(text), size):
+        lines.append(f"data: {json.dumps({'choices': [{'delta': {'content': text[i:i + size]}}]})}")
+        lines.append("")
+    for i in range(0, len(trailer), size):
+        lines.append(f"data: {json.dumps({'choices': [{'delta': {'content': trailer[i:i + size]}}]})}")
+    lines.append("data: [DONE]")
+    return lines
+
+
+class TestIncrementalJSONObjectParser(unittest.TestCase):
+    def test_fields_are_reported_as_they_close(self):
+        text = "<think>{not json}</think>\n```json\n" + json.dumps(RESPONSE) + "\n```"
+        parser = IncrementalJSONObjectParser()
+        completed = []
+        for i in range(0, len(text), 3):
+            completed.extend(parser.feed(text[i:i + 3]))
+            if not completed:
+                self.assertFalse(parser.fields)
+
+        self.assertEqual([key for key, _ in completed], ["state_estimation", "visual_context", "suggestion"])
+        self.assertEqual(parser.fields, RESPONSE)
+        self.assertTrue(parser.complete)
+
+    def test_state_is_available_before_the_rest(self):
+        text = json.dumps(RESPONSE)
+        cut = text.index('"visual_context"') + 5
+        parser = IncrementalJSONObjectParser()
+        self.assertEqual(parser.feed(text[:cut]), [("state_estimation", STATE)])
+        self.assertFalse(parser.complete)
+
+    def test_sse_content_stream(self):
+        text = json.dumps(RESPONSE)
+        self.assertEqual("".join(iter_sse_content(_sse_lines(text))), text)
+
+
+class TestStreamingLMMInterface(unittest.TestCase):
+    def setUp(self):
+        self.lmm = LMMInterface(data_logger=MagicMock())
+        self.lmm.streaming = True
+
+    def _response(self, lines):
+        response = MagicMock()
+        response.iter_lines.return_value = iter(lines)
+        return response
+
+    @patch('requests.Session.post')
+    def test_partial_fields_and_early_cancel(self, mock_post):
+        # Reasoning-style tail after the object must not be waited for
+        response = self._response(_sse_lines(json.dumps(RESPONSE), trailer=" Explanation: " + "x" * 200))
+        mock_post.return_value = response
+        partial = []
+
+        result = self.lmm.process_data(user_context={"current_mode": "active"}, on_partial=lambda k, v: partial.append(k))
+
+        self.assertEqual(partial, ["state_estimation", "visual_context", "suggestion"])
+        self.assertEqual(result["state_estimation"], STATE)
+        self.assertEqual(result["_meta"]["streamed_fields"], partial)
+        self.assertIn("first_field_latency_ms", result["_meta"])
+        self.assertTrue(mock_post.call_args[1]["stream"])
+        self.assertTrue(mock_post.call_args[1]["json"]["stream"])
+        response.close.assert_called_once()
+        # Stopped reading as soon as the required fields were in
+        self.assertIsNotNone(next(response.iter_lines.return_value, None))
+
+    @patch('requests.Session.post')
+    def test_truncated_stream_is_retried(self, mock_post):
+        text = json.dumps(RESPONSE)
+        truncated = self._response(_sse_lines(text[:text.index('"suggestion"')]))
+        mock_post.side_effect = [truncated, self._response(_sse_lines(text))]
+        partial = []
+
+        with patch.object(self.lmm.clock, 'sleep'):
+            result = self.lmm.process_data(user_context={"current_mode": "active"}, on_partial=lambda k, v: partial.append(k))
+
+        self.assertEqual(mock_post.call_count, 2)
+        # Fields already delivered by the failed attempt are not delivered twice
+        self.assertEqual(partial, ["state_estimation", "visual_context", "suggestion"])
+        self.assertEqual(result["suggestion"]["id"], "box_breathing")
+
+
+class TestLogicEngineStreaming(unittest.TestCase):
+    def test_streamed_state_is_applied_once(self):
+        lmm = MagicMock()
+        lmm.streaming = True
+        engine = LogicEngine(logger=MagicMock(), lmm_interface=lmm)
+        engine.state_engine = MagicMock()
+        engine.state_engine.get_state.return_value = {}
+
+        def process_data(video_data=None, audio_data=None, user_context=None, on_partial=None):
+            on_partial("state_estimation", STATE)
+            engine.state_engine.update.assert_called_once_with({"state_estimation": STATE})
+            return dict(RESPONSE, _meta={"streamed_fields": ["state_estimation"]})
+
+        lmm.process_data.side_effect = process_data
+        engine._run_lmm_analysis_async({"video_data": None, "audio_data": None, "user_context": {}}, allow_intervention=False)
+
+        engine.state_engine.update.assert_called_once()
+        engine.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -96,8 +96,8 @@ class TestLMMTimeout(unittest.TestCase):
         import numpy as np
         self.engine.last_audio_chunk = np.zeros(1024)
 
-        # Mock requests.post to timeout
-        with patch('requests.post', side_effect=requests.exceptions.Timeout("Connection timed out")):
+        # Mock the pooled session's post to timeout
+        with patch('requests.Session.post', side_effect=requests.exceptions.Timeout("Connection timed out")):
 
             # --- Cycle 1: Timeout ---
             # Manually trigger LMM analysis via update or direct method
@@ -110,7 +110,7 @@ class TestLMMTimeout(unittest.TestCase):
                 self.engine.update()
 
             # Verification 1:
-            # - requests.post called (retried 3 times internally by LMMInterface)
+            # - Session.post called (retried 3 times internally by LMMInterface)
             # - LogicEngine should have incremented failure count?
             # LMMInterface catches Timeout, increments its circuit_failures.
             # It returns None (since fallback enabled but circuit not open yet? Or returns fallback?)
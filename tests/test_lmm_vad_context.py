@@ -14,7 +14,7 @@ def lmm_interface(mock_logger):
     config.LMM_FALLBACK_ENABLED = False
     return LMMInterface(data_logger=mock_logger)
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_vad_metrics_in_prompt(mock_post, lmm_interface):
     """
     Verifies that VAD metrics are correctly formatted into the LMM prompt.
@@ -48,7 +48,7 @@ def test_vad_metrics_in_prompt(mock_post, lmm_interface):
     # Call process_data
     lmm_interface.process_data(user_context=user_context)
 
-    # Inspect the call to requests.post
+    # Inspect the call to the pooled session's post
     assert mock_post.called
     args, kwargs = mock_post.call_args
     payload = kwargs['json']
@@ -69,7 +69,7 @@ def test_vad_metrics_in_prompt(mock_post, lmm_interface):
     assert "Speech Rate: 3.50 syllables/sec" in text_part
     assert "Voice Activity: Yes (Conf: 0.85)" in text_part
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_vad_metrics_missing_keys(mock_post, lmm_interface):
     """
     Verifies that the system handles missing VAD keys gracefully (backward compatibility).
@@ -105,7 +105,7 @@ def test_vad_metrics_missing_keys(mock_post, lmm_interface):
     assert "Speech Rate: 0.00 syllables/sec" in text_part
     assert "Voice Activity: No (Conf: 0.00)" in text_part
 
-@patch('requests.post')
+@patch('requests.Session.post')
 def test_no_audio_analysis(mock_post, lmm_interface):
     """
     Verifies behavior when audio_analysis is completely missing.
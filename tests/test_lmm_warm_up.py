@@ -0,0 +1,135 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+import requests
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.lmm_interface import LMMInterface
+from core.lmm_workloads import WORKLOAD_STATE
+from core.logic_engine import LogicEngine
+
+
+class TestLMMInterfaceWarmUp(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.lmm = LMMInterface(data_logger=MagicMock(), clock=self.clock)
+        self.lmm.http = MagicMock()
+        self.lmm.http.read_timeout = 20.0
+
+    def _respond_after(self, *latencies):
+        """http.post takes the given virtual seconds per call."""
+        remaining = iter(latencies)
+
+        def post(url, json=None, read_timeout=None):
+            self.clock.advance(next(remaining))
+            return MagicMock()
+        self.lmm.http.post.side_effect = post
+
+    def test_cold_then_warm_requests_set_the_baseline(self):
+        # Cold request takes 30 s (model load), the warm ones 1.5 s and 1.0 s
+        self._respond_after(30.0, 1.5, 1.0)
+        result = self.lmm.warm_up(runs=2, timeout=90.0)
+
+        self.assertEqual(result, {"cold_latency": 30.0, "warm_latency": 1.5})
+        # The baseline applies to full analyses only
+        analysis_class = LMMInterface._latency_class(self.lmm.http.post.call_args.kwargs["json"])
+        self.assertEqual(self.lmm.health.baselines, {analysis_class: 1.5})
+        self.assertEqual(self.lmm.health.adaptive_timeout(20.0, analysis_class), 5.0)
+        self.assertEqual(self.lmm.health.adaptive_timeout(20.0, "text-model/text/100"), 20.0)
+        endpoint = self.lmm.router.primary
+        self.assertEqual(endpoint.ewma_latency, 1.5 + self.lmm.router.ewma_alpha * (1.0 - 1.5))  # Warm runs only
+        self.assertEqual((endpoint.requests, endpoint.in_flight), (3, 0))
+
+        calls = self.lmm.http.post.call_args_list
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[0].kwargs["read_timeout"], 90.0)
+        payload = calls[0].kwargs["json"]
+        self.assertEqual(payload["messages"][0]["content"], self.lmm.SYSTEM_INSTRUCTION)
+        self.assertTrue(LMMInterface._has_image(payload))
+        self.assertEqual(self.lmm.workloads.get_stats()[WORKLOAD_STATE]["requests"], 1)
+        self.assertEqual(self.lmm.workloads.in_flight(WORKLOAD_STATE), 0)
+
+    def test_warm_runs_share_the_request_deadline(self):
+        self.lmm.request_deadline = 10.0
+        self._respond_after(30.0, 6.0, 3.5, 1.0)
+        result = self.lmm.warm_up(runs=3, timeout=90.0)
+
+        self.assertEqual(result["warm_latency"], 6.0)
+        read_timeouts = [call.kwargs["read_timeout"] for call in self.lmm.http.post.call_args_list]
+        # The second warm run only gets what is left of the 10 s; nothing is left for a third
+        self.assertEqual(read_timeouts, [90.0, 10.0, 4.0])
+
+    def test_skipped_while_circuit_is_open(self):
+        self.lmm.health.force_open(self.clock.time() + 60)
+        self.assertIsNone(self.lmm.warm_up())
+        self.lmm.http.post.assert_not_called()
+
+    def test_waits_for_a_state_workload_slot(self):
+        # Both state-estimation slots are taken by analyses; shutting down while waiting gives up
+        self.lmm.workloads.acquire(WORKLOAD_STATE)
+        self.lmm.workloads.acquire(WORKLOAD_STATE)
+        self.lmm._closing.set()
+        self.assertIsNone(self.lmm.warm_up())
+        self.lmm.http.post.assert_not_called()
+        self.assertEqual(self.lmm.health.consecutive_failures, 0)
+
+    def test_baseline_shortens_the_read_timeout(self):
+        self.lmm.health.set_baseline(3.0)
+        self.assertEqual(self.lmm.health.adaptive_timeout(20.0), 6.0)
+
+    def test_unreachable_server(self):
+        self.lmm.http.post.side_effect = requests.exceptions.ConnectionError("refused")
+        self.assertIsNone(self.lmm.warm_up())
+        self.assertEqual(self.lmm.health.baselines, {})
+        self.assertEqual(self.lmm.http.post.call_count, 1)
+        # The failed request is accounted to the endpoint and does not stay in flight
+        endpoint = self.lmm.router.primary
+        self.assertEqual((endpoint.in_flight, endpoint.failures), (0, 1))
+        self.assertEqual(self.lmm.health.consecutive_failures, 1)
+
+    def test_failed_warm_run_does_not_stay_in_flight(self):
+        self.lmm.http.post.side_effect = [MagicMock(), requests.exceptions.ReadTimeout("slow")]
+        self.assertIsNone(self.lmm.warm_up(runs=2))
+        endpoint = self.lmm.router.primary
+        self.assertEqual((endpoint.requests, endpoint.in_flight, endpoint.failures), (2, 0, 1))
+
+
+class TestLogicEngineWarmUp(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.engine = LogicEngine(logger=MagicMock(), clock=self.clock)
+        self.engine.lmm_interface = MagicMock()
+        self.engine._trigger_lmm_analysis = MagicMock()
+
+    def test_periodic_checks_wait_for_warm_up(self):
+        self.engine._lmm_warm_up_thread = MagicMock(is_alive=MagicMock(return_value=True))
+        self.clock.advance(10)
+        self.engine.update()
+        self.engine._trigger_lmm_analysis.assert_not_called()
+
+        self.engine._lmm_warm_up_thread.is_alive.return_value = False
+        self.engine.update()
+        self.assertEqual(self.engine._trigger_lmm_analysis.call_args.kwargs["reason"], "periodic_check")
+
+    def test_slow_server_lengthens_periodic_interval(self):
+        self.engine.lmm_interface.warm_up.return_value = {"cold_latency": 40.0, "warm_latency": 4.2}
+        self.engine.start_lmm_warm_up()
+        self.engine._lmm_warm_up_thread.join(timeout=5.0)
+
+        self.assertEqual(self.engine.lmm_call_interval, 9)
+        self.engine.logger.log_event.assert_any_call("lmm_warm_up", {"cold_latency": 40.0, "warm_latency": 4.2, "periodic_interval": 9})
+
+    def test_fast_server_keeps_configured_interval(self):
+        self.engine.lmm_interface.warm_up.return_value = {"cold_latency": 5.0, "warm_latency": 0.8}
+        self.engine.start_lmm_warm_up()
+        self.engine._lmm_warm_up_thread.join(timeout=5.0)
+        self.assertEqual(self.engine.lmm_call_interval, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.lmm_interface import LMMInterface
+from core.lmm_workloads import WorkloadGate, WORKLOAD_STATE, WORKLOAD_POSE, WORKLOAD_CAPTION
+
+
+class TestWorkloadGate(unittest.TestCase):
+    def _start(self, gate, workload, log, hold=0.05):
+        def run():
+            with gate.slot(workload):
+                log.append(workload)
+                time.sleep(hold)
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def test_captions_wait_for_state_estimation(self):
+        gate = WorkloadGate(max_defer=5.0)
+        log = []
+        self.assertTrue(gate.acquire(WORKLOAD_STATE))
+        captions = [self._start(gate, WORKLOAD_CAPTION, log) for _ in range(3)]
+        time.sleep(0.2)
+        self.assertEqual(log, [])  # Deferred while the analysis is in flight
+
+        gate.release(WORKLOAD_STATE, 1.0)
+        for thread in captions:
+            thread.join(timeout=5.0)
+        self.assertEqual(log, [WORKLOAD_CAPTION] * 3)  # Then one at a time
+
+        stats = gate.get_stats()[WORKLOAD_CAPTION]
+        self.assertEqual((stats["requests"], stats["deferred"], stats["forced"]), (3, 3, 0))
+        self.assertGreater(stats["max_wait_s"], 0.15)
+        self.assertEqual(gate.get_stats()[WORKLOAD_STATE]["mean_service_s"], 1.0)
+
+    def test_interactive_work_does_not_yield(self):
+        gate = WorkloadGate()
+        self.assertTrue(gate.acquire(WORKLOAD_STATE))
+        log = []
+        self._start(gate, WORKLOAD_POSE, log).join(timeout=2.0)
+        self.assertEqual(log, [WORKLOAD_POSE])
+
+    def test_max_defer_prevents_starvation(self):
+        gate = WorkloadGate(max_defer=0.1)
+        self.assertTrue(gate.acquire(WORKLOAD_STATE))
+        log = []
+        self._start(gate, WORKLOAD_CAPTION, log).join(timeout=2.0)
+        self.assertEqual(log, [WORKLOAD_CAPTION])
+        self.assertEqual(gate.get_stats()[WORKLOAD_CAPTION]["forced"], 1)
+
+    def test_cancel_while_waiting(self):
+        gate = WorkloadGate(max_defer=5.0)
+        gate.acquire(WORKLOAD_STATE)
+        cancel = threading.Event()
+        cancel.set()
+        self.assertFalse(gate.acquire(WORKLOAD_CAPTION, cancel))
+        self.assertEqual(gate.in_flight(WORKLOAD_CAPTION), 0)
+
+    def test_overrides_and_unknown_classes(self):
+        gate = WorkloadGate(classes={WORKLOAD_CAPTION: {"max_concurrent": 2, "yields": False}})
+        self.assertEqual(gate.classes[WORKLOAD_CAPTION]["priority"], 0)
+        self.assertTrue(gate.acquire(WORKLOAD_CAPTION))
+        self.assertTrue(gate.acquire(WORKLOAD_CAPTION))
+        with self.assertRaises(ValueError):
+            gate.acquire("translation")
+
+
+class TestLMMInterfaceWorkloads(unittest.TestCase):
+    def setUp(self):
+        self.lmm = LMMInterface(data_logger=MagicMock())
+        self.lmm.workloads = WorkloadGate(max_defer=5.0)
+
+    def test_caption_waits_for_in_flight_analysis(self):
+        analysis_started = threading.Event()
+        release_analysis = threading.Event()
+        order = []
+
+        def send(payload, **kwargs):
+            if "caption" in str(payload["messages"]):
+                order.append("caption")
+                return {"caption": "Nice."}
+            analysis_started.set()
+            release_analysis.wait(timeout=5.0)
+            order.append("analysis")
+            return {"state_estimation": {"arousal": 50, "overload": 10, "focus": 50, "energy": 50, "mood": 50},
+                    "suggestion": None}
+
+        with patch.object(self.lmm, '_send_request_with_retry', side_effect=send):
+            analysis = threading.Thread(target=self.lmm.process_data, kwargs={"user_context": {"sensor_metrics": {}}})
+            analysis.start()
+            self.assertTrue(analysis_started.wait(timeout=5.0))
+            captions = []
+            caption = threading.Thread(target=lambda: captions.append(self.lmm.generate_caption("aW1n", "desk")))
+            caption.start()
+            time.sleep(0.2)
+            self.assertEqual(order, [])
+            release_analysis.set()
+            analysis.join(timeout=5.0)
+            caption.join(timeout=5.0)
+
+        self.assertEqual(order, ["analysis", "caption"])
+        self.assertEqual(captions, ["Nice."])
+        self.assertEqual(self.lmm.workloads.get_stats()[WORKLOAD_CAPTION]["deferred"], 1)
+        self.assertEqual(self.lmm.workloads.in_flight(WORKLOAD_STATE), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,6 +40,8 @@ class TestLogicEngineCoverage:
         mock_config.LOG_LEVEL = "INFO"
         mock_config.HISTORY_WINDOW_SIZE = 5
         mock_config.HISTORY_SAMPLE_INTERVAL = 10
+        mock_config.HISTORY_NARRATIVE_INTERVAL = 0
+        mock_config.STATE_PREDICTOR_ENABLED = False
         mock_config.RAPID_SWITCHING_THRESHOLD = 4
         mock_config.SEXUAL_AROUSAL_THRESHOLD = 50
         mock_config.MEETING_MODE_SPEECH_DURATION_THRESHOLD = 3.0
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from core.logic_engine import LogicEngine
+from core.metric_store import MetricStore, posture_code
+
+
+class TestMetricStore(unittest.TestCase):
+    def test_window_queries_on_raw_samples(self):
+        store = MetricStore(capacity=100)
+        for i in range(10):
+            store.record(timestamp=1000.0 + i, audio_rms=i / 10.0, is_speech=i % 2 == 0)
+
+        self.assertAlmostEqual(store.mean("audio_rms", 4.5, now=1009.0), 0.7)
+        self.assertAlmostEqual(store.max("audio_rms", 100, now=1009.0), 0.9)
+        self.assertAlmostEqual(store.fraction_true("is_speech", 100, now=1009.0), 0.5)
+        self.assertEqual(store.count("audio_rms", 100, now=1009.0), 10)
+
+    def test_missing_columns_are_ignored(self):
+        store = MetricStore(capacity=10)
+        store.record(timestamp=1.0, audio_rms=0.2)
+        store.record(timestamp=2.0, video_activity=30.0)
+
+        self.assertAlmostEqual(store.mean("audio_rms", 10, now=2.0), 0.2)
+        self.assertAlmostEqual(store.mean("video_activity", 10, now=2.0), 30.0)
+        self.assertIsNone(store.mean("face_detected", 10, now=2.0))
+
+    def test_long_windows_use_rollups_after_wrap(self):
+        store = MetricStore(capacity=50, rollup_buckets=100)
+        # 10 Hz for 300 s: the raw ring only holds the last 5 s
+        ts = 10000.0 + np.arange(3000) * 0.1
+        for t in ts:
+            store.record(timestamp=float(t), audio_rms=1.0 if t < 10150 else 0.0)
+
+        self.assertEqual(len(store), 50)
+        now = float(ts[-1])
+        self.assertAlmostEqual(store.mean("audio_rms", 5, now=now), 0.0)
+        self.assertAlmostEqual(store.mean("audio_rms", 300, now=now), 0.5, places=2)
+        self.assertEqual(store.max("audio_rms", 300, now=now), 1.0)
+
+        starts, means = store.series("audio_rms", 300, 60, now=now)
+        self.assertEqual(list(means[:2]), [1.0, 1.0])
+        self.assertEqual(means[-1], 0.0)
+        self.assertTrue(np.all(np.diff(starts) > 0))
+
+    def test_summary_reports_dominant_posture(self):
+        store = MetricStore(capacity=20)
+        for i in range(5):
+            store.record(timestamp=float(i), face_detected=True, posture=posture_code("slouching"))
+        store.record(timestamp=5.0, face_detected=False)
+
+        summary = store.summary(10, now=5.0)
+        self.assertEqual(summary["dominant_posture"], "slouching")
+        self.assertAlmostEqual(summary["face_presence"], 5 / 6)
+
+
+class TestLogicEngineMetricStore(unittest.TestCase):
+    def test_sensor_processing_feeds_store_and_context(self):
+        engine = LogicEngine(logger=MagicMock())
+        for _ in range(3):
+            engine.process_audio_data(np.full(16, 0.5, dtype=np.float32))
+        engine.process_video_data(np.zeros((8, 8, 3), dtype=np.uint8))
+
+        self.assertAlmostEqual(engine.metric_store.mean("audio_rms", 60), 0.5, places=5)
+        self.assertEqual(engine.metric_store.fraction_true("face_detected", 60), 0.0)
+
+        payload = engine._prepare_lmm_data()
+        trends = payload["user_context"]["sensor_metrics"]["trends"]
+        self.assertAlmostEqual(trends["audio_level_mean"], 0.5, places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
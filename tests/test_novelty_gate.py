@@ -0,0 +1,98 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.image_processing import ImageProcessor
+from core.lmm_scheduler import LMMRequest
+from core.logic_engine import LogicEngine
+from core.novelty_gate import NoveltyGate, fingerprint
+from core.sensor_snapshot import SensorSnapshot
+
+
+def _scene(seed=0, noise=0):
+    rng = np.random.default_rng(seed)
+    frame = np.repeat(np.linspace(0, 255, 320, dtype=np.float64)[None, :], 240, axis=0)
+    frame[60:180, 100:220] = 255 - frame[60:180, 100:220]  # Something in the middle
+    frame = frame + rng.normal(0, noise, frame.shape) if noise else frame
+    return np.clip(np.stack([frame] * 3, axis=-1), 0, 255).astype(np.uint8)
+
+
+class TestNoveltyGate(unittest.TestCase):
+    def test_image_hash_ignores_noise_but_not_scene_changes(self):
+        image_hash = ImageProcessor.difference_hash
+        base = image_hash(_scene())
+        noisy = image_hash(_scene(seed=1, noise=4))
+        changed = image_hash(np.ascontiguousarray(_scene()[:, ::-1]))
+        self.assertLessEqual(bin(base ^ noisy).count("1"), 4)
+        self.assertGreater(bin(base ^ changed).count("1"), 20)
+        self.assertIsNone(image_hash(None))
+        self.assertEqual(image_hash(_scene()), image_hash(_scene()[..., 0]))  # Gray frames hash the same
+
+    def test_distance_and_decisions(self):
+        quiet = SensorSnapshot(video_frame=_scene(), face_metrics={"face_detected": True, "face_count": 1},
+                               video_analysis={"posture_state": "neutral"})
+        gate = NoveltyGate(threshold=0.3, max_staleness=60)
+        base = fingerprint(quiet, "Editor")
+        self.assertEqual(gate.check(base, 0), (True, "dispatched_first"))
+        gate.record(base, 0)
+
+        self.assertEqual(gate.check(fingerprint(quiet.replace(video_frame=_scene(seed=2, noise=4)), "Editor"), 10),
+                         (False, "skipped_unchanged"))
+        self.assertEqual(gate.check(fingerprint(quiet, "Browser"), 20), (True, "dispatched_novel"))
+        away = quiet.replace(face_metrics={"face_detected": False, "face_count": 0})
+        self.assertGreaterEqual(NoveltyGate.distance(fingerprint(away, "Editor"), base), 1.0)
+        self.assertEqual(gate.check(base, 60), (True, "dispatched_stale"))
+        self.assertEqual(gate.get_stats(), {"dispatched_first": 1, "dispatched_novel": 1, "dispatched_stale": 1, "skipped_unchanged": 1})
+
+    def test_disabled_by_default(self):
+        self.assertFalse(NoveltyGate().enabled)
+
+
+class TestLogicEngineNoveltyGating(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.engine = LogicEngine(clock=self.clock)
+        self.engine.lmm_interface = MagicMock()
+        self.engine.task_runner = MagicMock()
+        self.engine.window_sensor = MagicMock()
+        self.engine.window_sensor.get_active_window.return_value = "Editor"
+        self.engine.novelty_gate = NoveltyGate(threshold=0.3, max_staleness=60)
+        self.dispatched = []
+
+        def submit(reason, allow_intervention):
+            self.dispatched.append(reason)
+            self.engine._dispatch_lmm_request(LMMRequest(reason, 1, allow_intervention, created_at=self.clock.time()))
+            return "dispatched"
+        self.engine.lmm_scheduler.submit = submit
+        self.engine._publish_snapshot(video_frame=_scene(), face_metrics={"face_detected": True, "face_count": 1})
+
+    def _run(self, seconds, step=5):
+        for _ in range(int(seconds / step)):
+            self.clock.advance(step)
+            self.engine.update()
+
+    def test_quiet_user_is_checked_only_when_stale(self):
+        self._run(60)
+        self.assertEqual(self.dispatched, ["periodic_check"])  # First call only
+        self._run(5)
+        self.assertEqual(len(self.dispatched), 2)  # 60 s after the first analysis
+        stats = self.engine.novelty_gate.get_stats()
+        self.assertEqual((stats["skipped_unchanged"], stats["dispatched_stale"]), (11, 1))
+
+    def test_scene_change_is_checked_at_the_next_interval(self):
+        self._run(10)
+        self.engine.window_sensor.get_active_window.return_value = "Browser"
+        self._run(5)
+        self.assertEqual(len(self.dispatched), 2)
+        self.assertEqual(self.engine.novelty_gate.get_stats()["dispatched_novel"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
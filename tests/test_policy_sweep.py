@@ -0,0 +1,188 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from core.clock import VirtualClock
+from core.logic_engine import LogicEngine
+from sensors.window_sensor import WindowSensor
+from tools.policy_sweep import (
+    build_grid, build_report, evaluate_session, parse_values, session_from_events, sweep,
+    SWEEP_KEYS, LMM_CALL_INTERVAL, MIN_LMM_INTERVAL
+)
+
+
+def _event(audio=0.05, video=1.0, speech=False, face=False, duration=10, window="Editor",
+           user_input=False, tags=None, reason="periodic_check", doom=False):
+    return {
+        "id": "e", "description": "e", "duration_seconds": duration,
+        "input": {"audio_level": audio, "video_activity": video, "active_window": window, "user_input": user_input},
+        "input_analysis": {
+            "audio": {"rms": audio, "is_speech": speech},
+            "video": {"video_activity": video, "face_detected": face, "face_count": int(face)},
+        },
+        "expected_outcome": {
+            "trigger_reason": reason,
+            "visual_context": tags or [],
+            "intervention": None,
+            "expected_system_intervention": "doom_scroll_breaker" if doom else None,
+        },
+    }
+
+
+EVENTS = [
+    _event(duration=6),
+    _event(audio=0.5, speech=True, face=True, duration=5, reason="high_audio_level"),
+    _event(audio=0.7, video=40.0, face=True, duration=4, window="Browser Docs"),  # Loud but not speech: blocks video
+    _event(video=25.0, face=True, duration=6, window="Mail", reason="high_video_activity"),
+    _event(video=25.0, duration=3, window="Chat"),  # Motion without a face
+    _event(tags=["phone_usage"], duration=12, window="Editor"),
+    _event(tags=["phone_usage", "looking_down"], duration=8, window="Notes", doom=True),
+    _event(user_input=True, duration=2, window="Terminal"),
+    _event(audio=0.2, speech=True, face=True, duration=12, window="Terminal"),  # Talking, not typing
+    _event(audio=0.2, speech=True, face=True, duration=5, window="Netflix"),  # Blacklisted for meeting mode
+    _event(user_input=True, duration=2, window="Editor"),
+    _event(tags=["working"], duration=5),
+]
+
+
+# Per-tick raw inputs for the reference run (PolicySession keeps only derived arrays for these)
+session_windows = []
+session_tags = []
+session_inputs = []
+for _e in EVENTS:
+    for _ in range(_e["duration_seconds"]):
+        session_windows.append(_e["input"]["active_window"])
+        session_tags.append(_e["expected_outcome"]["visual_context"])
+        session_inputs.append(_e["input"]["user_input"])
+
+
+class _ReferenceEngine(LogicEngine):
+    """Real LogicEngine whose LMM call is replaced by the parts of the result handling the sweep models."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counts = {"lmm_calls": 0, "audio_triggers": 0, "video_triggers": 0, "periodic_checks": 0,
+                       "doom_scroll_interventions": 0, "rapid_switching_alerts": 0}
+        self.current_tags = []
+
+    def _trigger_lmm_analysis(self, reason="unknown", allow_intervention=True):
+        self.last_lmm_call_time = self.clock.time()  # Started at once, as _dispatch_lmm_request would
+        self.counts["lmm_calls"] += 1
+        key = {"high_audio_level": "audio_triggers", "high_video_activity": "video_triggers",
+               "periodic_check": "periodic_checks"}[reason]
+        self.counts[key] += 1
+        payload = self._prepare_lmm_data(trigger_reason=reason)
+        if "Rapid Task Switching Detected" in payload["user_context"]["system_alerts"]:
+            self.counts["rapid_switching_alerts"] += 1
+        if self.current_tags:
+            if self._process_visual_context_triggers(self.current_tags) and allow_intervention:
+                self.counts["doom_scroll_interventions"] += 1
+
+
+def run_reference(session, params):
+    clock = VirtualClock(0.0)
+    windows = {"title": "Unknown"}
+    sanitizer = WindowSensor()._sanitize_title
+    window_sensor = MagicMock()
+    window_sensor.get_active_window.side_effect = lambda sanitize=True: sanitizer(windows["title"]) if sanitize else windows["title"]
+
+    overrides = {key: params[key] for key in ("RAPID_SWITCHING_THRESHOLD", "MEETING_MODE_SPEECH_DURATION_THRESHOLD",
+                                              "MEETING_MODE_IDLE_KEYBOARD_THRESHOLD", "MEETING_MODE_SPEECH_GRACE_PERIOD")}
+    with patch.multiple(config, **overrides):
+        engine = _ReferenceEngine(window_sensor=window_sensor, logger=MagicMock(), clock=clock)
+        engine.audio_threshold_high = params["AUDIO_THRESHOLD_HIGH"]
+        engine.video_activity_threshold_high = params["VIDEO_ACTIVITY_THRESHOLD_HIGH"]
+        engine.doom_scroll_trigger_threshold = params["DOOM_SCROLL_THRESHOLD"]
+        engine.lmm_call_interval = LMM_CALL_INTERVAL
+        engine.min_lmm_interval = MIN_LMM_INTERVAL
+
+        meeting_entries = 0
+        dnd_ticks = 0
+        for k in range(len(session)):
+            clock.set(session.t[k])
+            windows["title"] = session_windows[k]
+            engine.current_tags = session_tags[k]
+            if session_inputs[k]:
+                engine.register_user_input()
+            engine._publish_snapshot(
+                audio_chunk=np.zeros(4, dtype=np.float32),
+                audio_level=float(session.audio_level[k]),
+                video_activity=float(session.video_activity[k]),
+                audio_analysis={"is_speech": bool(session.is_speech[k])},
+                face_metrics={"face_detected": bool(session.face_detected[k]), "face_count": int(session.face_detected[k])},
+            )
+            before = engine.get_mode()
+            engine.update()
+            after = engine.get_mode()
+            if before == "active" and after == "dnd":
+                meeting_entries += 1
+            dnd_ticks += after == "dnd"
+        engine.shutdown()
+
+    counts = dict(engine.counts)
+    counts["meeting_mode_entries"] = meeting_entries
+    counts["dnd_ticks"] = dnd_ticks
+    return counts
+
+
+
+class TestPolicySweep(unittest.TestCase):
+    def setUp(self):
+        self.session = session_from_events("test", EVENTS, tick=1.0)
+        self.spec = {
+            "AUDIO_THRESHOLD_HIGH": [0.3, 0.6],
+            "VIDEO_ACTIVITY_THRESHOLD_HIGH": [10.0, 30.0],
+            "DOOM_SCROLL_THRESHOLD": [2, 4],
+            "RAPID_SWITCHING_THRESHOLD": [3, 5],
+            "MEETING_MODE_SPEECH_DURATION_THRESHOLD": [3.0, 15.0],
+            "MEETING_MODE_IDLE_KEYBOARD_THRESHOLD": [5.0],
+            "MEETING_MODE_SPEECH_GRACE_PERIOD": [2.0],
+        }
+
+    def test_matches_logic_engine_for_every_combination(self):
+        grid = build_grid(self.spec)
+        counts = evaluate_session(self.session, grid)
+        self.assertEqual(len(grid["AUDIO_THRESHOLD_HIGH"]), 32)
+
+        for i in range(32):
+            params = {key: grid[key][i] for key in SWEEP_KEYS}
+            expected = run_reference(self.session, params)
+            actual = {name: int(counts[name][i]) for name in expected}
+            self.assertEqual(actual, expected, f"Mismatch for {params}")
+
+    def test_surface_reflects_thresholds(self):
+        grid = build_grid(self.spec)
+        counts = evaluate_session(self.session, grid)
+        low_audio = grid["AUDIO_THRESHOLD_HIGH"] == 0.3
+        self.assertTrue(np.all(counts["audio_triggers"][low_audio] > 0))
+        self.assertTrue(np.all(counts["audio_triggers"][~low_audio] == 0))
+        # The 'high_audio_level' event is missed with the higher threshold
+        self.assertTrue(np.all(counts["event_fn"][~low_audio] >= 1))
+
+    def test_sweep_in_process_pool_and_report(self):
+        sessions = [self.session, session_from_events("copy", EVENTS)]
+        grid, totals = sweep(sessions, self.spec, workers=2)
+        single = evaluate_session(self.session, grid)
+        np.testing.assert_array_equal(totals["lmm_calls"], single["lmm_calls"] * 2)
+
+        report = build_report(grid, totals, sessions, wall_duration=0.1)
+        self.assertEqual(report["combinations"], 32)
+        self.assertNotIn("MEETING_MODE_IDLE_KEYBOARD_THRESHOLD", report["swept_parameters"])
+        self.assertIn("event_precision", report["results"][0])
+
+    def test_parse_values(self):
+        self.assertEqual(parse_values("0.3:0.5:0.1"), [0.3, 0.4, 0.5])
+        self.assertEqual(parse_values("2,3"), [2.0, 3.0])
+        with self.assertRaises(ValueError):
+            build_grid({"NOT_A_KEY": [1]})
+
+
+if __name__ == '__main__':
+    unittest.main()
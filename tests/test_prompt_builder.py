@@ -0,0 +1,159 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.lmm_interface import LMMInterface
+from core.prompt_builder import PromptBuilder, approx_tokens_by_chars, approx_tokens_by_words
+from tools.prompt_cache_benchmark import run_benchmark
+
+
+def _context(audio, state, history):
+    return {
+        "current_mode": "active",
+        "trigger_reason": "periodic_check",
+        "active_window": "Editor",
+        "history": history,
+        "sensor_metrics": {"audio_level": audio, "video_activity": 3.0},
+        "current_state_estimation": state,
+        "suppressed_interventions": ["take_break"],
+        "preferred_interventions": ["box_breathing"],
+        "system_alerts": ["Rapid Task Switching Detected"],
+    }
+
+
+class TestPromptBuilder(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.builder = PromptBuilder(clock=self.clock)
+        self.history = [
+            {"timestamp": 970.0, "active_window": "Mail", "mode": "active", "face_detected": True,
+             "posture": "neutral", "audio_level": 0.1, "video_activity": 2.0},
+            {"timestamp": 990.0, "active_window": "Editor", "mode": "active", "face_detected": True,
+             "posture": "neutral", "audio_level": 0.2, "video_activity": 4.0},
+        ]
+
+    def test_blocks_ordered_stable_to_volatile(self):
+        text = self.builder.build_user_text(_context(0.1, {"focus": 50}, self.history))
+        order = ["Suppressed Interventions", "Preferred Interventions", "Recent History", "- T-20s: Window='Mail'",
+                 "- T-0s: Window='Editor'", "Previous State", "Current Mode: active", "Latest History Snapshot: 10s ago",
+                 "Audio Level (RMS): 0.1000", "SYSTEM ALERTS"]
+        positions = [text.index(marker) for marker in order]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_stable_prefix_is_byte_identical_between_history_samples(self):
+        first = self.builder.build_user_text(_context(0.1, {"focus": 50}, self.history))
+        self.clock.advance(5)
+        second = self.builder.build_user_text(_context(0.3, {"focus": 52}, self.history))
+
+        prefix = first[:first.index("\nPrevious State")]
+        self.assertTrue(second.startswith(prefix))
+        self.assertNotEqual(first, second)
+
+    def test_cache_hints_in_payload(self):
+        lmm = LMMInterface(data_logger=MagicMock())
+        lmm._send_request_with_retry = MagicMock(return_value={"state_estimation": {}})
+        with patch('config.LMM_CACHE_PROMPT', True), patch('config.LMM_SLOT_ID', 0):
+            lmm.process_data(user_context=_context(0.1, None, []))
+        payload = lmm._send_request_with_retry.call_args[0][0]
+        self.assertTrue(payload["cache_prompt"])
+        self.assertEqual(payload["id_slot"], 0)
+        self.assertEqual([m["role"] for m in payload["messages"]], ["system", "user"])
+
+        with patch('config.LMM_CACHE_PROMPT', False), patch('config.LMM_SLOT_ID', -1):
+            lmm.process_data(user_context=_context(0.1, None, []))
+        payload = lmm._send_request_with_retry.call_args[0][0]
+        self.assertNotIn("cache_prompt", payload)
+        self.assertNotIn("id_slot", payload)
+
+    def test_benchmark_reports_prefill_savings(self):
+        report = run_benchmark(calls=12)
+        self.assertEqual(len(report["per_call"]), 12)
+        self.assertEqual(report["per_call"][0]["reused_tokens"], 0)
+        self.assertGreater(report["saved_fraction"], 0.5)
+
+
+class TestPromptTokenBudget(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.history = [
+            {"timestamp": 900.0 + 10 * i, "active_window": f"Window {i}", "mode": "active", "face_detected": i % 2 == 0,
+             "posture": "neutral", "audio_level": 0.1, "video_activity": 2.0}
+            for i in range(10)
+        ]
+        self.context = _context(0.1, {"focus": 50}, self.history)
+        self.context["sensor_metrics"].update({
+            "audio_analysis": {"is_speech": True, "speech_confidence": 0.8, "pitch_estimation": 120.0},
+            "video_analysis": {"face_detected": True, "face_size_ratio": 0.1, "vertical_position": 0.7, "posture_state": "slouching"},
+            "trends": {"audio_level_mean": 0.1, "speech_fraction": 0.5},
+        })
+
+    def _build(self, budget, tokenizer=None):
+        builder = PromptBuilder(clock=self.clock, token_budget=budget, tokenizer=tokenizer)
+        return builder.build_user_text(self.context), builder.last_report
+
+    def test_within_budget_is_unchanged(self):
+        unlimited, report = self._build(0)
+        text, budgeted = self._build(report["total"])
+        self.assertEqual(text, unlimited)
+        self.assertEqual(budgeted["trimmed"], [])
+        self.assertEqual(sum(budgeted["sections"].values()), budgeted["total"])
+
+    def test_lowest_value_sections_go_first(self):
+        _, full = self._build(0)
+        text, report = self._build(full["total"] - full["sections"]["trends"] - full["sections"]["preferred"] - 1)
+
+        self.assertLessEqual(report["total"], report["budget"])
+        self.assertEqual(report["trimmed"][:2], ["trends:dropped", "preferred:dropped"])
+        self.assertNotIn("Recent Trend", text)
+        self.assertNotIn("Preferred Interventions", text)
+        self.assertIn("Last 8 of 10 snapshots", text)
+        self.assertIn("- Earlier: 2 snapshots over 10s, Windows (newest first)=Window 1, Window 0", text)
+        self.assertNotIn("Window 0'", text)  # Oldest snapshots are summarized first
+
+    def test_tight_budget_summarizes_history_and_keeps_essentials(self):
+        _, full = self._build(0)
+        others = sum(full["sections"][name] for name in ("header", "suppressed", "previous_state", "status",
+                                                          "audio_detail", "video", "face", "alerts"))
+        summary = f"\nRecent History Summary: {PromptBuilder._history_summary(self.history)}\n"
+        text, report = self._build(others + approx_tokens_by_chars(summary))
+
+        self.assertLessEqual(report["total"], report["budget"])
+        self.assertIn("Recent History Summary: 10 snapshots over 90s", text)
+        self.assertIn("Windows (newest first)=Window 9, Window 8, Window 7", text)
+        for kept in ("Suppressed Interventions", "Current Mode: active", "Audio Level (RMS)", "SYSTEM ALERTS"):
+            self.assertIn(kept, text)
+
+        text, report = self._build(1)
+        self.assertIn("history:dropped", report["trimmed"])
+        self.assertIn("Posture: slouching", text)  # Face details shrink to presence and posture
+        self.assertNotIn("Audio Pitch", text)
+        self.assertNotIn("Previous State", text)
+        self.assertIn("SYSTEM ALERTS", text)
+
+    def test_pluggable_tokenizer(self):
+        _, by_words = self._build(0, tokenizer=approx_tokens_by_words)
+        _, by_lines = self._build(0, tokenizer=lambda text: text.count("\n"))
+        self.assertNotEqual(by_words["total"], by_lines["total"])
+        self.assertEqual(by_lines["sections"]["header"], 1)
+
+    def test_section_tokens_are_logged(self):
+        logger = MagicMock()
+        lmm = LMMInterface(data_logger=logger)
+        lmm._send_request_with_retry = MagicMock(return_value={"state_estimation": {}})
+        lmm.process_data(user_context=self.context)
+
+        events = [c[0] for c in logger.log_event.call_args_list if c[0][0] == "lmm_prompt_tokens"]
+        self.assertEqual(len(events), 1)
+        report = events[0][1]
+        self.assertEqual(report["tier"], "default")
+        self.assertIn("history", report["sections"])
+        self.assertGreater(report["system"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.replay_runner import build_report, discover_datasets, replay_dataset, run_replays
+from sensors.session_recording import SessionRecorder
+
+EVENTS = [
+    {
+        "id": "quiet",
+        "description": "Quiet",
+        "input": {"audio_level": 0.0, "video_activity": 0.0},
+        "expected_outcome": {"intervention": None}
+    },
+    {
+        "id": "noise",
+        "description": "Noise Trigger",
+        "input": {"audio_level": 0.8, "video_activity": 0.0},
+        "expected_outcome": {"state_change": {"arousal": "increase"}, "intervention": "noise_alert"}
+    }
+]
+
+
+class TestReplayRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.events_path = os.path.join(self.tmpdir.name, "events.json")
+        with open(self.events_path, 'w') as f:
+            json.dump(EVENTS, f)
+        self.scenario_path = os.path.join(self.tmpdir.name, "scenario.json")
+        with open(self.scenario_path, 'w') as f:
+            json.dump({"scenario": EVENTS}, f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _record_session(self, name="session"):
+        path = os.path.join(self.tmpdir.name, name)
+        recorder = SessionRecorder(path, sample_rate=16000, channels=1)
+        recorder.record_window("Editor", timestamp=100.0)
+        for i in range(5):
+            recorder.record_frame(np.full((24, 32, 3), i * 40, dtype=np.uint8), timestamp=100.0 + i)
+            recorder.record_audio(np.full((160, 1), 0.01, dtype=np.float32), timestamp=100.0 + i)
+        recorder.close()
+        return path
+
+    def test_discover_finds_recorded_sessions(self):
+        session = self._record_session()
+        everything = sorted([self.events_path, self.scenario_path, session])
+        self.assertEqual(discover_datasets([self.tmpdir.name]), everything)
+        self.assertEqual(discover_datasets([session]), [session])
+        self.assertEqual(discover_datasets([os.path.join(self.tmpdir.name, "*")]), everything)
+
+    def test_replay_recorded_session(self):
+        session = self._record_session()
+        result = replay_dataset(session)
+        self.assertNotIn("error", result)
+        self.assertFalse(result["labeled"])
+        self.assertEqual(result["outcomes"], {"tp": 0, "tn": 0, "fp": 0, "fn": 0})
+        self.assertAlmostEqual(result["simulated_duration"], 4.0)
+        self.assertEqual(result["steps"], 5)
+        self.assertEqual(len(result["stage_latencies"]["sensors"]), 10)
+
+    def test_discover_expands_directories(self):
+        self.assertEqual(discover_datasets([self.tmpdir.name, self.events_path]),
+                         sorted([self.events_path, self.scenario_path]))
+
+    def test_replay_dataset_reports_outcomes_and_virtual_time(self):
+        result = replay_dataset(self.events_path)
+        self.assertNotIn("error", result)
+        self.assertEqual(result["outcomes"], {"tp": 1, "tn": 1, "fp": 0, "fn": 0})
+        self.assertGreaterEqual(result["simulated_duration"], 200)
+        self.assertEqual(len(result["stage_latencies"]["update"]), 2)
+
+        scenario = replay_dataset(self.scenario_path)
+        self.assertEqual(scenario["steps"], 2)
+
+    def test_simulated_time_follows_event_durations(self):
+        timed_path = os.path.join(self.tmpdir.name, "timed.json")
+        with open(timed_path, 'w') as f:
+            json.dump([dict(EVENTS[0], duration_seconds=30), dict(EVENTS[1], duration_seconds=15)], f)
+        result = replay_dataset(timed_path)
+        self.assertEqual(result["simulated_duration"], 45)
+        self.assertEqual(result["outcomes"], {"tp": 1, "tn": 1, "fp": 0, "fn": 0})
+
+    def test_replays_are_deterministic(self):
+        first = replay_dataset(self.events_path)
+        second = replay_dataset(self.events_path)
+        self.assertEqual(first["outcomes"], second["outcomes"])
+        self.assertEqual(first["simulated_duration"], second["simulated_duration"])
+
+    def test_build_report_aggregates(self):
+        results = [
+            {"dataset": "a", "steps": 4, "outcomes": {"tp": 2, "tn": 1, "fp": 1, "fn": 0}, "interventions": 3,
+             "wall_duration": 0.1, "simulated_duration": 1800.0, "stage_latencies": {"update": [0.001, 0.003]}},
+            {"dataset": "b", "steps": 2, "outcomes": {"tp": 0, "tn": 1, "fp": 0, "fn": 1}, "interventions": 0,
+             "wall_duration": 0.1, "simulated_duration": 1800.0, "stage_latencies": {"update": [0.002]}},
+            {"dataset": "c", "error": "ValueError: bad"},
+        ]
+        report = build_report(results, wall_duration=0.5, workers=2)
+
+        self.assertAlmostEqual(report["precision"], 2 / 3)
+        self.assertAlmostEqual(report["recall"], 2 / 3)
+        self.assertAlmostEqual(report["accuracy"], 4 / 6)
+        self.assertAlmostEqual(report["interventions_per_simulated_hour"], 3.0)
+        self.assertEqual(report["stage_latency"]["update"]["count"], 3)
+        self.assertAlmostEqual(report["stage_latency"]["update"]["p50_ms"], 2.0)
+        self.assertEqual(report["failed_datasets"], [{"dataset": "c", "error": "ValueError: bad"}])
+        json.dumps(report)
+
+    def test_unlabeled_steps_are_left_out_of_accuracy(self):
+        results = [
+            {"dataset": "a", "steps": 4, "outcomes": {"tp": 2, "tn": 2, "fp": 0, "fn": 0}, "interventions": 2,
+             "wall_duration": 0.1, "simulated_duration": 10.0, "stage_latencies": {}},
+            {"dataset": "session", "labeled": False, "steps": 6, "outcomes": {"tp": 0, "tn": 0, "fp": 0, "fn": 0},
+             "interventions": 1, "wall_duration": 0.1, "simulated_duration": 6.0, "stage_latencies": {}},
+        ]
+        report = build_report(results, wall_duration=0.5, workers=1)
+        self.assertEqual(report["steps"], 10)
+        self.assertEqual(report["accuracy"], 1.0)
+        self.assertEqual(report["interventions"], 3)
+
+    def test_run_replays_in_process_pool(self):
+        report = run_replays([self.tmpdir.name], workers=2)
+        self.assertEqual(report["datasets"], 2)
+        self.assertEqual(report["failed_datasets"], [])
+        self.assertEqual(report["steps"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from core.logic_engine import LogicEngine
+from core.sensor_snapshot import SensorSnapshot
+
+
+class TestSensorSnapshot(unittest.TestCase):
+    def test_snapshot_is_immutable(self):
+        snap = SensorSnapshot(audio_level=0.5)
+        with self.assertRaises(AttributeError):
+            snap.audio_level = 0.9
+        with self.assertRaises(AttributeError):
+            snap.extra = 1
+
+    def test_replace_returns_new_snapshot(self):
+        snap = SensorSnapshot(audio_level=0.5, video_activity=3.0)
+        newer = snap.replace(audio_level=0.9)
+
+        self.assertEqual(snap.audio_level, 0.5)
+        self.assertEqual(newer.audio_level, 0.9)
+        self.assertEqual(newer.video_activity, 3.0)
+
+
+class TestLogicEngineSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.engine = LogicEngine(logger=MagicMock())
+
+    def test_setters_publish_new_snapshot(self):
+        before = self.engine.sensor_snapshot
+        self.engine.audio_level = 0.7
+
+        self.assertIsNot(self.engine.sensor_snapshot, before)
+        self.assertEqual(before.audio_level, 0.0)
+        self.assertEqual(self.engine.audio_level, 0.7)
+
+    def test_video_processing_publishes_consistent_snapshot(self):
+        sensor = MagicMock()
+        sensor.process_frame.return_value = {"video_activity": 12.0, "face_detected": True, "face_count": 1, "posture_state": "upright"}
+        self.engine.video_sensor = sensor
+        frame = np.zeros((10, 10, 3), dtype=np.uint8)
+
+        self.engine.process_video_data(frame)
+        snap = self.engine.sensor_snapshot
+
+        self.assertIs(snap.video_frame, frame)
+        self.assertEqual(snap.video_activity, 12.0)
+        self.assertEqual(snap.face_metrics, {"face_detected": True, "face_count": 1})
+        self.assertEqual(snap.video_analysis["posture_state"], "upright")
+        self.assertTrue(self.engine.is_face_detected())
+
+    def test_readers_do_not_block_on_mode_lock(self):
+        self.engine.last_video_frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        self.engine.audio_level = 0.4
+
+        # Even with the mode lock held elsewhere, sensor reads return immediately
+        with self.engine._lock:
+            result = {}
+            reader = threading.Thread(target=lambda: result.update(level=self.engine.audio_level, face=self.engine.is_face_detected()))
+            reader.start()
+            reader.join(timeout=1.0)
+            self.assertFalse(reader.is_alive())
+        self.assertEqual(result["level"], 0.4)
+
+    def test_audio_and_video_writers_do_not_clobber_each_other(self):
+        def write_audio():
+            for _ in range(200):
+                self.engine.process_audio_data(np.ones(16, dtype=np.float32))
+
+        def write_video():
+            for _ in range(200):
+                self.engine.process_video_data(np.zeros((4, 4, 3), dtype=np.uint8))
+
+        threads = [threading.Thread(target=write_audio), threading.Thread(target=write_video)]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        snap = self.engine.sensor_snapshot
+        self.assertIsNotNone(snap.audio_chunk)
+        self.assertIsNotNone(snap.video_frame)
+        self.assertAlmostEqual(snap.audio_level, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
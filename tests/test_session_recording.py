@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from core.clock import VirtualClock
+from sensors.session_recording import (
+    SessionRecorder, SessionPlayback, RecordingWindowSensor, PlaybackClock,
+    PlaybackAudioSensor, PlaybackVideoSensor, PlaybackWindowSensor, INDEX_FILE
+)
+
+
+class TestSessionRecording(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "session")
+
+        recorder = SessionRecorder(self.path, sample_rate=16000, channels=1)
+        recorder.record_window("Editor", timestamp=100.0)
+        for i in range(10):
+            t = 100.0 + i
+            frame = np.full((24, 32, 3), i * 20, dtype=np.uint8)
+            recorder.record_frame(frame, timestamp=t)
+            recorder.record_audio(np.full((160, 1), i / 10.0, dtype=np.float32), timestamp=t)
+            if i == 5:
+                recorder.record_window("Browser", timestamp=t)
+        recorder.record_window("Browser", timestamp=109.5)  # Unchanged: not recorded
+        recorder.close()
+        self.assertEqual(recorder.counts, {"video": 10, "audio": 10, "window": 2})
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_unthrottled_roundtrip(self):
+        playback = SessionPlayback(self.path, speed=0)
+        self.assertAlmostEqual(playback.duration, 9.0)
+
+        frames = []
+        while True:
+            frame = playback.read_frame()
+            if frame is None:
+                break
+            frames.append(frame)
+        self.assertEqual(len(frames), 10)
+        self.assertEqual(frames[0].shape, (24, 32, 3))
+        # JPEG is lossy but a flat frame survives almost exactly
+        self.assertAlmostEqual(float(frames[3].mean()), 60.0, delta=2.0)
+        self.assertEqual(playback.window_title(), "Browser")
+
+        chunks = [playback.read_chunk() for _ in range(10)]
+        self.assertTrue(np.allclose(chunks[4], 0.4))
+        self.assertEqual(chunks[4].shape, (160, 1))
+        self.assertIsNone(playback.read_chunk())
+        self.assertTrue(playback.finished)
+        playback.close()
+
+    def test_seek(self):
+        playback = SessionPlayback(self.path, speed=0)
+        playback.seek(6.0)
+        self.assertAlmostEqual(float(playback.read_frame().mean()), 120.0, delta=2.0)
+        self.assertTrue(np.allclose(playback.read_chunk(), 0.6))
+        self.assertEqual(playback.window_title(), "Browser")
+
+        playback.seek(0.0)
+        self.assertEqual(playback.window_title(), "Editor")
+        playback.close()
+
+    def test_throttled_playback_follows_clock_and_drops_stale_frames(self):
+        clock = VirtualClock(0.0)
+        playback = SessionPlayback(self.path, speed=2.0, clock=clock)
+
+        playback.read_frame()  # Starts playback at session time 100
+        clock.advance(2.0)     # 2 s wall at 2x = 4 s of session
+        frame = playback.read_frame()
+        self.assertAlmostEqual(float(frame.mean()), 80.0, delta=2.0)
+
+        # Next frame (t=105) is not due yet: reading waits 0.5 s of (virtual) wall time
+        playback.read_frame()
+        self.assertAlmostEqual(clock.time(), 2.5)
+        playback.close()
+
+    def test_playback_clock_runs_on_session_time(self):
+        wall = VirtualClock(0.0)
+        playback = SessionPlayback(self.path, speed=4.0, clock=wall)
+        session = PlaybackClock(playback)
+        self.assertEqual(session.time(), 100.0)
+
+        playback.read_frame()
+        wall.advance(1.0)  # 1 s wall at 4x
+        self.assertAlmostEqual(session.time(), 104.0)
+        # A 5 s session deadline is 1.25 s of wall time away at 4x
+        self.assertAlmostEqual(session.to_wall_time(109.0), 2.25)
+        session.sleep(2.0)
+        self.assertAlmostEqual(wall.time(), 1.5)
+        self.assertAlmostEqual(session.time(), 106.0)
+        playback.close()
+
+    def test_engine_cooldowns_follow_playback_speed(self):
+        from core.logic_engine import LogicEngine
+        wall = VirtualClock(0.0)
+        playback = SessionPlayback(self.path, speed=10.0, clock=wall)
+        engine = LogicEngine(logger=MagicMock(), clock=PlaybackClock(playback))
+        engine.lmm_interface = MagicMock()
+        engine._trigger_lmm_analysis = MagicMock()
+        engine.last_history_sample_time = 1e12
+
+        playback.read_frame()
+        engine.last_lmm_call_time = engine.clock.time()
+        wall.advance(0.6)  # 6 s of session at 10x: past the 5 s periodic interval
+        engine.update()
+        self.assertEqual(engine._trigger_lmm_analysis.call_args.kwargs["reason"], "periodic_check")
+        playback.close()
+
+    def test_truncated_index_is_tolerated(self):
+        with open(os.path.join(self.path, INDEX_FILE), 'a') as f:
+            f.write('{"t": 200.0, "type": "vid')
+        playback = SessionPlayback(self.path, speed=0)
+        self.assertEqual(len(playback.video), 10)
+        playback.close()
+
+    def test_playback_sensors(self):
+        playback = SessionPlayback(self.path, speed=0)
+        logger = MagicMock()
+        audio = PlaybackAudioSensor(playback, logger)
+        video = PlaybackVideoSensor(playback, logger)
+        window = PlaybackWindowSensor(playback, logger)
+
+        self.assertFalse(audio.has_error())
+        chunk, error = audio.get_chunk()
+        self.assertIsNone(error)
+        self.assertIn("rms", audio.analyze_chunk(chunk))
+
+        frame, error = video.get_frame()
+        self.assertIsNone(error)
+        self.assertIn("face_detected", video.process_frame(frame))
+        self.assertEqual(window.get_active_window(), "Editor")
+
+        for _ in range(9):
+            video.get_frame()
+        self.assertEqual(video.get_frame(), (None, "Session playback finished."))
+        playback.close()
+
+    def test_recording_window_sensor_records_changes(self):
+        recorder = MagicMock()
+        sensor = MagicMock()
+        sensor.get_active_window.return_value = "Terminal"
+        wrapped = RecordingWindowSensor(sensor, recorder)
+
+        self.assertEqual(wrapped.get_active_window(), "Terminal")
+        recorder.record_window.assert_called_once_with("Terminal")
+
+
+if __name__ == '__main__':
+    unittest.main()
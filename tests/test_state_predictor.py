@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.logic_engine import LogicEngine
+from core.state_predictor import StatePredictor, STATE_DIMENSIONS, FEATURES, extract_features, training_pairs
+from tools.train_state_predictor import train
+
+
+def _metrics(face, motion, speech=False):
+    return {
+        "audio_level": 0.2 if speech else 0.01, "video_activity": motion, "face_detected": face, "face_count": int(face),
+        "video_analysis": {"posture_state": "neutral" if face else None},
+        "audio_analysis": {"is_speech": speech},
+        "trends": {"face_presence": 1.0 if face else 0.0},
+    }
+
+
+def _state(metrics):
+    # Synthetic ground truth: present and still -> focused; moving -> aroused, less focused
+    focus = 30 + 40 * metrics["face_detected"] - metrics["video_activity"]
+    return {"arousal": 40 + metrics["video_activity"], "overload": 10, "focus": focus,
+            "energy": 60, "mood": 55, "sexual_arousal": 0}
+
+
+def _events(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    events = []
+    for i in range(n):
+        metrics = _metrics(bool(rng.random() < 0.7), float(rng.uniform(0, 20)), bool(rng.random() < 0.2))
+        events.append({"timestamp": f"2026-01-01T10:{i // 60:02d}:{i % 60:02d}", "event_type": "lmm_trigger",
+                       "payload": {"reason": "periodic_check", "metrics": metrics}})
+        events.append({"timestamp": f"2026-01-01T10:{i // 60:02d}:{i % 60:02d}", "event_type": "lmm_state_estimation",
+                       "payload": _state(metrics)})
+    return events
+
+
+class TestStatePredictor(unittest.TestCase):
+    def test_features_are_fixed_order_and_tolerate_missing_values(self):
+        x = extract_features({"audio_level": None, "video_analysis": {"posture_state": "slouching"}})
+        self.assertEqual(len(x), len(FEATURES))
+        self.assertEqual(x[FEATURES.index("posture_slouching")], 1.0)
+        self.assertEqual(x[FEATURES.index("audio_level")], 0.0)
+
+    def test_pairs_skip_unanswered_triggers(self):
+        events = _events(3)
+        events.insert(2, {"event_type": "lmm_trigger", "payload": {"metrics": _metrics(True, 0.0)}})  # No answer
+        X, Y = training_pairs(events)
+        self.assertEqual(X.shape, (3, len(FEATURES)))
+        self.assertEqual(Y.shape, (3, len(STATE_DIMENSIONS)))
+
+    def test_pairs_use_the_raw_lmm_estimate(self):
+        metrics = _metrics(True, 0.0)
+        events = [{"event_type": "lmm_trigger", "payload": {"metrics": metrics}},
+                  {"event_type": "state_update", "payload": _state(_metrics(False, 20.0))},  # Smoothed, ignored
+                  {"event_type": "lmm_state_estimation",
+                   "payload": {"arousal": 40, "overload": 10, "focus": 70, "energy": 60, "mood": 55}}]
+        X, Y = training_pairs(events)
+        self.assertEqual(Y.tolist(), [[40, 10, 70, 60, 55, 0]])  # sexual_arousal defaults to 0
+
+    def test_legacy_logs_fall_back_to_state_updates(self):
+        legacy = [dict(event, event_type="state_update") if event["event_type"] == "lmm_state_estimation" else event
+                  for event in _events(10)]
+        X, Y = training_pairs(legacy)
+        self.assertEqual(len(X), 10)
+        # Once raw estimates appear, state_updates are no longer targets
+        X, Y = training_pairs(legacy + _events(3) + legacy[-2:])
+        self.assertEqual(len(X), 13)
+
+    def test_fit_predict_and_round_trip(self):
+        X, Y = training_pairs(_events())
+        model = StatePredictor.fit(X, Y, alpha=0.1)
+        self.assertLess(max(model.rmse), 1.0)
+
+        state, confidence = model.predict(_metrics(True, 5.0))
+        self.assertEqual((state["focus"], state["arousal"]), (65, 45))
+        self.assertGreater(confidence, 0.9)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model.json")
+            model.save(path)
+            loaded = StatePredictor.load(path)
+            self.assertEqual(loaded.predict(_metrics(False, 10.0)), model.predict(_metrics(False, 10.0)))
+
+            with open(path) as f:
+                data = json.load(f)
+            data["features"] = data["features"][:-1]
+            with open(path, "w") as f:
+                json.dump(data, f)
+            self.assertIsNone(StatePredictor.load(path))  # Trained on another feature set
+
+    def test_out_of_distribution_input_lowers_confidence(self):
+        X, Y = training_pairs(_events())
+        model = StatePredictor.fit(X, Y)
+        _, usual = model.predict(_metrics(True, 10.0))
+        _, unusual = model.predict(_metrics(True, 400.0))
+        self.assertLess(unusual, usual / 2)
+
+    def test_small_training_sets_are_never_trusted(self):
+        X, Y = training_pairs(_events(20))
+        self.assertEqual(StatePredictor.fit(X, Y).predict(_metrics(True, 1.0))[1], 0.0)
+
+    def test_training_tool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "events.jsonl")
+            with open(path, "w") as f:
+                f.writelines(json.dumps(event) + "\n" for event in _events())
+            self.assertEqual(train([path]).samples, 200)
+            self.assertIsNone(train([os.path.join(tmp, "missing.jsonl")]))
+
+
+class TestLocalPeriodicChecks(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1000.0)
+        self.engine = LogicEngine(clock=self.clock)
+        self.engine.lmm_interface = MagicMock()
+        self.engine._trigger_lmm_analysis = MagicMock(return_value=True)
+        X, Y = training_pairs(_events())
+        self.engine.state_predictor = StatePredictor.fit(X, Y, alpha=0.1)
+        self.engine.last_lmm_call_time = self.clock.time()
+        self.engine.last_lmm_state = {"arousal": 40, "overload": 10, "focus": 70, "energy": 60, "mood": 55, "sexual_arousal": 0}
+
+    def _present(self, face):
+        self.face = face
+        self.engine._publish_snapshot(face_metrics={"face_detected": face, "face_count": int(face)},
+                                      video_analysis={"posture_state": "neutral"} if face else {})
+
+    def _tick(self, seconds):
+        self.clock.advance(seconds)
+        self.engine.metric_store.record(timestamp=self.clock.time(), face_detected=self.face, video_activity=0.0)
+        self.engine.update()
+
+    def test_confident_agreeing_prediction_skips_periodic_check(self):
+        self._present(True)
+        for _ in range(10):
+            self._tick(5)
+        self.engine._trigger_lmm_analysis.assert_not_called()
+        self.assertEqual(self.engine.local_check_stats["skipped_periodic_checks"], 10)
+        self.assertEqual(self.engine.state_engine.get_state()["focus"], 70)
+
+        self._tick(15)  # 65 s since the last LMM call: STATE_PREDICTOR_MAX_SKIP reached
+        self.engine._trigger_lmm_analysis.assert_called_once()
+        self.assertEqual(self.engine._trigger_lmm_analysis.call_args.kwargs["reason"], "periodic_check")
+
+    def test_last_lmm_state_is_the_raw_estimate(self):
+        self.engine.state_engine.update({"state_estimation": {"focus": 20}})  # E.g. from a local prediction
+        estimate = {"arousal": 45, "overload": 10, "focus": 65, "energy": 60, "mood": 55}
+        self.engine._handle_lmm_analysis({"state_estimation": estimate}, allow_intervention=False)
+        self.assertEqual(self.engine.last_lmm_state, estimate)
+        self.assertNotEqual(self.engine.state_engine.get_state()["focus"], 65)
+
+    def test_cache_hits_are_not_logged_as_estimates(self):
+        estimate = {"arousal": 45, "overload": 10, "focus": 65, "energy": 60, "mood": 55}
+        self.engine.logger = MagicMock()
+        self.engine._handle_lmm_analysis({"state_estimation": estimate, "_meta": {"cache_hit": True}}, allow_intervention=False)
+        logged = [c.args[0] for c in self.engine.logger.log_event.call_args_list]
+        self.assertNotIn("lmm_state_estimation", logged)
+        self.assertEqual(self.engine.last_lmm_state, estimate)
+
+        self.engine._handle_lmm_analysis({"state_estimation": estimate}, allow_intervention=False)
+        self.engine.logger.log_event.assert_any_call("lmm_state_estimation", estimate)
+
+    def test_disagreeing_prediction_asks_the_lmm(self):
+        self._present(False)  # Predicts focus 30
+        self._tick(5)
+        self.engine._trigger_lmm_analysis.assert_called_once()
+        self.assertEqual(self.engine.local_check_stats["skipped_periodic_checks"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
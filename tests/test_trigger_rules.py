@@ -0,0 +1,184 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import config
+from core.logic_engine import LogicEngine
+from core.lmm_scheduler import PRIORITY_HIGH
+from core.metric_store import MetricStore
+from core.trigger_rules import TriggerRuleEngine, TriggerRuleError, parse_condition
+
+NOISE_RULE = {
+    "name": "sustained_noise",
+    "when": ["min(audio_rms, 3s) > 0.4", "fraction_true(is_speech, 3s) < 0.2"],
+    "action": "lmm",
+    "priority": "high",
+    "cooldown": 10,
+}
+
+
+class TestParseCondition(unittest.TestCase):
+    def test_string_condition(self):
+        cond = parse_condition("mean(video_activity, 2.5s) >= 20")
+        self.assertEqual(cond, {"metric": "video_activity", "agg": "mean", "window": 2.5, "op": ">=", "value": 20.0})
+
+    def test_invalid_condition(self):
+        with self.assertRaises(TriggerRuleError):
+            parse_condition("audio_rms is loud")
+        with self.assertRaises(TriggerRuleError):
+            parse_condition("median(audio_rms, 3s) > 1")
+
+
+class TestTriggerRuleEngine(unittest.TestCase):
+    def setUp(self):
+        self.store = MetricStore(capacity=500)
+        self.now = 1000.0
+
+    def _feed(self, seconds, rate=10, **values):
+        for i in range(int(seconds * rate)):
+            self.now += 1.0 / rate
+            self.store.record(timestamp=self.now, **values)
+
+    def test_rule_requires_sustained_condition(self):
+        engine = TriggerRuleEngine([NOISE_RULE], self.store)
+
+        self._feed(2, audio_rms=0.6, is_speech=0)
+        self._feed(0.3, audio_rms=0.1, is_speech=0)
+        self._feed(2, audio_rms=0.6, is_speech=0)
+        self.assertEqual(engine.evaluate("active", self.now), [])
+
+        self._feed(1.5, audio_rms=0.6, is_speech=0)
+        fired = engine.evaluate("active", self.now)
+        self.assertEqual([r.name for r in fired], ["sustained_noise"])
+        self.assertEqual(fired[0].priority, PRIORITY_HIGH)
+
+    def test_speech_suppresses_rule(self):
+        engine = TriggerRuleEngine([NOISE_RULE], self.store)
+        self._feed(4, audio_rms=0.6, is_speech=1)
+        self.assertEqual(engine.evaluate("active", self.now), [])
+
+    def test_cooldown_and_modes(self):
+        engine = TriggerRuleEngine([NOISE_RULE], self.store)
+        self._feed(4, audio_rms=0.6, is_speech=0)
+
+        self.assertEqual(engine.evaluate("dnd", self.now), [])
+        fired = engine.evaluate("active", self.now)
+        self.assertEqual(len(fired), 1)
+        # Not acted on yet: still due
+        self.assertEqual(engine.evaluate("active", self.now), fired)
+        engine.mark_fired(fired[0], self.now)
+        fired_at = self.now
+
+        self._feed(5, audio_rms=0.6, is_speech=0)
+        self.assertEqual(engine.evaluate("active", self.now), [])
+        self._feed(5, audio_rms=0.6, is_speech=0)
+        self.assertGreaterEqual(self.now - fired_at, 10)
+        self.assertEqual(len(engine.evaluate("active", self.now)), 1)
+
+    def test_duration_needs_covered_window(self):
+        engine = TriggerRuleEngine([{"name": "loud", "when": ["min(audio_rms, 3s) > 0.4"]},
+                                    {"name": "latest", "when": ["last(audio_rms, 3s) > 0.4"]}], self.store)
+        self._feed(0.1, audio_rms=0.6)
+        # One sample is not "above 0.4 for 3 seconds"; point aggregates are unaffected
+        self.assertEqual([r.name for r in engine.evaluate("active", self.now)], ["latest"])
+
+        self._feed(2.8, audio_rms=0.6)
+        self.assertEqual([r.name for r in engine.evaluate("active", self.now)], ["latest"])
+        self._feed(0.2, audio_rms=0.6)
+        self.assertEqual([r.name for r in engine.evaluate("active", self.now)], ["loud", "latest"])
+
+    def test_many_rules_single_pass(self):
+        rules = [
+            {"name": f"motion_{i}", "when": [f"mean(video_activity, 2s) > {i}"], "cooldown": 0}
+            for i in range(50)
+        ]
+        engine = TriggerRuleEngine(rules, self.store)
+        self._feed(3, video_activity=25.0)
+
+        with patch.object(self.store, "window_matrix", wraps=self.store.window_matrix) as spy:
+            fired = engine.evaluate("active", self.now)
+        self.assertEqual(len(fired), 25)
+        self.assertEqual(spy.call_count, 1)  # one distinct window, one store read
+
+    def test_invalid_rules_are_skipped(self):
+        logger = MagicMock()
+        engine = TriggerRuleEngine([
+            {"name": "bad_metric", "when": ["mean(heart_rate, 3s) > 1"]},
+            {"name": "no_conditions"},
+            {"name": "missing_id", "action": "intervention", "when": ["max(audio_rms, 1s) > 0.1"]},
+            NOISE_RULE,
+        ], self.store, logger=logger)
+
+        self.assertEqual([r.name for r in engine.rules], ["sustained_noise"])
+        self.assertEqual(logger.log_warning.call_count, 3)
+
+    def test_no_data_never_fires(self):
+        engine = TriggerRuleEngine([{"name": "quiet", "when": ["max(audio_rms, 3s) < 0.1"]}], self.store)
+        self.assertEqual(engine.evaluate("active", self.now), [])
+
+
+class TestLogicEngineTriggerRules(unittest.TestCase):
+    def test_configured_rule_triggers_lmm(self):
+        with patch.object(config, "TRIGGER_RULES", [NOISE_RULE], create=True):
+            engine = LogicEngine(logger=MagicMock())
+        engine.current_mode = "active"
+        engine.lmm_interface = MagicMock()
+        engine.last_lmm_call_time = time.time()
+        engine.last_history_sample_time = time.time()
+
+        self.assertEqual(engine.lmm_scheduler.priority_for("sustained_noise"), PRIORITY_HIGH)
+
+        now = time.time()
+        for i in range(40):
+            engine.metric_store.record(timestamp=now - 4 + i * 0.1, audio_rms=0.6, is_speech=0)
+        engine.last_lmm_call_time = now - engine.min_lmm_interval
+
+        with patch.object(engine, "_trigger_lmm_analysis") as mock_trigger:
+            engine.update()
+        mock_trigger.assert_called_once_with(reason="sustained_noise", allow_intervention=True)
+
+    def test_rule_cooldown_starts_only_when_acted_on(self):
+        with patch.object(config, "TRIGGER_RULES", [NOISE_RULE], create=True):
+            engine = LogicEngine(logger=MagicMock())
+        engine.current_mode = "active"
+        engine.lmm_interface = MagicMock()
+        now = time.time()
+        engine.last_lmm_call_time = now
+        engine.last_history_sample_time = now
+        for i in range(40):
+            engine.metric_store.record(timestamp=now - 4 + i * 0.1, audio_rms=0.6, is_speech=0)
+
+        # A speech trigger wins this tick; the rule is not consumed
+        engine.audio_level = 0.9
+        engine.audio_analysis = {"is_speech": True}
+        with patch.object(engine, "_trigger_lmm_analysis") as mock_trigger:
+            engine.update()
+        mock_trigger.assert_called_once_with(reason="high_audio_level", allow_intervention=True)
+
+        engine.audio_level = 0.0
+        engine.audio_analysis = {"is_speech": False}
+        with patch.object(engine, "_trigger_lmm_analysis") as mock_trigger:
+            engine.update()
+            engine.update()
+        # Acted on once, then cooling down
+        mock_trigger.assert_called_once_with(reason="sustained_noise", allow_intervention=True)
+
+    def test_intervention_rule(self):
+        rule = {"name": "slouch", "when": ["mean(face_detected, 2s) > 0.5"], "intervention": "posture_water_reset", "tier": 2}
+        with patch.object(config, "TRIGGER_RULES", [rule], create=True):
+            engine = LogicEngine(logger=MagicMock())
+        engine.current_mode = "active"
+        engine.intervention_engine = MagicMock()
+        now = time.time()
+        engine.last_lmm_call_time = now
+        engine.last_history_sample_time = now
+        for i in range(21):
+            engine.metric_store.record(timestamp=now - 2 + i * 0.1, face_detected=1)
+
+        engine.update()
+        engine.intervention_engine.start_intervention.assert_called_with(
+            {"id": "posture_water_reset", "tier": 2}, category="trigger_rule")
+
+
+if __name__ == '__main__':
+    unittest.main()
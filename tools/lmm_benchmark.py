@@ -31,7 +31,7 @@ def run_benchmark(mock=False):
 
     if mock:
         print("🛠️  Activating Mock Mode...")
-        # Patch requests.get and requests.post on the lmm instance or globally
+        # Patch get/post on the interface's pooled HTTP session
         import requests
 
         # Mock Response Object
@@ -85,10 +85,10 @@ def run_benchmark(mock=False):
 
         # Apply mocks
         lmm.check_connection = lambda: True # Force connection check true for speed
-        requests.post = mock_post
-        # requests.get is used in check_connection, but we overrode that method directly above.
+        lmm.http.session.post = mock_post
+        # get is used in check_connection, but we overrode that method directly above.
         # But for completeness if we didn't override check_connection:
-        requests.get = mock_get
+        lmm.http.session.get = mock_get
 
 
     print(f"Target URL: {lmm.llm_url}")
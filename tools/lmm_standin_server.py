@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+NEUTRAL_ANALYSIS = {
+    "state_estimation": {"arousal": 50, "overload": 10, "focus": 60, "energy": 60, "mood": 55, "sexual_arousal": 0},
+    "visual_context": [],
+    "suggestion": None,
+}
+
+
+class _StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        standin = self.server.standin
+        if not self.path.rstrip('/').endswith("/models"):
+            self._reply(404, {"error": "not found"})
+        elif standin.down:
+            self._reply(503, {"error": "unavailable"})
+        else:
+            self._reply(200, {"data": [{"id": standin.model_id}]})
+
+    def do_POST(self):
+        standin = self.server.standin
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        standin.record(payload)
+        if standin.latency:
+            time.sleep(standin.latency)
+        if standin.down:
+            self._reply(503, {"error": "unavailable"})
+            return
+        has_image = any(isinstance(m.get("content"), list) and any(p.get("type") == "image_url" for p in m["content"])
+                        for m in payload.get("messages", []))
+        if has_image and not standin.vision:
+            self._reply(400, {"error": "model does not support images"})
+            return
+        content = json.dumps(dict(NEUTRAL_ANALYSIS, visual_context=[standin.name]))
+        self._reply(200, {"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinServer:
+    """
+    Minimal OpenAI-compatible inference server for exercising LMM routing without a GPU.
+
+    Answers POST /v1/chat/completions with a fixed neutral analysis (its `visual_context`
+    names the server, so callers can tell who answered) after `latency` seconds, and
+    GET /v1/models for health probes. Set `down` to make both return 503; a server
+    without `vision` rejects requests that carry an image.
+    """
+
+    def __init__(self, name="standin", latency=0.0, vision=True, port=0, model_id="standin-model"):
+        self.name = name
+        self.latency = latency
+        self.vision = vision
+        self.down = False
+        self.model_id = model_id
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _StandinHandler)
+        self._server.daemon_threads = True
+        self._server.standin = self
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def record(self, payload):
+        with self._lock:
+            self.requests.append(payload)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=f"standin-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run local stand-in LMM servers (e.g. for LMM_ENDPOINTS).")
+    parser.add_argument("--count", type=int, default=2, help="Number of servers")
+    parser.add_argument("--base-port", type=int, default=8101, help="Port of the first server (the rest follow)")
+    parser.add_argument("--latency", default="0.5", help="Seconds per completion; one value or a comma-separated list per server")
+    parser.add_argument("--text-only", type=int, default=0, help="How many of the last servers reject images")
+    args = parser.parse_args()
+
+    latencies = [float(v) for v in args.latency.split(",")]
+    servers = []
+    for i in range(args.count):
+        server = StandinServer(name=f"standin-{i}", latency=latencies[min(i, len(latencies) - 1)],
+                               vision=i < args.count - args.text_only, port=args.base_port + i).start()
+        servers.append(server)
+
+    endpoints = [{"url": s.url, "capabilities": ["vision", "text"] if s.vision else ["text"]} for s in servers]
+    print("LMM_ENDPOINTS=" + json.dumps(endpoints))
+    print("Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.stop()
@@ -0,0 +1,445 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+
+# Swept parameters (config keys). Each combination of values is one policy.
+SWEEP_KEYS = [
+    "AUDIO_THRESHOLD_HIGH",
+    "VIDEO_ACTIVITY_THRESHOLD_HIGH",
+    "DOOM_SCROLL_THRESHOLD",
+    "RAPID_SWITCHING_THRESHOLD",
+    "MEETING_MODE_SPEECH_DURATION_THRESHOLD",
+    "MEETING_MODE_IDLE_KEYBOARD_THRESHOLD",
+    "MEETING_MODE_SPEECH_GRACE_PERIOD",
+]
+
+# LogicEngine defaults for the LMM call cadence (not config keys)
+LMM_CALL_INTERVAL = 5.0
+MIN_LMM_INTERVAL = 2.0
+
+# Virtual start time of every session (LogicEngine uses 0 as "never" for several timestamps)
+SWEEP_EPOCH = 1_700_000_000.0
+
+EVENT_REASONS = ("high_audio_level", "high_video_activity")
+
+COUNTERS = [
+    "lmm_calls", "audio_triggers", "video_triggers", "periodic_checks",
+    "doom_scroll_interventions", "rapid_switching_alerts", "meeting_mode_entries", "dnd_ticks",
+    "event_tp", "event_fp", "event_fn", "doom_tp", "doom_fp", "doom_fn",
+]
+
+
+class PolicySession:
+    """
+    One session loaded into per-tick arrays.
+
+    Everything that does not depend on the swept parameters (input tracking, idle
+    time, blacklist matches, history window counts) is precomputed here once.
+    """
+
+    def __init__(self, name, t, audio_level, is_speech, video_activity, face_detected, face_count,
+                 user_input, windows, visual_tags, event_index, expected_reason, expected_doom):
+        self.name = name
+        self.t = np.asarray(t, dtype=np.float64)
+        self.audio_level = np.asarray(audio_level, dtype=np.float64)
+        self.is_speech = np.asarray(is_speech, dtype=bool)
+        self.video_activity = np.asarray(video_activity, dtype=np.float64)
+        self.face_detected = np.asarray(face_detected, dtype=bool)
+        self.face_present = self.face_detected | (np.asarray(face_count) > 0)
+        self.event_index = np.asarray(event_index, dtype=np.int64)
+        # Per event: expected LMM trigger reason ("" = unlabeled) and doom-scroll label (1/0, -1 = unlabeled)
+        self.expected_reason = list(expected_reason)
+        self.expected_doom = list(expected_doom)
+
+        user_input = np.asarray(user_input, dtype=bool)
+        self.tracking = np.maximum.accumulate(user_input) if len(user_input) else user_input
+        last_input = np.where(user_input, self.t, -np.inf)
+        last_input = np.maximum.accumulate(last_input) if len(last_input) else last_input
+        self.idle = np.where(self.tracking, self.t - last_input, 0.0)
+
+        # Meeting mode: blacklist uses raw titles, history (rapid switching) uses sanitized ones
+        blacklist = [b.lower() for b in getattr(config, 'MEETING_MODE_BLACKLIST', [])]
+        self.blacklisted = np.array([w != "Unknown" and any(b in w.lower() for b in blacklist) for w in windows], dtype=bool)
+        self.speech_active = self.is_speech & self.face_detected & ~self.blacklisted
+
+        sanitize = _title_sanitizer()
+        history = deque(maxlen=getattr(config, 'HISTORY_WINDOW_SIZE', 5))
+        history_interval = getattr(config, 'HISTORY_SAMPLE_INTERVAL', 10)
+        last_sample = 0.0
+        unique_windows = np.zeros(len(self.t), dtype=np.int64)
+        for k, now in enumerate(self.t):
+            if now - last_sample >= history_interval:
+                last_sample = now
+                history.append(sanitize(windows[k]))
+            unique_windows[k] = len(set(w for w in history if w))
+        self.unique_windows = unique_windows
+
+        # Visual context the LMM would report; persistence only updates when it is non-empty
+        self.has_tags = np.array([bool(tags) for tags in visual_tags], dtype=bool)
+        self.phone_usage = np.array(["phone_usage" in (tags or []) for tags in visual_tags], dtype=bool)
+
+    def __len__(self):
+        return len(self.t)
+
+
+_sanitizer = None
+
+
+def _title_sanitizer():
+    global _sanitizer
+    if _sanitizer is None:
+        from sensors.window_sensor import WindowSensor
+        _sanitizer = WindowSensor()._sanitize_title
+    return _sanitizer
+
+
+def session_from_events(name, events, tick=1.0, default_duration=10.0):
+    """
+    Expands dataset events (replay harness format) into a tick timeline.
+
+    Each event holds its inputs for 'duration_seconds'. Optional per-event fields:
+    input.user_input (keyboard/mouse activity during the event), input.active_window,
+    input_analysis.audio.is_speech and input_analysis.video.face_detected/face_count.
+    expected_outcome.visual_context stands in for what the LMM would report.
+    """
+    columns = {key: [] for key in ("t", "audio_level", "is_speech", "video_activity", "face_detected",
+                                   "face_count", "user_input", "windows", "visual_tags", "event_index")}
+    expected_reason, expected_doom = [], []
+    now = SWEEP_EPOCH
+    for index, event in enumerate(events):
+        inputs = event.get("input", {})
+        analysis = event.get("input_analysis", {})
+        audio = analysis.get("audio", {})
+        video = analysis.get("video", {})
+        outcome = event.get("expected_outcome", {})
+
+        expected_reason.append(outcome.get("trigger_reason") or "")
+        doom_label = "doom_scroll_breaker" in (outcome.get("intervention"), outcome.get("expected_system_intervention"))
+        expected_doom.append(1 if doom_label else (0 if outcome else -1))
+
+        ticks = max(1, int(math.ceil(event.get("duration_seconds", default_duration) / tick)))
+        for _ in range(ticks):
+            columns["t"].append(now)
+            columns["audio_level"].append(audio.get("rms", inputs.get("audio_level", 0.0)))
+            columns["is_speech"].append(bool(audio.get("is_speech", False)))
+            columns["video_activity"].append(video.get("video_activity", inputs.get("video_activity", 0.0)))
+            columns["face_detected"].append(bool(video.get("face_detected", False)))
+            columns["face_count"].append(int(video.get("face_count", 0)))
+            columns["user_input"].append(bool(inputs.get("user_input", False)))
+            columns["windows"].append(inputs.get("active_window", "Unknown"))
+            columns["visual_tags"].append(outcome.get("visual_context") or [])
+            columns["event_index"].append(index)
+            now += tick
+
+    return PolicySession(name, expected_reason=expected_reason, expected_doom=expected_doom, **columns)
+
+
+def session_from_recording(path, tick=1.0):
+    """
+    Runs a recorded sensor session (sensors/session_recording.py) through the real
+    sensor analysis once and samples the LogicEngine snapshot every `tick` seconds.
+    Recordings carry no labels, so only trigger counts are reported for them.
+    """
+    from core.clock import VirtualClock
+    from core.logic_engine import LogicEngine
+    from sensors.session_recording import SessionPlayback, PlaybackAudioSensor, PlaybackVideoSensor
+    from tools.replay_runner import NullLogger
+
+    playback = SessionPlayback(path, speed=0)
+    logger = NullLogger()
+    clock = VirtualClock(playback.start_time)
+    engine = LogicEngine(audio_sensor=PlaybackAudioSensor(playback, logger), video_sensor=PlaybackVideoSensor(playback, logger),
+                         logger=logger, clock=clock)
+
+    items = [(entry[0], "video", entry) for entry in playback.video] + [(entry[0], "audio", entry) for entry in playback.audio]
+    items.sort(key=lambda item: item[0])
+
+    columns = {key: [] for key in ("t", "audio_level", "is_speech", "video_activity", "face_detected",
+                                   "face_count", "user_input", "windows", "visual_tags", "event_index")}
+    next_tick = playback.start_time
+    window_index = 0
+    title = "Unknown"
+
+    def sample(now):
+        snapshot = engine.sensor_snapshot
+        columns["t"].append(SWEEP_EPOCH + (now - playback.start_time))
+        columns["audio_level"].append(float(snapshot.audio_level))
+        columns["is_speech"].append(bool(snapshot.audio_analysis.get("is_speech", False)))
+        columns["video_activity"].append(float(snapshot.video_activity))
+        columns["face_detected"].append(bool(snapshot.face_metrics.get("face_detected", False)))
+        columns["face_count"].append(int(snapshot.face_metrics.get("face_count", 0)))
+        columns["user_input"].append(False)
+        columns["windows"].append(title)
+        columns["visual_tags"].append([])
+        columns["event_index"].append(0)
+
+    for ts, kind, entry in items:
+        while next_tick < ts:
+            sample(next_tick)
+            next_tick += tick
+        clock.set(ts)
+        while window_index < len(playback.windows) and playback.windows[window_index][0] <= ts:
+            title = playback.windows[window_index][1]
+            window_index += 1
+        if kind == "video":
+            frame = playback.frame_at(entry)
+            if frame is not None:
+                engine.process_video_data(frame)
+        else:
+            engine.process_audio_data(playback.chunk_at(entry))
+    sample(next_tick)
+    engine.shutdown()
+    playback.close()
+
+    return PolicySession(path, expected_reason=[""], expected_doom=[-1], **columns)
+
+
+def load_corpus(paths, tick=1.0):
+    """Loads dataset JSON files and recorded session directories (see tools/replay_runner.py for discovery)."""
+    from tools.replay_runner import discover_datasets
+
+    sessions = []
+    for path in paths:
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, "session.json")):
+            sessions.append(session_from_recording(path, tick))
+            continue
+        for dataset in discover_datasets([path]):
+            with open(dataset, 'r') as f:
+                data = json.load(f)
+            events = data if isinstance(data, list) else data.get("scenario", data.get("steps", []))
+            sessions.append(session_from_events(dataset, events, tick))
+    return sessions
+
+
+def build_grid(spec):
+    """
+    Cartesian product of parameter values. `spec` maps config keys to value lists;
+    keys not given use the current config value. Returns {key: flat array}.
+    """
+    unknown = set(spec) - set(SWEEP_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+    axes = [np.asarray(spec.get(key, [getattr(config, key)]), dtype=np.float64) for key in SWEEP_KEYS]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return {key: m.ravel() for key, m in zip(SWEEP_KEYS, mesh)}
+
+
+def evaluate_session(session, grid, lmm_call_interval=LMM_CALL_INTERVAL, min_lmm_interval=MIN_LMM_INTERVAL):
+    """
+    Replays LogicEngine.update()'s trigger policy over one session for every grid
+    combination at once. Time is stepped sequentially (the periodic interval and meeting-mode
+    timers are recurrences); each step is a vector operation across combinations.
+    Returns {counter: int array of grid size}.
+
+    LMM calls are assumed to complete before the next tick and the circuit breaker
+    to stay closed. Audio and video triggers are each paced by `min_lmm_interval`
+    (LogicEngine._lmm_trigger_ready), so a sustained condition is not a call per tick.
+    The sexual-arousal accelerator (driven by LMM state) and config TRIGGER_RULES are
+    not modelled.
+    """
+    audio_threshold = grid["AUDIO_THRESHOLD_HIGH"]
+    video_threshold = grid["VIDEO_ACTIVITY_THRESHOLD_HIGH"]
+    doom_threshold = grid["DOOM_SCROLL_THRESHOLD"]
+    rapid_threshold = grid["RAPID_SWITCHING_THRESHOLD"]
+    speech_threshold = grid["MEETING_MODE_SPEECH_DURATION_THRESHOLD"]
+    idle_threshold = grid["MEETING_MODE_IDLE_KEYBOARD_THRESHOLD"]
+    grace_period = grid["MEETING_MODE_SPEECH_GRACE_PERIOD"]
+    size = len(audio_threshold)
+
+    counts = {name: np.zeros(size, dtype=np.int64) for name in COUNTERS}
+    last_lmm = np.zeros(size)
+    last_audio = np.full(size, -np.inf)
+    last_video = np.full(size, -np.inf)
+    dnd = np.zeros(size, dtype=bool)
+    auto_dnd = np.zeros(size, dtype=bool)
+    speech_start = np.zeros(size)
+    last_speech = np.zeros(size)
+    doom_count = np.zeros(size, dtype=np.int64)
+
+    fired_audio = np.zeros(size, dtype=bool)
+    fired_video = np.zeros(size, dtype=bool)
+    fired_doom = np.zeros(size, dtype=bool)
+
+    def finish_event(index):
+        expected = session.expected_reason[index]
+        if expected:
+            if expected in EVENT_REASONS:
+                hit = fired_audio if expected == "high_audio_level" else fired_video
+                other = fired_video if expected == "high_audio_level" else fired_audio
+                counts["event_tp"] += hit
+                counts["event_fn"] += ~hit
+                counts["event_fp"] += other
+            else:
+                counts["event_fp"] += fired_audio | fired_video
+        label = session.expected_doom[index]
+        if label == 1:
+            counts["doom_tp"] += fired_doom
+            counts["doom_fn"] += ~fired_doom
+        elif label == 0:
+            counts["doom_fp"] += fired_doom
+        fired_audio[:] = False
+        fired_video[:] = False
+        fired_doom[:] = False
+
+    for k in range(len(session)):
+        now = session.t[k]
+        if k and session.event_index[k] != session.event_index[k - 1]:
+            finish_event(session.event_index[k - 1])
+
+        # Mode as read at the top of update(): decides whether interventions are allowed this tick
+        active = ~dnd
+
+        # Meeting mode (Active -> DND)
+        if session.tracking[k]:
+            if session.speech_active[k]:
+                last_speech[:] = now
+                speech_start = np.where(speech_start == 0, now, speech_start)
+            else:
+                speech_start = np.where((speech_start > 0) & (now - last_speech > grace_period), 0.0, speech_start)
+
+            if session.face_detected[k] and not session.blacklisted[k]:
+                speech_duration = np.where(speech_start > 0, now - speech_start, 0.0)
+                enter = ~dnd & (speech_duration >= speech_threshold) & (session.idle[k] >= idle_threshold)
+                dnd |= enter
+                auto_dnd |= enter
+                counts["meeting_mode_entries"] += enter
+
+            # Auto-DND exit on fresh input
+            if session.idle[k] < 1.0:
+                leave = dnd & auto_dnd
+                dnd &= ~leave
+                auto_dnd &= ~leave
+
+        # Event triggers: audio first; a loud non-speech sound still blocks the video check
+        loud = session.audio_level[k] > audio_threshold
+        audio_trigger = loud & session.is_speech[k] & (now - last_audio >= min_lmm_interval)
+        video_trigger = (~loud & (session.video_activity[k] > video_threshold) & session.face_present[k]
+                         & (now - last_video >= min_lmm_interval))
+        event_trigger = audio_trigger | video_trigger
+        periodic = ~event_trigger & (now - last_lmm >= lmm_call_interval)
+        call = event_trigger | periodic
+        last_lmm = np.where(call, now, last_lmm)
+        last_audio = np.where(audio_trigger, now, last_audio)
+        last_video = np.where(video_trigger, now, last_video)
+
+        counts["lmm_calls"] += call
+        counts["audio_triggers"] += audio_trigger
+        counts["video_triggers"] += video_trigger
+        counts["periodic_checks"] += periodic
+        counts["rapid_switching_alerts"] += call & (session.unique_windows[k] >= rapid_threshold)
+        fired_audio |= audio_trigger
+        fired_video |= video_trigger
+
+        # LMM result: visual-context persistence (only when the LMM reports tags)
+        if session.has_tags[k]:
+            doom_count = np.where(call, np.where(session.phone_usage[k], doom_count + 1, 0), doom_count)
+            doom = call & (doom_count >= doom_threshold) & active
+            counts["doom_scroll_interventions"] += doom
+            fired_doom |= doom
+
+        counts["dnd_ticks"] += dnd
+
+    if len(session):
+        finish_event(session.event_index[-1])
+    return counts
+
+
+def _evaluate_shard(args):
+    sessions, grid, lmm_call_interval, min_lmm_interval = args
+    totals = {name: np.zeros(len(grid[SWEEP_KEYS[0]]), dtype=np.int64) for name in COUNTERS}
+    for session in sessions:
+        for name, values in evaluate_session(session, grid, lmm_call_interval, min_lmm_interval).items():
+            totals[name] += values
+    return totals
+
+
+def sweep(sessions, spec, workers=None, lmm_call_interval=LMM_CALL_INTERVAL, min_lmm_interval=MIN_LMM_INTERVAL):
+    """Evaluates every grid combination over all sessions; sessions are sharded across a process pool."""
+    grid = build_grid(spec)
+    workers = max(1, workers or os.cpu_count() or 1)
+    shards = [sessions[i::workers] for i in range(min(workers, len(sessions)))]
+    jobs = [(shard, grid, lmm_call_interval, min_lmm_interval) for shard in shards]
+
+    if len(jobs) <= 1:
+        results = [_evaluate_shard(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            results = list(executor.map(_evaluate_shard, jobs))
+
+    totals = {name: np.zeros(len(grid[SWEEP_KEYS[0]]), dtype=np.int64) for name in COUNTERS}
+    for result in results:
+        for name, values in result.items():
+            totals[name] += values
+    return grid, totals
+
+
+def build_report(grid, totals, sessions, wall_duration):
+    """One row per parameter combination with trigger counts, FP counts and precision/recall."""
+    rows = []
+    for i in range(len(grid[SWEEP_KEYS[0]])):
+        row = {key: float(grid[key][i]) for key in SWEEP_KEYS}
+        row.update({name: int(totals[name][i]) for name in COUNTERS})
+        tp, fp, fn = row["event_tp"], row["event_fp"], row["event_fn"]
+        row["event_precision"] = tp / (tp + fp) if tp + fp else None
+        row["event_recall"] = tp / (tp + fn) if tp + fn else None
+        row["false_positives"] = fp + row["doom_fp"]
+        rows.append(row)
+
+    swept = [key for key in SWEEP_KEYS if len(np.unique(grid[key])) > 1]
+    return {
+        "sessions": len(sessions),
+        "ticks": int(sum(len(s) for s in sessions)),
+        "combinations": len(rows),
+        "swept_parameters": swept,
+        "wall_duration": wall_duration,
+        "results": rows,
+    }
+
+
+def parse_values(text):
+    """'0.3,0.5,0.7' -> list; 'start:stop:step' -> inclusive range."""
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        return list(np.round(np.arange(start, stop + step / 2, step), 10))
+    return [float(v) for v in text.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep LogicEngine trigger thresholds over a dataset corpus.")
+    parser.add_argument("paths", nargs="*", default=["datasets"], help="Dataset files/directories/globs or recorded session directories")
+    parser.add_argument("--sweep", action="append", default=[], metavar="KEY=VALUES",
+                        help="Parameter values, e.g. AUDIO_THRESHOLD_HIGH=0.3:0.8:0.1 or DOOM_SCROLL_THRESHOLD=2,3,4")
+    parser.add_argument("--tick", type=float, default=1.0, help="Seconds between simulated update() calls")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    spec = {}
+    for item in args.sweep:
+        key, _, values = item.partition("=")
+        spec[key.strip()] = parse_values(values)
+
+    start = time.time()
+    corpus = load_corpus(args.paths, tick=args.tick)
+    grid, totals = sweep(corpus, spec, workers=args.workers)
+    report = build_report(grid, totals, corpus, time.time() - start)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+        print(f"Evaluated {report['combinations']} combinations over {report['ticks']} ticks in {report['wall_duration']:.2f}s. Report: {args.output}")
+    else:
+        print(text)
@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import random
+import sys
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.clock import VirtualClock
+from core.intervention_library import InterventionLibrary
+from core.prompt_builder import PromptBuilder
+from core.prompts.v1 import SYSTEM_INSTRUCTION_V1
+
+# Rough BPE ratio used when no tokenizer endpoint is given
+CHARS_PER_TOKEN = 4.0
+
+WINDOWS = ["VS Code - main.py", "Terminal", "Slack - general", "Firefox - Docs", "VS Code - tests.py"]
+
+
+def simulate_contexts(calls, call_interval=5.0, history_interval=10.0, history_size=5, seed=0):
+    """
+    Yields (now, user_context) pairs shaped like LogicEngine._prepare_lmm_data output for a
+    stretch of periodic checks: noisy metrics every call, a history sample every
+    `history_interval` seconds and an occasional window switch.
+    """
+    rng = random.Random(seed)
+    now = 1_700_000_000.0
+    history = []
+    last_sample = 0.0
+    window = WINDOWS[0]
+    state = {"arousal": 50, "overload": 10, "focus": 70, "energy": 60, "mood": 55, "sexual_arousal": 0}
+
+    for _ in range(calls):
+        if rng.random() < 0.1:
+            window = rng.choice(WINDOWS)
+        audio = max(0.0, rng.gauss(0.08, 0.03))
+        motion = max(0.0, rng.gauss(4.0, 2.0))
+        if now - last_sample >= history_interval:
+            last_sample = now
+            history.append({"timestamp": now, "mode": "active", "active_window": window, "audio_level": audio,
+                            "video_activity": motion, "face_detected": True, "posture": "neutral"})
+            history = history[-history_size:]
+
+        yield now, {
+            "current_mode": "active",
+            "trigger_reason": "periodic_check",
+            "active_window": window,
+            "history": list(history),
+            "sensor_metrics": {
+                "audio_level": audio,
+                "video_activity": motion,
+                "face_detected": True,
+                "face_count": 1,
+                "audio_analysis": {"is_speech": False, "speech_confidence": 0.1, "pitch_estimation": 0.0,
+                                   "pitch_variance": 0.0, "zcr": 0.02, "speech_rate": 0.0},
+                "video_analysis": {"face_detected": True, "face_size_ratio": 0.1, "vertical_position": 0.5,
+                                   "posture_state": "neutral"},
+            },
+            "current_state_estimation": dict(state),
+            "suppressed_interventions": ["take_break"],
+            "preferred_interventions": ["box_breathing"],
+            "system_alerts": [],
+        }
+        state = {k: max(0, min(100, v + rng.randint(-3, 3))) for k, v in state.items()}
+        now += call_interval
+
+
+def _prompt_text(messages):
+    """Text the server tokenizes, in order (image parts are appended after the text by the chat template)."""
+    parts = []
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            parts.append(content)
+        else:
+            parts.extend(part["text"] for part in content if part["type"] == "text")
+    return "\n".join(parts)
+
+
+def _common_prefix(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _tokenizer(url):
+    """Token list function: the llama.cpp server /tokenize endpoint, or None for the char estimate."""
+    if not url:
+        return None
+    from core.lmm_http_client import LMMHttpClient
+    client = LMMHttpClient()
+    endpoint = url.rstrip('/') + "/tokenize"
+
+    def tokenize(text):
+        response = client.post(endpoint, json={"content": text})
+        response.raise_for_status()
+        return response.json()["tokens"]
+    return tokenize
+
+
+def run_benchmark(calls=60, tokenize_url=None, seed=0):
+    """Reports, per call, how many prompt tokens a prefix-caching server could reuse from the previous call."""
+    clock = VirtualClock(0.0)
+    builder = PromptBuilder(clock=clock)
+    system = SYSTEM_INSTRUCTION_V1.replace("{interventions_list}", InterventionLibrary().get_all_interventions_info())
+    tokenize = _tokenizer(tokenize_url)
+
+    previous = None
+    rows = []
+    for now, context in simulate_contexts(calls, seed=seed):
+        clock.set(now)
+        text = _prompt_text(builder.build_messages(system, context))
+        if tokenize:
+            current = tokenize(text)
+            total = len(current)
+        else:
+            current = text
+            total = round(len(text) / CHARS_PER_TOKEN)
+        if previous is None:
+            reused = 0
+        elif tokenize:
+            reused = _common_prefix(previous, current)
+        else:
+            reused = round(_common_prefix(previous, current) / CHARS_PER_TOKEN)
+        rows.append({"prompt_tokens": total, "reused_tokens": reused, "prefill_tokens": total - reused})
+        previous = current
+
+    steady = rows[1:] or rows
+    prompt = sum(r["prompt_tokens"] for r in steady) / len(steady)
+    saved = sum(r["reused_tokens"] for r in steady) / len(steady)
+    return {
+        "calls": calls,
+        "tokenizer": "server" if tokenize else f"estimate ({CHARS_PER_TOKEN} chars/token)",
+        "mean_prompt_tokens": prompt,
+        "mean_prefill_tokens_saved": saved,
+        "mean_prefill_tokens": prompt - saved,
+        "saved_fraction": saved / prompt if prompt else None,
+        "per_call": rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate prompt prefix (KV cache) reuse between consecutive LMM calls.")
+    parser.add_argument("--calls", type=int, default=60, help="Number of simulated periodic calls (5s apart)")
+    parser.add_argument("--tokenize-url", default=None, help="llama.cpp server base URL for exact token counts (uses /tokenize)")
+    parser.add_argument("--per-call", action="store_true", help="Include per-call rows in the output")
+    args = parser.parse_args()
+
+    report = run_benchmark(calls=args.calls, tokenize_url=args.tokenize_url)
+    if not args.per_call:
+        report.pop("per_call")
+    print(json.dumps(report, indent=2))
@@ -8,6 +8,7 @@ import numpy as np
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.logic_engine import LogicEngine
+from core.clock import VirtualClock
 from core.state_engine import StateEngine
 from core.data_logger import DataLogger
 import config
@@ -16,11 +17,19 @@ class MockLMMInterface:
     def __init__(self):
         self.last_analysis = {}
         self.current_expected_outcome = None
+        # Wall-clock seconds spent per process_data call (per-stage latency reporting)
+        self.call_durations = []
 
     def set_expectation(self, expected_outcome):
         self.current_expected_outcome = expected_outcome
 
     def process_data(self, video_data=None, audio_data=None, user_context=None):
+        start = time.perf_counter()
+        analysis = self._simulate(user_context)
+        self.call_durations.append(time.perf_counter() - start)
+        return analysis
+
+    def _simulate(self, user_context):
         # Simulate LMM processing based on the expected outcome of the current event
         trigger_reason = user_context.get("trigger_reason")
 
@@ -111,13 +120,38 @@ class SynchronousLogicEngine(LogicEngine):
             return
 
         # Directly call the async worker method synchronously
+        self.last_lmm_call_time = self.clock.time()
         self._run_lmm_analysis_async(lmm_payload, allow_intervention)
 
+# Fixed virtual start time so replays are deterministic
+REPLAY_EPOCH = 1_700_000_000.0
+
+# Virtual seconds an event lasts in run() when the dataset gives no 'duration_seconds'
+EVENT_SPACING = 100
+
+def classify_outcome(target_intervention, actual_interventions):
+    """
+    Classifies one event/step as 'tp', 'tn', 'fp' or 'fn'.
+    A different intervention than the expected one counts as a false positive.
+    """
+    if target_intervention:
+        match = next((i for i in actual_interventions if i.get('type') == target_intervention or i.get('id') == target_intervention), None)
+        if match:
+            return "tp"
+        return "fp" if actual_interventions else "fn"
+    return "fp" if actual_interventions else "tn"
+
 class ReplayHarness:
-    def __init__(self, dataset_path=None):
+    def __init__(self, dataset_path=None, clock=None, logger=None, verbose=True):
         self.dataset_path = dataset_path
+        # LogicEngine runs on virtual time: steps advance the clock instead of sleeping,
+        # so cooldowns behave as on the wall clock and long scenarios replay instantly.
+        self.clock = clock if clock is not None else VirtualClock(REPLAY_EPOCH)
+        self.verbose = verbose
         self.events = self._load_events() if dataset_path else []
-        self.logger = DataLogger(log_file_path="replay_log.txt")
+        self.logger = logger if logger is not None else DataLogger(log_file_path="replay_log.txt")
+        # Wall-clock seconds per step for each pipeline stage ('lmm' is part of 'update')
+        self.stage_latencies = {"sensors": [], "update": [], "lmm": []}
         self.mock_lmm = MockLMMInterface()
         self.mock_intervention = MockInterventionEngine()
         self.mock_audio_sensor = MockAudioSensor()
@@ -128,7 +162,8 @@ class ReplayHarness:
             logger=self.logger,
             lmm_interface=self.mock_lmm,
             audio_sensor=self.mock_audio_sensor,
-            video_sensor=self.mock_video_sensor
+            video_sensor=self.mock_video_sensor,
+            clock=self.clock
         )
         self.logic_engine.set_intervention_engine(self.mock_intervention)
 
@@ -145,8 +180,27 @@ class ReplayHarness:
         with open(self.dataset_path, 'r') as f:
             return json.load(f)
 
+    def _say(self, message):
+        if self.verbose:
+            print(message)
+
+    def _step(self, audio_chunk, frame1, frame2):
+        """Feeds one step of sensor data and runs update(), recording per-stage latency."""
+        lmm_calls = len(self.mock_lmm.call_durations)
+        start = time.perf_counter()
+        self.logic_engine.process_video_data(frame1) # Set previous
+        self.logic_engine.process_video_data(frame2) # Set current -> triggers diff calc
+        self.logic_engine.process_audio_data(audio_chunk)
+        sensors_done = time.perf_counter()
+        self.logic_engine.update()
+        update_done = time.perf_counter()
+
+        self.stage_latencies["sensors"].append(sensors_done - start)
+        self.stage_latencies["update"].append(update_done - sensors_done)
+        self.stage_latencies["lmm"].extend(self.mock_lmm.call_durations[lmm_calls:])
+
     def run(self):
-        print(f"Starting replay of {len(self.events)} events...")
+        self._say(f"Starting replay of {len(self.events)} events...")
 
         results = {
             "total_events": len(self.events),
@@ -154,11 +208,14 @@ class ReplayHarness:
             "correct_triggers": 0,
             "false_positives": 0,
             "false_negatives": 0,
+            # Intervention-only confusion counts (state mismatches are not included)
+            "outcomes": {"tp": 0, "tn": 0, "fp": 0, "fn": 0},
             "start_time": time.time(),
         }
+        virtual_start = self.clock.time()
 
         for event in self.events:
-            print(f"Processing event: {event['id']} ({event['description']})")
+            self._say(f"Processing event: {event['id']} ({event['description']})")
 
             # 1. Setup the mocks
             self.mock_lmm.set_expectation(event['expected_outcome'])
@@ -173,8 +230,8 @@ class ReplayHarness:
                 if 'video' in event['input_analysis']:
                     self.mock_video_sensor.analysis_result = event['input_analysis']['video']
 
-            # Reset LogicEngine state slightly to ensure clean slate for event
-            self.logic_engine.last_lmm_call_time = 0 # Force eligible for periodic check if needed
+            # Each event's inputs hold for its 'duration_seconds' (the same timeline as tools/policy_sweep.py)
+            self.clock.advance(event.get('duration_seconds', event.get('time_delta', EVENT_SPACING)))
 
             # 2. Inject Sensor Data
             target_audio = event['input']['audio_level']
@@ -186,16 +243,8 @@ class ReplayHarness:
             frame1 = np.zeros((100, 100, 3), dtype=np.uint8)
             frame2 = np.full((100, 100, 3), pixel_val, dtype=np.uint8)
 
-            # Inject
-            self.logic_engine.process_video_data(frame1) # Set previous
-            self.logic_engine.process_video_data(frame2) # Set current -> triggers diff calc
-            self.logic_engine.process_audio_data(audio_chunk)
-
-            # 3. Trigger LogicEngine Update
-            # Force time to allow trigger
-            self.logic_engine.last_lmm_call_time = time.time() - 100
-
-            self.logic_engine.update()
+            # Inject and 3. Trigger LogicEngine Update
+            self._step(audio_chunk, frame1, frame2)
 
             # 4. Verify Outcomes
             # Verify State (if expected)
@@ -207,10 +256,10 @@ class ReplayHarness:
                     actual_val = current_state.get(dim)
                     # Allow tolerance due to smoothing
                     if abs(actual_val - expected_val) > 10:
-                        print(f"  [FAILURE] State {dim}: Expected ~{expected_val}, got {actual_val}")
+                        self._say(f"  [FAILURE] State {dim}: Expected ~{expected_val}, got {actual_val}")
                         state_success = False
                     else:
-                        print(f"  [SUCCESS] State {dim}: {actual_val} (Target {expected_val})")
+                        self._say(f"  [SUCCESS] State {dim}: {actual_val} (Target {expected_val})")
 
             expected_intervention = event['expected_outcome'].get("intervention")
             # Also check for system-triggered interventions (not from LMM suggestion)
@@ -220,6 +269,8 @@ class ReplayHarness:
 
             actual_interventions = self.mock_intervention.interventions_triggered
 
+            results["outcomes"][classify_outcome(target_intervention, actual_interventions)] += 1
+
             if not state_success:
                  results["false_negatives"] += 1 # Count state failure as negative result
 
@@ -227,29 +278,32 @@ class ReplayHarness:
                 # Check if ANY of the triggered interventions match the type (or ID for system triggers)
                 match = next((i for i in actual_interventions if i.get('type') == target_intervention or i.get('id') == target_intervention), None)
                 if match:
-                    print(f"  [SUCCESS] Triggered expected intervention: {target_intervention}")
+                    self._say(f"  [SUCCESS] Triggered expected intervention: {target_intervention}")
                     results["correct_triggers"] += 1
                     results["triggered_interventions"] += 1
                 else:
                     if len(actual_interventions) > 0:
                         got_types = [i.get('type') or i.get('id') for i in actual_interventions]
-                        print(f"  [FAILURE] Expected {target_intervention}, got {got_types}")
+                        self._say(f"  [FAILURE] Expected {target_intervention}, got {got_types}")
                         results["false_positives"] += 1 # Wrong one triggered
                     else:
-                        print(f"  [FAILURE] Expected {target_intervention}, got NONE")
+                        self._say(f"  [FAILURE] Expected {target_intervention}, got NONE")
                         results["false_negatives"] += 1
             else:
                 if len(actual_interventions) == 0:
-                     print(f"  [SUCCESS] Correctly triggered NO intervention.")
+                     self._say(f"  [SUCCESS] Correctly triggered NO intervention.")
                      results["correct_triggers"] += 1
                 else:
                     got_types = [i.get('type') or i.get('id') for i in actual_interventions]
-                    print(f"  [FAILURE] Expected NONE, got {got_types}")
+                    self._say(f"  [FAILURE] Expected NONE, got {got_types}")
                     results["false_positives"] += 1
                     results["triggered_interventions"] += 1
 
         results["duration"] = time.time() - results["start_time"]
-        results["intervention_rate_per_hour_simulated"] = (results["triggered_interventions"] / len(self.events)) * (3600 / 30) # Approx
+        results["simulated_duration"] = self.clock.time() - virtual_start
+        simulated_hours = results["simulated_duration"] / 3600.0
+        results["intervention_rate_per_hour_simulated"] = results["triggered_interventions"] / simulated_hours if simulated_hours else 0.0
+        results["stage_latencies"] = self.stage_latencies
 
         return results
 
@@ -257,20 +311,21 @@ class ReplayHarness:
         """
         Runs a sequence of steps (scenario) without resetting LogicEngine state between steps.
         """
-        print(f"Starting scenario replay with {len(scenario)} steps...")
+        self._say(f"Starting scenario replay with {len(scenario)} steps...")
 
         results = {
             "total_steps": len(scenario),
             "step_results": [],
             "start_time": time.time(),
         }
+        virtual_start = self.clock.time()
 
         # Ensure we start with a clean state only at the beginning of the scenario
         # But we do NOT reset between steps
         # self.logic_engine.last_lmm_call_time = 0
 
         for i, step in enumerate(scenario):
-            print(f"Processing step {i+1}: {step.get('description', 'No description')}")
+            self._say(f"Processing step {i+1}: {step.get('description', 'No description')}")
 
             # 1. Setup Expectation for this step
             self.mock_lmm.set_expectation(step['expected_outcome'])
@@ -285,6 +340,9 @@ class ReplayHarness:
                 if 'video' in step['input_analysis']:
                     self.mock_video_sensor.analysis_result = step['input_analysis']['video']
 
+            # Time passes between steps: 'time_delta' virtual seconds (default 10)
+            self.clock.advance(step.get('time_delta', 10))
+
             # 2. Inject Data
             target_audio = step['input']['audio_level']
             audio_chunk = np.full(1024, target_audio)
@@ -295,20 +353,8 @@ class ReplayHarness:
             frame1 = np.zeros((100, 100, 3), dtype=np.uint8)
             frame2 = np.full((100, 100, 3), pixel_val, dtype=np.uint8)
 
-            self.logic_engine.process_video_data(frame1)
-            self.logic_engine.process_video_data(frame2)
-            self.logic_engine.process_audio_data(audio_chunk)
-
             # 3. Trigger Update
-            # We assume time passes between steps.
-            # If step defines 'time_delta', use it. Else assume enough time for LMM check.
-            time_delta = step.get('time_delta', 10)
-            # Note: LogicEngine checks time.time(). We can't easily mock time.time() inside LogicEngine
-            # without patching.
-            # However, we can force last_lmm_call_time to be old.
-            self.logic_engine.last_lmm_call_time = time.time() - self.logic_engine.lmm_call_interval - 1
-
-            self.logic_engine.update()
+            self._step(audio_chunk, frame1, frame2)
 
             # 4. Verify
             # Verify State (if expected)
@@ -322,10 +368,10 @@ class ReplayHarness:
                     # For scenarios, we might want stricter checks, but smoothing makes it hard.
                     # We'll use a tolerance of 5.
                     if abs(actual_val - expected_val) > 5:
-                        print(f"  [FAILURE] State {dim}: Expected ~{expected_val}, got {actual_val}")
+                        self._say(f"  [FAILURE] State {dim}: Expected ~{expected_val}, got {actual_val}")
                         state_success = False
                     else:
-                        print(f"  [SUCCESS] State {dim}: {actual_val} (Target {expected_val})")
+                        self._say(f"  [SUCCESS] State {dim}: {actual_val} (Target {expected_val})")
 
             expected_intervention = step['expected_outcome'].get("intervention")
             expected_system_intervention = step['expected_outcome'].get("expected_system_intervention")
@@ -341,19 +387,19 @@ class ReplayHarness:
                  # suggestion has 'type'.
                  match = next((i for i in actual_interventions if i.get('type') == target_intervention or i.get('id') == target_intervention), None)
                  if match:
-                     print(f"  [SUCCESS] Triggered expected intervention: {target_intervention}")
+                     self._say(f"  [SUCCESS] Triggered expected intervention: {target_intervention}")
                      intervention_success = True
                  else:
                      got_types = [i.get('type') or i.get('id') for i in actual_interventions]
-                     print(f"  [FAILURE] Expected {target_intervention}, got {got_types}")
+                     self._say(f"  [FAILURE] Expected {target_intervention}, got {got_types}")
                      intervention_success = False
             else:
                 if len(actual_interventions) == 0:
-                    print(f"  [SUCCESS] Correctly triggered NO intervention.")
+                    self._say(f"  [SUCCESS] Correctly triggered NO intervention.")
                     intervention_success = True
                 else:
                     got_types = [i.get('type') or i.get('id') for i in actual_interventions]
-                    print(f"  [FAILURE] Expected NONE, got {got_types}")
+                    self._say(f"  [FAILURE] Expected NONE, got {got_types}")
                     intervention_success = False
 
             step_success = state_success and intervention_success
@@ -362,9 +408,14 @@ class ReplayHarness:
                 "step": i,
                 "success": step_success,
                 "expected": expected_intervention,
-                "actual": actual_interventions
+                "actual": actual_interventions,
+                "outcome": classify_outcome(target_intervention, actual_interventions)
             })
 
+        results["duration"] = time.time() - results["start_time"]
+        results["simulated_duration"] = self.clock.time() - virtual_start
+        results["stage_latencies"] = self.stage_latencies
+
         return results
 
     def print_report(self, results):
@@ -0,0 +1,263 @@
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tools.replay_harness import ReplayHarness
+import config
+
+
+class NullLogger:
+    """DataLogger stand-in for workers: per-event console/file logging would dominate replay time."""
+
+    def log_info(self, message):
+        pass
+
+    def log_warning(self, message):
+        pass
+
+    def log_error(self, message, details=""):
+        pass
+
+    def log_debug(self, message):
+        pass
+
+    def log_event(self, event_type, payload):
+        pass
+
+
+# Virtual seconds between LogicEngine updates when replaying a recorded session
+RECORDING_TICK = 1.0
+
+
+def is_recording(path):
+    """True for a session directory written by sensors/session_recording.py (SessionRecorder)."""
+    return os.path.isdir(path) and os.path.exists(os.path.join(path, "session.json"))
+
+
+def discover_datasets(paths):
+    """
+    Expands files, directories and glob patterns into a sorted, de-duplicated list.
+    A directory contributes its *.json datasets and recorded session subdirectories;
+    a recorded session directory given directly is replayed as one dataset.
+    """
+    found = set()
+    for path in paths:
+        if is_recording(path):
+            found.add(path)
+        elif os.path.isdir(path):
+            found.update(glob.glob(os.path.join(path, "*.json")))
+            found.update(p for p in glob.glob(os.path.join(path, "*")) if is_recording(p))
+        elif os.path.isfile(path):
+            found.add(path)
+        else:
+            found.update(p for p in glob.glob(path) if os.path.isfile(p) or is_recording(p))
+    return sorted(found)
+
+
+def replay_recording(path, tick=RECORDING_TICK):
+    """
+    Replays a recorded sensor session through the real sensor analysis on a PlaybackClock,
+    running LogicEngine.update() every `tick` session seconds.
+    Recordings carry no labels, so only steps and interventions are reported for them.
+    """
+    from sensors.session_recording import (SessionPlayback, PlaybackClock, PlaybackAudioSensor,
+                                           PlaybackVideoSensor, PlaybackWindowSensor)
+
+    playback = SessionPlayback(path, speed=0)
+    try:
+        logger = NullLogger()
+        harness = ReplayHarness(clock=PlaybackClock(playback), logger=logger, verbose=False)
+        engine = harness.logic_engine
+        engine.video_sensor = PlaybackVideoSensor(playback, logger)
+        engine.audio_sensor = PlaybackAudioSensor(playback, logger)
+        engine.window_sensor = PlaybackWindowSensor(playback, logger)
+        # The harness thresholds match synthetic datasets; real sensor values use the configured ones
+        engine.audio_threshold_high = config.AUDIO_THRESHOLD_HIGH
+        engine.video_activity_threshold_high = config.VIDEO_ACTIVITY_THRESHOLD_HIGH
+
+        items = [(entry[0], "audio") for entry in playback.audio] + [(entry[0], "video") for entry in playback.video]
+        items.sort()
+        latencies = harness.stage_latencies
+        start = time.time()
+        next_tick = playback.start_time + tick
+        steps = 0
+
+        def update():
+            lmm_calls = len(harness.mock_lmm.call_durations)
+            update_start = time.perf_counter()
+            engine.update()
+            latencies["update"].append(time.perf_counter() - update_start)
+            latencies["lmm"].extend(harness.mock_lmm.call_durations[lmm_calls:])
+
+        # Frames and chunks are read in session-time order, so the PlaybackClock follows the recording
+        for ts, kind in items:
+            while next_tick <= ts:
+                update()
+                steps += 1
+                next_tick += tick
+            sensor_start = time.perf_counter()
+            if kind == "video":
+                engine.process_video_data(playback.read_frame())
+            else:
+                engine.process_audio_data(playback.read_chunk())
+            latencies["sensors"].append(time.perf_counter() - sensor_start)
+        update()
+        steps += 1
+
+        return {
+            "dataset": path,
+            "labeled": False,
+            "steps": steps,
+            "outcomes": {"tp": 0, "tn": 0, "fp": 0, "fn": 0},
+            "interventions": len(harness.mock_intervention.interventions_triggered),
+            "wall_duration": time.time() - start,
+            "simulated_duration": playback.duration,
+            "stage_latencies": latencies,
+        }
+    finally:
+        playback.close()
+
+
+def replay_dataset(path):
+    """
+    Replays one dataset in a fresh harness (own LogicEngine and VirtualClock).
+
+    A JSON list is treated as independent events (ReplayHarness.run); an object with
+    'scenario' or 'steps' is replayed as one continuous scenario (run_scenario).
+    Recorded session directories are replayed by replay_recording().
+    Returns a plain dict so it can cross the process boundary.
+    """
+    try:
+        if is_recording(path):
+            return replay_recording(path)
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        harness = ReplayHarness(logger=NullLogger(), verbose=False)
+        if isinstance(data, list):
+            harness.events = data
+            results = harness.run()
+            outcomes = results["outcomes"]
+            steps = results["total_events"]
+        else:
+            scenario = data.get("scenario", data.get("steps", []))
+            results = harness.run_scenario(scenario)
+            outcomes = {"tp": 0, "tn": 0, "fp": 0, "fn": 0}
+            for step in results["step_results"]:
+                outcomes[step["outcome"]] += 1
+            steps = results["total_steps"]
+    except Exception as e:
+        return {"dataset": path, "error": f"{type(e).__name__}: {e}"}
+
+    return {
+        "dataset": path,
+        "steps": steps,
+        "outcomes": outcomes,
+        "interventions": outcomes["tp"] + outcomes["fp"],
+        "wall_duration": results["duration"],
+        "simulated_duration": results["simulated_duration"],
+        "stage_latencies": results["stage_latencies"],
+    }
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else None
+
+
+def _latency_summary(samples):
+    if not samples:
+        return {"count": 0}
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "max_ms": float(values.max()),
+    }
+
+
+def build_report(dataset_results, wall_duration, workers):
+    """Aggregates per-dataset results into one machine-readable report."""
+    ok = [r for r in dataset_results if "error" not in r]
+    totals = {"tp": 0, "tn": 0, "fp": 0, "fn": 0}
+    stages = {}
+    for result in ok:
+        for key, count in result["outcomes"].items():
+            totals[key] += count
+        for stage, samples in result["stage_latencies"].items():
+            stages.setdefault(stage, []).extend(samples)
+
+    steps = sum(r["steps"] for r in ok)
+    # Unlabeled steps (recorded sessions) have no outcome and are left out of accuracy
+    labeled_steps = sum(r["steps"] for r in ok if r.get("labeled", True))
+    interventions = sum(r["interventions"] for r in ok)
+    simulated = sum(r["simulated_duration"] for r in ok)
+
+    return {
+        "datasets": len(dataset_results),
+        "failed_datasets": [{"dataset": r["dataset"], "error": r["error"]} for r in dataset_results if "error" in r],
+        "workers": workers,
+        "steps": steps,
+        "outcomes": totals,
+        "precision": _ratio(totals["tp"], totals["tp"] + totals["fp"]),
+        "recall": _ratio(totals["tp"], totals["tp"] + totals["fn"]),
+        "accuracy": _ratio(totals["tp"] + totals["tn"], labeled_steps),
+        "interventions": interventions,
+        "interventions_per_step": _ratio(interventions, steps),
+        "interventions_per_simulated_hour": _ratio(interventions * 3600.0, simulated),
+        "wall_duration": wall_duration,
+        "simulated_duration": simulated,
+        "speedup": _ratio(simulated, wall_duration),
+        "stage_latency": {stage: _latency_summary(samples) for stage, samples in stages.items()},
+        "per_dataset": [
+            {key: value for key, value in r.items() if key != "stage_latencies"}
+            for r in dataset_results
+        ],
+    }
+
+
+def run_replays(paths, workers=None):
+    """Replays every dataset across a process pool and returns the aggregated report."""
+    datasets = discover_datasets(paths)
+    workers = max(1, workers or os.cpu_count() or 1)
+    start = time.time()
+
+    if workers == 1 or len(datasets) <= 1:
+        dataset_results = [replay_dataset(path) for path in datasets]
+    else:
+        # Several datasets per task keeps IPC overhead low for large synthetic corpora
+        chunksize = max(1, math.ceil(len(datasets) / (workers * 4)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            dataset_results = list(executor.map(replay_dataset, datasets, chunksize=chunksize))
+
+    return build_report(dataset_results, time.time() - start, workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay datasets in parallel under virtual time and report policy metrics.")
+    parser.add_argument("paths", nargs="*", default=["datasets"], help="Dataset files, recorded session directories, directories or glob patterns (default: datasets/)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = run_replays(args.paths, workers=args.workers)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+        print(f"Replayed {report['datasets']} datasets ({report['steps']} steps) in {report['wall_duration']:.2f}s. Report: {args.output}")
+    else:
+        print(text)
+
+    sys.exit(1 if report["failed_datasets"] else 0)
@@ -0,0 +1,57 @@
+import argparse
+import glob
+import os
+import sys
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from core.state_predictor import StatePredictor, STATE_DIMENSIONS, training_pairs
+from tools.generate_timeline import parse_events
+
+
+def load_events(paths):
+    """Events from every given file (rotated logs included), in timestamp order."""
+    events = []
+    for path in paths:
+        events.extend(parse_events(path))
+    events.sort(key=lambda event: event.get('timestamp', ''))
+    return events
+
+
+def train(paths, alpha=1.0, folds=5):
+    X, Y = training_pairs(load_events(paths))
+    if len(X) == 0:
+        return None
+    return StatePredictor.fit(X, Y, alpha=alpha, folds=folds)
+
+
+def report(model):
+    lines = [f"Trained on {model.samples} lmm_trigger/state estimate pairs (alpha={model.alpha})."]
+    lines.append("Cross-validated RMSE per dimension (state points, 0-100):")
+    for dim, rmse in zip(STATE_DIMENSIONS, model.rmse):
+        lines.append(f"  {dim:<15} {rmse:6.2f}")
+    lines.append(f"Mean RMSE {np.mean(model.rmse):.2f} -> confidence on in-distribution input: "
+                 f"{max(0.0, 1.0 - float(np.mean(model.rmse)) / model.error_scale):.2f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit the local sensor-to-state predictor from events.jsonl.")
+    parser.add_argument("--events", nargs="+", default=sorted(glob.glob(config.EVENTS_FILE + "*")),
+                        help="events.jsonl files (default: the events file and its rotated backups)")
+    parser.add_argument("--output", default=config.STATE_PREDICTOR_FILE, help="Where to write the model JSON")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Ridge regularization strength")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds for the reported RMSE")
+    args = parser.parse_args()
+
+    model = train(args.events, alpha=args.alpha, folds=args.folds)
+    if model is None:
+        print("No lmm_trigger/state estimate pairs found; nothing to train on.")
+        sys.exit(1)
+    print(report(model))
+    model.save(args.output)
+    print(f"Model written to {args.output}")